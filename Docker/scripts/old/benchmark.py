@@ -0,0 +1,356 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.constants import NATIVE_RENDERER, CARGO_GENERATE_RENDERER
+from embedded_creator.create_makefile import core_makefile, project_makefile
+from embedded_creator.memory_map import core_memory_regions
+from embedded_creator.project_creator import project_creator
+from embedded_creator.staged_tree import StagedTree
+from embedded_creator.template_cache import TemplateCache
+from embedded_creator.toolchain_state import ToolchainState
+from embedded_creator.tracing import configure_logging
+from embedded_creator.update_cargo_toml import update_cargo_toml
+from embedded_creator.update_memory import modify_memory_x
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(SCRIPTS_DIR, "benchmark_fixtures")
+# Fake cargo, rustup and rustc, put first on the PATH while the benchmarks run
+FAKE_BIN_DIR = os.path.join(FIXTURES_DIR, "bin")
+QUICKSTART_FIXTURE = os.path.join(FIXTURES_DIR, "quickstart")
+
+RESULTS_VERSION = 1
+CORE_COUNTS = [1, 2, 8, 64]
+# Seconds every fake tool sleeps before doing its work
+DEFAULT_TOOL_LATENCY = 0.02
+DEFAULT_REPEAT = 5
+# A benchmark regresses when its median grows by more than this fraction of the baseline median
+DEFAULT_THRESHOLD = 0.10
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    # Seconds per call, one entry per repetition
+    timings: List[float] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    def serialize(self) -> dict:
+        return {"median": self.median, "best": self.best, "timings": self.timings}
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1 + self.threshold
+
+
+def measure(
+    function: Callable[[], None],
+    repeat: Optional[int] = DEFAULT_REPEAT,
+    number: Optional[int] = 1,
+    setup: Optional[Callable[[], None]] = None,
+) -> List[float]:
+    """
+    Times 'repeat' batches of 'number' calls and returns the time per call of each batch. 'setup' runs
+    before every call, outside of the measured time.
+    """
+    timings = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            function()
+            elapsed += time.perf_counter() - start
+        timings.append(elapsed / number)
+    return timings
+
+
+@contextmanager
+def offline_environment(latency: Optional[float] = DEFAULT_TOOL_LATENCY) -> Iterator[str]:
+    """
+    Scratch directory and environment in which nothing touches the network or the real toolchain:
+    cargo, rustup and rustc resolve to the fakes of 'benchmark_fixtures/bin', rustup targets are kept in
+    the scratch directory and the template store is seeded from the quickstart fixture.
+
+    Yields:
+    - str: The scratch directory, removed on exit along with the environment changes.
+    """
+    with tempfile.TemporaryDirectory(prefix="create-project-benchmark-") as workspace:
+        overrides = {
+            "PATH": FAKE_BIN_DIR + os.pathsep + os.environ.get("PATH", ""),
+            "BENCHMARK_TOOL_LATENCY": str(latency),
+            "FAKE_RUSTUP_STATE": os.path.join(workspace, "rustup-targets"),
+            # No rustup layout to fingerprint, the toolchain state falls back to 'rustc --version'
+            "RUSTUP_HOME": os.path.join(workspace, "rustup"),
+            "RUSTUP_TOOLCHAIN": "benchmark",
+            # The commands run in fresh processes must not fill the core cache of the user
+            "CORE_CACHE_DIR": os.path.join(workspace, "cores"),
+        }
+        saved = {name: os.environ.get(name) for name in overrides}
+        os.environ.update(overrides)
+        try:
+            TemplateCache(cache_dir=os.path.join(workspace, "templates")).refresh(seed=QUICKSTART_FIXTURE)
+            yield workspace
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def synthetic_config_data(cores: int) -> Dict:
+    """
+    Config of a project with 'cores' cores whose flash and RAM regions do not overlap.
+    """
+    return {
+        "mcu_family": "STM32H7",
+        "debug_configuration": "gdb-multiarch",
+        "config": [
+            {
+                "core": f"cortex-m7-{index}",
+                "arch": "thumbv7em-none-eabihf",
+                "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+                "memory": {
+                    "flash": [f"0x{0x08000000 + index * 0x20000:08X}", "128K"],
+                    "ram": [f"0x{0x20000000 + index * 0x4000:08X}", "16K"],
+                    "extra_sections": {"memory_type": "itcm_ram", "origin": f"0x{index * 0x1000:08X}", "length": "4K"},
+                },
+            }
+            for index in range(cores)
+        ],
+    }
+
+
+def benchmark_end_to_end(workspace: str, core_counts: List[int], repeat: int) -> List[BenchmarkResult]:
+    """
+    Times project_creator from config to committed project, with both renderers. Every run creates a
+    new project, the template store and the toolchain state are warmed up by an unmeasured first run.
+    """
+    template_cache = TemplateCache(cache_dir=os.path.join(workspace, "templates"))
+    toolchain_state_dir = os.path.join(workspace, "toolchain")
+    results = []
+    for renderer in [NATIVE_RENDERER, CARGO_GENERATE_RENDERER]:
+        for cores in core_counts:
+            project_config = build_project_config(synthetic_config_data(cores))
+            destinations = iter(tempfile.mkdtemp(dir=workspace) for _ in range(repeat + 1))
+
+            def create() -> None:
+                project_creator(
+                    f"bench-{cores}",
+                    project_config,
+                    template_cache=template_cache,
+                    renderer=renderer,
+                    destination=next(destinations),
+                    toolchain_state=ToolchainState(cache_dir=toolchain_state_dir),
+                )
+
+            create()
+            results.append(BenchmarkResult(f"end_to_end/{renderer}/{cores}_cores", measure(create, repeat)))
+    return results
+
+
+def benchmark_micro(workspace: str, repeat: int) -> List[BenchmarkResult]:
+    """
+    Times the steps of a core generation on their own, on in-memory trees.
+    """
+    config_data = synthetic_config_data(8)
+    project_config = build_project_config(config_data)
+    config = project_config.config[0]
+    regions = core_memory_regions(config)
+    with open(os.path.join(QUICKSTART_FIXTURE, "memory.x"), "r") as file:
+        memory_x = file.read()
+    with open(os.path.join(QUICKSTART_FIXTURE, ".cargo", "config.toml"), "r") as file:
+        cargo_config = file.read()
+    core_path = os.path.join(workspace, "micro", "core")
+    tree = StagedTree(os.path.join(workspace, "micro"))
+
+    def reset_files() -> None:
+        tree.write_text(os.path.join(core_path, "memory.x"), memory_x)
+        tree.write_text(os.path.join(core_path, ".cargo", "config.toml"), cargo_config)
+
+    core_names = [f"core-{index}" for index in range(64)]
+    return [
+        BenchmarkResult(
+            "micro/project_types_validation/8_cores",
+            measure(lambda: build_project_config(config_data), repeat, number=200),
+        ),
+        BenchmarkResult(
+            "micro/modify_memory_x",
+            measure(
+                lambda: modify_memory_x(core_path, project_config.mcu_family, config, tree=tree, regions=regions),
+                repeat,
+                number=200,
+                setup=reset_files,
+            ),
+        ),
+        BenchmarkResult(
+            "micro/update_cargo_toml",
+            measure(
+                lambda: update_cargo_toml(
+                    os.path.join(core_path, ".cargo"), "config.toml", config.arch, project_config.mcu_family, "gdb-multiarch", tree=tree
+                ),
+                repeat,
+                number=200,
+                setup=reset_files,
+            ),
+        ),
+        BenchmarkResult(
+            "micro/core_makefile",
+            measure(lambda: core_makefile().write(core_path, "Makefile", tree=tree), repeat, number=200),
+        ),
+        BenchmarkResult(
+            "micro/project_makefile/64_cores",
+            measure(lambda: project_makefile(core_names).write(tree.root, "Makefile", tree=tree), repeat, number=200),
+        ),
+    ]
+
+
+def run_benchmarks(
+    core_counts: Optional[List[int]] = None,
+    latency: Optional[float] = DEFAULT_TOOL_LATENCY,
+    repeat: Optional[int] = DEFAULT_REPEAT,
+    name_filter: Optional[str] = None,
+) -> dict:
+    """
+    Runs the whole suite offline and returns the results document written by 'run --output'.
+    """
+    with offline_environment(latency) as workspace:
+        results = benchmark_micro(workspace, repeat) + benchmark_end_to_end(workspace, core_counts or CORE_COUNTS, repeat)
+    if name_filter:
+        results = [result for result in results if name_filter in result.name]
+    return {
+        "version": RESULTS_VERSION,
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {"tool_latency": latency, "repeat": repeat},
+        "results": {result.name: result.serialize() for result in results},
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: Optional[float] = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """
+    Pairs the medians of the benchmarks present in both documents.
+    """
+    if baseline.get("settings", {}).get("tool_latency") != current.get("settings", {}).get("tool_latency"):
+        raise ValueError("The results were measured with different tool latencies and cannot be compared")
+    return [
+        Comparison(name, baseline["results"][name]["median"], result["median"], threshold)
+        for name, result in current["results"].items()
+        if name in baseline["results"]
+    ]
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def print_results(document: dict) -> None:
+    for name, result in document["results"].items():
+        print(f"{name:<48} {format_seconds(result['median']):>12} (best {format_seconds(result['best'])})")
+
+
+def print_comparison(comparisons: List[Comparison]) -> None:
+    for comparison in comparisons:
+        status = "REGRESSED" if comparison.regressed else "ok"
+        print(
+            f"{comparison.name:<48} {format_seconds(comparison.baseline):>12} -> {format_seconds(comparison.current):>12} "
+            f"{(comparison.ratio - 1) * 100:+7.1f}%  {status}"
+        )
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as file:
+        document = json.load(file)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"'{path}' is not a version {RESULTS_VERSION} benchmark result")
+    return document
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmark.py",
+        description="Offline benchmarks of the project creator, with fake cargo-generate, rustup and rustc.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the suite and print or save the results")
+    run_parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    run_parser.add_argument("--cores", default=",".join(map(str, CORE_COUNTS)), help="Comma separated core counts of the end-to-end runs")
+    run_parser.add_argument("--latency", type=float, default=DEFAULT_TOOL_LATENCY, help="Seconds each fake tool call takes")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Measured repetitions of each benchmark")
+    run_parser.add_argument("--filter", default=None, help="Only keep the benchmarks whose name contains this text")
+    run_parser.add_argument("--baseline", default=None, help="Compare with these results and fail on regressions")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Tolerated slowdown, as a fraction of the baseline")
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files and fail on regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Tolerated slowdown, as a fraction of the baseline")
+    parsed = parser.parse_args(args)
+
+    configure_logging("warning")
+    try:
+        if parsed.command == "run":
+            core_counts = [int(count) for count in parsed.cores.split(",") if count]
+            current = run_benchmarks(core_counts, parsed.latency, parsed.repeat, parsed.filter)
+            if parsed.output is not None:
+                with open(parsed.output, "w") as file:
+                    json.dump(current, file, indent=2)
+            baseline = load_results(parsed.baseline) if parsed.baseline is not None else None
+        else:
+            baseline, current = load_results(parsed.baseline), load_results(parsed.current)
+        if baseline is None:
+            print_results(current)
+            return 0
+        comparisons = compare_results(baseline, current, parsed.threshold)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print_comparison(comparisons)
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(f"{len(regressions)} of {len(comparisons)} benchmarks regressed by more than {parsed.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+## Example usage
+#python3 benchmark.py run --output baseline.json
+#python3 benchmark.py run --baseline baseline.json --threshold 0.15
+#python3 benchmark.py compare baseline.json current.json
@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .config_loader import build_project_config
+from .config_resolver import ConfigResolver, is_config_file_name
+from .config_schema import ConfigValidationError
+from .constants import DEFAULT_RENDERER
+from .memory_map import validate_memory_map
+from .device_catalog import device_regions_for
+from .core_cache import CoreCache
+from .project_creator import project_creator
+from .template_cache import TemplateCache
+from .toolchain_state import ToolchainState, validate_project_archs
+from .tracing import configure_logging
+
+# A manifest entry: the project name and either the path of a config file or an inline config
+ManifestEntry = Tuple[str, Union[str, Dict]]
+
+
+@dataclass
+class BatchResult:
+    project_name: str
+    success: bool
+    duration: float
+    error: Optional[str] = None
+    # What the project used of the caches of its worker: template_hits, template_misses, core_hits, core_misses
+    caches: Dict[str, int] = field(default_factory=dict)
+
+    def serialize(self) -> dict:
+        return {
+            "project_name": self.project_name,
+            "success": self.success,
+            "duration": self.duration,
+            "error": self.error,
+            "caches": self.caches,
+        }
+
+
+def iter_manifest(manifest_path: str) -> Iterator[ManifestEntry]:
+    """
+    Streams the entries of a manifest without loading or validating the configs.
+
+    The manifest is either a directory, where every JSON, YAML or TOML file is a config named after
+    the file (except the ones starting with '_', left for the bases configs extend), or a JSONL file where each line is '{"project_name": ..., "config": <path or inline config>}'.
+    Relative config paths are resolved against the manifest location.
+    """
+    if os.path.isdir(manifest_path):
+        for file_name in sorted(os.listdir(manifest_path)):
+            if is_config_file_name(file_name) and not file_name.startswith("_"):
+                yield os.path.splitext(file_name)[0], os.path.join(manifest_path, file_name)
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, "r") as manifest:
+        for line_number, line in enumerate(manifest, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+                project_name, config = entry["project_name"], entry["config"]
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                # Reported as a failed project instead of aborting the whole batch
+                yield f"<line {line_number}>", {"__error__": f"invalid manifest entry: {e}"}
+                continue
+            if isinstance(config, str) and not os.path.isabs(config):
+                config = os.path.join(base_dir, config)
+            yield project_name, config
+
+
+# Per worker state, created once by the pool initializer and reused for every project the worker handles
+_worker_template_cache = None
+_worker_toolchain_state = None
+_worker_core_cache = None
+_worker_options = {}
+
+
+def resolve_entry_config(resolver: ConfigResolver, config: Union[str, Dict], base_dir: str) -> Dict:
+    # A config that cannot be resolved fails its own project only, like any other invalid entry
+    if isinstance(config, dict) and "__error__" in config:
+        return config
+    try:
+        if isinstance(config, str):
+            return resolver.load(config)
+        return resolver.resolve_data(config, base_dir)
+    except (ConfigValidationError, OSError, UnicodeDecodeError) as e:
+        return {"__error__": str(e)}
+
+
+def _init_worker(
+    cache_dir: Optional[str], toolchain_state_dir: Optional[str], renderer: str, destination: str, core_cache_dir: Optional[str], use_core_cache: bool
+) -> None:
+    global _worker_template_cache, _worker_toolchain_state, _worker_core_cache, _worker_options
+    # Progress records of many projects would interleave, workers only report problems unless LOG_LEVEL says otherwise
+    configure_logging(os.environ.get("LOG_LEVEL", "warning"))
+    _worker_template_cache = TemplateCache(cache_dir=cache_dir)
+    _worker_toolchain_state = ToolchainState(cache_dir=toolchain_state_dir)
+    # Projects of a batch often share cores, the first worker to generate one stores it for the others
+    _worker_core_cache = CoreCache(cache_dir=core_cache_dir) if use_core_cache else None
+    _worker_options = {"renderer": renderer, "destination": destination}
+
+
+def _worker_cache_counters() -> Dict[str, int]:
+    # Session counters of the worker caches, the difference before and after a project is what it used
+    counters = {f"template_{name}": value for name, value in _worker_template_cache.session_stats.items()}
+    if _worker_core_cache is not None:
+        counters.update({f"core_{name}": value for name, value in _worker_core_cache.session_stats.items()})
+    return counters
+
+
+def create_from_entry(entry: ManifestEntry) -> BatchResult:
+    project_name, config = entry
+    start = time.perf_counter()
+    before = _worker_cache_counters()
+    result = _create_from_entry(project_name, config, start)
+    after = _worker_cache_counters()
+    result.caches = {name: after[name] - before[name] for name in after}
+    return result
+
+
+def _create_from_entry(project_name: str, config: Dict, start: float) -> BatchResult:
+    try:
+        # The parent already resolved the config (see resolve_entry_config), it is built and checked
+        # here, in the worker, so a bad entry only fails its own project
+        if "__error__" in config:
+            raise ValueError(config["__error__"])
+        project_config = build_project_config(config)
+        validate_project_archs(project_config, _worker_toolchain_state)
+        validate_memory_map(project_config, device_regions_for(project_config))
+        project_creator(
+            project_name,
+            project_config,
+            template_cache=_worker_template_cache,
+            renderer=_worker_options["renderer"],
+            destination=_worker_options["destination"],
+            toolchain_state=_worker_toolchain_state,
+            core_cache=_worker_core_cache,
+        )
+    except Exception as e:
+        return BatchResult(project_name, False, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    return BatchResult(project_name, True, time.perf_counter() - start)
+
+
+def run_batch(
+    manifest_path: str,
+    destination: str,
+    cache_dir: Optional[str] = None,
+    toolchain_state_dir: Optional[str] = None,
+    renderer: Optional[str] = DEFAULT_RENDERER,
+    workers: Optional[int] = None,
+    core_cache_dir: Optional[str] = None,
+    use_core_cache: Optional[bool] = True,
+) -> List[BatchResult]:
+    """
+    Creates every project of a manifest on a process pool.
+
+    The manifest is read one entry at a time: the config of each entry is resolved here, in this
+    process, right before it is submitted, and at most two resolved configs per worker are in flight,
+    so the configs of the whole manifest are never held in memory together. Resolving them here
+    parses and merges a base shared by many projects once for the whole batch; the workers then
+    build, validate and create each project. All workers share the same template store and toolchain
+    state on disk.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(destination, exist_ok=True)
+    results = []
+    entries = iter_manifest(manifest_path)
+    resolver = ConfigResolver()
+    base_dir = manifest_path if os.path.isdir(manifest_path) else os.path.dirname(os.path.abspath(manifest_path))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(cache_dir, toolchain_state_dir, renderer, os.path.abspath(destination), core_cache_dir, use_core_cache),
+    ) as executor:
+        pending = set()
+        for project_name, config in entries:
+            entry = (project_name, resolve_entry_config(resolver, config, base_dir))
+            pending.add(executor.submit(create_from_entry, entry))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+        results.extend(future.result() for future in pending)
+    return sorted(results, key=lambda result: result.project_name)
+
+
+def batch_cache_stats(results: List[BatchResult]) -> Dict[str, int]:
+    """
+    Cache counters of the whole batch, added up over its projects.
+    """
+    totals: Dict[str, int] = {}
+    for result in results:
+        for name, value in result.caches.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def print_summary(results: List[BatchResult], elapsed: float) -> None:
+    failed = [result for result in results if not result.success]
+    for result in results:
+        status = "ok" if result.success else "FAILED"
+        line = f"  {status:<7} {result.project_name:<32} {result.duration:8.2f}s"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    print(f"Batch summary: {len(results) - len(failed)} succeeded, {len(failed)} failed in {elapsed:.2f}s")
+    caches = batch_cache_stats(results)
+    line = f"Template cache: {caches.get('template_hits', 0)} hits, {caches.get('template_misses', 0)} misses"
+    if "core_hits" in caches:
+        line += f"; core cache: {caches['core_hits']} cores restored, {caches['core_misses']} generated"
+    print(line)
+
+## Example usage
+#results = run_batch('boards.jsonl', destination='/tmp/projects', workers=8)
+#print_summary(results, elapsed=0.0)
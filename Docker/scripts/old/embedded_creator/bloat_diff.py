@@ -0,0 +1,168 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .demangle import crate_of, demangle
+from .elf_file import ElfFile, STT_FUNC, STT_OBJECT
+
+BLOAT_DIFF_VERSION = 1
+DEFAULT_TOP = 10
+
+# (section name, demangled symbol name) to size in bytes
+SymbolSizes = Dict[Tuple[str, str], int]
+
+
+@dataclass
+class SymbolDelta:
+    name: str
+    section: str
+    crate: str
+    old_size: int
+    new_size: int
+
+    @property
+    def delta(self) -> int:
+        return self.new_size - self.old_size
+
+    def serialize(self) -> dict:
+        return {
+            "name": self.name,
+            "section": self.section,
+            "crate": self.crate,
+            "old_size": self.old_size,
+            "new_size": self.new_size,
+            "delta": self.delta,
+        }
+
+
+@dataclass
+class BloatDiff:
+    old_path: str
+    new_path: str
+    # Only the symbols whose size changed
+    symbols: List[SymbolDelta] = field(default_factory=list)
+    # Section name to (old, new) total of its symbols
+    sections: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # Crate to (old, new) total of its symbols
+    crates: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def top(self, section: str, count: Optional[int] = DEFAULT_TOP) -> Tuple[List[SymbolDelta], List[SymbolDelta]]:
+        """
+        Returns the symbols of a section that grew the most and the ones that shrank the most.
+        """
+        in_section = [symbol for symbol in self.symbols if symbol.section == section]
+        growth = sorted((symbol for symbol in in_section if symbol.delta > 0), key=lambda symbol: (-symbol.delta, symbol.name))
+        shrink = sorted((symbol for symbol in in_section if symbol.delta < 0), key=lambda symbol: (symbol.delta, symbol.name))
+        return growth[:count], shrink[:count]
+
+    def serialize(self, count: Optional[int] = DEFAULT_TOP) -> dict:
+        sections = {}
+        for section, (old, new) in sorted(self.sections.items()):
+            growth, shrink = self.top(section, count)
+            sections[section] = {
+                "old_size": old,
+                "new_size": new,
+                "delta": new - old,
+                "growth": [symbol.serialize() for symbol in growth],
+                "shrink": [symbol.serialize() for symbol in shrink],
+            }
+        return {
+            "version": BLOAT_DIFF_VERSION,
+            "old": self.old_path,
+            "new": self.new_path,
+            "sections": sections,
+            "crates": {
+                crate: {"old_size": old, "new_size": new, "delta": new - old}
+                for crate, (old, new) in sorted(self.crates.items(), key=lambda item: (-abs(item[1][1] - item[1][0]), item[0]))
+            },
+        }
+
+
+def symbol_sizes(elf: ElfFile, names: Optional[Dict[str, str]] = None) -> SymbolSizes:
+    """
+    Sizes of the functions and objects of the allocated sections, by demangled name. Instances that
+    demangle to the same name (e.g. generic code) are added up.
+
+    Args:
+    - elf (ElfFile): The firmware.
+    - names (dict): Mangled to demangled names, filled as symbols are demangled so that two files
+      sharing most of their symbols demangle each of them once.
+
+    Returns:
+    - dict: (section name, demangled name) to size in bytes.
+    """
+    names = names if names is not None else {}
+    sections = [section.name if section.allocated else None for section in elf.sections]
+    sizes: SymbolSizes = defaultdict(int)
+    section_count = len(sections)
+    for symbol in elf.symbols([STT_FUNC, STT_OBJECT]):
+        section = sections[symbol.section_index] if symbol.section_index < section_count else None
+        if section is None:
+            continue
+        name = names.get(symbol.name)
+        if name is None:
+            name = names[symbol.name] = demangle(symbol.name)
+        sizes[(section, name)] += symbol.size
+    return sizes
+
+
+def diff_symbol_sizes(old_path: str, new_path: str, old: SymbolSizes, new: SymbolSizes) -> BloatDiff:
+    diff = BloatDiff(old_path, new_path)
+    sections: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    crates: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    crate_names: Dict[str, str] = {}
+    for key in old.keys() | new.keys():
+        section, name = key
+        old_size, new_size = old.get(key, 0), new.get(key, 0)
+        crate = crate_names.get(name)
+        if crate is None:
+            crate = crate_names[name] = crate_of(name)
+        sections[section][0] += old_size
+        sections[section][1] += new_size
+        crates[crate][0] += old_size
+        crates[crate][1] += new_size
+        if old_size != new_size:
+            diff.symbols.append(SymbolDelta(name, section, crate, old_size, new_size))
+    diff.sections = {section: tuple(sizes) for section, sizes in sections.items()}
+    diff.crates = {crate: tuple(sizes) for crate, sizes in crates.items()}
+    return diff
+
+
+def bloat_diff(old_path: str, new_path: str) -> BloatDiff:
+    """
+    Compares the symbols of two builds of the same core. Only the headers and .symtab of each file
+    are read, through a memory map, so the size of the debug sections does not matter.
+    """
+    names: Dict[str, str] = {}
+    with ElfFile(old_path) as old_elf:
+        old = symbol_sizes(old_elf, names)
+    with ElfFile(new_path) as new_elf:
+        new = symbol_sizes(new_elf, names)
+    return diff_symbol_sizes(old_path, new_path, old, new)
+
+
+def _signed(size: int) -> str:
+    return f"{size:+d}"
+
+
+def render_bloat_diff(diff: BloatDiff, count: Optional[int] = DEFAULT_TOP) -> str:
+    lines = [f"{diff.old_path} -> {diff.new_path}\n"]
+    for section, (old, new) in sorted(diff.sections.items()):
+        if old == new and not any(symbol.section == section for symbol in diff.symbols):
+            continue
+        lines.append(f"\n{section}: {old} -> {new} ({_signed(new - old)})\n")
+        growth, shrink = diff.top(section, count)
+        for title, symbols in (("growth", growth), ("shrink", shrink)):
+            if symbols:
+                lines.append(f"  {title}:\n")
+                lines += [f"    {_signed(symbol.delta):>9} {symbol.new_size:>9}  {symbol.name}\n" for symbol in symbols]
+    lines.append("\ncrates:\n")
+    for crate, sizes in diff.serialize(count)["crates"].items():
+        if sizes["delta"]:
+            lines.append(f"  {_signed(sizes['delta']):>9} {sizes['new_size']:>9}  {crate}\n")
+    return "".join(lines)
+
+## Example usage
+#diff = bloat_diff('old/cortex-m7', 'target/thumbv7em-none-eabihf/release/cortex-m7')
+#print(render_bloat_diff(diff, count=20))
+#json.dump(diff.serialize(), open('bloat.json', 'w'))
@@ -0,0 +1,88 @@
+import os
+from typing import List, Optional
+
+from .line_transform import LineTransformer, Rule, Section, delete, regex
+from .staged_tree import DiskTree, DISK
+from .tracing import get_logger, fields
+
+logger = get_logger("cargo_workspace")
+
+# Profiles of the quickstart Cargo.toml, used when the template is not available locally
+DEFAULT_WORKSPACE_PROFILES = [
+    "[profile.release]\n",
+    "codegen-units = 1 # better optimizations\n",
+    "debug = true # symbols are nice and they don't increase the size on Flash\n",
+    "lto = true # better optimizations\n",
+]
+
+PROFILE_HEADER = r"^\s*\[profile\."
+TABLE_HEADER = r"^\s*\["
+
+
+def _profile_sections(rules: List[Rule]) -> LineTransformer:
+    # A profile table runs from its header to the next table header, which may start another profile
+    return LineTransformer(rules, [Section("profile", start=regex(PROFILE_HEADER), end=regex(TABLE_HEADER))])
+
+
+def member_cargo_toml_transformer() -> LineTransformer:
+    """
+    Rules of the Cargo.toml of a workspace member: cargo ignores the profiles of members, so they are
+    dropped and set once in the workspace root.
+    """
+    return _profile_sections([Rule(regex(PROFILE_HEADER), delete()), Rule(lambda line: True, delete(), section="profile")])
+
+
+def update_member_cargo_toml_lines(lines: List[str]) -> List[str]:
+    new_lines = member_cargo_toml_transformer().apply(lines)
+    # The profiles usually close the manifest, do not leave the blank line that preceded them
+    while new_lines and not new_lines[-1].strip():
+        new_lines.pop()
+    return new_lines
+
+
+def update_member_cargo_toml(path: str, tree: Optional[DiskTree] = DISK) -> None:
+    file_path = os.path.join(path, "Cargo.toml")
+    if not tree.isfile(file_path):
+        logger.warning("The file does not exist", extra=fields(path=file_path))
+        return
+    lines = tree.read_text(file_path).splitlines(keepends=True)
+    tree.write_text(file_path, "".join(update_member_cargo_toml_lines(lines)))
+    logger.debug("Workspace member manifest updated", extra=fields(path=file_path))
+
+
+def template_profiles(template_path: Optional[str]) -> List[str]:
+    """
+    Returns the profile tables of the template Cargo.toml, the quickstart ones without a local template.
+    """
+    manifest_path = os.path.join(template_path, "Cargo.toml") if template_path is not None else None
+    if manifest_path is None or not os.path.isfile(manifest_path):
+        return list(DEFAULT_WORKSPACE_PROFILES)
+    with open(manifest_path, "r") as file:
+        lines = file.read().splitlines(keepends=True)
+    # Keep the headers and the lines inside profile tables only
+    keep = lambda line, match, state: line
+    profiles = _profile_sections([
+        Rule(regex(PROFILE_HEADER), keep),
+        Rule(lambda line: True, keep, section="profile"),
+        Rule(lambda line: True, delete()),
+    ]).apply(lines)
+    while profiles and not profiles[-1].strip():
+        profiles.pop()
+    return profiles
+
+
+def workspace_cargo_toml(members: List[str], profiles: Optional[List[str]] = None) -> str:
+    """
+    Manifest of the project root: every core crate is a member, so they share Cargo.lock and target/,
+    and each shared dependency is resolved and compiled once per target triple.
+    """
+    lines = ["[workspace]\n", 'resolver = "2"\n', "members = [\n"]
+    lines += [f'    "{member}",\n' for member in members]
+    lines += ["]\n"]
+    if profiles:
+        lines += ["\n"] + [line if line.endswith("\n") else line + "\n" for line in profiles]
+    return "".join(lines)
+
+## Example usage
+#print(workspace_cargo_toml(['cortex-m4', 'cortex-m7'], template_profiles(None)))
+#update_member_cargo_toml('/path/to/project/cortex-m7')
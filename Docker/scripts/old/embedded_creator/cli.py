@@ -0,0 +1,71 @@
+import importlib
+import sys
+from typing import Callable, List, Optional
+
+PROG = "create_project"
+DEFAULT_COMMAND = "create"
+# Command name to (module of embedded_creator.commands, function, summary). A command module is only
+# imported when its command runs, so that e.g. 'validate' never loads the project creator
+COMMANDS = {
+    "create": ("create", "create_project", "Create a project from a config (the default command)"),
+    "plan": ("plan", "plan", "Show what creating or re-running a project would change"),
+    "validate": ("validate", "validate_configs", "Validate config files and report every error"),
+    "resolve": ("resolve", "resolve_config", "Print the effective config of a file"),
+    "schema": ("schema", "print_schema", "Print the JSON Schema of the config files"),
+    "catalog": ("catalog", "list_catalog", "List the devices of the catalog"),
+    "watch": ("watch", "watch_project", "Create a project and keep it in step with its config"),
+    "batch": ("batch", "batch", "Create every project of a manifest"),
+    "size": ("size", "firmware_size", "Check the firmware of every core against its memory regions"),
+    "bloat": ("bloat", "firmware_bloat", "Compare the symbols of two builds of a core"),
+    "cache-refresh": ("cache", "cache_refresh", "Refresh the local quickstart snapshot"),
+    "cache": ("cache", "cache", "Show the stats of the caches or prune the core cache"),
+    "daemon": ("daemon", "daemon", "Run create, plan and validate in warm worker processes"),
+}
+# Commands sent to the daemon when one is running (see daemon_client), the others always run in the calling process
+DAEMON_COMMANDS = ["create", "plan", "validate"]
+
+
+def usage() -> str:
+    lines = [f"usage: {PROG} [command] [options]\n", f"       {PROG} [create] [options] project_name config.json\n", "\ncommands:\n"]
+    lines += [f"  {name:<14} {summary}\n" for name, (_, _, summary) in COMMANDS.items()]
+    lines.append(f"\nRun '{PROG} <command> --help' for the options of a command.\n")
+    return "".join(lines)
+
+
+def command_function(name: str) -> Callable[[List[str]], None]:
+    module_name, function_name, _ = COMMANDS[name]
+    return getattr(importlib.import_module(f".commands.{module_name}", __package__), function_name)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the 'create_project' command: dispatches to the subcommand named by the first
+    argument, or creates a project when it is not a subcommand.
+
+    Args:
+    - argv (list): Arguments without the program name, sys.argv[1:] by default.
+
+    Returns:
+    - int: Exit code, the commands exit on their own on failure. A command run by the daemon returns its exit code.
+    """
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        sys.stderr.write(usage())
+        return 2
+    if args[0] in ("-h", "--help"):
+        sys.stdout.write(usage())
+        return 0
+    name = args[0] if args[0] in COMMANDS else DEFAULT_COMMAND
+    if args[0] in COMMANDS:
+        args = args[1:]
+    from .tracing import configure_logging
+
+    configure_logging()
+    if name in DAEMON_COMMANDS:
+        from .daemon_client import forward
+
+        exit_code = forward(name, args)
+        if exit_code is not None:
+            return exit_code
+    command_function(name)(args)
+    return 0
@@ -0,0 +1,282 @@
+import asyncio
+import os
+import re
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError as FutureCancelledError
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .constants import (
+    MAX_CONCURRENT_COMMANDS,
+    LOCAL_COMMAND_TIMEOUT,
+    COMMAND_RETRY_BACKOFF,
+    COMMAND_KILL_GRACE,
+)
+from .tracing import TRACER, get_logger, fields
+
+logger = get_logger("command_runner")
+
+# Output of a failed command that points at the network rather than at the command itself: name
+# resolution, connections, timeouts and 5xx server errors. A 403 or 404 ('unable to access' alone)
+# would fail the same way again.
+TRANSIENT_ERROR_PATTERN = re.compile(
+    r"could not resolve host|temporary failure in name resolution|(failed|could not|unable) to connect|"
+    r"connection (reset|refused|timed out|closed)|network is unreachable|timed out|timeout was reached|"
+    r"spurious network error|early eof|(returned error|status code|got|http/[\d.]+)\W+5\d\d\b",
+    re.IGNORECASE,
+)
+# Longest line read at once from a command output
+STREAM_LIMIT = 1 << 20
+
+
+@dataclass
+class CommandResult:
+    command: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    attempts: int = 1
+    duration: float = 0.0
+
+
+class CommandError(RuntimeError):
+    """
+    Raised when a command exits with a non zero status. Being a RuntimeError, callers that only report
+    tool failures keep working without knowing about the runner.
+    """
+
+    def __init__(self, message: str, result: Optional[CommandResult] = None):
+        super().__init__(message)
+        self.result = result
+
+    @property
+    def stderr(self) -> str:
+        return self.result.stderr if self.result is not None else ""
+
+
+class CommandTimeout(CommandError):
+    pass
+
+
+def is_transient_failure(error: CommandError) -> bool:
+    """
+    Timeouts and network errors are worth a retry, any other failure would fail the same way again.
+    """
+    return isinstance(error, CommandTimeout) or bool(TRANSIENT_ERROR_PATTERN.search(error.stderr))
+
+
+def command_name(command: List[str]) -> str:
+    # 'cargo generate', 'rustup target', 'git fetch'...
+    return " ".join([os.path.basename(command[0])] + command[1:2])
+
+
+class CommandRunner:
+    """
+    Runs external commands on an asyncio event loop shared by every thread of the process.
+
+    The output of each command is streamed line by line to the logger while it runs and also kept for
+    the caller. A semaphore caps the number of commands running at once, whichever thread or core
+    started them; each command has a timeout after which its whole process group is terminated, and
+    transient failures are retried with exponential backoff.
+
+    Async code awaits 'run_async'; synchronous code calls 'run', which blocks the calling thread only.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = MAX_CONCURRENT_COMMANDS,
+        timeout: Optional[float] = LOCAL_COMMAND_TIMEOUT,
+        backoff: Optional[float] = COMMAND_RETRY_BACKOFF,
+        kill_grace: Optional[float] = COMMAND_KILL_GRACE,
+        transient: Optional[Callable[[CommandError], bool]] = is_transient_failure,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.backoff = backoff
+        self.kill_grace = kill_grace
+        self.transient = transient
+        self.stats: Dict[str, int] = {"commands": 0, "retries": 0, "timeouts": 0, "failures": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._owner_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        # Started on first use; a forked child (e.g. a batch worker) gets a loop of its own
+        with self._lock:
+            if self._loop is None or self._owner_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="command-runner", daemon=True).start()
+                self._semaphore = None
+                self._loop, self._owner_pid = loop, os.getpid()
+            return self._loop
+
+    def run(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = 0,
+        check: Optional[bool] = True,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> CommandResult:
+        """
+        Runs a command to completion from synchronous code, see run_async.
+        Interrupting the calling thread (e.g. Ctrl-C) cancels the command and kills its processes.
+        """
+        with TRACER.span(command_name(command), "subprocess", command=" ".join(command)) as command_span:
+            future = asyncio.run_coroutine_threadsafe(
+                self.run_async(command, timeout, retries, check, cwd, env), self._event_loop()
+            )
+            try:
+                result = future.result()
+            except BaseException as e:
+                future.cancel()
+                if isinstance(e, FutureCancelledError):
+                    raise CommandError(f"'{' '.join(command)}' was cancelled") from e
+                raise
+            command_span.set(returncode=result.returncode, attempts=result.attempts)
+            return result
+
+    async def run_async(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = 0,
+        check: Optional[bool] = True,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> CommandResult:
+        """
+        Runs a command, retrying transient failures up to 'retries' times.
+
+        Args:
+        - command (list): Program and arguments, no shell is involved.
+        - timeout (float): Seconds before the command is killed, the runner default when None.
+        - retries (int): Additional attempts after a transient failure.
+        - check (bool): Raise CommandError on a non zero exit status instead of returning the result.
+
+        Returns:
+        - CommandResult: The exit status and the whole output of the last attempt.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._semaphore:
+                    result = await self._attempt(command, timeout or self.timeout, cwd, env)
+                result.attempts, result.duration = attempt, time.perf_counter() - start
+                if result.returncode != 0 and check:
+                    raise CommandError(
+                        f"'{' '.join(command)}' exited with status {result.returncode}: {result.stderr.strip()}", result
+                    )
+                return result
+            except CommandError as e:
+                if attempt > retries or not self.transient(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"Retrying in {delay:.1f}s after a transient failure: {e}",
+                    extra=fields(command=command_name(command), attempt=attempt),
+                )
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, command: List[str], timeout: float, cwd: Optional[str], env: Optional[Dict[str, str]]) -> CommandResult:
+        self.stats["commands"] += 1
+        name = command_name(command)
+        try:
+            # A session of its own, so a timeout also stops the processes the command spawned (e.g. git under cargo generate)
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.DEVNULL,
+                cwd=cwd,
+                env=env,
+                limit=STREAM_LIMIT,
+                start_new_session=True,
+            )
+        except OSError as e:
+            raise CommandError(f"Unable to run '{' '.join(command)}': {e}") from e
+
+        stdout: List[str] = []
+        stderr: List[str] = []
+        streams = asyncio.gather(
+            self._stream(process.stdout, stdout, name, "stdout"),
+            self._stream(process.stderr, stderr, name, "stderr"),
+            process.wait(),
+        )
+        try:
+            await asyncio.wait_for(streams, timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            await self._terminate(process)
+            result = CommandResult(command, -1, "".join(stdout), "".join(stderr))
+            raise CommandTimeout(f"'{' '.join(command)}' timed out after {timeout:g}s", result) from None
+        except asyncio.CancelledError:
+            await self._terminate(process)
+            raise
+        return CommandResult(command, process.returncode, "".join(stdout), "".join(stderr))
+
+    async def _stream(self, stream: asyncio.StreamReader, lines: List[str], name: str, stream_name: str) -> None:
+        while True:
+            line = await stream.readline()
+            if not line:
+                return
+            text = line.decode("utf-8", errors="replace")
+            lines.append(text)
+            logger.debug(text.rstrip(), extra=fields(command=name, stream=stream_name))
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(process.wait(), self.kill_grace)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+
+_default_runner: Optional[CommandRunner] = None
+_default_runner_lock = threading.Lock()
+
+
+def default_runner() -> CommandRunner:
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = CommandRunner()
+        return _default_runner
+
+
+def run_command(
+    command: List[str],
+    timeout: Optional[float] = None,
+    retries: Optional[int] = 0,
+    check: Optional[bool] = True,
+    cwd: Optional[str] = None,
+) -> CommandResult:
+    """
+    Runs a command on the shared runner of the process, see CommandRunner.run.
+    """
+    return default_runner().run(command, timeout=timeout, retries=retries, check=check, cwd=cwd)
+
+## Example usage
+#result = run_command(["rustup", "target", "add", "thumbv7em-none-eabihf"], timeout=600, retries=2)
+#print(result.stdout)
+#
+#async def generate_all(commands):
+#    runner = CommandRunner(max_concurrency=4)
+#    return await asyncio.gather(*(runner.run_async(command) for command in commands))
@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from ..batch import run_batch, print_summary
+from ..cli import PROG
+from ..constants import RENDERERS, DEFAULT_RENDERER
+
+
+def batch(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} batch",
+        description="Create every project listed in a manifest (JSONL file or directory of configs).",
+    )
+    parser.add_argument("manifest", help="JSONL manifest or directory of config files")
+    parser.add_argument("--output", default=os.getcwd(), help="Directory in which the projects are created")
+    parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    parser.add_argument("--toolchain-state", default=None, help="Directory of the cached toolchain state")
+    parser.add_argument("--renderer", choices=RENDERERS, default=DEFAULT_RENDERER, help="How each core is generated from the template")
+    parser.add_argument("--core-cache", default=None, help="Directory of the cache of generated cores (default: CORE_CACHE_DIR)")
+    parser.add_argument("--no-core-cache", action="store_true", help="Generate every core, without reading or filling the core cache")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--summary-json", default=None, help="Also write the per-project summary to this JSON file")
+    parsed = parser.parse_args(args)
+    if not os.path.exists(parsed.manifest):
+        print(f"Error: The specified manifest '{parsed.manifest}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = run_batch(
+        parsed.manifest,
+        destination=parsed.output,
+        cache_dir=parsed.template_cache,
+        toolchain_state_dir=parsed.toolchain_state,
+        renderer=parsed.renderer,
+        workers=parsed.workers,
+        core_cache_dir=parsed.core_cache,
+        use_core_cache=not parsed.no_core_cache,
+    )
+    print_summary(results, time.perf_counter() - start)
+    if parsed.summary_json is not None:
+        with open(parsed.summary_json, "w") as file:
+            json.dump([result.serialize() for result in results], file, indent=2)
+    if any(not result.success for result in results):
+        sys.exit(1)
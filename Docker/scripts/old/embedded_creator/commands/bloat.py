@@ -0,0 +1,33 @@
+import argparse
+import json
+import sys
+from typing import List
+
+from ..bloat_diff import DEFAULT_TOP, bloat_diff, render_bloat_diff
+from ..cli import PROG
+
+
+def firmware_bloat(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} bloat",
+        description="Show which symbols made the firmware of a core grow or shrink between two builds.",
+    )
+    parser.add_argument("old_elf", help="Firmware of the reference build")
+    parser.add_argument("new_elf", help="Firmware of the build to compare")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Number of symbols listed per section and direction")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parsed = parser.parse_args(args)
+    try:
+        diff = bloat_diff(parsed.old_elf, parsed.new_elf)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    report = diff.serialize(parsed.top)
+    if parsed.json:
+        print(json.dumps(report, indent=2))
+    else:
+        sys.stdout.write(render_bloat_diff(diff, parsed.top))
+    if parsed.output is not None:
+        with open(parsed.output, "w") as file:
+            json.dump(report, file, indent=2)
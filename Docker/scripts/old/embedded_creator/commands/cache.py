@@ -0,0 +1,99 @@
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+from ..cli import PROG
+from ..constants import QUICKSTART_REVISION
+from ..core_cache import CoreCache, format_size, parse_size
+from ..template_cache import TemplateCache
+from ..tracing import get_logger, fields
+
+logger = get_logger("create_project")
+
+
+def print_cache_stats(template_cache: TemplateCache) -> None:
+    stats = template_cache.stats()
+    logger.info(
+        f"Template cache {template_cache.cache_dir}: {stats.get('hits', 0)} hits, {stats.get('misses', 0)} misses",
+        extra=fields(hits=stats.get("hits", 0), misses=stats.get("misses", 0)),
+    )
+
+
+def print_core_cache_stats(core_cache: CoreCache, before: Optional[Dict[str, int]] = None) -> None:
+    # Only the cores of this run, 'before' being the session counters when it started
+    before = before or {}
+    hits = core_cache.session_stats["hits"] - before.get("hits", 0)
+    misses = core_cache.session_stats["misses"] - before.get("misses", 0)
+    logger.info(
+        f"Core cache {core_cache.cache_dir}: {hits} cores restored, {misses} generated",
+        extra=fields(hits=hits, misses=misses, materialize=core_cache.materialize),
+    )
+
+
+def cache_refresh(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} cache-refresh",
+        description="Refresh the local cortex-m-quickstart snapshot used to generate projects offline.",
+    )
+    parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    parser.add_argument("--revision", default=QUICKSTART_REVISION, help="Quickstart revision to snapshot")
+    parser.add_argument("--seed", default=None, help="Local quickstart checkout to seed the store from")
+    parsed = parser.parse_args(args)
+
+    template_cache = TemplateCache(cache_dir=parsed.template_cache, revision=parsed.revision)
+    try:
+        template_cache.refresh(seed=parsed.seed)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print_cache_stats(template_cache)
+
+
+def cache(args: List[str]) -> None:
+    stores_parser = argparse.ArgumentParser(add_help=False)
+    stores_parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    stores_parser.add_argument("--core-cache", default=None, help="Directory of the cache of generated cores (default: CORE_CACHE_DIR)")
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} cache",
+        description="Inspect and trim the local template store and the cache of generated cores.",
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    stats_parser = subparsers.add_parser("stats", parents=[stores_parser], help="Print the size and the hit rates of the caches")
+    stats_parser.add_argument("--json", action="store_true", help="Print the stats as JSON")
+    prune_parser = subparsers.add_parser("prune", parents=[stores_parser], help="Evict the least recently used cores until the cache fits its size")
+    prune_parser.add_argument("--max-size", default=None, help="Size to fit in, e.g. 64M (default: CORE_CACHE_MAX_SIZE, 0 empties the cache)")
+    parsed = parser.parse_args(args)
+
+    try:
+        max_size = parse_size(parsed.max_size) if getattr(parsed, "max_size", None) is not None else None
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        core_cache = CoreCache(cache_dir=parsed.core_cache)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if parsed.action == "prune":
+        evicted, freed = core_cache.prune(max_size)
+        stats = core_cache.stats()
+        print(
+            f"Evicted {evicted} cores, freed {format_size(freed)}; {stats['entries']} cores, "
+            f"{format_size(stats['size'])} left in {core_cache.cache_dir}"
+        )
+        return
+
+    template_cache = TemplateCache(cache_dir=parsed.template_cache)
+    stats = {"templates": {"path": template_cache.cache_dir, **template_cache.stats()}, "cores": core_cache.stats()}
+    if parsed.json:
+        print(json.dumps(stats, indent=2))
+        return
+    templates = stats["templates"]
+    print(f"Template store {templates['path']}: {templates.get('hits', 0)} hits, {templates.get('misses', 0)} misses")
+    cores = stats["cores"]
+    hit_rate = f"{cores['hit_rate'] * 100:.0f}%" if cores["hit_rate"] is not None else "n/a"
+    print(f"Core cache {cores['path']} ({cores['materialize']}):")
+    print(f"  {cores['entries']} cores, {cores['objects']} files, {format_size(cores['size'])} of {format_size(cores['max_size'])}")
+    print(f"  {cores['hits']} hits, {cores['misses']} misses, hit rate {hit_rate}")
+
@@ -0,0 +1,19 @@
+import argparse
+from typing import List
+
+from ..cli import PROG
+from ..device_catalog import default_catalog
+
+
+def list_catalog(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} catalog",
+        description="List the devices that configs can reference with '\"mcu\": \"<part>\"'.",
+    )
+    parser.add_argument("prefix", nargs="?", default="", help="Only list the part numbers starting with this prefix")
+    parsed = parser.parse_args(args)
+    catalog = default_catalog()
+    for part in catalog.parts(parsed.prefix):
+        device = catalog.get(part)
+        cores = ", ".join(f"{core['core']} ({core['arch']})" for core in device["config"])
+        print(f"{part:<16} {device['mcu_family']:<10} {cores}")
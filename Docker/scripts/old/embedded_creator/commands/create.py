@@ -0,0 +1,106 @@
+import argparse
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..constants import MATERIALIZE_METHODS, RENDERERS, DEFAULT_RENDERER
+from ..config_loader import load_config_from_json
+from ..core_cache import shared_core_cache
+from ..device_catalog import device_regions_for
+from ..memory_map import validate_memory_map
+from ..project_creator import project_creator
+from ..project_types import ProjectConfig
+from ..template_cache import shared_template_cache
+from ..toolchain_state import ToolchainState, shared_toolchain_state, validate_project_archs
+from ..tracing import TRACER, get_logger, fields, span
+from .cache import print_cache_stats, print_core_cache_stats
+
+logger = get_logger("create_project")
+
+
+def load_validated_config(file_path: str, toolchain_state: ToolchainState) -> ProjectConfig:
+    with span("load_config", path=file_path):
+        project_config = load_config_from_json(file_path)
+    try:
+        with span("validate_config"):
+            validate_project_archs(project_config, toolchain_state)
+            validate_memory_map(project_config, device_regions_for(project_config))
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    return project_config
+
+
+def parse_arguments(args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        usage=f"{PROG} [create] [--template-cache DIR] [--toolchain-state DIR] [--renderer RENDERER] [--jobs N] [--dry-run] [--force] [--core-cache DIR | --no-core-cache] [--materialize METHOD] [--trace FILE] project_name config.json",
+    )
+    parser.add_argument("project_name")
+    parser.add_argument("config_file_path")
+    parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    parser.add_argument("--toolchain-state", default=None, help="Directory of the cached toolchain state")
+    parser.add_argument("--renderer", choices=RENDERERS, default=DEFAULT_RENDERER, help="How each core is generated from the template")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Number of cores generated concurrently (default: all of them)")
+    parser.add_argument("--dry-run", action="store_true", help="List the files that would be written without touching the disk")
+    parser.add_argument("--force", action="store_true", help="Regenerate every core, even the ones the .project-lock reports as up to date")
+    parser.add_argument("--core-cache", default=None, help="Directory of the cache of generated cores (default: CORE_CACHE_DIR)")
+    parser.add_argument("--no-core-cache", action="store_true", help="Generate every core, without reading or filling the core cache")
+    parser.add_argument(
+        "--materialize",
+        choices=MATERIALIZE_METHODS,
+        default=None,
+        help="How the files of a cached core are created (default: CORE_CACHE_MATERIALIZE, reflink)",
+    )
+    parser.add_argument("--trace", default=None, metavar="FILE", help="Write the timings of every stage as a Chrome trace-event file")
+    parsed = parser.parse_args(args)
+    if parsed.jobs is not None and parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return parsed
+
+
+def create_project(args: List[str]) -> None:
+    arguments = parse_arguments(args)
+    if arguments.trace is not None:
+        TRACER.enable()
+    # A dry run reads the template store and the toolchain state but writes neither
+    template_cache = shared_template_cache(arguments.template_cache, read_only=arguments.dry_run)
+    toolchain_state = shared_toolchain_state(arguments.toolchain_state, read_only=arguments.dry_run)
+    try:
+        core_cache = None if arguments.no_core_cache else shared_core_cache(arguments.core_cache, arguments.materialize)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    # The state and the core cache may have served earlier runs of the same process (see daemon)
+    calls = toolchain_state.calls
+    core_stats = dict(core_cache.session_stats) if core_cache is not None else None
+    config = load_validated_config(arguments.config_file_path, toolchain_state)
+    try:
+        with span("project_creator", project=arguments.project_name):
+            tree = project_creator(
+                arguments.project_name,
+                config,
+                template_cache=template_cache,
+                renderer=arguments.renderer,
+                jobs=arguments.jobs,
+                dry_run=arguments.dry_run,
+                toolchain_state=toolchain_state,
+                force=arguments.force,
+                core_cache=core_cache,
+            )
+    finally:
+        # A failed run is the one whose trace matters most
+        if arguments.trace is not None:
+            TRACER.write(arguments.trace)
+            logger.info("Trace written", extra=fields(path=arguments.trace, events=len(TRACER.events)))
+    if arguments.dry_run:
+        print(f"Dry run, {len(tree.files)} files would be written to {tree.root}:")
+        for file_name in tree.staged_files():
+            print(f"  {file_name}")
+    print_cache_stats(template_cache)
+    if core_cache is not None:
+        print_core_cache_stats(core_cache, core_stats)
+    logger.info(
+        f"Toolchain state {toolchain_state.cache_dir}: {toolchain_state.calls - calls} rustup/rustc calls",
+        extra=fields(calls=toolchain_state.calls - calls),
+    )
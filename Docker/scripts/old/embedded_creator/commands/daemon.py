@@ -0,0 +1,58 @@
+import argparse
+import json
+import signal
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..constants import DAEMON_QUEUE_SIZE, DAEMON_SOCKET
+from ..daemon_client import send_request
+
+
+def daemon(args: List[str]) -> None:
+    socket_parser = argparse.ArgumentParser(add_help=False)
+    socket_parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix socket of the daemon (default: DAEMON_SOCKET)")
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} daemon",
+        description="Run create, plan and validate in warm worker processes: while the daemon runs, create_project forwards these commands to it.",
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    start_parser = subparsers.add_parser("start", parents=[socket_parser], help="Run the daemon in the foreground until it is stopped")
+    start_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    start_parser.add_argument("--queue-size", type=int, default=DAEMON_QUEUE_SIZE, help="Jobs waiting for a worker before clients run their commands themselves")
+    stats_parser = subparsers.add_parser("stats", parents=[socket_parser], help="Print the queue, job latencies and cache hit rates of the daemon")
+    stats_parser.add_argument("--json", action="store_true", help="Print the stats as JSON")
+    subparsers.add_parser("stop", parents=[socket_parser], help="Stop the daemon once its queued jobs are done")
+    parsed = parser.parse_args(args)
+    if not parsed.socket:
+        parser.error("no socket, set DAEMON_SOCKET or pass --socket")
+
+    if parsed.action == "start":
+        if parsed.workers is not None and parsed.workers < 1 or parsed.queue_size < 1:
+            parser.error("--workers and --queue-size must be at least 1")
+        from ..daemon import Daemon
+
+        creator_daemon = Daemon(parsed.socket, workers=parsed.workers, queue_size=parsed.queue_size)
+        signal.signal(signal.SIGTERM, lambda *_: creator_daemon.stop())
+        try:
+            creator_daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except (RuntimeError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    try:
+        reply = send_request({"type": parsed.action}, parsed.socket, timeout=5.0)
+    except (OSError, ValueError) as e:
+        print(f"Error: No daemon answering on {parsed.socket}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if parsed.action == "stop":
+        print(f"Daemon on {parsed.socket} stopping once its queued jobs are done")
+    elif parsed.json:
+        print(json.dumps(reply, indent=2))
+    else:
+        from ..daemon import print_stats
+
+        print_stats(reply)
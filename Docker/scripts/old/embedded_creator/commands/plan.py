@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..config_loader import load_config_from_json
+from ..constants import DEFAULT_RENDERER, RENDERERS
+from ..device_catalog import device_regions_for
+from ..memory_map import validate_memory_map
+from ..plan import plan_project
+from ..template_cache import shared_template_cache
+from ..tracing import configure_logging
+
+
+def plan(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} plan",
+        description="Show what creating or re-running a project would change, without touching the disk, spawning processes or using the network.",
+    )
+    parser.add_argument("project_name")
+    parser.add_argument("config_file_path")
+    parser.add_argument("--output", default=os.getcwd(), help="Directory in which the project is created")
+    parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    parser.add_argument("--renderer", choices=RENDERERS, default=DEFAULT_RENDERER, help="Renderer of the run being planned")
+    parser.add_argument("--format", choices=["diff", "json"], default="diff", help="Unified diff or machine readable JSON")
+    parser.add_argument("--force", action="store_true", help="Plan a regeneration of every core, ignoring the .project-lock")
+    parser.add_argument("--exit-code", action="store_true", help="Exit with 1 when the plan has changes")
+    parsed = parser.parse_args(args)
+    # The diff is the output, progress records would only get in the way
+    configure_logging(os.environ.get("LOG_LEVEL", "warning"))
+
+    project_config = load_config_from_json(parsed.config_file_path)
+    try:
+        validate_memory_map(project_config, device_regions_for(project_config))
+        project_plan = plan_project(
+            parsed.project_name,
+            project_config,
+            shared_template_cache(parsed.template_cache, read_only=True),
+            destination=parsed.output,
+            force=parsed.force,
+            renderer=parsed.renderer,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if parsed.format == "json":
+        print(json.dumps(project_plan.serialize(), indent=2))
+    else:
+        sys.stdout.write(project_plan.render_diff())
+        summary = project_plan.summary()
+        print(f"Plan for {project_plan.root}: {summary['create']} to create, {summary['modify']} to modify, {summary['delete']} to delete", file=sys.stderr)
+    if parsed.exit_code and project_plan.changes:
+        sys.exit(1)
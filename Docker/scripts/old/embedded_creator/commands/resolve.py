@@ -0,0 +1,30 @@
+import argparse
+import json
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..config_loader import load_config_data, validate_file_exists, resolve_config_data
+from ..config_schema import ConfigValidationError
+
+
+def resolve_config(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} resolve",
+        description="Print the effective config of a file, with the configs it extends and its catalog device merged in.",
+    )
+    parser.add_argument("config_file_path", help="JSON, YAML or TOML config")
+    parser.add_argument("--output", default=None, help="Write the config to this file instead of the standard output")
+    parsed = parser.parse_args(args)
+    validate_file_exists(parsed.config_file_path)
+    try:
+        config_data = resolve_config_data(load_config_data(parsed.config_file_path))
+    except ConfigValidationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    resolved = json.dumps(config_data, indent=2)
+    if parsed.output is None:
+        print(resolved)
+    else:
+        with open(parsed.output, "w") as file:
+            file.write(resolved + "\n")
@@ -0,0 +1,21 @@
+import argparse
+import json
+from typing import List
+
+from ..cli import PROG
+from ..config_schema import PROJECT_CONFIG_VALIDATOR
+
+
+def print_schema(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} schema",
+        description="Print the JSON Schema of the configuration files.",
+    )
+    parser.add_argument("--output", default=None, help="Write the schema to this file instead of stdout")
+    parsed = parser.parse_args(args)
+    schema = json.dumps(PROJECT_CONFIG_VALIDATOR.json_schema(), indent=2)
+    if parsed.output is None:
+        print(schema)
+    else:
+        with open(parsed.output, "w") as file:
+            file.write(schema + "\n")
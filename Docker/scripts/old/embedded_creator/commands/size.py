@@ -0,0 +1,43 @@
+import argparse
+import json
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..config_loader import load_config_from_json
+from ..constants import SIZE_WARNING_THRESHOLD
+from ..firmware_size import project_sizes, render_sizes
+
+
+def firmware_size(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} size",
+        description="Report how much of each memory region the firmware of every core of a project uses.",
+    )
+    parser.add_argument("project_path", help="Root of the generated project")
+    parser.add_argument("config_file_path", help="Config the project was generated from")
+    parser.add_argument("--profile", default="release", help="Cargo profile the firmwares were built with")
+    parser.add_argument("--elf", action="append", default=[], metavar="CORE=PATH", help="Firmware of a core, instead of the one found in target/")
+    parser.add_argument("--threshold", type=float, default=SIZE_WARNING_THRESHOLD, help="Share of a region above which it is reported as nearly full")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parsed = parser.parse_args(args)
+    elf_paths = {}
+    for value in parsed.elf:
+        core, separator, path = value.partition("=")
+        if not separator:
+            parser.error(f"--elf expects CORE=PATH, got: {value}")
+        elf_paths[core] = path
+
+    project_config = load_config_from_json(parsed.config_file_path)
+    try:
+        sizes = project_sizes(parsed.project_path, project_config, parsed.profile, elf_paths)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if parsed.json:
+        print(json.dumps([core_size.serialize(parsed.threshold) for core_size in sizes], indent=2))
+    else:
+        sys.stdout.write(render_sizes(sizes, parsed.threshold))
+    # A core that was not built, overflows or nears the threshold fails the check
+    if not all(core_size.passed(parsed.threshold) for core_size in sizes):
+        sys.exit(1)
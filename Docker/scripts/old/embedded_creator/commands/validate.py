@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..config_loader import build_project_config, resolve_config_data
+from ..config_resolver import default_resolver
+from ..config_schema import ConfigValidationError, ValidationError, validate
+from ..device_catalog import device_regions_for
+from ..memory_map import MemoryMap
+
+
+def validate_configs(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} validate",
+        description="Validate configuration files and report every error with its JSON path.",
+    )
+    parser.add_argument("config_files", nargs="+", help="Configuration files to validate")
+    parser.add_argument("--json", action="store_true", help="Print the errors as JSON")
+    parsed = parser.parse_args(args)
+
+    report = {}
+    for file_path in parsed.config_files:
+        # A file that is missing or does not parse is one more error of the report, the other files are still checked
+        if not os.path.isfile(file_path):
+            report[file_path] = [vars(ValidationError(file_path, "the file does not exist"))]
+            continue
+        try:
+            config_data = resolve_config_data(default_resolver().load(file_path))
+            errors = validate(config_data)
+        except ConfigValidationError as e:
+            errors = e.errors
+        except (OSError, UnicodeDecodeError) as e:
+            errors = [ValidationError(file_path, f"unable to load the file: {e}")]
+        if not errors:
+            try:
+                project_config = build_project_config(config_data)
+            except ConfigValidationError as e:
+                errors = e.errors
+        if not errors:
+            # The memory map can only be checked once every origin and length is well formed
+            memory_map = MemoryMap.from_project_config(project_config)
+            issues = memory_map.check(device_regions=device_regions_for(project_config))
+            errors = [ValidationError(issue.path, issue.message) for issue in issues]
+        report[file_path] = [vars(error) for error in errors]
+    if parsed.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for file_path, errors in report.items():
+            print(f"{file_path}: {'OK' if not errors else f'{len(errors)} errors'}")
+            for error in errors:
+                print(f"  {error['path']}: {error['message']}")
+    if any(report.values()):
+        sys.exit(1)
@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+from typing import List
+
+from ..cli import PROG
+from ..config_loader import validate_file_exists
+from ..constants import DEFAULT_RENDERER, RENDERERS
+from ..file_watcher import DEFAULT_POLL_INTERVAL, file_watcher
+from ..template_cache import TemplateCache
+from ..toolchain_state import ToolchainState
+from ..tracing import get_logger, fields
+from ..watch import ProjectWatcher, log_update
+
+logger = get_logger("create_project")
+
+
+def watch_project(args: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog=f"{PROG} watch",
+        description="Create a project, then regenerate the files affected by every change of its config, until interrupted.",
+    )
+    parser.add_argument("project_name")
+    parser.add_argument("config_file_path")
+    parser.add_argument("--output", default=os.getcwd(), help="Directory in which the project is created")
+    parser.add_argument("--template-cache", default=None, help="Directory of the local template store")
+    parser.add_argument("--toolchain-state", default=None, help="Directory of the cached toolchain state")
+    parser.add_argument(
+        "--renderer",
+        choices=RENDERERS,
+        default=DEFAULT_RENDERER,
+        help="How each core is generated, only the native renderer updates the affected files alone",
+    )
+    parser.add_argument("--poll", action="store_true", help="Poll the config files instead of relying on inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between two polls")
+    parsed = parser.parse_args(args)
+    validate_file_exists(parsed.config_file_path)
+
+    project_watcher = ProjectWatcher(
+        parsed.project_name,
+        parsed.config_file_path,
+        TemplateCache(cache_dir=parsed.template_cache),
+        ToolchainState(cache_dir=parsed.toolchain_state),
+        destination=parsed.output,
+        renderer=parsed.renderer,
+    )
+    try:
+        log_update(project_watcher.start())
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    sources = project_watcher.sources()
+    watcher = file_watcher(sources, polling=parsed.poll, interval=parsed.interval)
+    logger.info(f"Watching {', '.join(sources)}, press Ctrl-C to stop", extra=fields(watcher=type(watcher).__name__))
+    try:
+        project_watcher.run(watcher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -0,0 +1,152 @@
+from typing import List, Dict, Union
+import sys
+import os
+from .project_types import (
+    ProjectConfig,
+    MemoryConfig,
+    ExtraMemorySection,
+    CoreConfig,
+    OpenOCDCfg,
+    BuildProfile,
+)
+from .config_schema import ConfigValidationError, ValidationError, validate
+from .config_resolver import default_resolver
+from .device_catalog import expand_mcu
+
+
+def validate_file_exists(file_path: str):
+    if not os.path.isfile(file_path):
+        print(
+            f"Error: The specified file '{file_path}' does not exist.", file=sys.stderr
+        )
+        sys.exit(1)
+
+
+def print_validation_errors(file_path: str, error: ConfigValidationError) -> None:
+    print(f"Error: '{file_path}' has {len(error.errors)} validation errors:", file=sys.stderr)
+    for validation_error in error.errors:
+        print(f"  {validation_error}", file=sys.stderr)
+
+
+def load_config_data(file_path: str) -> Dict:
+    """
+    Reads a JSON, YAML or TOML config with every config it 'extends' merged in, see ConfigResolver.
+    """
+    try:
+        return default_resolver().load(file_path)
+    except ConfigValidationError as e:
+        print_validation_errors(file_path, e)
+        sys.exit(1)
+    except (OSError, UnicodeDecodeError) as e:
+        print(
+            f"Error: Unable to load the configuration file '{file_path}': {e}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def create_extra_memory_sections(
+    extra_sections: Union[Dict, List[Dict]]
+) -> List[ExtraMemorySection]:
+    if extra_sections is None:
+        return None
+
+    if isinstance(extra_sections, dict):
+        extra_sections = [extra_sections]
+
+    return [
+        ExtraMemorySection(
+            memory_type=section.get("memory_type", None),
+            origin=section.get("origin", None),
+            length=section.get("length", None),
+        )
+        for section in extra_sections
+    ]
+
+
+def create_memory_config(memory_config: Dict) -> MemoryConfig:
+    if memory_config is None:
+        return None
+    return MemoryConfig(
+        flash=memory_config.get("flash", None),
+        ram=memory_config.get("ram", None),
+        extra_sections=create_extra_memory_sections(
+            memory_config.get("extra_sections", None)
+        ),
+    )
+
+
+def create_openocd_cfg(openocd_cfg: dict) -> OpenOCDCfg:
+    if openocd_cfg is None:
+        return None
+    return OpenOCDCfg(
+        interface=openocd_cfg.get("interface", None),
+        target=openocd_cfg.get("target", None),
+    )
+
+
+def create_build_profile(profile: Dict) -> BuildProfile:
+    if not profile:
+        return None
+    return BuildProfile(**{key: profile.get(key, None) for key in BuildProfile.__dataclass_fields__})
+
+
+def create_core_configs(configs: Dict) -> List[CoreConfig]:
+    if configs is None:
+        return None
+
+    # Check if the config_section is a dictionary (single core), and if so, wrap it in a list.
+    if isinstance(configs, dict):
+        configs = [configs]  # Make it a list of one dictionary.
+    # Proceed with creating CoreConfig objects.
+    return [
+        CoreConfig(
+            core=config.get("core", None),
+            arch=config.get("arch", None),
+            memory=create_memory_config(config.get("memory", None)),
+            debug_configuration=config.get("debug_configuration", None),
+            openocd_cfg=create_openocd_cfg(config.get("openocd_cfg", None)),
+            profile=create_build_profile(config.get("profile", None)),
+        )
+        for config in configs  # This now works for both single and multiple configs.
+    ]
+
+
+def load_config_from_json(file_path: str) -> ProjectConfig:
+    validate_file_exists(file_path)
+    config_data = load_config_data(file_path)
+    try:
+        return build_project_config(config_data)
+    except ConfigValidationError as e:
+        print_validation_errors(file_path, e)
+        sys.exit(1)
+
+
+def resolve_config_data(config_data: Dict) -> Dict:
+    # A config naming a catalog part gets the cores of that device
+    try:
+        return expand_mcu(config_data)
+    except ValueError as e:
+        raise ConfigValidationError([ValidationError("mcu", str(e))])
+
+
+def build_project_config(config_data: Dict) -> ProjectConfig:
+    config_data = resolve_config_data(config_data)
+    # Report every problem at once before the dataclasses stop at the first one
+    errors = validate(config_data)
+    if errors:
+        raise ConfigValidationError(errors)
+    try:
+        return ProjectConfig(
+            mcu_family=config_data.get("mcu_family", None),
+            config=create_core_configs(config_data.get("config", None)),
+            directories=config_data.get("directories", None),
+            arch=config_data.get("arch", None),
+            debug_configuration=config_data.get("debug_configuration", None),
+            mcu=config_data.get("mcu", None),
+            workspace=config_data.get("workspace", None),
+            profile=create_build_profile(config_data.get("profile", None)),
+        )
+    except ValueError as e:
+        # Checks across fields, such as the profiles of a workspace, only run once the dataclasses are built
+        raise ConfigValidationError([ValidationError("config", str(e))]) from e
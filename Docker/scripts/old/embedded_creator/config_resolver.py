@@ -0,0 +1,233 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import tomllib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config_schema import ConfigValidationError, ValidationError
+from .constants import EXTENDS_KEY
+
+# Config files by extension; 'extends' values without one of them name a device of the catalog
+JSON_EXTENSIONS = [".json"]
+YAML_EXTENSIONS = [".yaml", ".yml"]
+TOML_EXTENSIONS = [".toml"]
+CONFIG_EXTENSIONS = JSON_EXTENSIONS + YAML_EXTENSIONS + TOML_EXTENSIONS
+
+
+def is_config_file_name(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in CONFIG_EXTENSIONS
+
+
+def parse_config_text(text: str, file_path: str) -> Dict:
+    """
+    Parses a JSON, YAML or TOML config, picked by the file extension.
+
+    Raises ConfigValidationError when the document is malformed or is not a mapping.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension in YAML_EXTENSIONS:
+            try:
+                import yaml
+            except ImportError:
+                raise ConfigValidationError([ValidationError(file_path, "YAML configs need PyYAML, install it with 'pip install pyyaml'")])
+            data = yaml.safe_load(text)
+        elif extension in TOML_EXTENSIONS:
+            data = tomllib.loads(text)
+        else:
+            data = json.loads(text)
+    except ConfigValidationError:
+        raise
+    except Exception as e:
+        raise ConfigValidationError([ValidationError(file_path, f"is not a valid {extension.lstrip('.').upper() or 'JSON'} file: {e}")])
+    if not isinstance(data, dict):
+        raise ConfigValidationError([ValidationError(file_path, f"must contain an object, got {type(data).__name__}")])
+    return data
+
+
+def _cores(value: Any) -> Optional[List[Dict]]:
+    # 'config' holds one core or a list of them
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, list) and all(isinstance(core, dict) and "core" in core for core in value):
+        return value
+    return None
+
+
+def deep_merge(base: Dict, overlay: Dict) -> Dict:
+    """
+    Overlays a config on its base: objects are merged key by key, cores of 'config' are merged
+    with the base core of the same name (new cores are appended), any other value replaces the base
+    one, and null removes the key. Neither argument is modified.
+    """
+    merged = dict(base)
+    for key, value in overlay.items():
+        if value is None:
+            merged.pop(key, None)
+            continue
+        base_value = merged.get(key)
+        if key == "config" and _cores(base_value) is not None and _cores(value) is not None:
+            cores = list(_cores(base_value))
+            indexes = {core["core"]: index for index, core in enumerate(cores)}
+            for core in _cores(value):
+                if core.get("core") in indexes:
+                    cores[indexes[core["core"]]] = deep_merge(cores[indexes[core["core"]]], core)
+                else:
+                    indexes[core.get("core")] = len(cores)
+                    cores.append(core)
+            merged[key] = cores
+        elif isinstance(value, dict) and isinstance(base_value, dict):
+            merged[key] = deep_merge(base_value, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@dataclass
+class ConfigDocument:
+    path: str
+    # Hash of the file content, the identity of the document in the caches
+    digest: str
+    data: Dict
+    bases: List[str]
+
+
+class ConfigResolver:
+    """
+    Resolves configs that 'extends' other configs, by file path (relative to the extending file)
+    or by catalog part number, into a single effective config.
+
+    Configs form a DAG keyed by content hash: each file is parsed once per distinct content, and
+    each base chain is merged once, so the projects of a batch sharing a board family base only pay
+    for their own overlay. A changed file gets a new hash, its stale entries are simply never hit again.
+    """
+
+    def __init__(self):
+        # Path to (mtime, size, digest), so an unchanged file is not even read again
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        # (digest, directory) to parsed document: relative bases depend on where the file is
+        self._documents: Dict[Tuple[str, str], ConfigDocument] = {}
+        # Resolution key (digest of the document and of its resolved bases) to effective config
+        self._resolved: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        self.stats = {"parsed": 0, "merged": 0, "hits": 0}
+
+    def load(self, file_path: str) -> Dict:
+        """
+        Returns the effective config of a file, with its bases merged in. The catalog expansion of
+        'mcu' is left to the config loader.
+
+        Raises ConfigValidationError for a malformed file, a missing base or an 'extends' cycle.
+        """
+        with self._lock:
+            _, data = self._resolve_file(os.path.abspath(file_path), [])
+        return copy.deepcopy(data)
+
+    def resolve_data(self, data: Dict, base_dir: str) -> Dict:
+        """
+        Resolves an in-memory config (e.g. inline in a batch manifest), its bases being relative to 'base_dir'.
+        """
+        if not isinstance(data, dict) or EXTENDS_KEY not in data:
+            return data
+        with self._lock:
+            bases = self._resolve_bases(data, base_dir, [])
+            merged = self._merge([base for _, base in bases], data)
+        return copy.deepcopy(merged)
+
+    def sources(self, file_path: str) -> List[str]:
+        """
+        Returns the config file and every config file it extends, as of its last load, so that a
+        change to any of them can be watched for.
+        """
+        sources: List[str] = []
+        pending = [os.path.abspath(file_path)]
+        with self._lock:
+            while pending:
+                path = pending.pop(0)
+                if path in sources:
+                    continue
+                sources.append(path)
+                cached = self._digests.get(path)
+                document = self._documents.get((cached[2], os.path.dirname(path))) if cached is not None else None
+                if document is not None:
+                    pending += [os.path.normpath(os.path.join(os.path.dirname(path), base)) for base in document.bases if is_config_file_name(base)]
+        return sources
+
+    def _document(self, file_path: str) -> ConfigDocument:
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            raise ConfigValidationError([ValidationError(EXTENDS_KEY, f"unable to read '{file_path}': {e.strerror}")])
+        cached = self._digests.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return self._documents[(cached[2], os.path.dirname(file_path))]
+        with open(file_path, "rb") as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        self._digests[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        document = self._documents.get((digest, os.path.dirname(file_path)))
+        if document is None:
+            data = parse_config_text(content.decode("utf-8"), file_path)
+            bases = data.get(EXTENDS_KEY) or []
+            bases = [bases] if isinstance(bases, str) else bases
+            if not isinstance(bases, list) or not all(isinstance(base, str) for base in bases):
+                raise ConfigValidationError([ValidationError(EXTENDS_KEY, f"must be a file or catalog name or a list of them, in '{file_path}'")])
+            document = ConfigDocument(file_path, digest, data, bases)
+            self._documents[(digest, os.path.dirname(file_path))] = document
+            self.stats["parsed"] += 1
+        return document
+
+    def _resolve_file(self, file_path: str, stack: List[str]) -> Tuple[str, Dict]:
+        if file_path in stack:
+            cycle = stack[stack.index(file_path):] + [file_path]
+            raise ConfigValidationError([ValidationError(EXTENDS_KEY, f"cycle: {' -> '.join(cycle)}")])
+        document = self._document(file_path)
+        bases = self._resolve_bases(document.data, os.path.dirname(file_path), stack + [file_path], document.bases)
+        key = hashlib.sha256("\0".join([document.digest] + [base_key for base_key, _ in bases]).encode()).hexdigest()
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            self.stats["hits"] += 1
+            return key, resolved
+        resolved = self._merge([base for _, base in bases], document.data)
+        self._resolved[key] = resolved
+        return key, resolved
+
+    def _resolve_bases(self, data: Dict, base_dir: str, stack: List[str], bases: Optional[List[str]] = None) -> List[Tuple[str, Dict]]:
+        if bases is None:
+            bases = data.get(EXTENDS_KEY) or []
+            bases = [bases] if isinstance(bases, str) else bases
+        resolved = []
+        for base in bases:
+            if is_config_file_name(base):
+                resolved.append(self._resolve_file(os.path.normpath(os.path.join(base_dir, base)), stack))
+            else:
+                # A catalog device, expanded with the rest of the 'mcu' handling once the config is resolved
+                resolved.append((f"catalog:{base}", {"mcu": base}))
+        return resolved
+
+    def _merge(self, bases: List[Dict], data: Dict) -> Dict:
+        merged: Dict = {}
+        for base in bases:
+            merged = deep_merge(merged, base)
+        self.stats["merged"] += 1
+        return deep_merge(merged, {key: value for key, value in data.items() if key != EXTENDS_KEY})
+
+
+_default_resolver: Optional[ConfigResolver] = None
+_default_resolver_lock = threading.Lock()
+
+
+def default_resolver() -> ConfigResolver:
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = ConfigResolver()
+        return _default_resolver
+
+## Example usage
+#resolver = ConfigResolver()
+#config_data = resolver.load('boards/nucleo-h743zi.yaml')  # 'extends: bases/stm32h7.yaml'
+#print(json.dumps(config_data, indent=2), resolver.stats)
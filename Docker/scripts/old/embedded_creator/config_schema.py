@@ -0,0 +1,450 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from difflib import get_close_matches
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import (
+    MEMORY_DIGITS_RANGE,
+    MEMORY_UNITS,
+    MEMORY_SIZE_GRANULARITY,
+    OPT_LEVELS,
+    LTO_OPTIONS,
+    DEBUG_OPTIONS,
+    PANIC_STRATEGIES,
+    BUILD_STD_CRATES,
+    BUILD_PROFILE_PRESETS,
+    EXTENDS_KEY,
+)
+from .project_types import hexadecimal_pattern, memory_size_pattern
+
+# A compiled check appends the errors found in 'value' to 'errors', 'path' locates the value in the config
+Check = Callable[[Any, str, List["ValidationError"]], None]
+
+
+@dataclass
+class ValidationError:
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class ConfigValidationError(ValueError):
+    def __init__(self, errors: List[ValidationError]):
+        self.errors = errors
+        super().__init__("\n".join(str(error) for error in errors))
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and len(value) == 0)
+
+
+class SchemaNode(ABC):
+    description: Optional[str] = None
+
+    @abstractmethod
+    def compile(self) -> Check:
+        """
+        Builds the check of the values matching this node, once per validator.
+        """
+
+    @abstractmethod
+    def json_schema(self) -> Dict:
+        """
+        JSON Schema of the values matching this node.
+        """
+
+    def partial(self) -> "SchemaNode":
+        """
+        This node as a config that is merged with others may write it: with the keys it still needs only.
+        """
+        return self
+
+
+class String(SchemaNode):
+    def __init__(self, pattern=None, message: Optional[str] = None, description: Optional[str] = None):
+        self.pattern = pattern
+        self.message = message
+        self.description = description
+
+    def compile(self) -> Check:
+        match = self.pattern.match if self.pattern is not None else None
+        message = self.message
+
+        def check(value, path, errors):
+            if not isinstance(value, str):
+                errors.append(ValidationError(path, f"must be of type str, got {type(value).__name__}"))
+            elif match is not None and not match(value):
+                errors.append(ValidationError(path, f"{message}, got: {value}"))
+        return check
+
+    def json_schema(self) -> Dict:
+        schema = {"type": "string", "minLength": 1}
+        if self.pattern is not None:
+            # Python and JSON Schema regexes agree on the subset used here, except for the case flag
+            ignore_case = self.pattern.flags & re.IGNORECASE
+            schema["pattern"] = _case_insensitive(self.pattern.pattern) if ignore_case else self.pattern.pattern
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class Boolean(SchemaNode):
+    def __init__(self, description: Optional[str] = None):
+        self.description = description
+
+    def compile(self) -> Check:
+        def check(value, path, errors):
+            if not isinstance(value, bool):
+                errors.append(ValidationError(path, f"must be of type bool, got {type(value).__name__}"))
+        return check
+
+    def json_schema(self) -> Dict:
+        schema = {"type": "boolean"}
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class Integer(SchemaNode):
+    def __init__(self, minimum: Optional[int] = None, description: Optional[str] = None):
+        self.minimum = minimum
+        self.description = description
+
+    def compile(self) -> Check:
+        minimum = self.minimum
+
+        def check(value, path, errors):
+            if not isinstance(value, int) or isinstance(value, bool):
+                errors.append(ValidationError(path, f"must be of type int, got {type(value).__name__}"))
+            elif minimum is not None and value < minimum:
+                errors.append(ValidationError(path, f"must be at least {minimum}, got: {value}"))
+        return check
+
+    def json_schema(self) -> Dict:
+        schema = {"type": "integer"}
+        if self.minimum is not None:
+            schema["minimum"] = self.minimum
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class Choice(SchemaNode):
+    """
+    One of a fixed set of JSON values, compared with their type so that true is not taken for 1.
+    """
+
+    def __init__(self, values: List[Any], description: Optional[str] = None):
+        self.values = values
+        self.description = description
+
+    def compile(self) -> Check:
+        allowed = {(type(value), value) for value in self.values}
+        expected = ", ".join(json.dumps(value) for value in self.values)
+
+        def check(value, path, errors):
+            try:
+                valid = (type(value), value) in allowed
+            except TypeError:
+                valid = False
+            if not valid:
+                errors.append(ValidationError(path, f"must be one of {expected}, got: {json.dumps(value)}"))
+        return check
+
+    def json_schema(self) -> Dict:
+        schema = {"enum": list(self.values)}
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class Array(SchemaNode):
+    def __init__(self, items: SchemaNode, length: Optional[int] = None, description: Optional[str] = None):
+        self.items = items
+        self.length = length
+        self.description = description
+
+    def compile(self) -> Check:
+        check_item = self.items.compile()
+        length = self.length
+
+        def check(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(ValidationError(path, f"must be a list, got {type(value).__name__}"))
+                return
+            if length is not None and len(value) != length:
+                errors.append(ValidationError(path, f"must have exactly {length} elements, got {len(value)}"))
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        return check
+
+    def partial(self) -> SchemaNode:
+        return Array(self.items.partial(), self.length, self.description)
+
+    def json_schema(self) -> Dict:
+        schema = {"type": "array", "items": self.items.json_schema(), "minItems": self.length or 1}
+        if self.length is not None:
+            schema["maxItems"] = self.length
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class MemorySection(SchemaNode):
+    """
+    '[origin, length]' pair, e.g. ["0x08000000", "1024K"].
+    """
+
+    def __init__(self, origin: SchemaNode, length: SchemaNode, description: Optional[str] = None):
+        self.origin = origin
+        self.length = length
+        self.description = description
+
+    def compile(self) -> Check:
+        check_pair = Array(String(), length=2).compile()
+        check_origin = self.origin.compile()
+        check_length = self.length.compile()
+
+        def check(value, path, errors):
+            found = len(errors)
+            check_pair(value, path, errors)
+            if len(errors) == found:
+                check_origin(value[0], f"{path}[0]", errors)
+                check_length(value[1], f"{path}[1]", errors)
+        return check
+
+    def json_schema(self) -> Dict:
+        schema = {"type": "array", "prefixItems": [self.origin.json_schema(), self.length.json_schema()], "minItems": 2, "maxItems": 2}
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class Object(SchemaNode):
+    def __init__(
+        self,
+        fields: Dict[str, SchemaNode],
+        required: List[str],
+        description: Optional[str] = None,
+        keys: Optional[List[str]] = None,
+    ):
+        self.fields = fields
+        self.required = required
+        self.description = description
+        # Required keys identifying the object, kept by partial(): e.g. the core a config overrides
+        self.keys = keys or []
+
+    def compile(self) -> Check:
+        checks = [(name, node.compile(), name in self.required) for name, node in self.fields.items()]
+        names = list(self.fields)
+
+        def check(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(ValidationError(path, f"must be an object, got {type(value).__name__}"))
+                return
+            for name, check_field, required in checks:
+                field_value = value.get(name)
+                field_path = f"{path}.{name}" if path else name
+                if _is_empty(field_value):
+                    # Optional keys may be missing or empty, like the 'if self.<field>:' checks of the dataclasses
+                    if required:
+                        errors.append(ValidationError(field_path, f"key not set or is empty. Got: {field_value}"))
+                    continue
+                check_field(field_value, field_path, errors)
+            for name in value:
+                if name not in names:
+                    # Most often a misspelled key, which would otherwise be dropped without a word
+                    suggestions = get_close_matches(str(name), names, n=1)
+                    hint = f", did you mean: {suggestions[0]}?" if suggestions else ""
+                    errors.append(ValidationError(f"{path}.{name}" if path else str(name), f"unknown key{hint}"))
+        return check
+
+    def partial(self) -> SchemaNode:
+        fields = {name: node.partial() for name, node in self.fields.items()}
+        return Object(fields, [name for name in self.required if name in self.keys], self.description, self.keys)
+
+    def json_schema(self) -> Dict:
+        schema = {
+            "type": "object",
+            "properties": {name: node.json_schema() for name, node in self.fields.items()},
+            "required": list(self.required),
+            "additionalProperties": False,
+        }
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class OneOrMany(SchemaNode):
+    """
+    A single object or a list of them, as accepted by 'config' and 'extra_sections'.
+    """
+
+    def __init__(self, items: SchemaNode, description: Optional[str] = None):
+        self.items = items
+        self.description = description
+
+    def compile(self) -> Check:
+        check_item = self.items.compile()
+        check_list = Array(self.items).compile()
+
+        def check(value, path, errors):
+            if isinstance(value, dict):
+                check_item(value, f"{path}[0]", errors)
+            else:
+                check_list(value, path, errors)
+        return check
+
+    def partial(self) -> SchemaNode:
+        return OneOrMany(self.items.partial(), self.description)
+
+    def json_schema(self) -> Dict:
+        item_schema = self.items.json_schema()
+        schema = {"oneOf": [item_schema, {"type": "array", "items": item_schema, "minItems": 1}]}
+        if self.description:
+            schema["description"] = self.description
+        return schema
+
+
+class ConfigFile(SchemaNode):
+    """
+    A config file as written. It is checked against 'project' once the configs it extends and the catalog
+    part it names are merged in, so its JSON Schema only asks for every required key of 'project' when
+    it does neither; otherwise the keys it sets must be valid, and the cores it lists need a name.
+    """
+
+    def __init__(self, project: Object, extends_key: str):
+        self.project = project
+        self.extends_key = extends_key
+        self.description = project.description
+
+    def compile(self) -> Check:
+        return self.project.compile()
+
+    def json_schema(self) -> Dict:
+        schema = self.project.partial().json_schema()
+        schema["properties"][self.extends_key] = {
+            "oneOf": [{"type": "string", "minLength": 1}, {"type": "array", "items": {"type": "string", "minLength": 1}}],
+            "description": "Config files or catalog parts this config is merged onto",
+        }
+        schema["if"] = {"anyOf": [{"required": [self.extends_key]}, {"required": ["mcu"]}]}
+        schema["else"] = self.project.json_schema()
+        return schema
+
+
+def _case_insensitive(pattern: str) -> str:
+    # JSON Schema has no flags, spell out both cases of every letter outside of escapes and classes
+    result, escaped, in_class = "", False, False
+    for char in pattern:
+        if escaped or in_class or not char.isalpha():
+            result += char
+        else:
+            result += f"[{char.lower()}{char.upper()}]"
+        in_class = (in_class or char == "[") and not (char == "]" and not escaped)
+        escaped = char == "\\" and not escaped
+    return result
+
+
+HEXADECIMAL = String(
+    hexadecimal_pattern(MEMORY_DIGITS_RANGE["lower"], MEMORY_DIGITS_RANGE["upper"]),
+    f"must be a hexadecimal number with digits between {MEMORY_DIGITS_RANGE['lower']} and {MEMORY_DIGITS_RANGE['upper']}",
+    "Origin address, e.g. 0x08000000",
+)
+MEMORY_SIZE = String(
+    memory_size_pattern(tuple(MEMORY_UNITS)),
+    f"must be a string representing a memory size multiple of {MEMORY_SIZE_GRANULARITY // 1024}K followed by one of {', '.join(MEMORY_UNITS)} units",
+    "Region size, e.g. 128K",
+)
+OPENOCD_CFG_SCHEMA = Object(
+    {"interface": String(description="OpenOCD interface script"), "target": String(description="OpenOCD target script")},
+    required=["interface", "target"],
+)
+EXTRA_MEMORY_SECTION_SCHEMA = Object(
+    {"memory_type": String(), "origin": HEXADECIMAL, "length": MEMORY_SIZE},
+    required=["memory_type", "origin", "length"],
+)
+MEMORY_CONFIG_SCHEMA = Object(
+    {
+        "flash": MemorySection(HEXADECIMAL, MEMORY_SIZE, "FLASH region as [origin, length]"),
+        "ram": MemorySection(HEXADECIMAL, MEMORY_SIZE, "RAM region as [origin, length]"),
+        "extra_sections": OneOrMany(EXTRA_MEMORY_SECTION_SCHEMA),
+    },
+    required=["flash", "ram"],
+)
+PROFILE_SCHEMA = Object(
+    {
+        "preset": Choice(list(BUILD_PROFILE_PRESETS), "Named preset the other keys override"),
+        "opt_level": Choice(OPT_LEVELS, "Optimization level, 's' and 'z' optimize for size"),
+        "lto": Choice(LTO_OPTIONS, "Link time optimization"),
+        "codegen_units": Integer(1, "Code generation units, 1 gives the best code"),
+        "debug": Choice(DEBUG_OPTIONS, "Debug information, kept out of the flashed image"),
+        "panic": Choice(PANIC_STRATEGIES, "Panic strategy"),
+        "build_std": Array(Choice(BUILD_STD_CRATES), description="Standard crates rebuilt with the profile (nightly)"),
+        "build_std_features": Array(String(), description="Features of the rebuilt standard crates (nightly)"),
+    },
+    required=[],
+    description="Release profile written to Cargo.toml and .cargo/config.toml",
+)
+CORE_CONFIG_SCHEMA = Object(
+    {
+        "core": String(description="Core name, also the name of the generated crate"),
+        "arch": String(description="Rust target triple"),
+        "memory": MEMORY_CONFIG_SCHEMA,
+        "openocd_cfg": OPENOCD_CFG_SCHEMA,
+        "debug_configuration": String(description="GDB flavour used as cargo runner"),
+        "profile": PROFILE_SCHEMA,
+    },
+    required=["core", "arch", "memory", "openocd_cfg"],
+    keys=["core"],
+)
+PROJECT_CONFIG_SCHEMA = Object(
+    {
+        # Lets editors find the schema exported by the 'schema' command
+        "$schema": String(description="JSON Schema of the file"),
+        "mcu_family": String(description="MCU family, e.g. STM32H7"),
+        "config": OneOrMany(CORE_CONFIG_SCHEMA, "One core or a list of cores"),
+        "directories": Array(String(), description="Extra directories created at the project root"),
+        "arch": String(description="Rust target triple overriding the one of every core"),
+        "debug_configuration": String(description="GDB flavour overriding the one of every core"),
+        "mcu": String(description="Part number of the device catalog the config is expanded from, e.g. STM32H755ZI"),
+        "workspace": Boolean(description="Make the project root a Cargo workspace sharing one lockfile and target directory"),
+        "profile": PROFILE_SCHEMA,
+    },
+    required=["mcu_family", "config"],
+    description="Project configuration of the Rust embedded project creator",
+)
+
+
+class SchemaValidator:
+    """
+    Validator compiled once from a schema, reusable for any number of configs.
+
+    Unlike the dataclasses of project_types it builds no objects and does not stop at the first
+    problem: every error is collected with the JSON path of the offending value.
+    """
+
+    def __init__(self, schema: SchemaNode):
+        self.schema = schema
+        self._check = schema.compile()
+
+    def validate(self, data: Any) -> List[ValidationError]:
+        errors = []
+        self._check(data, "", errors)
+        return errors
+
+    def json_schema(self) -> Dict:
+        schema = {"$schema": "https://json-schema.org/draft/2020-12/schema"}
+        schema.update(self.schema.json_schema())
+        return schema
+
+
+PROJECT_CONFIG_VALIDATOR = SchemaValidator(ConfigFile(PROJECT_CONFIG_SCHEMA, EXTENDS_KEY))
+
+
+def validate(data: Any) -> List[ValidationError]:
+    return PROJECT_CONFIG_VALIDATOR.validate(data)
+
@@ -0,0 +1,138 @@
+import os
+
+DIRECTORIES = ["Common", "Drivers", "Utils"]
+DIRECTORIES_TO_DELETE_FROM_TEMPLATE = [""]
+MEMORY_UNITS = ["K", "M"]
+MEMORY_DIGITS_RANGE = {"lower" : 6, "upper" : 8}
+# Bytes per memory unit, as understood by the linker in memory.x
+MEMORY_UNIT_SIZES = {"K" : 1024, "M" : 1024 * 1024}
+# Every region length must be a multiple of this many bytes, i.e. an even number of K
+MEMORY_SIZE_GRANULARITY = 2 * 1024
+# Every region origin and length must be word aligned
+MEMORY_REGION_ALIGNMENT = 4
+# Cortex-M cores address 4 GiB
+ADDRESS_SPACE_SIZE = 1 << 32
+LINES_TO_DELETE_FROM_MEMORY_X_FILE = [
+    "/* These values correspond to the LM3S6965, one of the few devices QEMU can emulate */"
+]
+
+
+
+### Default debug configuration
+#debugger_option = "<option>"  
+# Options: "arm-none-eabi-gdb"
+# Options: "gdb-multiarch"
+# Options: "gdb"
+DEFAULT_DEBUGGER_CONFIGURATION = 'gdb-multiarch'
+
+
+
+### Template store
+# The cortex-m-quickstart snapshot is fetched once per revision and reused offline afterwards.
+QUICKSTART_GIT_URL = "https://github.com/rust-embedded/cortex-m-quickstart"
+# Branch, tag or commit to snapshot. A branch or a tag is resolved to its commit on the first fetch and
+# the store keeps using that commit until 'cache-refresh'; set a full commit SHA to pin every machine
+QUICKSTART_REVISION = os.environ.get("QUICKSTART_REVISION", "master")
+# Templates shipped with this repository, overlaid on top of the quickstart snapshot
+CARGO_PROJECT_TEMPLATE_DIR = os.environ.get(
+    "CARGO_PROJECT_TEMPLATE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "cargo_project_template"),
+)
+DEFAULT_TEMPLATE_CACHE_DIR = os.environ.get(
+    "TEMPLATE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "rust-embedded-env", "templates"),
+)
+DEFAULT_TOOLCHAIN_STATE_DIR = os.environ.get(
+    "TOOLCHAIN_STATE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "rust-embedded-env", "toolchain"),
+)
+SINGLE_CORE_TEMPLATE = "single_core_template"
+DUAL_CORE_TEMPLATE = "dual_core_template"
+
+### Core cache
+# Content-addressed store of generated core directories, shared by every project created on the machine
+DEFAULT_CORE_CACHE_DIR = os.environ.get(
+    "CORE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "rust-embedded-env", "cores"),
+)
+# Bytes the stored files may take before the least recently used cores are evicted
+CORE_CACHE_MAX_SIZE = int(os.environ.get("CORE_CACHE_MAX_SIZE", 256 * 1024 * 1024))
+# How the files of a cached core are put in a project: "reflink" clones them copy-on-write where the
+# file system supports it and copies them elsewhere, "copy" copies them. Either way a project file is
+# its own file, editing it never reaches the cache or the other projects.
+REFLINK = "reflink"
+COPY = "copy"
+MATERIALIZE_METHODS = [REFLINK, COPY]
+CORE_CACHE_MATERIALIZE = os.environ.get("CORE_CACHE_MATERIALIZE", REFLINK)
+
+### Incremental regeneration
+# Manifest written at the root of every project with the hashes of its inputs and generated files
+PROJECT_LOCK_FILE = ".project-lock"
+
+### Device catalog
+# Packed catalog bundled next to the scripts, built from the JSON source with 'python3 -m embedded_creator.device_catalog build'
+DEVICE_CATALOG_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "device_catalog.json")
+DEVICE_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "device_catalog.bin")
+# Local devices, same format as the JSON source, overriding the bundled ones
+DEFAULT_DEVICE_CATALOG_OVERLAY = os.environ.get(
+    "DEVICE_CATALOG_OVERLAY",
+    os.path.join(os.path.expanduser("~"), ".config", "rust-embedded-env", "devices.json"),
+)
+
+### Config files
+# Key of the configs (files or catalog parts) a config is merged onto
+EXTENDS_KEY = "extends"
+
+### Template renderers
+# "native" renders the cached template in Python, "cargo-generate" spawns 'cargo generate' for every core
+NATIVE_RENDERER = "native"
+CARGO_GENERATE_RENDERER = "cargo-generate"
+RENDERERS = [NATIVE_RENDERER, CARGO_GENERATE_RENDERER]
+# The native renderer is opt-in until its golden trees are regenerated with cargo-generate (see tests/golden/SOURCE)
+DEFAULT_RENDERER = CARGO_GENERATE_RENDERER
+
+### External commands
+# Commands running at the same time, across every core and thread of a run
+MAX_CONCURRENT_COMMANDS = int(os.environ.get("MAX_CONCURRENT_COMMANDS", os.cpu_count() or 4))
+# Seconds before a command is killed: local commands should be quick, network ones get more slack
+LOCAL_COMMAND_TIMEOUT = float(os.environ.get("LOCAL_COMMAND_TIMEOUT", 120))
+NETWORK_COMMAND_TIMEOUT = float(os.environ.get("NETWORK_COMMAND_TIMEOUT", 600))
+# Retries of a command that failed for a transient reason (timeout, network error), with exponential backoff
+NETWORK_COMMAND_RETRIES = 2
+COMMAND_RETRY_BACKOFF = 1.0
+# Seconds a timed out or cancelled command gets to exit after SIGTERM, before SIGKILL
+COMMAND_KILL_GRACE = 5.0
+
+### Daemon
+# Unix socket of the scaffolding daemon: create, plan and validate run in it while it listens, an empty value disables forwarding
+DAEMON_SOCKET = os.environ.get(
+    "DAEMON_SOCKET",
+    os.path.join(os.path.expanduser("~"), ".cache", "rust-embedded-env", "daemon.sock"),
+)
+# Jobs waiting for a worker of the daemon, a client finding the queue full runs its command itself
+DAEMON_QUEUE_SIZE = 16
+# Seconds a client waits for the reply to its job: a job no worker started by then is handed back to the
+# client to run itself, a job still running is reported with an unknown outcome (exit code 75)
+DAEMON_JOB_TIMEOUT = float(os.environ.get("DAEMON_JOB_TIMEOUT", 1800))
+# Latest jobs of every command the latency percentiles of the daemon stats are computed on
+DAEMON_LATENCY_WINDOW = 1000
+
+### Build profiles
+# Values accepted by the [profile.release] keys cargo understands, as written in the config
+OPT_LEVELS = [0, 1, 2, 3, "s", "z"]
+LTO_OPTIONS = [True, False, "fat", "thin", "off"]
+DEBUG_OPTIONS = [True, False, 0, 1, 2, "none", "line-directives-only", "line-tables-only", "limited", "full"]
+PANIC_STRATEGIES = ["abort", "unwind"]
+# Crates '-Z build-std' can rebuild (nightly only)
+BUILD_STD_CRATES = ["core", "alloc", "std", "proc_macro", "panic_abort", "panic_unwind", "compiler_builtins"]
+# Named presets, a profile block overrides their values key by key
+BUILD_PROFILE_PRESETS = {
+    "size": {"opt_level": "z", "lto": "fat", "codegen_units": 1, "debug": True, "panic": "abort"},
+    "speed": {"opt_level": 3, "lto": "fat", "codegen_units": 1, "debug": True, "panic": "abort"},
+}
+# Settings cargo only applies to the whole build: the cores of a workspace must agree on them
+WORKSPACE_PROFILE_FIELDS = ["lto", "panic", "build_std", "build_std_features"]
+
+### Firmware size
+# Share of a memory region above which 'size' reports the region as nearly full
+SIZE_WARNING_THRESHOLD = float(os.environ.get("SIZE_WARNING_THRESHOLD", 0.9))
@@ -0,0 +1,346 @@
+import fcntl
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .constants import CORE_CACHE_MATERIALIZE, CORE_CACHE_MAX_SIZE, DEFAULT_CORE_CACHE_DIR, MATERIALIZE_METHODS
+from .project_lock import content_hash, data_hash
+from .staged_tree import StagedTree
+from .template_renderer import default_authors
+from .tracing import get_logger, fields
+
+logger = get_logger("core_cache")
+
+# Bumped whenever the layout of the store changes, entries of another version are never restored
+CORE_CACHE_VERSION = 2
+
+# Mode of the stored files, whatever the mode of the project files cloned from them
+OBJECT_MODE = 0o444
+
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*$", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def core_cache_key(core_inputs: str, authors: Optional[str] = None) -> str:
+    """
+    Key of the generated directory of a core: its inputs in the .project-lock (see core_inputs_hash:
+    template revision and digest, core config, mcu_family, debugger option, profile, renderer) and the
+    rendered authors, which come from the environment rather than the config.
+    """
+    return data_hash(
+        {
+            "version": CORE_CACHE_VERSION,
+            "inputs": core_inputs,
+            "authors": default_authors() if authors is None else authors,
+        }
+    )
+
+
+def parse_size(size: str) -> int:
+    """
+    Parses a size such as '1048576', '512K', '256M' or '2G' into bytes.
+    """
+    match = SIZE_PATTERN.match(size)
+    if match is None:
+        raise ValueError(f"Invalid size {size!r}, expected a number of bytes with an optional K, M or G suffix")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.1f} {unit}iB"
+    return f"{size} B"
+
+
+class CoreCache:
+    """
+    Content-addressed store of generated core directories, shared by every project created on the machine.
+
+    Each file is stored once under 'objects/<hash[:2]>/<hash>', read-only, whatever the number of cores
+    it belongs to, and 'entries/<key>.json' lists the files of a core directory (see core_cache_key)
+    with the mode of each, so identical contents share an object whatever their mode. A hit stages
+    the files of the entry as clones of the objects (see StagedTree.link_file):
+    - reflink: copy-on-write clones, a later edit of a project file never reaches the store; plain
+      copies where the file system cannot clone.
+    - copy: plain copies.
+    Every object is checked against its hash before it is used.
+
+    Entries are evicted least recently used first once the objects exceed 'max_size'. A lock file
+    serializes writers, which lets concurrent runs share the same store.
+    """
+
+    LOCK_FILE = ".lock"
+    STATE_FILE = "state.json"
+    OBJECTS_DIR = "objects"
+    ENTRIES_DIR = "entries"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: Optional[int] = None, materialize: Optional[str] = None):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_CORE_CACHE_DIR)
+        self.max_size = CORE_CACHE_MAX_SIZE if max_size is None else max_size
+        self.materialize = materialize or CORE_CACHE_MATERIALIZE
+        if self.materialize not in MATERIALIZE_METHODS:
+            raise ValueError(f"Unknown materialize method {self.materialize}, expected one of {', '.join(MATERIALIZE_METHODS)}")
+        # Hits and misses of this instance only, the state file counts those of every run sharing the store
+        self.session_stats = {"hits": 0, "misses": 0}
+        os.makedirs(os.path.join(self.cache_dir, self.OBJECTS_DIR), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, self.ENTRIES_DIR), exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.cache_dir, self.LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, self.ENTRIES_DIR, f"{key}.json")
+
+    def _object_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, self.OBJECTS_DIR, name[:2], name)
+
+    def restore(self, cores: Dict[str, str], tree: StagedTree) -> List[str]:
+        """
+        Stages the cached files of core directories into 'tree'.
+
+        Args:
+        - cores (dict): Directory of each core in the project to its key, see core_cache_key.
+        - tree (StagedTree): Tree of the project, the cores missing from the cache are left untouched.
+
+        Returns:
+        - list: Directories of the cores restored.
+        """
+        if not cores:
+            return []
+        restored = [core_path for core_path, key in cores.items() if self._restore(key, core_path, tree)]
+        self._record(hits=len(restored), misses=len(cores) - len(restored))
+        return restored
+
+    def _restore(self, key: str, core_path: str, tree: StagedTree) -> bool:
+        entry_path = self._entry_path(key)
+        files = self._read_entry(entry_path)
+        if files is None:
+            return False
+        dirs, entries = files
+        restored = []
+        for relative_path, entry in entries.items():
+            object_path = self._object_path(entry["object"])
+            try:
+                with open(object_path, "rb") as file:
+                    content = file.read()
+            except OSError:
+                content = None
+            if content is None or content_hash(content) != entry["object"]:
+                # Evicted by a concurrent prune or damaged on disk: the entry cannot be trusted anymore
+                logger.warning("Dropping a corrupt core cache entry", extra=fields(key=key, path=relative_path))
+                with self._locked():
+                    self._drop_entry(key)
+                    if content is not None and os.path.isfile(object_path):
+                        os.remove(object_path)
+                return False
+            restored.append((relative_path, object_path, content, entry["mode"]))
+
+        for directory in dirs:
+            tree.makedirs(os.path.join(core_path, directory))
+        for relative_path, object_path, content, mode in restored:
+            tree.link_file(os.path.join(core_path, relative_path), object_path, content, mode, self.materialize)
+        # Entries are evicted by the time of their last use
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        logger.info("Core restored from the cache", extra=fields(core=os.path.basename(core_path), key=key, files=len(restored)))
+        return True
+
+    def store(self, key: str, core_path: str, tree: StagedTree) -> None:
+        """
+        Adds the core directory staged at 'core_path' in 'tree' under 'key', then evicts the least
+        recently used entries if the store grew over its size limit.
+        """
+        dirs, files = tree.staged_under(core_path)
+        entries = {}
+        added = 0
+        with self._locked():
+            for relative_path, (content, mode) in sorted(files.items()):
+                name = content_hash(content)
+                added += self._write_object(name, content)
+                entries[relative_path] = {"object": name, "mode": mode}
+            entry = {"version": CORE_CACHE_VERSION, "dirs": dirs, "files": entries}
+            _write_json(self._entry_path(key), entry)
+            state = self._state()
+            state["size"] = state.get("size", 0) + added
+            _write_json(os.path.join(self.cache_dir, self.STATE_FILE), state)
+            if state["size"] > self.max_size:
+                self._prune(self.max_size)
+        logger.info("Core stored in the cache", extra=fields(core=os.path.basename(core_path), key=key, files=len(entries), added=added))
+
+    def prune(self, max_size: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Evicts the least recently used entries until the objects fit in 'max_size' (default: the
+        limit of the store, 0 empties it) and deletes the objects no entry uses anymore.
+
+        Returns:
+        - tuple: Number of entries evicted and number of bytes freed.
+        """
+        with self._locked():
+            return self._prune(self.max_size if max_size is None else max_size)
+
+    def stats(self) -> Dict:
+        state = self._state()
+        entries = len(self._entry_keys())
+        objects = 0
+        size = 0
+        for _, path in self._objects():
+            objects += 1
+            size += os.stat(path).st_size
+        hits, misses = state.get("hits", 0), state.get("misses", 0)
+        return {
+            "path": self.cache_dir,
+            "entries": entries,
+            "objects": objects,
+            "size": size,
+            "max_size": self.max_size,
+            "materialize": self.materialize,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+
+    def _read_entry(self, entry_path: str) -> Optional[Tuple[List[str], Dict[str, Dict]]]:
+        try:
+            with open(entry_path, "r") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CORE_CACHE_VERSION:
+            return None
+        return entry["dirs"], entry["files"]
+
+    def _write_object(self, name: str, content: bytes) -> int:
+        path = self._object_path(name)
+        if os.path.isfile(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(content)
+        # Objects are never modified in place, the mode of the project files is the one of their entry
+        os.chmod(temporary_path, OBJECT_MODE)
+        os.replace(temporary_path, path)
+        return len(content)
+
+    def _drop_entry(self, key: str) -> None:
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _entry_keys(self) -> List[str]:
+        entries_dir = os.path.join(self.cache_dir, self.ENTRIES_DIR)
+        return [file_name[: -len(".json")] for file_name in os.listdir(entries_dir) if file_name.endswith(".json")]
+
+    def _objects(self):
+        objects_dir = os.path.join(self.cache_dir, self.OBJECTS_DIR)
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if not name.endswith(".tmp"):
+                    yield name, os.path.join(prefix_dir, name)
+
+    def _prune(self, max_size: int) -> Tuple[int, int]:
+        entries = []
+        for key in self._entry_keys():
+            entry_path = self._entry_path(key)
+            files = self._read_entry(entry_path)
+            try:
+                last_used = os.stat(entry_path).st_mtime
+            except OSError:
+                continue
+            entries.append((last_used, key, files))
+        object_sizes = {name: os.stat(path).st_size for name, path in self._objects()}
+
+        # Keep the most recently used entries while their objects fit, evict every older one
+        kept = set()
+        size = 0
+        evicted = 0
+        over = False
+        for _, key, files in sorted(entries, key=lambda entry: entry[0], reverse=True):
+            names = {entry["object"] for entry in files[1].values()} if files is not None else None
+            entry_size = sum(object_sizes.get(name, 0) for name in names - kept) if names is not None else 0
+            if names is None or over or size + entry_size > max_size:
+                over = over or names is not None
+                self._drop_entry(key)
+                evicted += 1
+                continue
+            kept |= names
+            size += entry_size
+
+        freed = 0
+        for name, path in list(self._objects()):
+            if name not in kept:
+                freed += object_sizes.get(name, 0)
+                os.remove(path)
+        state = self._state()
+        state["size"] = size
+        _write_json(os.path.join(self.cache_dir, self.STATE_FILE), state)
+        if evicted:
+            logger.info("Core cache pruned", extra=fields(evicted=evicted, freed=freed, size=size))
+        return evicted, freed
+
+    def _state(self) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self.cache_dir, self.STATE_FILE), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {"size": 0, "hits": 0, "misses": 0}
+
+    def _record(self, hits: int, misses: int) -> None:
+        self.session_stats["hits"] += hits
+        self.session_stats["misses"] += misses
+        with self._locked():
+            state = self._state()
+            state["hits"] = state.get("hits", 0) + hits
+            state["misses"] = state.get("misses", 0) + misses
+            _write_json(os.path.join(self.cache_dir, self.STATE_FILE), state)
+
+
+def _write_json(path: str, data: Dict) -> None:
+    # Read without the lock, a reader must never see a partly written file
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(data, file)
+    os.replace(temporary_path, path)
+
+
+_shared_core_caches: Dict[Tuple[str, str], CoreCache] = {}
+_shared_core_caches_lock = threading.Lock()
+
+
+def shared_core_cache(cache_dir: Optional[str] = None, materialize: Optional[str] = None) -> CoreCache:
+    """
+    Core cache of 'cache_dir', created once per process (see daemon).
+    """
+    key = (os.path.abspath(cache_dir or DEFAULT_CORE_CACHE_DIR), materialize or CORE_CACHE_MATERIALIZE)
+    with _shared_core_caches_lock:
+        if key not in _shared_core_caches:
+            _shared_core_caches[key] = CoreCache(cache_dir=cache_dir, materialize=materialize)
+        return _shared_core_caches[key]
+
+
+def shared_core_caches() -> List[CoreCache]:
+    with _shared_core_caches_lock:
+        return list(_shared_core_caches.values())
+
+## Example usage
+#core_cache = CoreCache(cache_dir='/tmp/cores', max_size=parse_size('64M'))
+#if not core_cache.restore({'/path/to/project/core': key}, tree):
+#    generate_core(...)
+#    core_cache.store(key, '/path/to/project/core', tree)
+#print(core_cache.stats(), core_cache.prune())
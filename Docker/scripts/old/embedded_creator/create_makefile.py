@@ -0,0 +1,198 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .staged_tree import DiskTree, DISK
+from .tracing import get_logger, fields
+
+logger = get_logger("create_makefile")
+
+
+@dataclass
+class MakeVariable:
+    name: str
+    value: str
+    operator: str = ":="
+
+    def render(self) -> str:
+        return f"{self.name} {self.operator} {self.value}\n"
+
+
+@dataclass
+class MakeRule:
+    target: str
+    prerequisites: List[str] = field(default_factory=list)
+    recipe: List[str] = field(default_factory=list)
+    # Every rule generated here names an action, not a file
+    phony: bool = True
+
+    def render(self) -> str:
+        header = f"{self.target}: {' '.join(self.prerequisites)}" if self.prerequisites else f"{self.target}:"
+        return header + "\n" + "".join(f"\t{command}\n" for command in self.recipe)
+
+
+class Makefile:
+    """
+    In-memory Makefile: variables, rules with their prerequisites and recipes, and the .PHONY list.
+
+    The whole file is built up front and rendered once, instead of being re-read and patched for every rule.
+    Rules are rendered in insertion order, so the first rule added is the default goal.
+    """
+
+    def __init__(self):
+        self.variables: Dict[str, MakeVariable] = {}
+        self.rules: Dict[str, MakeRule] = {}
+
+    def set_variable(self, name: str, value: str, operator: Optional[str] = ":=") -> MakeVariable:
+        self.variables[name] = MakeVariable(name, value, operator)
+        return self.variables[name]
+
+    def add_rule(
+        self,
+        target: str,
+        prerequisites: Optional[List[str]] = None,
+        recipe: Optional[List[str]] = None,
+        phony: Optional[bool] = True,
+    ) -> MakeRule:
+        if target in self.rules:
+            raise ValueError(f"Rule '{target}' is already defined in the Makefile")
+        self.rules[target] = MakeRule(target, list(prerequisites or []), list(recipe or []), phony)
+        return self.rules[target]
+
+    @property
+    def phony_targets(self) -> List[str]:
+        return [rule.target for rule in self.rules.values() if rule.phony]
+
+    def render(self) -> str:
+        sections = []
+        if self.variables:
+            sections.append("".join(variable.render() for variable in self.variables.values()))
+        if self.phony_targets:
+            sections.append(f".PHONY: {' '.join(self.phony_targets)}\n")
+        sections.extend(rule.render() for rule in self.rules.values())
+        return "\n".join(sections)
+
+    def write(self, path: str, name: Optional[str] = "Makefile", tree: Optional[DiskTree] = DISK) -> None:
+        makefile_path = os.path.join(path, name)
+        tree.write_text(makefile_path, self.render())
+        logger.debug("Makefile created", extra=fields(path=makefile_path))
+
+    @classmethod
+    def from_rules(cls, rules) -> "Makefile":
+        """
+        Builds a Makefile from the rules dictionary format used by create_makefile, e.g.
+        {'all': {'dependencies': ['clean', 'build'], 'command': [...]}, 'build': ['cargo build']}
+        """
+        makefile = cls()
+        for rule, details in rules.items():
+            dependencies = details.get('dependencies', []) if isinstance(details, dict) else []
+            commands = details.get('command', []) if isinstance(details, dict) else details
+            if isinstance(commands, str):
+                commands = [commands]  # Wrap single command in a list for consistency
+            makefile.add_rule(rule, dependencies, commands)
+        return makefile
+
+
+def create_makefile(path: str, name: str, rules, tree: Optional[DiskTree] = DISK):
+    Makefile.from_rules(rules).write(path, name, tree)
+
+## Example usage
+#core_path = '/path/to/directory'
+#rules = {
+#    'all': {
+#        'dependencies': ['clean', 'build'],
+#        'command': ['echo "Cleaning..."', 'echo "Building all targets"']
+#    },
+#    "build": ["echo 'Building target'", "cargo build"],
+#    'clean': ['echo "Cleaning up"', 'cargo clean']
+#}
+#create_makefile(core_path, 'Makefile', rules)
+
+
+def sanitize_rule_name(core):
+    """
+    Sanitizes the core name to be used as a Makefile rule name.
+
+    Args:
+    - core (str): The core name, which may contain hyphens, underscores, or colons.
+
+    Returns:
+    - str: A sanitized version of the core name suitable for a Makefile rule.
+    """
+    # Replace colons with underscores to avoid syntax issues in Makefiles
+    sanitized_name = core.replace(':', '_')
+
+    # Further sanitization can be added here if needed
+
+    return sanitized_name
+
+## Example usage
+#cores = ['cortex-m7', 'cortex_m7', 'cortex:m7']
+#for core in cores:
+#    rule_name = sanitize_rule_name(core)
+#    print(f"Original: {core}, Makefile rule name: {rule_name}")
+
+
+def core_makefile(package: Optional[str] = None) -> Makefile:
+    """
+    Makefile of a single core crate. 'all' cleans then builds through sub-makes, so it stays
+    correct under 'make -j' where plain prerequisites would run clean and build concurrently.
+    A workspace member only cleans its own package, the target directory is shared.
+    """
+    makefile = Makefile()
+    makefile.add_rule("all", recipe=['echo "Cleaning..."', "$(MAKE) clean", 'echo "Building all targets"', "$(MAKE) build"])
+    makefile.add_rule("build", recipe=["echo 'Building target'", "cargo build"])
+    makefile.add_rule("clean", recipe=['echo "Cleaning up"', f"cargo clean -p {package}" if package else "cargo clean"])
+    return makefile
+
+
+def project_makefile(core_names: List[str]) -> Makefile:
+    """
+    Top level Makefile of a project. The aggregate targets only have prerequisites, so
+    'make -j build' runs the per-core sub-makes concurrently.
+    """
+    makefile = Makefile()
+    makefile.set_variable("SUBDIRS", " ".join(core_names))
+    for action in ("all", "build", "clean"):
+        makefile.add_rule(action, [f"{action}-{core_name}" for core_name in core_names])
+    for core_name in core_names:
+        for action in ("build", "clean", "all"):
+            makefile.add_rule(f"{action}-{core_name}", recipe=[f"$(MAKE) -C {core_name} {action}"])
+    return makefile
+
+
+def workspace_makefile(core_triples: Dict[str, str]) -> Makefile:
+    """
+    Top level Makefile of a Cargo workspace project. cargo runs from the root, where the member
+    .cargo/config.toml files are not read, so every build names its target triple (the runner and linker
+    script come from the root .cargo/config.toml, see workspace_cargo_config). 'build' builds the
+    cores sharing a triple in a single cargo call, compiling their common dependencies once.
+
+    Args:
+    - core_triples (dict): Core crate name to its target triple, in config order.
+    """
+    targets: Dict[str, List[str]] = {}
+    for core_name, triple in core_triples.items():
+        targets.setdefault(triple, []).append(core_name)
+
+    makefile = Makefile()
+    makefile.set_variable("CARGO", "cargo", "?=")
+    makefile.set_variable("SUBDIRS", " ".join(core_triples))
+    makefile.add_rule("all", recipe=['echo "Cleaning..."', "$(MAKE) clean", 'echo "Building all targets"', "$(MAKE) build"])
+    makefile.add_rule(
+        "build",
+        recipe=[
+            f"$(CARGO) build --target {triple} {' '.join(f'-p {core_name}' for core_name in core_names)}"
+            for triple, core_names in targets.items()
+        ],
+    )
+    makefile.add_rule("clean", recipe=["$(CARGO) clean"])
+    for core_name, triple in core_triples.items():
+        makefile.add_rule(f"build-{core_name}", recipe=[f"$(CARGO) build --target {triple} -p {core_name}"])
+        makefile.add_rule(f"clean-{core_name}", recipe=[f"$(CARGO) clean --target {triple} -p {core_name}"])
+        makefile.add_rule(f"all-{core_name}", recipe=[f"$(MAKE) clean-{core_name}", f"$(MAKE) build-{core_name}"])
+    return makefile
+
+## Example usage
+#makefile = project_makefile(['cortex-m4', 'cortex-m7'])
+#print(makefile.render())
+#print(workspace_makefile({'cortex-m4': 'thumbv7em-none-eabihf', 'cortex-m7': 'thumbv7em-none-eabihf'}).render())
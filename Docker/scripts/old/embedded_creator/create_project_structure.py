@@ -0,0 +1,51 @@
+import os
+from typing import Dict, Optional
+from .staged_tree import DiskTree, DISK
+from .command_runner import CommandError, run_command
+from .constants import LOCAL_COMMAND_TIMEOUT, NETWORK_COMMAND_TIMEOUT, NETWORK_COMMAND_RETRIES
+from .tracing import get_logger, fields
+
+logger = get_logger("create_project_structure")
+
+
+def create_project_directories(path: str, directories: list[str], tree: Optional[DiskTree] = DISK) -> None:
+    # Loop through the list of directories and create each one
+    for directory in directories:
+        # Construct the path for each directory
+        dir_path = os.path.join(path, directory)
+        # Make the directory, including intermediate directories as needed
+        tree.makedirs(dir_path)
+        logger.debug("Directory created", extra=fields(directory=directory, path=path))
+
+def generate_rust_project(path: str, project_name: str, template_path: Optional[str] = None, values: Optional[Dict[str, str]] = None):
+    try:
+        # Construct the command as a list of its parts
+        if template_path is not None:
+            # Offline generation from the local template store
+            command = [
+                "cargo", "generate",
+                "--path", template_path,
+                "--name", project_name,
+                "--destination", path,
+                "--silent",
+            ]
+            for key, value in (values or {}).items():
+                command += ["--define", f"{key}={value}"]
+        else:
+            command = [
+                "cargo", "generate",
+                "--git", "https://github.com/rust-embedded/cortex-m-quickstart",
+                "--name", project_name,
+                "--destination", path
+            ]
+
+        # Execute the command, its output is streamed to the log; only a clone can fail transiently
+        if template_path is not None:
+            run_command(command, timeout=LOCAL_COMMAND_TIMEOUT)
+        else:
+            run_command(command, timeout=NETWORK_COMMAND_TIMEOUT, retries=NETWORK_COMMAND_RETRIES)
+        logger.info("Project generated", extra=fields(project=project_name, path=path))
+
+    except CommandError as e:
+        logger.error("cargo generate failed", extra=fields(project=project_name, stderr=e.stderr.strip()))
+        raise RuntimeError(f"An error occurred while trying to generate the project {project_name}: {e}") from e
@@ -0,0 +1,492 @@
+import io
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from .cli import DAEMON_COMMANDS, command_function
+from .config_resolver import default_resolver
+from .constants import DAEMON_JOB_TIMEOUT, DAEMON_LATENCY_WINDOW, DAEMON_QUEUE_SIZE, DAEMON_SOCKET, DUAL_CORE_TEMPLATE, SINGLE_CORE_TEMPLATE
+from .daemon_client import BUSY, DONE, TIMED_OUT, UNSUPPORTED, send_request
+from .device_catalog import default_catalog
+from .core_cache import shared_core_caches
+from .template_cache import shared_template_cache, shared_template_caches
+from .toolchain_state import shared_toolchain_state, shared_toolchain_states
+from .tracing import TRACER, configure_logging, get_logger, fields
+
+logger = get_logger("daemon")
+
+# Environment variables read once, when the constants are imported: a client whose values differ
+# from the ones of the daemon runs its command itself
+IMPORT_TIME_SETTINGS = [
+    "HOME",
+    "CARGO_PROJECT_TEMPLATE_DIR",
+    "QUICKSTART_REVISION",
+    "TEMPLATE_CACHE_DIR",
+    "TOOLCHAIN_STATE_DIR",
+    "CORE_CACHE_DIR",
+    "CORE_CACHE_MAX_SIZE",
+    "CORE_CACHE_MATERIALIZE",
+    "DEVICE_CATALOG_OVERLAY",
+    "MAX_CONCURRENT_COMMANDS",
+    "LOCAL_COMMAND_TIMEOUT",
+    "NETWORK_COMMAND_TIMEOUT",
+    "SIZE_WARNING_THRESHOLD",
+]
+# Seconds a client gets to send its request once connected
+REQUEST_TIMEOUT = 10.0
+
+
+def latency_percentiles(latencies: Deque[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+@dataclass
+class CommandStats:
+    jobs: int = 0
+    failed: int = 0
+    # Jobs turned away because the queue was full, their clients ran them
+    rejected: int = 0
+    # Seconds from the request to the reply, and waiting for a worker, of the latest jobs
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=DAEMON_LATENCY_WINDOW))
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=DAEMON_LATENCY_WINDOW))
+
+    def serialize(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency": latency_percentiles(self.latencies),
+            "wait": latency_percentiles(self.waits),
+        }
+
+
+def hit_rate(hits: int, misses: int) -> Optional[float]:
+    return hits / (hits + misses) if hits + misses else None
+
+
+def cache_counters() -> Dict[str, int]:
+    """
+    Counters of the caches a worker keeps from one job to the next, the difference before and after
+    a job is what the job used.
+    """
+    template_caches = shared_template_caches()
+    core_caches = shared_core_caches()
+    resolver_stats = default_resolver().stats
+    return {
+        "template_hits": sum(template_cache.session_stats["hits"] for template_cache in template_caches),
+        "template_misses": sum(template_cache.session_stats["misses"] for template_cache in template_caches),
+        "core_hits": sum(core_cache.session_stats["hits"] for core_cache in core_caches),
+        "core_misses": sum(core_cache.session_stats["misses"] for core_cache in core_caches),
+        "config_hits": resolver_stats["hits"],
+        "config_parsed": resolver_stats["parsed"],
+        "toolchain_calls": sum(toolchain_state.calls for toolchain_state in shared_toolchain_states()),
+    }
+
+
+def cache_stats(counters: Dict[str, int]) -> Dict[str, Dict]:
+    template_hits, template_misses = counters.get("template_hits", 0), counters.get("template_misses", 0)
+    config_hits, config_parsed = counters.get("config_hits", 0), counters.get("config_parsed", 0)
+    core_hits, core_misses = counters.get("core_hits", 0), counters.get("core_misses", 0)
+    return {
+        "template": {"hits": template_hits, "misses": template_misses, "hit_rate": hit_rate(template_hits, template_misses)},
+        # Cores restored from the core cache against cores generated
+        "core": {"hits": core_hits, "misses": core_misses, "hit_rate": hit_rate(core_hits, core_misses)},
+        # Resolved configs served from memory against config files parsed
+        "config": {"hits": config_hits, "parsed": config_parsed, "hit_rate": hit_rate(config_hits, config_parsed)},
+        "toolchain": {"calls": counters.get("toolchain_calls", 0)},
+    }
+
+
+def warm_caches() -> None:
+    """
+    Fills the disk caches the first jobs would otherwise fill: both templates in the default store and
+    the state of the active toolchain.
+    """
+    try:
+        template_cache = shared_template_cache()
+        for template_name in (SINGLE_CORE_TEMPLATE, DUAL_CORE_TEMPLATE):
+            template_cache.template_digest(template_name)
+        shared_toolchain_state().state()
+    except (ValueError, RuntimeError, OSError) as e:
+        logger.warning(f"Caches not warmed up, the first jobs will fill them: {e}")
+
+
+def _init_worker() -> None:
+    # Interrupting the daemon stops it once the running jobs are done, the workers must not die under them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for command in DAEMON_COMMANDS:
+        command_function(command)
+    default_catalog().parts()
+    try:
+        shared_toolchain_state().state()
+    except RuntimeError:
+        # Already reported by warm_caches, the jobs needing the toolchain report it again
+        pass
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _run_command(command: str, args: List[str], cwd: str) -> int:
+    # What cli.main does once the command is known, on top of the state left by the previous jobs
+    configure_logging()
+    TRACER.reset()
+    try:
+        os.chdir(cwd)
+    except OSError as e:
+        print(f"Error: Unable to run {command} from '{cwd}': {e.strerror}", file=sys.stderr)
+        return 1
+    try:
+        for toolchain_state in shared_toolchain_states():
+            toolchain_state.recheck()
+        command_function(command)(args)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def run_job(request: Dict) -> Dict:
+    """
+    Runs a command in a worker process as the client would have: from its directory, with its
+    environment, its output captured.
+
+    Args:
+    - request (dict): Job request of daemon_client.forward.
+
+    Returns:
+    - dict: Exit code, stdout and stderr of the command, and what it used of the warm caches.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    counters = cache_counters()
+    environment, cwd = dict(os.environ), os.getcwd()
+    os.environ.clear()
+    os.environ.update(request["env"])
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            exit_code = _run_command(request["command"], request["args"], request["cwd"])
+    finally:
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(environment)
+    after = cache_counters()
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "caches": {name: after[name] - counters[name] for name in after},
+    }
+
+
+def failed_reply(error: str) -> Dict:
+    return {"exit_code": 1, "stdout": "", "stderr": f"Error: {error}\n", "caches": {}}
+
+
+def job_request_error(request: Dict) -> Optional[str]:
+    if request.get("command") not in DAEMON_COMMANDS:
+        return f"'{request.get('command')}' is not run by the daemon"
+    if not isinstance(request.get("args"), list) or not all(isinstance(arg, str) for arg in request["args"]):
+        return "'args' must be a list of strings"
+    if not isinstance(request.get("cwd"), str) or not isinstance(request.get("env"), dict):
+        return "'cwd' and 'env' are required"
+    mismatched = [name for name in IMPORT_TIME_SETTINGS if request["env"].get(name) != os.environ.get(name)]
+    if mismatched:
+        return f"settings differing from the daemon ones: {', '.join(mismatched)}"
+    return None
+
+
+@dataclass
+class Job:
+    request: Dict
+    queued: float = field(default_factory=time.perf_counter)
+    done: threading.Event = field(default_factory=threading.Event)
+    reply: Optional[Dict] = None
+    # Set under the lock of the daemon: a dispatcher took the job, or its client stopped waiting before one did
+    started: bool = False
+    cancelled: bool = False
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except (OSError, ValueError) as e:
+            reply = {"status": UNSUPPORTED, "reason": f"malformed request: {e}"}
+        else:
+            reply = self.server.creator_daemon.handle(request)
+        try:
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        except OSError as e:
+            logger.warning(f"Client gone before its reply: {e}")
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    def __init__(self, socket_path: str, creator_daemon: "Daemon"):
+        self.creator_daemon = creator_daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class Daemon:
+    """
+    Runs the create, plan and validate commands of every client of a Unix socket (see daemon_client)
+    on a pool of worker processes. Each worker imports the command modules and maps the device catalog
+    once, and keeps the config resolver, the template stores and the toolchain states from one job to the next.
+
+    Jobs wait for a worker in a bounded queue: a client finding it full is told so at once and runs its
+    command itself. The 'stats' request reports the queue depth, the latency of the latest jobs of
+    every command and the hit rates of the caches. The socket is only accessible to its owner.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = DAEMON_SOCKET,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = DAEMON_QUEUE_SIZE,
+        job_timeout: Optional[float] = DAEMON_JOB_TIMEOUT,
+    ):
+        if not socket_path:
+            raise ValueError("No socket to listen on, set DAEMON_SOCKET or pass one")
+        self.socket_path = os.path.abspath(socket_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=queue_size)
+        self.job_timeout = job_timeout
+        self.started = time.time()
+        self.running = 0
+        self.commands = {command: CommandStats() for command in DAEMON_COMMANDS}
+        self.caches: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[_Server] = None
+        self._dispatchers: List[threading.Thread] = []
+
+    def serve_forever(self) -> None:
+        """
+        Listens until stop is called or a client sends 'stop', then finishes the queued jobs.
+
+        Raises RuntimeError when another daemon listens on the socket.
+        """
+        self._claim_socket()
+        warm_caches()
+        self._executor = self._new_executor()
+        # Start every worker now rather than on the first jobs
+        for future in [self._executor.submit(_worker_ready) for _ in range(self.workers)]:
+            future.result()
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, self)
+        finally:
+            os.umask(umask)
+        self._dispatchers = [threading.Thread(target=self._dispatch, name=f"dispatcher-{index}") for index in range(self.workers)]
+        for thread in self._dispatchers:
+            thread.start()
+        logger.info(
+            f"Daemon listening on {self.socket_path} with {self.workers} workers",
+            extra=fields(pid=os.getpid(), workers=self.workers, queue_size=self.jobs.maxsize),
+        )
+        try:
+            self._server.serve_forever()
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopping = True
+        if self._server is not None:
+            # shutdown waits for serve_forever to return, it must not run on the thread serving
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def handle(self, request: Dict) -> Dict:
+        if not isinstance(request, dict):
+            return {"status": UNSUPPORTED, "reason": "malformed request: not an object"}
+        if request.get("type") == "stats":
+            return {"status": DONE, **self.stats()}
+        if request.get("type") == "stop":
+            self.stop()
+            return {"status": DONE}
+        if request.get("type") != "job":
+            return {"status": UNSUPPORTED, "reason": f"unknown request type '{request.get('type')}'"}
+        error = job_request_error(request)
+        if error is not None:
+            return {"status": UNSUPPORTED, "reason": error}
+        job = Job(request)
+        with self._lock:
+            if self._stopping:
+                return {"status": BUSY, "reason": "the daemon is stopping"}
+            try:
+                self.jobs.put_nowait(job)
+            except queue.Full:
+                self.commands[request["command"]].rejected += 1
+                return {"status": BUSY, "reason": f"{self.jobs.maxsize} jobs already queued"}
+        if job.done.wait(self.job_timeout):
+            return job.reply
+        with self._lock:
+            if not job.started:
+                # No dispatcher took the job, e.g. every one is stuck or gone: the client runs it itself
+                job.cancelled = True
+                self.commands[request["command"]].rejected += 1
+                return {"status": BUSY, "reason": f"no worker took the job within {self.job_timeout:.0f} s"}
+        if job.done.is_set():
+            return job.reply
+        # The worker cannot be stopped without killing the jobs of the other clients: the job goes on, and
+        # e.g. a create may still write the project, so its outcome is unknown rather than a failure
+        reason = f"the daemon did not finish {request['command']} within {self.job_timeout:.0f} s, it is still running and its outcome is unknown"
+        logger.error(reason, extra=fields(command=request["command"], cwd=request["cwd"]))
+        return {"status": TIMED_OUT, "reason": reason}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "socket": self.socket_path,
+                "uptime": time.time() - self.started,
+                "workers": self.workers,
+                "queue": {"depth": self.jobs.qsize(), "size": self.jobs.maxsize, "running": self.running},
+                "commands": {command: command_stats.serialize() for command, command_stats in self.commands.items()},
+                "caches": cache_stats(self.caches),
+            }
+
+    def _claim_socket(self) -> None:
+        if os.path.exists(self.socket_path):
+            try:
+                send_request({"type": "stats"}, self.socket_path, timeout=1.0)
+            except (OSError, ValueError):
+                # Left behind by a daemon that did not stop cleanly
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Workers forked from a process running threads could inherit locks held by them
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+        )
+
+    def _dispatch(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            start = time.perf_counter()
+            with self._lock:
+                if job.cancelled:
+                    continue
+                job.started = True
+                self.running += 1
+            try:
+                job.reply = {"status": DONE, **self._run(job.request)}
+                self._record(job, start)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                if job.reply is None:
+                    job.reply = {"status": DONE, **failed_reply(f"The daemon could not run {job.request['command']}")}
+                job.done.set()
+
+    def _run(self, request: Dict, attempts: Optional[int] = 2) -> Dict:
+        executor = self._executor
+        try:
+            return executor.submit(run_job, request).result()
+        except BrokenProcessPool as e:
+            # A worker died, e.g. killed, maybe while idle: no job can run until the pool is replaced.
+            # Every daemon command can run again safely, create only rewrites what the .project-lock reports as changed
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._new_executor()
+                    executor.shutdown(wait=False)
+            if attempts > 1:
+                logger.warning(f"Worker pool replaced, running {request['command']} again: {e}")
+                return self._run(request, attempts - 1)
+            error = f"The daemon worker running the command died: {e}"
+        except Exception as e:
+            error = f"The daemon could not run the command: {type(e).__name__}: {e}"
+        logger.error(error, extra=fields(command=request["command"]))
+        return failed_reply(error)
+
+    def _record(self, job: Job, start: float) -> None:
+        command, reply = job.request["command"], job.reply
+        latency = time.perf_counter() - job.queued
+        with self._lock:
+            command_stats = self.commands[command]
+            command_stats.jobs += 1
+            command_stats.failed += reply["exit_code"] != 0
+            command_stats.latencies.append(latency)
+            command_stats.waits.append(start - job.queued)
+            for name, value in reply["caches"].items():
+                self.caches[name] = self.caches.get(name, 0) + value
+        logger.info(
+            f"{command} done in {latency * 1000:.1f} ms",
+            extra=fields(command=command, exit_code=reply["exit_code"], cwd=job.request["cwd"], wait=start - job.queued),
+        )
+
+    def _shutdown(self) -> None:
+        with self._lock:
+            self._stopping = True
+        # Queued jobs are done first, the end markers come after them
+        for _ in self._dispatchers:
+            self.jobs.put(None)
+        for thread in self._dispatchers:
+            thread.join()
+        self._executor.shutdown()
+        if self._server is not None:
+            self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("Daemon stopped", extra=fields(jobs=sum(command_stats.jobs for command_stats in self.commands.values())))
+
+
+def print_stats(stats: Dict) -> None:
+    queue_stats = stats["queue"]
+    print(
+        f"Daemon {stats['socket']} (pid {stats['pid']}, up {stats['uptime']:.0f} s): {stats['workers']} workers, "
+        f"{queue_stats['running']} running, {queue_stats['depth']}/{queue_stats['size']} queued"
+    )
+    for command, command_stats in stats["commands"].items():
+        line = f"  {command:<10} {command_stats['jobs']} jobs, {command_stats['failed']} failed, {command_stats['rejected']} rejected"
+        latency = command_stats["latency"]
+        if latency:
+            line += f", latency median {latency['median'] * 1000:.1f} ms, p95 {latency['p95'] * 1000:.1f} ms, max {latency['max'] * 1000:.1f} ms"
+        print(line)
+    caches = stats["caches"]
+    for name, misses, label in (("template", "misses", "misses"), ("core", "misses", "misses"), ("config", "parsed", "files parsed")):
+        rate = caches[name]["hit_rate"]
+        line = f"  {name + ' cache':<16} {caches[name]['hits']} hits, {caches[name][misses]} {label}"
+        print(line + (f" ({rate:.0%} hit rate)" if rate is not None else ""))
+    print(f"  {'toolchain':<16} {caches['toolchain']['calls']} rustup/rustc calls")
+
+## Example usage
+#creator_daemon = Daemon('/tmp/create_project.sock', workers=4)
+#creator_daemon.serve_forever()
+#print_stats(send_request({'type': 'stats'}, '/tmp/create_project.sock'))
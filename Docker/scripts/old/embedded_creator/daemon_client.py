@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from .constants import DAEMON_SOCKET
+from .tracing import get_logger
+
+logger = get_logger("daemon_client")
+
+# Reply statuses, see daemon
+DONE = "done"
+BUSY = "busy"
+UNSUPPORTED = "unsupported"
+# The job was still running when the client stopped waiting, it may yet finish or fail
+TIMED_OUT = "timed-out"
+# Exit code of a job whose outcome is unknown, EX_TEMPFAIL of sysexits.h, told apart from a failure
+UNKNOWN_OUTCOME_EXIT_CODE = 75
+
+
+def send_request(request: Dict, socket_path: Optional[str] = DAEMON_SOCKET, timeout: Optional[float] = None) -> Dict:
+    """
+    Sends one request to the daemon listening on 'socket_path' and returns its reply. Both are a JSON
+    object on a single line.
+
+    Raises OSError when no daemon listens on the socket, ValueError for a malformed reply.
+    """
+    # Only paid by the commands that find a socket to talk to
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ValueError("The daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def forward(command: str, args: List[str], socket_path: Optional[str] = DAEMON_SOCKET) -> Optional[int]:
+    """
+    Runs a command in the daemon, from the current directory and with the current environment, and
+    replays its output.
+
+    Args:
+    - command (str): Name of the command, one of cli.DAEMON_COMMANDS.
+    - args (list): Arguments of the command.
+    - socket_path (str): Socket of the daemon, forwarding is disabled when empty.
+
+    Returns:
+    - int: Exit code of the command, None when no daemon ran it (none running, queue full or settings
+      differing from the daemon ones) and the caller should run it itself. UNKNOWN_OUTCOME_EXIT_CODE when
+      the job was still running after DAEMON_JOB_TIMEOUT: running it again would race with it.
+    """
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+    request = {"type": "job", "command": command, "args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        reply = send_request(request, socket_path)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Daemon unavailable, running {command} locally: {e}")
+        return None
+    if reply.get("status") == TIMED_OUT:
+        sys.stderr.write(f"Error: {reply.get('reason')}\n")
+        return UNKNOWN_OUTCOME_EXIT_CODE
+    if reply.get("status") != DONE:
+        logger.debug(f"Daemon did not run {command}, running it locally: {reply.get('reason', reply.get('status'))}")
+        return None
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["exit_code"]
+
+## Example usage
+#exit_code = forward('validate', ['config.json'])
+#if exit_code is None:
+#    validate_configs(['config.json'])
+#print(send_request({'type': 'stats'}))
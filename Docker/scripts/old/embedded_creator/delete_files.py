@@ -0,0 +1,25 @@
+import os
+from typing import Optional
+from .staged_tree import DiskTree, DISK
+from .tracing import get_logger, fields
+
+logger = get_logger("delete_files")
+
+def delete_files_and_directories(path: str, names_to_delete: list, tree: Optional[DiskTree] = DISK):
+    # Work with absolute paths instead of changing directory, the working directory is shared by every thread
+    try:
+        # Iterate through each name in the list
+        for name in names_to_delete:
+            target = os.path.join(path, name)
+            if name and tree.exists(target):
+                # Check if it's a file or directory and delete accordingly
+                if tree.isfile(target):
+                    tree.remove(target)
+                    logger.debug("Deleted file", extra=fields(name=name, path=path))
+                elif tree.isdir(target):
+                    tree.remove(target)
+                    logger.debug("Deleted directory", extra=fields(name=name, path=path))
+            else:
+                logger.debug("Nothing to delete", extra=fields(name=name, path=path))
+    except Exception as e:
+        logger.error(f"Unable to delete the template leftovers: {e}", extra=fields(path=path))
@@ -0,0 +1,331 @@
+import re
+from typing import Callable, List, Optional
+
+# Escapes of the legacy Rust mangling, e.g. '_ZN4core3ptr13drop_in_place17h0123456789abcdefE'
+LEGACY_ESCAPES = {
+    "$SP$": "@",
+    "$BP$": "*",
+    "$RF$": "&",
+    "$LT$": "<",
+    "$GT$": ">",
+    "$LP$": "(",
+    "$RP$": ")",
+    "$C$": ",",
+}
+LEGACY_ESCAPE_PATTERN = re.compile(r"\$(SP|BP|RF|LT|GT|LP|RP|C|u[0-9a-f]{2})\$")
+LEGACY_HASH_PATTERN = re.compile(r"^h[0-9a-f]{16}$")
+LENGTH_PATTERN = re.compile(r"\d+")
+BASE62_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+UNKNOWN_CRATE = "[Unknown]"
+# Types of the v0 mangling spelled with a single letter
+V0_BASIC_TYPES = {
+    "a": "i8", "b": "bool", "c": "char", "d": "f64", "e": "str", "f": "f32", "h": "u8", "i": "isize",
+    "j": "usize", "l": "i32", "m": "u32", "n": "i128", "o": "u128", "s": "i16", "t": "u16", "u": "()",
+    "v": "...", "x": "i64", "y": "u64", "z": "!", "p": "_",
+}
+MAX_BACKREF_DEPTH = 64
+# First crate root of a v0 symbol the parser does not support
+V0_CRATE_PATTERN = re.compile(r"C(?:s[0-9a-zA-Z]*_)?(\d+)_?")
+
+
+def _unescape(component: str) -> str:
+    if component.startswith("_$"):
+        component = component[1:]
+    component = component.replace("..", "::")
+
+    def replace(match: re.Match) -> str:
+        escape = match.group(1)
+        if escape.startswith("u"):
+            return chr(int(escape[1:], 16))
+        return LEGACY_ESCAPES[f"${escape}$"]
+
+    return LEGACY_ESCAPE_PATTERN.sub(replace, component)
+
+
+def demangle_legacy(symbol: str) -> Optional[str]:
+    """
+    Demangles a symbol of the legacy Rust scheme (an Itanium nested name ending with a hash), None for any other symbol.
+    """
+    if not symbol.startswith("_ZN"):
+        return None
+    components: List[str] = []
+    index = 3
+    length = len(symbol)
+    while index < length and symbol[index] != "E":
+        match = LENGTH_PATTERN.match(symbol, index)
+        if match is None:
+            return None
+        end = match.end()
+        size = int(match.group())
+        components.append(symbol[end:end + size])
+        index = end + size
+    if index >= length or not components:
+        return None
+    if LEGACY_HASH_PATTERN.match(components[-1]):
+        components.pop()
+    if "$" not in symbol and "." not in symbol:
+        return "::".join(components)
+    return "::".join([_unescape(component) for component in components])
+
+
+class _V0Parser:
+    """
+    Parser of the v0 Rust mangling ('_RNvNtCs1_5krate3mod4func'): paths with generic arguments, impls,
+    types, consts and backreferences, printed like rustc does without the crate disambiguators and lifetimes.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.index = 2
+        # Backreferences point back into the symbol, a chain of them is bounded by this depth
+        self.depth = 0
+        if self.peek().isdigit():
+            # Encoding version
+            self.decimal()
+
+    def peek(self) -> str:
+        return self.symbol[self.index:self.index + 1]
+
+    def eat(self, character: str) -> bool:
+        if self.peek() == character:
+            self.index += 1
+            return True
+        return False
+
+    def next(self) -> str:
+        if self.index >= len(self.symbol):
+            raise ValueError("unexpected end of symbol")
+        character = self.symbol[self.index]
+        self.index += 1
+        return character
+
+    def decimal(self) -> int:
+        start = self.index
+        # A number starting with 0 is 0, e.g. the empty names of two nested closures are '00'
+        if self.eat("0"):
+            return 0
+        while self.peek().isdigit():
+            self.index += 1
+        if start == self.index:
+            raise ValueError("expected a number")
+        return int(self.symbol[start:self.index])
+
+    def base62(self) -> int:
+        # '_' alone is 0, otherwise the digits before '_' encode the number minus one
+        if self.eat("_"):
+            return 0
+        value = 0
+        character = self.next()
+        while character != "_":
+            value = value * 62 + BASE62_DIGITS.index(character)
+            character = self.next()
+        return value + 1
+
+    def disambiguator(self) -> None:
+        if self.eat("s"):
+            self.base62()
+
+    def undisambiguated_identifier(self) -> str:
+        # Punycode identifiers are kept encoded
+        self.eat("u")
+        size = self.decimal()
+        self.eat("_")
+        name = self.symbol[self.index:self.index + size]
+        if len(name) != size:
+            raise ValueError("identifier past the end of symbol")
+        self.index += size
+        return name
+
+    def identifier(self) -> str:
+        self.disambiguator()
+        return self.undisambiguated_identifier()
+
+    def backref(self, parse: Callable[[], str]) -> str:
+        target = self.base62() + 2
+        if target >= self.index - 1 or self.depth > MAX_BACKREF_DEPTH:
+            raise ValueError("invalid backreference")
+        saved = self.index
+        self.index = target
+        self.depth += 1
+        try:
+            return parse()
+        finally:
+            self.depth -= 1
+            self.index = saved
+
+    def path(self, in_value: Optional[bool] = True) -> str:
+        tag = self.next()
+        if tag == "C":
+            return self.identifier()
+        if tag == "N":
+            namespace = self.next()
+            parent = self.path(in_value)
+            name = self.identifier()
+            if namespace.isupper():
+                # Closures and shims are named after the item they belong to
+                name = "{closure}" if namespace == "C" else "{shim}"
+            return f"{parent}::{name}" if name else parent
+        if tag == "M":
+            self.impl_path()
+            return f"<{self.type()}>"
+        if tag == "X":
+            self.impl_path()
+            implementor = self.type()
+            return f"<{implementor} as {self.path(False)}>"
+        if tag == "Y":
+            implementor = self.type()
+            return f"<{implementor} as {self.path(False)}>"
+        if tag == "I":
+            base = self.path(in_value)
+            arguments = self.generic_arguments()
+            separator = "::" if in_value else ""
+            return f"{base}{separator}<{', '.join(arguments)}>" if arguments else base
+        if tag == "B":
+            return self.backref(lambda: self.path(in_value))
+        raise ValueError(f"unsupported path tag '{tag}'")
+
+    def impl_path(self) -> None:
+        # Module the impl is in, rustc does not print it
+        self.disambiguator()
+        self.path()
+
+    def generic_arguments(self) -> List[str]:
+        arguments = []
+        while not self.eat("E"):
+            if self.eat("L"):
+                # Lifetimes are erased in symbols
+                self.base62()
+            elif self.eat("K"):
+                arguments.append(self.const())
+            else:
+                arguments.append(self.type())
+        return arguments
+
+    def type(self) -> str:
+        tag = self.peek()
+        if tag in V0_BASIC_TYPES:
+            self.index += 1
+            return V0_BASIC_TYPES[tag]
+        if tag in "CNMXYI":
+            return self.path(False)
+        self.index += 1
+        if tag == "A":
+            element = self.type()
+            return f"[{element}; {self.const()}]"
+        if tag == "S":
+            return f"[{self.type()}]"
+        if tag in "RQ":
+            if self.eat("L"):
+                self.base62()
+            return ("&" if tag == "R" else "&mut ") + self.type()
+        if tag == "P":
+            return f"*const {self.type()}"
+        if tag == "O":
+            return f"*mut {self.type()}"
+        if tag == "F":
+            return self.function_signature()
+        if tag == "T":
+            elements = []
+            while not self.eat("E"):
+                elements.append(self.type())
+            return f"({elements[0]},)" if len(elements) == 1 else f"({', '.join(elements)})"
+        if tag == "D":
+            return self.dyn_bounds()
+        if tag == "B":
+            return self.backref(self.type)
+        raise ValueError(f"unsupported type tag '{tag}'")
+
+    def binder(self) -> None:
+        if self.eat("G"):
+            self.base62()
+
+    def function_signature(self) -> str:
+        self.binder()
+        prefix = "unsafe " if self.eat("U") else ""
+        if self.eat("K"):
+            abi = "C" if self.eat("C") else self.undisambiguated_identifier().replace("_", "-")
+            prefix += f'extern "{abi}" '
+        parameters = []
+        while not self.eat("E"):
+            parameters.append(self.type())
+        result = self.type()
+        signature = f"{prefix}fn({', '.join(parameters)})"
+        return signature if result == "()" else f"{signature} -> {result}"
+
+    def dyn_bounds(self) -> str:
+        self.binder()
+        traits = []
+        while not self.eat("E"):
+            name = self.path(False)
+            bindings = []
+            while self.eat("p"):
+                binding = self.undisambiguated_identifier()
+                bindings.append(f"{binding} = {self.type()}")
+            if bindings:
+                name = f"{name[:-1]}, {', '.join(bindings)}>" if name.endswith(">") else f"{name}<{', '.join(bindings)}>"
+            traits.append(name)
+        # Lifetime of the trait object
+        if self.next() != "L":
+            raise ValueError("trait object without lifetime")
+        self.base62()
+        return "dyn " + " + ".join(traits)
+
+    def const(self) -> str:
+        if self.eat("p"):
+            return "_"
+        if self.eat("B"):
+            return self.backref(self.const)
+        kind = self.type()
+        negative = self.eat("n")
+        start = self.index
+        while self.peek() and self.peek() in "0123456789abcdef":
+            self.index += 1
+        digits = self.symbol[start:self.index]
+        if not self.eat("_"):
+            raise ValueError("unsupported const")
+        value = int(digits, 16) if digits else 0
+        if kind == "bool":
+            return "true" if value else "false"
+        if kind == "char":
+            return repr(chr(value))
+        return str(-value if negative else value)
+
+
+def demangle_v0(symbol: str) -> Optional[str]:
+    if not symbol.startswith("_R"):
+        return None
+    try:
+        return _V0Parser(symbol).path()
+    except (ValueError, IndexError, RecursionError):
+        return None
+
+
+def demangle(symbol: str) -> str:
+    """
+    Returns the Rust path of a mangled symbol, or the symbol itself when it is not a Rust one (e.g. a C function).
+    """
+    return demangle_legacy(symbol) or demangle_v0(symbol) or symbol
+
+
+def crate_of(demangled: str) -> str:
+    """
+    Crate a demangled symbol belongs to: the first path component, the one of the type for '<Type as Trait>::method'.
+    Symbols without a path, such as C functions from the runtime, are grouped as '[Unknown]'.
+    """
+    if demangled.startswith("_R"):
+        match = V0_CRATE_PATTERN.search(demangled, 2)
+        if match is None:
+            return UNKNOWN_CRATE
+        return demangled[match.end():match.end() + int(match.group(1))]
+    path = demangled.lstrip("<&*")
+    if path.startswith("mut "):
+        path = path[4:]
+    crate, separator, _ = path.partition("::")
+    if not separator or not crate.replace("_", "").isalnum():
+        return UNKNOWN_CRATE
+    return crate
+
+## Example usage
+#print(demangle('_ZN4core3ptr13drop_in_place17h0123456789abcdefE'))  # core::ptr::drop_in_place
+#print(demangle('_RNvNtCs1234_7mycrate6module4func'))  # mycrate::module::func
+#print(crate_of('<cortex_m::peripheral::SCB as core::fmt::Debug>::fmt'))  # cortex_m
@@ -0,0 +1,233 @@
+import copy
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .constants import DEVICE_CATALOG_PATH, DEVICE_CATALOG_SOURCE, DEFAULT_DEVICE_CATALOG_OVERLAY
+from .memory_map import DeviceRegions, parse_origin, parse_size
+from .project_types import ProjectConfig
+
+# Packed layout: header, zlib compressed JSON record of every device, then the index sorted by part number.
+# Index entries have a fixed width, so a lookup bisects them in place without reading the records.
+CATALOG_MAGIC = b"MCUCAT01"
+HEADER = struct.Struct("<8sII32s")  # magic, device count, index offset, sha256 of the JSON source
+PART_NUMBER_SIZE = 24
+INDEX_ENTRY = struct.Struct(f"<{PART_NUMBER_SIZE}sII")  # part number (NUL padded), record offset, record length
+
+
+def normalize_part(part: str) -> str:
+    return part.strip().upper()
+
+
+def pack_catalog(devices: Dict[str, Dict], source_digest: Optional[bytes] = b"") -> bytes:
+    """
+    Packs a '{part: device}' mapping, as found in device_catalog.json, into the binary catalog format.
+    """
+    devices = {normalize_part(part): device for part, device in devices.items()}
+    records = bytearray()
+    index = []
+    for part in sorted(devices):
+        encoded = part.encode("ascii")
+        if len(encoded) > PART_NUMBER_SIZE:
+            raise ValueError(f"Part number '{part}' is longer than {PART_NUMBER_SIZE} characters")
+        record = zlib.compress(json.dumps(devices[part], separators=(",", ":")).encode("utf-8"))
+        index.append(INDEX_ENTRY.pack(encoded, HEADER.size + len(records), len(record)))
+        records += record
+    header = HEADER.pack(CATALOG_MAGIC, len(index), HEADER.size + len(records), source_digest.ljust(32, b"\0"))
+    return header + bytes(records) + b"".join(index)
+
+
+def build_catalog(source_path: Optional[str] = DEVICE_CATALOG_SOURCE, output_path: Optional[str] = DEVICE_CATALOG_PATH) -> int:
+    with open(source_path, "rb") as file:
+        source = file.read()
+    packed = pack_catalog(json.loads(source), hashlib.sha256(source).digest())
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(packed)
+    os.replace(temporary_path, output_path)
+    return len(packed)
+
+
+def is_catalog_stale(source_path: Optional[str] = DEVICE_CATALOG_SOURCE, catalog_path: Optional[str] = DEVICE_CATALOG_PATH) -> bool:
+    if not os.path.isfile(catalog_path):
+        return True
+    with open(source_path, "rb") as file:
+        digest = hashlib.sha256(file.read()).digest()
+    with open(catalog_path, "rb") as file:
+        _, _, _, catalog_digest = HEADER.unpack(file.read(HEADER.size))
+    return digest != catalog_digest
+
+
+class DeviceCatalog:
+    """
+    Read-only view of the packed device catalog, with a local overlay on top of it.
+
+    Nothing is read when the catalog is created. The first lookup maps the packed file and only the
+    index is touched to find a part; its record is decompressed on demand and kept for later lookups.
+    Parts of the overlay file replace the bundled parts of the same name.
+    """
+
+    def __init__(self, path: Optional[str] = DEVICE_CATALOG_PATH, overlay_path: Optional[str] = DEFAULT_DEVICE_CATALOG_OVERLAY):
+        self.path = path
+        self.overlay_path = overlay_path
+        self._buffer = None
+        self._count = 0
+        self._index_offset = 0
+        self._overlay: Optional[Dict[str, Dict]] = None
+        self._records: Dict[str, Dict] = {}
+
+    def _load(self) -> None:
+        if self._buffer is not None:
+            return
+        if os.path.isfile(self.path):
+            with open(self.path, "rb") as file:
+                self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # No packed catalog next to the scripts, pack the JSON source in memory
+            with open(DEVICE_CATALOG_SOURCE, "r") as file:
+                self._buffer = pack_catalog(json.load(file))
+        magic, self._count, self._index_offset, _ = HEADER.unpack_from(self._buffer, 0)
+        if magic != CATALOG_MAGIC:
+            raise ValueError(f"'{self.path}' is not a device catalog")
+
+        self._overlay = {}
+        if self.overlay_path and os.path.isfile(self.overlay_path):
+            with open(self.overlay_path, "r") as file:
+                self._overlay = {normalize_part(part): device for part, device in json.load(file).items()}
+
+    def _entry(self, position: int) -> Tuple[str, int, int]:
+        part, offset, length = INDEX_ENTRY.unpack_from(self._buffer, self._index_offset + position * INDEX_ENTRY.size)
+        return part.rstrip(b"\0").decode("ascii"), offset, length
+
+    def _bisect(self, part: str) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < part:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def parts(self, prefix: Optional[str] = "") -> List[str]:
+        self._load()
+        prefix = normalize_part(prefix)
+        found = set(part for part in self._overlay if part.startswith(prefix))
+        position = self._bisect(prefix)
+        while position < self._count:
+            part = self._entry(position)[0]
+            if not part.startswith(prefix):
+                break
+            found.add(part)
+            position += 1
+        return sorted(found)
+
+    def get(self, part: str) -> Optional[Dict]:
+        self._load()
+        part = normalize_part(part)
+        if part in self._overlay:
+            return self._overlay[part]
+        if part not in self._records:
+            position = self._bisect(part)
+            if position == self._count or self._entry(position)[0] != part:
+                return None
+            _, offset, length = self._entry(position)
+            self._records[part] = json.loads(zlib.decompress(self._buffer[offset:offset + length]))
+        return self._records[part]
+
+    def resolve(self, query: str) -> Tuple[str, Dict]:
+        """
+        Finds the device of a part number. Ordering codes resolve to the longest catalog part they
+        start with (e.g. 'STM32H755ZIT6' to 'STM32H755ZI') and a prefix matching a single part resolves to it.
+
+        Returns:
+        - Tuple[str, Dict]: The catalog part number and its device.
+        """
+        query = normalize_part(query)
+        if self.get(query) is not None:
+            return query, self.get(query)
+        for length in range(len(query) - 1, 0, -1):
+            if self.get(query[:length]) is not None:
+                return query[:length], self.get(query[:length])
+        completions = self.parts(query)
+        if len(completions) == 1:
+            return completions[0], self.get(completions[0])
+        if completions:
+            raise ValueError(f"mcu '{query}' is ambiguous, it matches: {', '.join(completions)}")
+        # Only an unknown part pays for importing difflib
+        from difflib import get_close_matches
+
+        suggestions = get_close_matches(query, self.parts(), n=3)
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise ValueError(f"mcu '{query}' is not in the device catalog.{hint}")
+
+
+_default_catalog: Optional[DeviceCatalog] = None
+
+
+def default_catalog() -> DeviceCatalog:
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = DeviceCatalog()
+    return _default_catalog
+
+
+def _merge(base: Dict, override: Dict) -> Dict:
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = _merge(merged[key], value) if isinstance(value, dict) and isinstance(merged.get(key), dict) else value
+    return merged
+
+
+def expand_mcu(config_data: Dict, catalog: Optional[DeviceCatalog] = None) -> Dict:
+    """
+    Expands '"mcu": "<part>"' into the family and cores of the catalog device.
+
+    Keys set in the config win over the catalog. Cores listed under 'config' are merged
+    into the catalog core of the same name, e.g. to change only the arch of one core.
+    """
+    if not isinstance(config_data, dict) or not config_data.get("mcu"):
+        return config_data
+    part, device = (catalog or default_catalog()).resolve(config_data["mcu"])
+    expanded = {"mcu_family": device["mcu_family"], "config": copy.deepcopy(device["config"])}
+    expanded.update({key: value for key, value in config_data.items() if key != "config"})
+    expanded["mcu"] = part
+
+    overrides = config_data.get("config") or []
+    cores = {core["core"]: index for index, core in enumerate(expanded["config"])}
+    for override in [overrides] if isinstance(overrides, dict) else overrides:
+        name = override.get("core") if isinstance(override, dict) else None
+        if name not in cores:
+            raise ValueError(f"core '{name}' is not a core of {part}, expected one of: {', '.join(cores)}")
+        expanded["config"][cores[name]] = _merge(expanded["config"][cores[name]], override)
+    return expanded
+
+
+def device_regions_for(project_config: ProjectConfig, catalog: Optional[DeviceCatalog] = None) -> Optional[DeviceRegions]:
+    """
+    Address windows of the project device, used to find the regions laid out of the device memory.
+    """
+    if not project_config.mcu:
+        return None
+    _, device = (catalog or default_catalog()).resolve(project_config.mcu)
+    return [(parse_origin(origin), parse_size(length)) for _, origin, length in device.get("memory", [])]
+
+
+if __name__ == "__main__":
+    # Usage: python3 -m embedded_creator.device_catalog build|check
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "build":
+        size = build_catalog()
+        print(f"Device catalog written to {DEVICE_CATALOG_PATH} ({size} bytes)")
+    elif command == "check":
+        stale = is_catalog_stale()
+        print(f"{DEVICE_CATALOG_PATH} is {'out of date, run build' if stale else 'up to date'}")
+        sys.exit(1 if stale else 0)
+    else:
+        print("Usage: python3 -m embedded_creator.device_catalog build|check", file=sys.stderr)
+        sys.exit(1)
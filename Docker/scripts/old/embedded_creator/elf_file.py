@@ -0,0 +1,221 @@
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+# e_ident
+ELF_MAGIC = b"\x7fELF"
+ELF_CLASS_32 = 1
+ELF_CLASS_64 = 2
+ELF_DATA_LSB = 1
+ELF_DATA_MSB = 2
+# Section types and flags
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+SHF_ALLOC = 0x2
+SHN_LORESERVE = 0xFF00
+SHN_XINDEX = 0xFFFF
+# Symbol types
+STT_OBJECT = 1
+STT_FUNC = 2
+# Program header types
+PT_LOAD = 1
+
+# Header layouts after e_ident, per class: file header, section header, program header
+HEADER_FORMATS = {
+    ELF_CLASS_32: ("HHIIIIIHHHHHH", "IIIIIIIIII", "IIIIIIII"),
+    ELF_CLASS_64: ("HHIQQQIHHHHHH", "IIQQQQIIQQ", "IIQQQQQQ"),
+}
+# Symbol table entry, per class
+SYMBOL_FORMATS = {ELF_CLASS_32: "IIIBBH", ELF_CLASS_64: "IBBHQQ"}
+IDENT_SIZE = 16
+
+
+@dataclass(frozen=True)
+class ElfSection:
+    name: str
+    type: int
+    flags: int
+    address: int
+    offset: int
+    size: int
+
+    @property
+    def allocated(self) -> bool:
+        # Takes memory on the target, unlike the debug and symbol sections
+        return bool(self.flags & SHF_ALLOC)
+
+    @property
+    def has_contents(self) -> bool:
+        # .bss and the like only reserve memory, there is nothing to load for them
+        return self.type != SHT_NOBITS
+
+
+@dataclass(frozen=True)
+class ElfSegment:
+    type: int
+    offset: int
+    virtual_address: int
+    physical_address: int
+    file_size: int
+    memory_size: int
+
+
+@dataclass
+class ElfSymbol:
+    name: str
+    type: int
+    address: int
+    size: int
+    # Index of the section the symbol is defined in
+    section_index: int
+
+
+class ElfFile:
+    """
+    ELF file mapped in memory: only the file, section and program headers are parsed when it is
+    opened, the contents of a section are only paged in when asked for, so the size of the debug
+    sections does not matter. 32 and 64-bit files of either endianness are supported.
+
+    Raises ValueError when the file is not an ELF file, or a truncated or corrupt one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size < IDENT_SIZE:
+                raise ValueError(f"'{path}' is not an ELF file")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse_headers()
+        except struct.error:
+            # A header cut short or an offset past the end of the file
+            self.close()
+            raise ValueError(f"'{path}' is not a valid ELF file") from None
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "ElfFile":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _parse_headers(self) -> None:
+        ident = self._map[:IDENT_SIZE]
+        if ident[:4] != ELF_MAGIC or ident[4] not in HEADER_FORMATS or ident[5] not in (ELF_DATA_LSB, ELF_DATA_MSB):
+            raise ValueError(f"'{self.path}' is not an ELF file")
+        self.elf_class = ident[4]
+        self.byte_order = "<" if ident[5] == ELF_DATA_LSB else ">"
+        header_format, section_format, segment_format = (self.byte_order + layout for layout in HEADER_FORMATS[self.elf_class])
+        (
+            self.type, self.machine, _version, self.entry, program_offset, section_offset,
+            _flags, _header_size, segment_entry_size, segment_count, section_entry_size, section_count, names_index,
+        ) = struct.unpack_from(header_format, self._map, IDENT_SIZE)
+
+        section_headers = []
+        if section_offset:
+            first = struct.unpack_from(section_format, self._map, section_offset)
+            # With 0xff00 sections or more, the count and the names index are kept in the first section header
+            section_count = section_count or first[5]
+            if names_index == SHN_XINDEX:
+                names_index = first[6]
+            section_headers = self._table(section_format, section_offset, section_entry_size, section_count)
+        segment_headers = self._table(segment_format, program_offset, segment_entry_size, segment_count) if program_offset else []
+
+        names_offset = section_headers[names_index][4] if names_index < len(section_headers) else None
+        self._links = [header[6] for header in section_headers]
+        self.sections: List[ElfSection] = [
+            ElfSection(self.string(names_offset, name) if names_offset is not None else "", kind, flags, address, offset, size)
+            for name, kind, flags, address, offset, size, *_ in section_headers
+        ]
+        if self.elf_class == ELF_CLASS_32:
+            self.segments: List[ElfSegment] = [
+                ElfSegment(kind, offset, virtual, physical, file_size, memory_size)
+                for kind, offset, virtual, physical, file_size, memory_size, *_ in segment_headers
+            ]
+        else:
+            self.segments = [
+                ElfSegment(kind, offset, virtual, physical, file_size, memory_size)
+                for kind, _flags, offset, virtual, physical, file_size, memory_size, _align in segment_headers
+            ]
+
+    def _table(self, entry_format: str, offset: int, entry_size: int, count: int) -> List[tuple]:
+        entry = struct.Struct(entry_format)
+        if entry_size < entry.size or offset + entry_size * count > len(self._map):
+            raise ValueError(f"'{self.path}' has a truncated header table")
+        if entry_size == entry.size:
+            return list(entry.iter_unpack(self._map[offset:offset + entry_size * count]))
+        return [entry.unpack_from(self._map, offset + index * entry_size) for index in range(count)]
+
+    def string(self, table_offset: int, index: int) -> str:
+        start = table_offset + index
+        end = self._map.find(b"\0", start)
+        return self._map[start:end if end >= 0 else len(self._map)].decode("utf-8", errors="replace")
+
+    def section(self, name: str) -> Optional[ElfSection]:
+        return next((section for section in self.sections if section.name == name), None)
+
+    def symbols(self, types: Optional[List[int]] = None) -> Iterator[ElfSymbol]:
+        """
+        Streams the defined symbols of .symtab with a non zero size, only the ones of 'types' when given
+        (e.g. [STT_FUNC, STT_OBJECT]). The names of the other symbols are not even decoded.
+        """
+        symbol_table = next((section for section in self.sections if section.type == SHT_SYMTAB), None)
+        if symbol_table is None:
+            return
+        names = self._linked_section(symbol_table)
+        if names.offset + names.size > len(self._map):
+            raise ValueError(f"'{self.path}' has a truncated string table")
+        # Copied once, symbol names are then sliced out of it without going through the map
+        names_table = self._map[names.offset:names.offset + names.size]
+        entry = struct.Struct(self.byte_order + SYMBOL_FORMATS[self.elf_class])
+        end = symbol_table.offset + symbol_table.size - symbol_table.size % entry.size
+        if end > len(self._map):
+            raise ValueError(f"'{self.path}' has a truncated symbol table")
+        wanted = set(types) if types is not None else None
+        is_32 = self.elf_class == ELF_CLASS_32
+        for fields in entry.iter_unpack(self._map[symbol_table.offset:end]):
+            if is_32:
+                name, address, size, info, _other, section_index = fields
+            else:
+                name, info, _other, section_index, address, size = fields
+            if size == 0 or section_index == 0 or section_index >= SHN_LORESERVE:
+                continue
+            if wanted is not None and info & 0xF not in wanted:
+                continue
+            name_end = names_table.find(b"\0", name)
+            yield ElfSymbol(names_table[name:name_end if name_end >= 0 else None].decode("utf-8", errors="replace"), info & 0xF, address, size, section_index)
+
+    def _linked_section(self, section: ElfSection) -> ElfSection:
+        # The linked section of a symbol table is its string table
+        index = self._links[self.sections.index(section)]
+        if index >= len(self.sections):
+            raise ValueError(f"'{self.path}' has no string table for {section.name}")
+        return self.sections[index]
+
+    def load_address(self, section: ElfSection) -> int:
+        """
+        Address the section is loaded from (LMA), e.g. in flash for .data, which runs from RAM at its own address.
+        """
+        if not section.has_contents:
+            return section.address
+        for segment in self.segments:
+            if segment.type == PT_LOAD and segment.offset <= section.offset < segment.offset + segment.file_size:
+                return section.address - segment.virtual_address + segment.physical_address
+        return section.address
+
+## Example usage
+#with ElfFile('cortex-m7/target/thumbv7em-none-eabihf/release/cortex-m7') as elf:
+#    for section in elf.sections:
+#        if section.allocated:
+#            print(section.name, hex(section.address), hex(elf.load_address(section)), section.size)
@@ -0,0 +1,193 @@
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+from .tracing import get_logger, fields
+
+logger = get_logger("file_watcher")
+
+# inotify(7) flags and events
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_DELETE = 0x200
+# Sent when a watch is removed, also by the kernel once the watched directory is gone
+IN_IGNORED = 0x8000
+# Editors either rewrite a file in place or write a copy and rename it over the file, the
+# directory of every watched file is watched for both
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+EVENT_BUFFER_SIZE = 64 * 1024
+DEFAULT_POLL_INTERVAL = 0.05
+# Events keep being collected until none came for this long, a save often takes several of them
+DEFAULT_SETTLE_TIME = 0.01
+
+
+class PollingWatcher:
+    """
+    Detects changes by comparing the modification time, size and inode of every watched file every 'interval' seconds.
+    """
+
+    def __init__(self, paths: List[str], interval: Optional[float] = DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._stats: Dict[str, Optional[tuple]] = {}
+        self.watch(paths)
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def watch(self, paths: List[str]) -> None:
+        previous = self._stats
+        self._stats = {path: previous[path] if path in previous else self._stat(path) for path in map(os.path.abspath, paths)}
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Blocks until some of the watched files changed or 'timeout' seconds passed.
+
+        Returns:
+        - set: The absolute paths of the files that changed, empty on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = {path: self._stat(path) for path in self._stats}
+            changed = {path for path, stat in stats.items() if stat != self._stats[path]}
+            self._stats = stats
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Same interface as PollingWatcher, woken up by the kernel through inotify(7) instead of polling.
+    The files of a directory that cannot be watched any more, e.g. removed since, are polled every
+    'interval' seconds instead, until a later watch call can watch it again.
+
+    Raises OSError when inotify is not available or the directories of 'paths' cannot be watched.
+    """
+
+    def __init__(
+        self, paths: List[str], settle_time: Optional[float] = DEFAULT_SETTLE_TIME, interval: Optional[float] = DEFAULT_POLL_INTERVAL
+    ):
+        self.settle_time = settle_time
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch descriptor to the directory it watches
+        self._directories: Dict[int, str] = {}
+        self._paths: Set[str] = set()
+        # Files whose directory could not be watched
+        self._polled: Set[str] = set()
+        self._polling = PollingWatcher([], interval)
+        try:
+            errors = self._update_watches(paths)
+            if errors:
+                raise errors[0]
+        except OSError:
+            self.close()
+            raise
+
+    def watch(self, paths: List[str]) -> None:
+        for error in self._update_watches(paths):
+            logger.warning(f"Polling the files of an unwatched directory: {error}", extra=fields(interval=self._polling.interval))
+
+    def _update_watches(self, paths: List[str]) -> List[OSError]:
+        self._paths = set(map(os.path.abspath, paths))
+        directories = {os.path.dirname(path) for path in self._paths}
+        for descriptor, directory in list(self._directories.items()):
+            if directory not in directories:
+                self._libc.inotify_rm_watch(self._fd, descriptor)
+                del self._directories[descriptor]
+        errors = []
+        for directory in directories - set(self._directories.values()):
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if descriptor < 0:
+                errors.append(OSError(ctypes.get_errno(), f"Unable to watch '{directory}'"))
+                continue
+            self._directories[descriptor] = directory
+        watched = set(self._directories.values())
+        self._polled = {path for path in self._paths if os.path.dirname(path) not in watched}
+        self._polling.watch(list(self._polled))
+        return errors
+
+    def _read_events(self) -> Set[str]:
+        try:
+            data = os.read(self._fd, EVENT_BUFFER_SIZE)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_IGNORED:
+                # The directory is gone, so are its files: the next watch call polls them until it is back
+                directory = self._directories.pop(descriptor, None)
+                changed |= {path for path in self._paths if os.path.dirname(path) == directory}
+                continue
+            directory = self._directories.get(descriptor)
+            if directory is not None and name:
+                path = os.path.join(directory, os.fsdecode(name))
+                if path in self._paths:
+                    changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[str] = set()
+        while not changed:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if self._polled:
+                remaining = self._polling.interval if remaining is None else min(remaining, self._polling.interval)
+            if select.select([self._fd], [], [], remaining)[0]:
+                # Other files of the watched directories wake the loop up too
+                changed |= self._read_events()
+            if self._polled:
+                changed |= self._polling.wait(0)
+            if not changed and deadline is not None and time.monotonic() >= deadline:
+                return changed
+        while select.select([self._fd], [], [], self.settle_time)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def file_watcher(paths: List[str], polling: Optional[bool] = False, interval: Optional[float] = DEFAULT_POLL_INTERVAL):
+    """
+    Returns an InotifyWatcher for 'paths', or a PollingWatcher when polling is asked for or inotify
+    is not available (e.g. outside of Linux, or when the watch limit is reached).
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths, interval=interval)
+        except OSError as e:
+            logger.warning(f"Falling back to polling the config files: {e}", extra=fields(interval=interval))
+    return PollingWatcher(paths, interval)
+
+## Example usage
+#watcher = file_watcher(['config.json', 'bases/stm32h7.yaml'])
+#while True:
+#    print(watcher.wait())
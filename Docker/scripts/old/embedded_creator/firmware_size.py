@@ -0,0 +1,174 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .constants import SIZE_WARNING_THRESHOLD
+from .elf_file import ElfFile
+from .memory_map import MemoryMap, MemoryRegion, core_memory_regions
+from .project_types import ProjectConfig
+from .utils import normalize_string
+
+OK = "ok"
+WARNING = "warning"
+OVERFLOW = "overflow"
+
+
+@dataclass
+class RegionUsage:
+    region: MemoryRegion
+    used: int = 0
+    sections: List[str] = field(default_factory=list)
+
+    @property
+    def ratio(self) -> float:
+        return self.used / self.region.length if self.region.length else float(self.used > 0)
+
+    def status(self, threshold: Optional[float] = SIZE_WARNING_THRESHOLD) -> str:
+        if self.used > self.region.length:
+            return OVERFLOW
+        return WARNING if self.ratio >= threshold else OK
+
+    def serialize(self, threshold: Optional[float] = SIZE_WARNING_THRESHOLD) -> dict:
+        return {
+            "region": self.region.name,
+            "origin": self.region.origin,
+            "length": self.region.length,
+            "used": self.used,
+            "ratio": round(self.ratio, 4),
+            "status": self.status(threshold),
+            "sections": self.sections,
+        }
+
+
+@dataclass
+class CoreSize:
+    core: str
+    elf_path: Optional[str]
+    regions: List[RegionUsage] = field(default_factory=list)
+    # Allocated sections whose address is in none of the configured regions
+    unplaced: List[str] = field(default_factory=list)
+
+    def passed(self, threshold: Optional[float] = SIZE_WARNING_THRESHOLD) -> bool:
+        return self.elf_path is not None and not self.unplaced and all(usage.status(threshold) == OK for usage in self.regions)
+
+    def serialize(self, threshold: Optional[float] = SIZE_WARNING_THRESHOLD) -> dict:
+        return {
+            "core": self.core,
+            "elf": self.elf_path,
+            "passed": self.passed(threshold),
+            "regions": [usage.serialize(threshold) for usage in self.regions],
+            "unplaced": self.unplaced,
+        }
+
+
+def region_usage(elf: ElfFile, regions: List[MemoryRegion]) -> Tuple[List[RegionUsage], List[str]]:
+    """
+    Adds up the allocated sections of an ELF file per memory region. A section with contents that is
+    loaded from another address than the one it runs at (e.g. .data) takes room in both regions.
+
+    Args:
+    - elf (ElfFile): The firmware.
+    - regions (list): Memory regions of the core, as written into memory.x.
+
+    Returns:
+    - tuple: The usage of every region, in the order of 'regions', and the names of the allocated
+      sections that are in none of them.
+    """
+    memory_map = MemoryMap(regions)
+    usages = {region: RegionUsage(region) for region in regions}
+    unplaced = []
+    for section in elf.sections:
+        if not section.allocated or section.size == 0:
+            continue
+        addresses = [section.address]
+        load_address = elf.load_address(section)
+        if load_address != section.address:
+            addresses.append(load_address)
+        for address in addresses:
+            found = memory_map.regions_at(address)
+            if not found:
+                if section.name not in unplaced:
+                    unplaced.append(section.name)
+                continue
+            usage = usages[found[0]]
+            usage.used += section.size
+            usage.sections.append(section.name)
+    return [usages[region] for region in regions], unplaced
+
+
+def core_elf_path(project_path: str, core_name: str, triple: str, profile: Optional[str] = "release") -> Optional[str]:
+    """
+    Returns the firmware of a core built in its own directory or in the workspace of the project, the
+    most recent one when both exist, None when it has not been built.
+    """
+    candidates = [
+        os.path.join(project_path, core_name, "target", triple, profile, core_name),
+        os.path.join(project_path, "target", triple, profile, core_name),
+    ]
+    built = [path for path in candidates if os.path.isfile(path)]
+    return max(built, key=os.path.getmtime) if built else None
+
+
+def project_sizes(
+    project_path: str,
+    project_config: ProjectConfig,
+    profile: Optional[str] = "release",
+    elf_paths: Optional[Dict[str, str]] = None,
+) -> List[CoreSize]:
+    """
+    Measures the firmware of every core of a generated project against the memory regions of its config.
+
+    Args:
+    - project_path (str): Root of the generated project.
+    - project_config (ProjectConfig): The config the project was generated from.
+    - profile (str): Cargo profile directory the firmware is looked for in.
+    - elf_paths (dict): Core name to firmware path, overriding the lookup in target/.
+
+    Returns:
+    - list: One CoreSize per core, in config order, without regions when the firmware is missing.
+    """
+    sizes = []
+    for index, config in enumerate(project_config.config):
+        core_name = normalize_string(input_str=config.core, chars_to_normalize=[":", "_"], normalizer="-")
+        elf_path = (elf_paths or {}).get(core_name) or core_elf_path(
+            project_path, core_name, project_config.core_arch(config), profile
+        )
+        if elf_path is None:
+            sizes.append(CoreSize(core_name, None))
+            continue
+        with ElfFile(elf_path) as elf:
+            usages, unplaced = region_usage(elf, core_memory_regions(config, index))
+        sizes.append(CoreSize(core_name, elf_path, usages, unplaced))
+    return sizes
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return str(size)
+    for unit in ["K", "M", "G"]:
+        size /= 1024
+        if size < 1024 or unit == "G":
+            return f"{size:.1f}{unit}"
+
+
+def render_sizes(sizes: List[CoreSize], threshold: Optional[float] = SIZE_WARNING_THRESHOLD) -> str:
+    lines = []
+    for core_size in sizes:
+        if core_size.elf_path is None:
+            lines.append(f"{core_size.core}: not built\n")
+            continue
+        lines.append(f"{core_size.core}: {core_size.elf_path}\n")
+        for usage in core_size.regions:
+            status = usage.status(threshold)
+            marker = {OK: "", WARNING: "  nearly full", OVERFLOW: "  OVERFLOW"}[status]
+            lines.append(
+                f"  {usage.region.name:<12} {format_size(usage.used):>8} / {usage.region.length_text:>6} {usage.ratio * 100:6.1f}%{marker}\n"
+            )
+        if core_size.unplaced:
+            lines.append(f"  outside of every region: {', '.join(core_size.unplaced)}\n")
+    return "".join(lines)
+
+## Example usage
+#project_config = load_config_from_json('config.json')
+#sizes = project_sizes('/path/to/project', project_config)
+#print(render_sizes(sizes))
@@ -0,0 +1,123 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# A matcher returns something truthy (e.g. a re.Match) when the line matches
+Matcher = Callable[[str], Any]
+# An action returns the new line, None to drop the line, or a list of lines to emit in its place
+Action = Callable[[str, Any, Dict[str, Any]], Union[str, None, List[str]]]
+
+
+def contains(text: str) -> Matcher:
+    return lambda line: text in line
+
+
+def startswith(text: str) -> Matcher:
+    return lambda line: line.startswith(text)
+
+
+def regex(pattern: str, flags: Optional[int] = 0) -> Matcher:
+    return re.compile(pattern, flags).search
+
+
+def stripped_in(values: Iterable[str]) -> Matcher:
+    values = frozenset(values)
+    return lambda line: line.strip() in values
+
+
+def all_of(*matchers: Matcher) -> Matcher:
+    return lambda line: all(matcher(line) for matcher in matchers)
+
+
+def replace_with(new_line: str) -> Action:
+    return lambda line, match, state: new_line
+
+
+def substitute(old: str, new: str) -> Action:
+    return lambda line, match, state: line.replace(old, new)
+
+
+def delete() -> Action:
+    return lambda line, match, state: None
+
+
+@dataclass
+class Rule:
+    match: Matcher
+    action: Action
+    # Only applied to the lines inside this section
+    section: Optional[str] = None
+    # Later rules are skipped for a line this rule matched
+    final: bool = True
+
+
+@dataclass
+class Section:
+    """
+    Block of lines between a start line and an end line, both excluded, e.g. the MEMORY block of memory.x.
+    'on_exit' may return lines emitted just before the end line, or at the end of the file when the
+    section is still open there.
+    """
+
+    name: str
+    start: Matcher
+    end: Matcher
+    on_exit: Optional[Callable[[Dict[str, Any], bool], List[str]]] = None
+    # Called at the end of the file when the section never started
+    on_missing: Optional[Callable[[Dict[str, Any]], List[str]]] = None
+    # A section that ends is not entered again
+    once: bool = False
+
+
+@dataclass
+class LineTransformer:
+    """
+    Declarative line editor: every rule and section is applied in a single streaming pass.
+
+    Each line goes through the rules in order. A matching rule rewrites or drops the line, and
+    unless it is final the next rules see the rewritten line. Lines emitted by an action or by a
+    section exit are not matched again. Matchers are built once, when the rule set is created.
+    """
+
+    rules: List[Rule] = field(default_factory=list)
+    sections: List[Section] = field(default_factory=list)
+
+    def stream(self, lines: Iterable[str]) -> Iterator[str]:
+        state: Dict[str, Any] = {}
+        active = set()
+        seen = set()
+        for line in lines:
+            for section in self.sections:
+                if section.name in active and section.end(line):
+                    active.discard(section.name)
+                    if section.on_exit is not None:
+                        yield from section.on_exit(state, False)
+
+            output: Union[str, None, List[str]] = line
+            for rule in self.rules:
+                if rule.section is not None and rule.section not in active:
+                    continue
+                match = rule.match(output)
+                if not match:
+                    continue
+                output = rule.action(output, match, state)
+                if output is None or isinstance(output, list) or rule.final:
+                    break
+            if isinstance(output, list):
+                yield from output
+            elif output is not None:
+                yield output
+
+            for section in self.sections:
+                if section.name not in active and not (section.once and section.name in seen) and section.start(line):
+                    active.add(section.name)
+                    seen.add(section.name)
+
+        for section in self.sections:
+            if section.name in active and section.on_exit is not None:
+                yield from section.on_exit(state, True)
+            elif section.name not in seen and section.on_missing is not None:
+                yield from section.on_missing(state)
+
+    def apply(self, lines: Iterable[str]) -> List[str]:
+        return list(self.stream(lines))
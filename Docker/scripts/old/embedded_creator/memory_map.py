@@ -0,0 +1,194 @@
+import heapq
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .constants import ADDRESS_SPACE_SIZE, MEMORY_REGION_ALIGNMENT, MEMORY_UNIT_SIZES
+from .project_types import CoreConfig, ProjectConfig
+
+SIZE_PATTERN = re.compile(rf'^([0-9]+)({"|".join(MEMORY_UNIT_SIZES)})?$', re.IGNORECASE)
+
+# Address windows a device actually implements, as (origin, length) pairs
+DeviceRegions = List[Tuple[int, int]]
+
+
+def parse_origin(value: str) -> int:
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        raise ValueError(f"origin must be a hexadecimal address, got: {value}")
+
+
+def parse_size(value: str) -> int:
+    """
+    Converts a memory.x length such as '128K' or '2M' (or a plain number of bytes) to bytes.
+    """
+    match = SIZE_PATTERN.match(value) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError(f"length must be a number followed by one of {', '.join(MEMORY_UNIT_SIZES)} units, got: {value}")
+    count, unit = match.groups()
+    return int(count) * (MEMORY_UNIT_SIZES[unit.upper()] if unit else 1)
+
+
+@dataclass(frozen=True)
+class MemoryRegion:
+    core: str
+    name: str
+    # 'flash', 'ram' or 'extra_sections'
+    section: str
+    path: str
+    origin: int
+    length: int
+    # Spelling of the config, kept so memory.x shows the values as written
+    origin_text: str
+    length_text: str
+
+    @property
+    def end(self) -> int:
+        return self.origin + self.length
+
+    def render(self) -> str:
+        return f"  {self.name} : ORIGIN = {self.origin_text}, LENGTH = {self.length_text}\n"
+
+    def __str__(self) -> str:
+        return f"{self.core} {self.name} [0x{self.origin:08X}, 0x{self.end:08X})"
+
+
+@dataclass
+class MemoryMapIssue:
+    # 'overlap', 'alignment' or 'out-of-device'
+    kind: str
+    message: str
+    regions: List[MemoryRegion]
+
+    @property
+    def path(self) -> str:
+        return self.regions[0].path
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+def _region(core: str, name: str, section: str, path: str, origin: str, length: str) -> MemoryRegion:
+    return MemoryRegion(core, name, section, path, parse_origin(origin), parse_size(length), origin, length)
+
+
+def core_memory_regions(config: CoreConfig, index: Optional[int] = 0) -> List[MemoryRegion]:
+    """
+    Regions of a core in memory.x order: FLASH, RAM, then every extra section.
+    """
+    memory = config.memory
+    path = f"config[{index}].memory"
+    regions = [
+        _region(config.core, "FLASH", "flash", f"{path}.flash", memory.flash[0], memory.flash[1]),
+        _region(config.core, "RAM", "ram", f"{path}.ram", memory.ram[0], memory.ram[1]),
+    ]
+    for section_index, section in enumerate(memory.extra_sections or []):
+        regions.append(
+            _region(
+                config.core,
+                section.memory_type.upper(),
+                "extra_sections",
+                f"{path}.extra_sections[{section_index}]",
+                section.origin,
+                section.length,
+            )
+        )
+    return regions
+
+
+class MemoryMap:
+    """
+    Interval index of the memory regions of every core, sorted by origin.
+
+    All checks work on the sorted regions, so a whole map is checked in O(n log n)
+    (plus the number of overlapping pairs reported) whatever the number of cores.
+    """
+
+    def __init__(self, regions: List[MemoryRegion]):
+        self.regions = sorted(regions, key=lambda region: (region.origin, region.end))
+        self._origins = [region.origin for region in self.regions]
+        # Largest end among the regions up to each index, bounds the backward scan of regions_at
+        self._max_ends = []
+        max_end = 0
+        for region in self.regions:
+            max_end = max(max_end, region.end)
+            self._max_ends.append(max_end)
+
+    @classmethod
+    def from_project_config(cls, project_config: ProjectConfig) -> "MemoryMap":
+        return cls([region for index, config in enumerate(project_config.config) for region in core_memory_regions(config, index)])
+
+    def regions_at(self, address: int) -> List[MemoryRegion]:
+        found = []
+        index = bisect_right(self._origins, address) - 1
+        while index >= 0 and self._max_ends[index] > address:
+            if self.regions[index].end > address:
+                found.append(self.regions[index])
+            index -= 1
+        return found[::-1]
+
+    def overlaps(self) -> List[MemoryMapIssue]:
+        issues = []
+        # Sweep in origin order, keeping the regions still open in a heap keyed by their end
+        active: List[Tuple[int, int, MemoryRegion]] = []
+        for order, region in enumerate(self.regions):
+            while active and active[0][0] <= region.origin:
+                heapq.heappop(active)
+            for _, _, other in sorted(active, key=lambda item: item[1]):
+                start, end = region.origin, min(region.end, other.end)
+                issues.append(
+                    MemoryMapIssue(
+                        "overlap",
+                        f"{other} overlaps {region} on [0x{start:08X}, 0x{end:08X})",
+                        [other, region],
+                    )
+                )
+            if region.length:
+                heapq.heappush(active, (region.end, order, region))
+        return issues
+
+    def misaligned(self, alignment: Optional[int] = MEMORY_REGION_ALIGNMENT) -> List[MemoryMapIssue]:
+        issues = []
+        for region in self.regions:
+            if region.origin % alignment:
+                issues.append(MemoryMapIssue("alignment", f"{region} origin is not aligned to {alignment} bytes", [region]))
+            if region.length % alignment:
+                issues.append(MemoryMapIssue("alignment", f"{region} length is not a multiple of {alignment} bytes", [region]))
+        return issues
+
+    def out_of_device(self, device_regions: Optional[DeviceRegions] = None) -> List[MemoryMapIssue]:
+        """
+        Reports the regions that do not fit inside a single window of 'device_regions'
+        (by default the whole 32-bit address space).
+        """
+        windows = sorted(device_regions or [(0, ADDRESS_SPACE_SIZE)])
+        window_origins = [origin for origin, _ in windows]
+        issues = []
+        for region in self.regions:
+            index = bisect_right(window_origins, region.origin) - 1
+            if index < 0 or region.end > windows[index][0] + windows[index][1]:
+                issues.append(MemoryMapIssue("out-of-device", f"{region} is outside of the device memory", [region]))
+        return issues
+
+    def check(
+        self,
+        alignment: Optional[int] = MEMORY_REGION_ALIGNMENT,
+        device_regions: Optional[DeviceRegions] = None,
+    ) -> List[MemoryMapIssue]:
+        return self.overlaps() + self.misaligned(alignment) + self.out_of_device(device_regions)
+
+
+def validate_memory_map(project_config: ProjectConfig, device_regions: Optional[DeviceRegions] = None) -> MemoryMap:
+    memory_map = MemoryMap.from_project_config(project_config)
+    issues = memory_map.check(device_regions=device_regions)
+    if issues:
+        raise ValueError("Invalid memory map:\n" + "\n".join(f"  {issue}" for issue in issues))
+    return memory_map
+
+## Example usage
+#memory_map = MemoryMap.from_project_config(project_config)
+#for issue in memory_map.check():
+#    print(issue)
+#print(memory_map.regions_at(0x08000000))
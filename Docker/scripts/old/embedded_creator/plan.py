@@ -0,0 +1,123 @@
+import difflib
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .constants import DEFAULT_RENDERER
+from .project_creator import project_creator
+from .project_types import ProjectConfig
+from .staged_tree import StagedTree
+from .template_cache import TemplateCache
+
+CREATE = "create"
+MODIFY = "modify"
+DELETE = "delete"
+
+
+@dataclass
+class FileChange:
+    path: str
+    action: str
+    # Unified diff of text files, None for binary files
+    diff: Optional[str] = None
+
+    def serialize(self) -> dict:
+        return {"path": self.path, "action": self.action, "diff": self.diff}
+
+
+@dataclass
+class ProjectPlan:
+    root: str
+    changes: List[FileChange]
+
+    def summary(self) -> Dict[str, int]:
+        summary = {CREATE: 0, MODIFY: 0, DELETE: 0}
+        for change in self.changes:
+            summary[change.action] += 1
+        return summary
+
+    def serialize(self) -> dict:
+        return {"root": self.root, "summary": self.summary(), "changes": [change.serialize() for change in self.changes]}
+
+    def render_diff(self) -> str:
+        return "".join(change.diff if change.diff is not None else f"Binary files a/{change.path} and b/{change.path} differ\n" for change in self.changes)
+
+
+def _read_disk(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def _unified_diff(relative_path: str, before: Optional[bytes], after: Optional[bytes]) -> Optional[str]:
+    try:
+        before_lines = before.decode("utf-8").splitlines(keepends=True) if before is not None else []
+        after_lines = after.decode("utf-8").splitlines(keepends=True) if after is not None else []
+    except UnicodeDecodeError:
+        return None
+    diff = difflib.unified_diff(
+        before_lines,
+        after_lines,
+        fromfile=f"a/{relative_path}" if before is not None else "/dev/null",
+        tofile=f"b/{relative_path}" if after is not None else "/dev/null",
+    )
+    # A file without a trailing newline would otherwise glue its last line to the next header
+    return "".join(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in diff)
+
+
+def diff_tree(tree: StagedTree) -> List[FileChange]:
+    """
+    Compares a staged tree with the disk, file by file, in path order.
+    """
+    changes = []
+    for relative_path in tree.staged_files():
+        path = os.path.join(tree.root, relative_path)
+        before, after = _read_disk(path), tree.files[path]
+        if before == after:
+            continue
+        changes.append(FileChange(relative_path, CREATE if before is None else MODIFY, _unified_diff(relative_path, before, after)))
+
+    for removed in sorted(tree.removed):
+        paths = [removed] if os.path.isfile(removed) else [
+            os.path.join(root, file_name) for root, _, files in os.walk(removed) for file_name in files
+        ]
+        for path in sorted(paths):
+            relative_path = os.path.relpath(path, tree.root)
+            changes.append(FileChange(relative_path, DELETE, _unified_diff(relative_path, _read_disk(path), None)))
+    return sorted(changes, key=lambda change: change.path)
+
+
+def plan_project(
+    project_name: str,
+    project_config: ProjectConfig,
+    template_cache: TemplateCache,
+    destination: Optional[str] = None,
+    force: Optional[bool] = False,
+    renderer: Optional[str] = DEFAULT_RENDERER,
+) -> ProjectPlan:
+    """
+    Runs the whole generation of a project against an in-memory view of its directory and returns
+    what a real run would change on disk.
+
+    The template is rendered natively from the local store and no rustup target is installed, so no
+    process is spawned; an offline TemplateCache also guarantees that no snapshot is fetched. 'renderer'
+    is the one of the run being planned, the .project-lock records it in the inputs of every core.
+    A template only cargo-generate can render raises UnsupportedTemplateError, it is never spawned.
+    """
+    tree = project_creator(
+        project_name,
+        project_config,
+        template_cache=template_cache,
+        renderer=renderer,
+        destination=destination,
+        dry_run=True,
+        force=force,
+    )
+    return ProjectPlan(tree.root, diff_tree(tree))
+
+## Example usage
+#plan = plan_project('h7', project_config, TemplateCache(offline=True))
+#print(plan.render_diff())
+#print(plan.summary())
@@ -0,0 +1,402 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+from .utils import normalize_string
+
+
+from .constants import (
+    DIRECTORIES,
+    DIRECTORIES_TO_DELETE_FROM_TEMPLATE,
+    SINGLE_CORE_TEMPLATE,
+    DUAL_CORE_TEMPLATE,
+    NATIVE_RENDERER,
+    CARGO_GENERATE_RENDERER,
+    DEFAULT_RENDERER,
+)
+from .project_types import BuildProfile, ProjectConfig, CoreConfig
+from .update_memory import modify_memory_x, update_memory_x_lines
+from .memory_map import MemoryRegion, core_memory_regions
+from .update_openocd_cfg import update_openocd_cfg, update_openocd_cfg_lines
+from .toolchain_state import ToolchainState
+from .delete_files import delete_files_and_directories
+from .update_cargo_toml import update_cargo_toml, update_cargo_toml_lines
+from .create_makefile import core_makefile, project_makefile, workspace_makefile
+from .cargo_workspace import template_profiles, update_member_cargo_toml, update_member_cargo_toml_lines, workspace_cargo_toml
+from .update_build_profile import (
+    update_build_profile,
+    update_profile_lines,
+    update_unstable_lines,
+    workspace_base_profile,
+    workspace_cargo_config,
+    workspace_profile_lines,
+)
+from .create_project_structure import generate_rust_project, create_project_directories
+from .template_cache import TemplateCache
+from .core_cache import CoreCache, core_cache_key
+from .template_renderer import (
+    LineTransform,
+    UnsupportedTemplateError,
+    core_template_values,
+    default_authors,
+    render_template,
+)
+from .staged_tree import StagedTree
+from .project_lock import ProjectLock, core_inputs_hash, update_lock
+from .tracing import TRACER, get_logger, fields, span
+
+logger = get_logger("project_creator")
+
+
+def core_file_transforms(
+    mcu_family: str,
+    config: CoreConfig,
+    core_arch: str,
+    debugger_option: str,
+    regions: Optional[List[MemoryRegion]] = None,
+    workspace: Optional[bool] = False,
+    profile: Optional[BuildProfile] = None,
+) -> Dict[str, LineTransform]:
+    # Same edits as modify_memory_x, update_openocd_cfg, update_cargo_toml and update_build_profile, applied to in-memory lines
+    transforms = {
+        "memory.x": partial(
+            update_memory_x_lines, mcu_family=mcu_family, config=config, regions=regions
+        ),
+        "openocd.cfg": partial(
+            update_openocd_cfg_lines,
+            header=f"Configuration for {mcu_family}",
+            interface_cfg=config.openocd_cfg.interface,
+            target_cfg=config.openocd_cfg.target,
+        ),
+        os.path.join(".cargo", "config.toml"): partial(
+            update_cargo_toml_lines,
+            arch=core_arch,
+            mcu_family=mcu_family,
+            debugger_option=debugger_option,
+        ),
+    }
+    if workspace:
+        # The profile of a member is set in the workspace root
+        transforms["Cargo.toml"] = update_member_cargo_toml_lines
+    elif profile is not None:
+        cargo_config = transforms[os.path.join(".cargo", "config.toml")]
+        transforms[os.path.join(".cargo", "config.toml")] = lambda lines: update_unstable_lines(cargo_config(lines), profile)
+        transforms["Cargo.toml"] = partial(update_profile_lines, profile=profile)
+    return transforms
+
+
+def core_transform_inputs(project_config: ProjectConfig, config: CoreConfig, regions: List[MemoryRegion]) -> Dict[str, Any]:
+    """
+    Everything core_file_transforms builds the transform of each file from, keyed like its result,
+    so that a config change can be narrowed down to the files it affects. Keep both in step.
+    """
+    workspace = bool(project_config.workspace)
+    profile = None if workspace else project_config.core_profile(config)
+    settings = profile.resolved().settings() if profile is not None else None
+    return {
+        "memory.x": [project_config.mcu_family, regions],
+        "openocd.cfg": [project_config.mcu_family, config.openocd_cfg],
+        os.path.join(".cargo", "config.toml"): [
+            project_config.core_arch(config),
+            project_config.mcu_family,
+            project_config.core_debugger_option(config),
+            settings,
+        ],
+        "Cargo.toml": [workspace, settings],
+    }
+
+
+def project_template_name(project_config: ProjectConfig) -> str:
+    return SINGLE_CORE_TEMPLATE if len(project_config.config) == 1 else DUAL_CORE_TEMPLATE
+
+
+def template_entry(template_cache: TemplateCache, template_name: str, template_path: Optional[str] = None) -> Dict[str, str]:
+    # Identity of the template in the core inputs of the .project-lock, the digest first since it
+    # fetches the snapshot the revision resolves to when it is not in the store yet
+    digest = template_cache.template_digest(template_name, template_path)
+    return {
+        "name": template_name,
+        "revision": template_cache.revision,
+        "commit": template_cache.commit,
+        "digest": digest,
+    }
+
+
+def core_directory_name(config: CoreConfig) -> str:
+    return normalize_string(input_str=config.core, chars_to_normalize=[":", "_"], normalizer="-")
+
+
+def generate_core(
+    project_path: str,
+    project_config: ProjectConfig,
+    config: CoreConfig,
+    template_path: Optional[str],
+    renderer: str,
+    tree: StagedTree,
+    regions: Optional[List[MemoryRegion]] = None,
+    dry_run: Optional[bool] = False,
+) -> str:
+    """
+    Runs the whole pipeline of a single core: generate, patch memory.x, openocd.cfg and config.toml
+    and write the core Makefile. Cores only share the top level Makefile, which
+    is left to the caller, so this is safe to run concurrently for different cores.
+    Every file is written to 'tree', nothing reaches the project directory before the tree is committed.
+    A dry run renders the template natively whatever the renderer, so that no process is spawned, and
+    raises UnsupportedTemplateError for a template only cargo-generate can render.
+
+    Returns:
+    - str: The normalized core name, which is also the name of the core directory.
+    """
+    normalized_core_name = core_directory_name(config)
+    core_path = os.path.join(project_path, normalized_core_name)
+    regions = regions if regions is not None else core_memory_regions(config)
+    # Every core gets a lane of its own in the trace, whichever worker thread generates it
+    with TRACER.lane(normalized_core_name), span("generate_core", core=normalized_core_name, renderer=renderer):
+        _generate_core_files(
+            project_path, core_path, normalized_core_name, project_config, config, template_path, renderer, tree, regions, dry_run
+        )
+    return normalized_core_name
+
+
+def _generate_core_files(
+    project_path: str,
+    core_path: str,
+    normalized_core_name: str,
+    project_config: ProjectConfig,
+    config: CoreConfig,
+    template_path: Optional[str],
+    renderer: str,
+    tree: StagedTree,
+    regions: List[MemoryRegion],
+    dry_run: bool,
+) -> None:
+    mcu_family = project_config.mcu_family
+    core_arch = project_config.core_arch(config)
+    debugger_option = project_config.core_debugger_option(config)
+    if renderer == NATIVE_RENDERER or dry_run:
+        # Render the template and apply every file edit in a single pass, without spawning cargo-generate
+        try:
+            with span("render_template", core=normalized_core_name):
+                render_template(
+                    template_path=template_path,
+                    destination=project_path,
+                    project_name=normalized_core_name,
+                    values=core_template_values(project_config, config),
+                    transforms=core_file_transforms(
+                        mcu_family,
+                        config,
+                        core_arch,
+                        debugger_option,
+                        regions,
+                        bool(project_config.workspace),
+                        project_config.core_profile(config),
+                    ),
+                    names_to_delete=DIRECTORIES_TO_DELETE_FROM_TEMPLATE,
+                    tree=tree,
+                )
+        except UnsupportedTemplateError as error:
+            # Liquid tags and filters are only implemented by cargo-generate, nothing was staged yet
+            if dry_run:
+                raise UnsupportedTemplateError(f"Template requires cargo-generate; plan unavailable: {error}") from error
+            logger.warning(
+                "Template not supported by the native renderer, using cargo-generate",
+                extra=fields(core=normalized_core_name, reason=str(error)),
+            )
+            renderer = CARGO_GENERATE_RENDERER
+    if renderer != NATIVE_RENDERER and not dry_run:
+        # cargo-generate can only write to disk, let it generate out of place and stage the result
+        with tempfile.TemporaryDirectory() as generation_dir:
+            generate_rust_project(
+                path=generation_dir,
+                project_name=normalized_core_name,
+                template_path=template_path,
+                values=core_template_values(project_config, config),
+            )
+            with span("import_directory", core=normalized_core_name):
+                tree.import_directory(os.path.join(generation_dir, normalized_core_name), core_path)
+        with span("update_files", core=normalized_core_name):
+            modify_memory_x(
+                path=core_path, mcu_family=mcu_family, config=config, file_name="memory.x", tree=tree, regions=regions
+            )
+            update_openocd_cfg(
+                path=core_path,
+                header=f"Configuration for {mcu_family}",
+                interface_cfg=config.openocd_cfg.interface,
+                target_cfg=config.openocd_cfg.target,
+                tree=tree,
+            )
+            delete_files_and_directories(
+                path=core_path, names_to_delete=DIRECTORIES_TO_DELETE_FROM_TEMPLATE, tree=tree
+            )
+
+            update_cargo_toml(
+                path=os.path.join(core_path, ".cargo"),
+                file_name="config.toml",
+                arch=core_arch,
+                mcu_family=mcu_family,
+                debugger_option=debugger_option,
+                tree=tree,
+            )
+            if project_config.workspace:
+                update_member_cargo_toml(core_path, tree=tree)
+            else:
+                update_build_profile(core_path, project_config.core_profile(config), tree=tree)
+    with span("core_makefile", core=normalized_core_name):
+        core_makefile(normalized_core_name if project_config.workspace else None).write(core_path, "Makefile", tree=tree)
+
+
+def ensure_project_targets(toolchain_state: ToolchainState, archs: List[str]) -> List[str]:
+    # Every missing target of the project is installed with one rustup call, none if they are all present
+    with TRACER.lane("toolchain"), span("ensure_targets", targets=",".join(sorted(set(archs)))):
+        return toolchain_state.ensure_targets(archs)
+
+
+def project_creator(
+    project_name: str,
+    project_config: ProjectConfig,
+    template_cache: Optional[TemplateCache] = None,
+    renderer: Optional[str] = DEFAULT_RENDERER,
+    jobs: Optional[int] = None,
+    destination: Optional[str] = None,
+    dry_run: Optional[bool] = False,
+    toolchain_state: Optional[ToolchainState] = None,
+    force: Optional[bool] = False,
+    core_cache: Optional[CoreCache] = None,
+) -> StagedTree:
+    """
+    Creates the project. Every step writes to an in-memory StagedTree which is committed once at the
+    end, so each file is written a single time and a failed run leaves no half written project.
+    With dry_run the tree is returned without being committed and no rustup target is added; the cores
+    are rendered natively, while the .project-lock still records 'renderer' as the one of the real run, and a
+    template only cargo-generate can render raises UnsupportedTemplateError instead of spawning it.
+
+    Re-running on an existing project only regenerates the cores whose inputs changed since the
+    '.project-lock' was written, unless force is set; files that end up identical are not rewritten.
+    With a core_cache, the cores generated before with the same inputs, by any project, are restored
+    from it instead of being generated (force still generates them), and the generated ones are added to it.
+    """
+
+    # Raw variables
+    configs = project_config.config
+    user_defined_directories = project_config.directories
+
+    ###
+    project_dirs = DIRECTORIES + (user_defined_directories or [])
+    # Normalize the project name
+    normalized_project_name = normalize_string(
+        input_str=project_name, chars_to_normalize=[":"], normalizer="_"
+    )
+    # This variable will load the directories that will be created within the root of the project
+    project_path = os.path.join(destination or os.getcwd(), normalized_project_name)
+    tree = StagedTree(project_path)
+
+    # Create a directory named as 'normalized_project_name' in the current location, containing in the root the directories' names passed on respective argument
+    with span("create_project_directories"):
+        create_project_directories(path=project_path, directories=project_dirs, tree=tree)
+    # Resolve the template once, every core is then generated offline from the local store
+    template_path = None
+    template_name = project_template_name(project_config)
+    if template_cache is None:
+        # Without a local store the template can only be cloned by cargo-generate
+        renderer = CARGO_GENERATE_RENDERER
+        template = {"name": template_name, "revision": "remote"}
+    else:
+        with span("resolve_template", template=template_name):
+            template_path = template_cache.template_path(template_name)
+            template = template_entry(template_cache, template_name, template_path)
+
+    # Cores whose inputs match the lock of a previous run are left as they are. Force regenerates them all,
+    # the previous lock is still needed to remove the files no longer generated and keep the edited ones
+    with span("check_lock"):
+        previous_lock = ProjectLock.load(project_path)
+        core_inputs = {
+            core_directory_name(config): core_inputs_hash(project_config, config, renderer, template) for config in configs
+        }
+        current_cores = [
+            core_name
+            for core_name, inputs in core_inputs.items()
+            if not force and previous_lock is not None and previous_lock.is_core_current(project_path, core_name, inputs)
+        ]
+
+    # Memory regions are parsed once for the whole project and each core writes its own into memory.x
+    core_regions = [core_memory_regions(config, index) for index, config in enumerate(configs)]
+    stale_cores = [
+        (config, regions) for config, regions in zip(configs, core_regions) if core_directory_name(config) not in current_cores
+    ]
+    if current_cores:
+        logger.info("Cores up to date, not regenerated", extra=fields(cores=",".join(current_cores)))
+
+    # A dry run only lists the files, it neither reads nor fills the cache
+    cache_keys = {}
+    if core_cache is not None and template_cache is not None and not dry_run:
+        authors = default_authors()
+        cache_keys = {
+            core_directory_name(config): core_cache_key(core_inputs[core_directory_name(config)], authors) for config, _ in stale_cores
+        }
+        if not force:
+            with span("restore_cores"):
+                restored = core_cache.restore(
+                    {os.path.join(project_path, core_name): key for core_name, key in cache_keys.items()}, tree
+                )
+            restored_cores = [os.path.basename(core_path) for core_path in restored]
+            stale_cores = [(config, regions) for config, regions in stale_cores if core_directory_name(config) not in restored_cores]
+            for core_name in restored_cores:
+                del cache_keys[core_name]
+
+    # Cores are independent of each other, generate them concurrently (jobs=1 keeps the serial behaviour).
+    # Installing the rustup targets does not depend on the generated files either, so it overlaps with them;
+    # nothing reaches the disk before both are done.
+    jobs = jobs or max(len(stale_cores), 1)
+    with ThreadPoolExecutor(max_workers=1) as toolchain_executor, ThreadPoolExecutor(max_workers=jobs) as executor:
+        targets = None
+        if not dry_run:
+            toolchain_state = toolchain_state or ToolchainState()
+            targets = toolchain_executor.submit(
+                ensure_project_targets, toolchain_state, [project_config.core_arch(config) for config in configs]
+            )
+        futures = [
+            executor.submit(
+                generate_core, project_path, project_config, config, template_path, renderer, tree, regions, dry_run
+            )
+            for config, regions in stale_cores
+        ]
+        for future in futures:
+            future.result()
+        if targets is not None:
+            targets.result()
+
+    if cache_keys:
+        with span("store_cores", cores=len(cache_keys)):
+            for core_name, key in cache_keys.items():
+                core_cache.store(key, os.path.join(project_path, core_name), tree)
+
+    # Global Makefile, built in memory and written once, in config order whichever cores were regenerated
+    core_names = list(core_inputs)
+    with span("project_makefile"):
+        if project_config.workspace:
+            # The cores are members of a workspace rooted at the project, sharing Cargo.lock and target/
+            core_profiles = {core_directory_name(config): project_config.core_profile(config) for config in configs}
+            profiles = template_profiles(template_path)
+            base_profile = None
+            if any(profile is not None for profile in core_profiles.values()):
+                base_profile = workspace_base_profile(project_config.profile, list(core_profiles.values()))
+                profiles = workspace_profile_lines(profiles, base_profile, core_profiles)
+            # cargo runs from the root, which holds a single runner: the one of the first core
+            cargo_config = workspace_cargo_config(base_profile, project_config.core_debugger_option(configs[0]))
+            tree.write_text(os.path.join(project_path, ".cargo", "config.toml"), cargo_config)
+            workspace_manifest = workspace_cargo_toml(core_names, profiles)
+            tree.write_text(os.path.join(project_path, "Cargo.toml"), workspace_manifest)
+            core_triples = {core_directory_name(config): project_config.core_arch(config) for config in configs}
+            workspace_makefile(core_triples).write(project_path, "Makefile", tree=tree)
+        else:
+            project_makefile(core_names).write(project_path, "Makefile", tree=tree)
+
+    with span("update_lock"):
+        update_lock(tree, previous_lock, template, core_inputs, current_cores)
+
+    if not dry_run:
+        with span("commit", files=len(tree.files)):
+            tree.commit()
+    return tree
+
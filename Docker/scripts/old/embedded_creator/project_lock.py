@@ -0,0 +1,174 @@
+import dataclasses
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .constants import PROJECT_LOCK_FILE
+from .project_types import ProjectConfig, CoreConfig
+from .staged_tree import StagedTree
+from .tracing import get_logger, fields
+
+logger = get_logger("project_lock")
+
+# Bumped whenever the generated output changes for the same inputs, so existing projects get regenerated
+LOCK_VERSION = 2
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def data_hash(data) -> str:
+    return content_hash(json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as file:
+            return content_hash(file.read())
+    except OSError:
+        return None
+
+
+def core_inputs_hash(project_config: ProjectConfig, config: CoreConfig, renderer: str, template: Dict[str, str]) -> str:
+    """
+    Hash of everything the files of a core are generated from.
+    """
+    profile = project_config.core_profile(config)
+    return data_hash(
+        {
+            "version": LOCK_VERSION,
+            # The profile is hashed below once merged with the project one
+            "core": {key: value for key, value in dataclasses.asdict(config).items() if key != "profile"},
+            "mcu_family": project_config.mcu_family,
+            "arch": project_config.core_arch(config),
+            "debugger_option": project_config.core_debugger_option(config),
+            "renderer": renderer,
+            "template": template,
+            # Only present when set, so the locks of existing projects stay valid
+            **({"workspace": True} if project_config.workspace else {}),
+            **({"profile": profile.resolved().settings()} if profile is not None else {}),
+        }
+    )
+
+
+@dataclass
+class CoreLock:
+    inputs: str
+    # Relative path from the project root to content hash
+    files: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ProjectLock:
+    """
+    Content of '.project-lock': the template, the hash of the inputs of every core and of every generated file.
+
+    Paths are relative to the project root. Files generated outside of any core, such as the top
+    level Makefile, are listed under 'files'.
+    """
+
+    template: Dict[str, str]
+    cores: Dict[str, CoreLock] = field(default_factory=dict)
+    files: Dict[str, str] = field(default_factory=dict)
+    version: int = LOCK_VERSION
+
+    def serialize(self) -> dict:
+        return dataclasses.asdict(self)
+
+    def render(self) -> str:
+        return json.dumps(self.serialize(), indent=2, sort_keys=True) + "\n"
+
+    @classmethod
+    def load(cls, project_path: str) -> Optional["ProjectLock"]:
+        lock_path = os.path.join(project_path, PROJECT_LOCK_FILE)
+        try:
+            with open(lock_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != LOCK_VERSION:
+            return None
+        cores = {name: CoreLock(**core) for name, core in data.get("cores", {}).items()}
+        # Locks written before the config hash was dropped still hold it, it is ignored
+        return cls(data["template"], cores, data.get("files", {}))
+
+    def all_files(self) -> Dict[str, str]:
+        files = dict(self.files)
+        for core in self.cores.values():
+            files.update(core.files)
+        return files
+
+    def is_core_current(self, project_path: str, core_name: str, inputs: str) -> bool:
+        """
+        A core is current when its inputs did not change and its generated files are on disk as they were
+        generated. A core with an edited file is therefore regenerated, update_lock keeps the edited file.
+        """
+        core = self.cores.get(core_name)
+        if core is None or core.inputs != inputs:
+            return False
+        return all(
+            file_hash(os.path.join(project_path, relative_path)) == expected_hash
+            for relative_path, expected_hash in core.files.items()
+        )
+
+
+def update_lock(
+    tree: StagedTree,
+    previous: Optional[ProjectLock],
+    template: Dict[str, str],
+    core_inputs: Dict[str, str],
+    current_cores: List[str],
+    partial: Optional[bool] = False,
+) -> ProjectLock:
+    """
+    Reconciles the staged tree with the previous lock and stages the new '.project-lock'.
+
+    - Files edited since they were generated (their hash on disk no longer matches the lock) are kept as is.
+    - Files the previous run generated and this one does not are removed, unless they were edited.
+    - Cores listed in 'current_cores' were not regenerated, their entries are carried over.
+    - With partial, only some files of the other cores were regenerated (e.g. by the watch mode): the
+      entries of the files that were not are carried over as well and nothing is removed.
+    """
+    lock = ProjectLock(template)
+    previous_files = previous.all_files() if previous is not None else {}
+    for core_name in current_cores:
+        lock.cores[core_name] = previous.cores[core_name]
+    if partial and previous is not None:
+        lock.files = dict(previous.files)
+        for core_name, inputs in core_inputs.items():
+            if core_name in previous.cores:
+                lock.cores.setdefault(core_name, CoreLock(inputs, dict(previous.cores[core_name].files)))
+    for core_name, inputs in core_inputs.items():
+        lock.cores.setdefault(core_name, CoreLock(inputs))
+
+    for relative_path in tree.staged_files():
+        if relative_path == PROJECT_LOCK_FILE:
+            continue
+        path = os.path.join(tree.root, relative_path)
+        core_name = relative_path.split(os.sep, 1)[0]
+        files = lock.cores[core_name].files if core_name in core_inputs and os.sep in relative_path else lock.files
+        files[relative_path] = content_hash(tree.read_bytes(path))
+        if relative_path in previous_files and os.path.isfile(path) and file_hash(path) != previous_files[relative_path]:
+            logger.warning(f"Keeping {relative_path}, it was modified since it was generated.", extra=fields(path=relative_path))
+            tree.discard(path)
+
+    generated = lock.all_files()
+    for relative_path, previous_hash in sorted(previous_files.items()):
+        path = os.path.join(tree.root, relative_path)
+        if partial or relative_path in generated or not os.path.isfile(path):
+            continue
+        if file_hash(path) == previous_hash:
+            tree.remove(path)
+        else:
+            logger.warning(f"Keeping {relative_path}, it is no longer generated but was modified.", extra=fields(path=relative_path))
+
+    tree.write_text(os.path.join(tree.root, PROJECT_LOCK_FILE), lock.render())
+    return lock
+
+## Example usage
+#lock = ProjectLock.load('/path/to/project')
+#if lock is not None:
+#    print(lock.template, sorted(lock.cores))
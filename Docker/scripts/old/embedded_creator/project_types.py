@@ -0,0 +1,317 @@
+
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from typing import Union, List, Dict, Optional, Any, TypeVar, Callable, Tuple
+from .constants import (
+    DIRECTORIES,
+    MEMORY_UNITS,
+    MEMORY_UNIT_SIZES,
+    MEMORY_SIZE_GRANULARITY,
+    MEMORY_DIGITS_RANGE,
+    DEFAULT_DEBUGGER_CONFIGURATION,
+    OPT_LEVELS,
+    LTO_OPTIONS,
+    DEBUG_OPTIONS,
+    PANIC_STRATEGIES,
+    BUILD_STD_CRATES,
+    BUILD_PROFILE_PRESETS,
+    WORKSPACE_PROFILE_FIELDS,
+)
+import re
+
+T = TypeVar('T')
+
+def validate_list_elements(field: List[Any], element_type: T, field_name: str, custom_validator: Callable[[Any, str], None] = None, to_each: Optional[bool] = False):
+    """
+    Validates that the field is a list and that each element in the list is of the specified element type.
+    Optionally applies a custom validation function to each element.
+
+    :param field: The list to validate.
+    :param element_type: The expected type of each element in the list.
+    :param field_name: The name of the field (used for error messages).
+    :param custom_validator: An optional callable that applies additional validation to each element.
+    """
+    if not isinstance(field, list):
+        raise ValueError(f"Field {field_name} must be a list, got {type(field).__name__}")
+
+    for item in field:
+        if not isinstance(item, element_type):
+            raise ValueError(f"Each item in field {field_name} must be of type {element_type.__name__}, got {type(item).__name__}")
+        
+        if custom_validator and to_each:
+            custom_validator(item, field_name)
+
+    if custom_validator:
+        custom_validator(field, field_name)
+
+
+def validate_non_empty(value: Any, field_name: str) -> None:
+    # Check for None
+    if value is None:
+        raise ValueError(f"{field_name} key not set or is empty. Got: None")
+    # Check for empty string or list directly
+    if isinstance(value, (str, list)) and len(value) == 0:
+        raise ValueError(f"{field_name} key not set or is empty. Got: {value}")
+
+def validate_field_type(field: Any, field_type: Any, field_name: str) -> None:
+      # Check if the field is of the expected base type (e.g., list, dict, custom class, etc.)
+    if not isinstance(field, field_type):
+        raise ValueError(f"Field {field_name} must be of type {field_type.__name__}, got {type(field).__name__}")
+
+
+@lru_cache(maxsize=None)
+def hexadecimal_pattern(lower: int, upper: int) -> re.Pattern:
+    # Compiled once per digits range instead of on every validation
+    return re.compile(rf'^0x[0-9A-Fa-f]{{{lower},{upper}}}$')
+
+
+@lru_cache(maxsize=None)
+def memory_size_pattern(memory_units: Tuple[str, ...]) -> re.Pattern:
+    # Matches a number of bytes multiple of MEMORY_SIZE_GRANULARITY, case-insensitive: any count of a unit
+    # at least that large (e.g. 1M), an even count of a smaller one (e.g. 2K but not 1K)
+    sizes = [
+        rf'[0-9]+{unit}' if MEMORY_UNIT_SIZES[unit.upper()] % MEMORY_SIZE_GRANULARITY == 0 else rf'[0-9]*[02468]{unit}'
+        for unit in memory_units
+    ]
+    return re.compile(rf'^(?:{"|".join(sizes)})$', re.IGNORECASE)
+
+
+def validate_hexadecimal(value: str, field_name: str, digits_range: Optional[Dict[str, int]] = MEMORY_DIGITS_RANGE) -> None:
+    lower = digits_range.get("lower", 8)
+    upper = digits_range.get("upper", 8)
+    
+    if not hexadecimal_pattern(lower, upper).match(value):
+        raise ValueError(f"{field_name} must be a hexadecimal number with digits between {lower} and {upper}, got: {value}")
+
+
+
+def validate_memory_size(value: str, field_name: str, memory_units : Optional[list[str]] = MEMORY_UNITS) -> None:
+
+    # Validate the format is a number followed by a valid unit, case-insensitive.
+    if not memory_size_pattern(tuple(memory_units)).match(value):
+        raise ValueError(f"{field_name} must be a string representing a memory size multiple of {MEMORY_SIZE_GRANULARITY // 1024}K followed by one of {', '.join(memory_units)} units, got: {value}")
+
+
+
+
+def validate_choice(value: Any, choices: List[Any], field_name: str) -> None:
+    # Compares types too, so True is not taken for 1 nor 1 for True
+    if not any(type(value) is type(choice) and value == choice for choice in choices):
+        raise ValueError(f"{field_name} must be one of {', '.join(map(repr, choices))}, got: {value!r}")
+
+
+def validate_memory_section(section: List[str], section_name: str) -> None:
+    if len(section) != 2:
+        raise ValueError(f"memory section: {section_name} must be exactly a list where the first element is the {section_name} origin and the second element is {section_name} length")
+    validate_hexadecimal(section[0], f"{section_name}[0] (origin)")
+    validate_memory_size(section[1], f"{section_name}[1] (length)")
+
+
+@dataclass
+class OpenOCDCfg:
+    interface: str
+    target: str
+    def __post_init__(self):
+        validate_non_empty(self.interface, "interface")
+        validate_non_empty(self.target, "target")
+        validate_field_type(self.interface, str, "interface")
+        validate_field_type(self.target, str, "target")
+
+@dataclass
+class ExtraMemorySection:
+    memory_type : str
+    origin: str 
+    length: str 
+
+    def __post_init__(self):
+        validate_non_empty(self.memory_type, "memory_type")
+        validate_non_empty(self.origin, "origin")
+        validate_non_empty(self.length, "length")
+        validate_field_type(self.memory_type, str, "memory_type")
+        validate_field_type(self.origin, str, "origin")
+        validate_field_type(self.length, str, "length")
+        validate_hexadecimal(self.origin, "origin")
+        validate_memory_size(self.length, "length")
+
+    def serialize(self) -> dict:
+        return {"memory_type" : self.memory_type, "origin" : self.origin, "length" : self.length}
+
+
+@dataclass
+class MemoryConfig:
+    flash: List[str] 
+    ram: List[str]
+
+    #optionals
+    extra_sections: Optional[List[ExtraMemorySection]] = None
+
+    def __post_init__(self):
+        validate_non_empty(self.flash, "flash")
+        validate_non_empty(self.ram, "ram")
+        validate_list_elements(self.flash, str, "flash", validate_memory_section)
+        validate_list_elements(self.ram, str, "ram", validate_memory_section)
+        if self.extra_sections is not None:
+            validate_list_elements(self.extra_sections, ExtraMemorySection, "extra_sections")
+
+    def serialize(self) -> dict:
+        return {"flash" : self.flash, "ram" : self.ram, "extra_sections" : [extra_section.serialize() for extra_section in self.extra_sections] if self.extra_sections is not None else None}
+
+@dataclass
+class BuildProfile:
+    """
+    Settings of the release profile. Unset fields keep the value of the preset, then of the template.
+    """
+
+    preset: Optional[str] = None
+    opt_level: Optional[Union[int, str]] = None
+    lto: Optional[Union[bool, str]] = None
+    codegen_units: Optional[int] = None
+    debug: Optional[Union[bool, int, str]] = None
+    panic: Optional[str] = None
+    # Nightly only, written to the [unstable] table of .cargo/config.toml
+    build_std: Optional[List[str]] = None
+    build_std_features: Optional[List[str]] = None
+
+    def __post_init__(self) -> None:
+        if self.preset is not None:
+            validate_choice(self.preset, list(BUILD_PROFILE_PRESETS), "profile.preset")
+        if self.opt_level is not None:
+            validate_choice(self.opt_level, OPT_LEVELS, "profile.opt_level")
+        if self.lto is not None:
+            validate_choice(self.lto, LTO_OPTIONS, "profile.lto")
+        if self.codegen_units is not None:
+            validate_field_type(self.codegen_units, int, "profile.codegen_units")
+            if isinstance(self.codegen_units, bool) or self.codegen_units < 1:
+                raise ValueError(f"profile.codegen_units must be a positive integer, got: {self.codegen_units!r}")
+        if self.debug is not None:
+            validate_choice(self.debug, DEBUG_OPTIONS, "profile.debug")
+        if self.panic is not None:
+            validate_choice(self.panic, PANIC_STRATEGIES, "profile.panic")
+        if self.build_std is not None:
+            validate_list_elements(self.build_std, str, "profile.build_std")
+            for crate in self.build_std:
+                validate_choice(crate, BUILD_STD_CRATES, "profile.build_std")
+        if self.build_std_features is not None:
+            validate_list_elements(self.build_std_features, str, "profile.build_std_features")
+
+    def settings(self) -> Dict[str, Any]:
+        return {profile_field.name: getattr(self, profile_field.name) for profile_field in fields(self) if getattr(self, profile_field.name) is not None}
+
+    def merged(self, override: Optional["BuildProfile"]) -> "BuildProfile":
+        """
+        Returns this profile with every field set in 'override' replaced.
+        """
+        return replace(self, **override.settings()) if override is not None else self
+
+    def resolved(self) -> "BuildProfile":
+        """
+        Expands the preset: its values apply wherever the profile leaves a field unset.
+        """
+        if self.preset is None:
+            return self
+        return BuildProfile(**BUILD_PROFILE_PRESETS[self.preset]).merged(self)
+
+    def serialize(self) -> dict:
+        return self.settings()
+
+
+@dataclass
+class CoreConfig:
+    core: str
+    arch: str
+    memory: MemoryConfig
+    openocd_cfg: OpenOCDCfg
+
+    ###
+    debug_configuration: Optional[str] = None
+    # Overrides the project profile key by key
+    profile: Optional[BuildProfile] = None
+
+    def __post_init__(self)-> None:
+        validate_non_empty(self.core, "core")
+        validate_non_empty(self.arch, "arch")
+        validate_non_empty(self.memory, "memory")
+        validate_non_empty(self.openocd_cfg, "openocd_cfg")
+        validate_field_type(self.core, str, "core")
+        validate_field_type(self.arch, str, "arch")
+        validate_field_type(self.memory, MemoryConfig, "memory")
+        validate_field_type(self.openocd_cfg, OpenOCDCfg, "openocd_cfg")
+        if self.debug_configuration:
+            validate_non_empty(self.debug_configuration, "debug_configuration")
+            validate_field_type(self.debug_configuration, str, "debug_configuration")
+        if self.profile is not None:
+            validate_field_type(self.profile, BuildProfile, "profile")
+
+
+    def serialize(self) -> dict:
+        return {"core" : self.core, "arch" : self.arch, "memory" : self.memory.serialize(), "debug_configuration" : self.debug_configuration, "profile" : self.profile.serialize() if self.profile is not None else None }
+
+
+@dataclass
+class ProjectConfig:
+    mcu_family: str
+    config: List[CoreConfig]
+    # Optionals
+    directories: Optional[List[str]] = None 
+    arch: Optional[str] = None
+    debug_configuration: Optional[str] = None
+    # Catalog part number the config was expanded from
+    mcu: Optional[str] = None
+    # Cores are members of a Cargo workspace at the project root
+    workspace: Optional[bool] = None
+    profile: Optional[BuildProfile] = None
+
+    def __post_init__(self)-> None:
+        validate_non_empty(self.mcu_family, "mcu_family")
+        validate_non_empty(self.config, "config")
+        validate_field_type(self.mcu_family, str, "mcu_family")
+        validate_list_elements(self.config, CoreConfig, "config")
+        if self.directories:
+            validate_non_empty(self.directories, "directories")
+            validate_list_elements(self.directories, str, "directories")
+        if self.arch:
+            validate_non_empty(self.arch, "arch")
+            validate_field_type(self.arch, str, "arch")
+        if self.debug_configuration:
+            validate_non_empty(self.debug_configuration, "debug_configuration")
+            validate_field_type(self.debug_configuration, str, "debug_configuration")
+        if self.mcu:
+            validate_field_type(self.mcu, str, "mcu")
+        if self.workspace is not None:
+            validate_field_type(self.workspace, bool, "workspace")
+        if self.profile is not None:
+            validate_field_type(self.profile, BuildProfile, "profile")
+        if self.workspace:
+            self.validate_workspace_profiles()
+
+    def serialize(self) -> dict:
+        return {"mcu_family": self.mcu_family, "config" : [c.serialize() for c in self.config], "directories" : self.directories, "arch" : self.arch, "debug_configuration" : self.debug_configuration, "mcu" : self.mcu, "workspace" : self.workspace, "profile" : self.profile.serialize() if self.profile is not None else None}
+
+    @property
+    def get(self) -> dict:
+        return self.serialize()
+
+    def core_arch(self, core: CoreConfig) -> str:
+        # A project wide arch overrides the one of each core
+        return self.arch if self.arch is not None else core.arch
+
+    def core_debugger_option(self, core: CoreConfig) -> str:
+        # A project wide debug configuration overrides the one of each core
+        if self.debug_configuration is not None:
+            return self.debug_configuration
+        return core.debug_configuration if core.debug_configuration is not None else DEFAULT_DEBUGGER_CONFIGURATION
+
+    def core_profile(self, core: CoreConfig) -> Optional[BuildProfile]:
+        # Unlike arch, the core profile refines the project one: presets are expanded at each level, core keys win
+        if self.profile is None and core.profile is None:
+            return None
+        project_profile = self.profile.resolved() if self.profile is not None else BuildProfile()
+        return project_profile.merged(core.profile.resolved() if core.profile is not None else None)
+
+    def validate_workspace_profiles(self) -> None:
+        # Only some profile settings can be overridden per package, the other ones must be the same for every core
+        profiles = [self.core_profile(core) or BuildProfile() for core in self.config]
+        for name in WORKSPACE_PROFILE_FIELDS:
+            values = {repr(getattr(profile, name)) for profile in profiles}
+            if len(values) > 1:
+                raise ValueError(f"profile.{name} must be the same for every core of a workspace, got: {', '.join(sorted(values))}")
@@ -0,0 +1,17 @@
+from typing import List, Union
+from .command_runner import CommandError, run_command
+from .constants import NETWORK_COMMAND_TIMEOUT, NETWORK_COMMAND_RETRIES
+from .tracing import get_logger, fields
+
+logger = get_logger("rustup_add_target_arch")
+
+def rustup_add_target_arch(arch: Union[str, List[str]]) -> None:
+    # A single rustup call installs every requested target
+    archs = [arch] if isinstance(arch, str) else list(arch)
+    command = ["rustup", "target", "add"] + archs
+    try:
+        # Downloads the standard library of each target, a network hiccup is retried
+        run_command(command, timeout=NETWORK_COMMAND_TIMEOUT, retries=NETWORK_COMMAND_RETRIES)
+        logger.info("Targets added", extra=fields(targets=",".join(archs)))
+    except CommandError as e:
+        raise RuntimeError(f"Unable to add the targets {', '.join(archs)}: {e}") from e
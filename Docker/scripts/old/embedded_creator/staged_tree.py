@@ -0,0 +1,325 @@
+import errno
+import fcntl
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .constants import PROJECT_LOCK_FILE, REFLINK
+from .tracing import get_logger, fields
+
+logger = get_logger("staged_tree")
+
+# ioctl cloning the content of a file into another one, copy-on-write, see ioctl_ficlone(2)
+FICLONE = 0x40049409
+# Devices of the files a clone was refused for: the next files of the same device are written directly
+_reflink_unsupported = set()
+
+
+class DiskTree:
+    """
+    Direct file system access, with the same interface as StagedTree.
+    """
+
+    def isfile(self, path: str) -> bool:
+        return os.path.isfile(path)
+
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def makedirs(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
+
+    def read_text(self, path: str) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    def write_bytes(self, path: str, content: bytes, mode: Optional[int] = None) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(content)
+        if mode is not None:
+            os.chmod(path, mode)
+
+    def write_text(self, path: str, content: str, mode: Optional[int] = None) -> None:
+        self.write_bytes(path, content.encode("utf-8"), mode)
+
+    def remove(self, path: str) -> None:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+DISK = DiskTree()
+
+
+class StagedTree(DiskTree):
+    """
+    In-memory view of a project directory.
+
+    Every write is kept in memory and reads fall through to disk for files that were not staged, so
+    steps can read-modify-write the same file any number of times. 'commit' then writes each file
+    once: a new project is built in a temporary sibling directory and moved into place with a single
+    os.replace, an existing one gets every changed file written aside first and then swapped in, identical
+    files left untouched. A run that dies before the commit leaves nothing behind, and a commit that
+    fails while writing leaves the existing project as it was. Swapping the files in is one rename per
+    file though, not a single step: a process killed meanwhile leaves an existing project with some
+    files new and some old. The project lock is renamed last so that the next run regenerates them.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.files: Dict[str, bytes] = {}
+        self.modes: Dict[str, int] = {}
+        self.dirs = set()
+        self.removed = set()
+        # Staged files whose content is already on disk, to (source path, materialize method), see link_file
+        self.sources: Dict[str, Tuple[str, str]] = {}
+        # Files found identical on disk by the last commit, and therefore not rewritten
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def _key(self, path: str) -> str:
+        path = os.path.abspath(path)
+        if path != self.root and not path.startswith(self.root + os.sep):
+            raise ValueError(f"Path {path} is outside of the staged tree {self.root}")
+        return path
+
+    def _is_removed(self, key: str) -> bool:
+        return any(key == removed or key.startswith(removed + os.sep) for removed in self.removed)
+
+    def isfile(self, path: str) -> bool:
+        key = self._key(path)
+        with self._lock:
+            if key in self.files:
+                return True
+            return not self._is_removed(key) and os.path.isfile(key)
+
+    def isdir(self, path: str) -> bool:
+        key = self._key(path)
+        with self._lock:
+            if key in self.dirs or any(file.startswith(key + os.sep) for file in self.files):
+                return True
+            return not self._is_removed(key) and os.path.isdir(key)
+
+    def exists(self, path: str) -> bool:
+        return self.isfile(path) or self.isdir(path)
+
+    def makedirs(self, path: str) -> None:
+        key = self._key(path)
+        with self._lock:
+            while key != self.root:
+                self.dirs.add(key)
+                key = os.path.dirname(key)
+
+    def read_bytes(self, path: str) -> bytes:
+        key = self._key(path)
+        with self._lock:
+            if key in self.files:
+                return self.files[key]
+            if self._is_removed(key):
+                raise FileNotFoundError(key)
+        return super().read_bytes(key)
+
+    def write_bytes(self, path: str, content: bytes, mode: Optional[int] = None) -> None:
+        key = self._key(path)
+        self.makedirs(os.path.dirname(key))
+        with self._lock:
+            self.files[key] = content
+            self.sources.pop(key, None)
+            if mode is not None:
+                self.modes[key] = mode
+
+    def link_file(self, path: str, source: str, content: bytes, mode: Optional[int] = None, method: Optional[str] = REFLINK) -> None:
+        """
+        Stages a file whose content is the one of 'source', e.g. in the core cache. The commit creates
+        it as a reflink of 'source' when 'method' says so, and writes 'content' when that fails.
+        """
+        self.write_bytes(path, content, mode)
+        with self._lock:
+            self.sources[self._key(path)] = (source, method)
+
+    def remove(self, path: str) -> None:
+        key = self._key(path)
+        with self._lock:
+            for staged in [file for file in self.files if file == key or file.startswith(key + os.sep)]:
+                del self.files[staged]
+                self.modes.pop(staged, None)
+                self.sources.pop(staged, None)
+            self.dirs = {d for d in self.dirs if d != key and not d.startswith(key + os.sep)}
+            if os.path.exists(key):
+                self.removed.add(key)
+
+    def discard(self, path: str) -> None:
+        """
+        Drops a staged write, leaving whatever is on disk untouched.
+        """
+        key = self._key(path)
+        with self._lock:
+            self.files.pop(key, None)
+            self.modes.pop(key, None)
+            self.sources.pop(key, None)
+
+    def import_directory(self, source: str, path: str) -> None:
+        """
+        Stages a copy of a directory that was produced outside of the tree, e.g. by 'cargo generate'.
+        """
+        for root, dirs, files in os.walk(source):
+            relative_root = os.path.relpath(root, source)
+            self.makedirs(os.path.join(path, relative_root))
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                with open(file_path, "rb") as file:
+                    content = file.read()
+                self.write_bytes(
+                    os.path.join(path, relative_root, file_name), content, os.stat(file_path).st_mode & 0o7777
+                )
+
+    def staged_under(self, path: str) -> Tuple[List[str], Dict[str, Tuple[bytes, Optional[int]]]]:
+        """
+        Returns the directories and the files (content and mode) staged under 'path', relative to it.
+        """
+        key = self._key(path)
+        with self._lock:
+            dirs = sorted(os.path.relpath(d, key) for d in self.dirs if d == key or d.startswith(key + os.sep))
+            files = {
+                os.path.relpath(file, key): (content, self.modes.get(file))
+                for file, content in self.files.items()
+                if file.startswith(key + os.sep)
+            }
+        return dirs, files
+
+    def staged_files(self) -> List[str]:
+        return sorted(os.path.relpath(key, self.root) for key in self.files)
+
+    def commit(self) -> None:
+        if not os.path.exists(self.root):
+            # Build the whole project next to its final location and move it into place in one step
+            parent = os.path.dirname(self.root)
+            os.makedirs(parent, exist_ok=True)
+            staging_dir = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(self.root)}.staging-")
+            try:
+                self._write_all(lambda key: os.path.join(staging_dir, os.path.relpath(key, self.root)))
+                os.chmod(staging_dir, 0o777 & ~UMASK)
+                os.replace(staging_dir, self.root)
+            except BaseException:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+        else:
+            # Every changed file is written aside before the project is touched, so a commit that fails
+            # while writing (e.g. a full disk) leaves the existing files as they were
+            staging_dir = tempfile.mkdtemp(dir=self.root, prefix=".staged-")
+            try:
+                written = self._write_all(lambda key: key, staging_dir)
+                for removed in sorted(self.removed):
+                    if os.path.isdir(removed):
+                        shutil.rmtree(removed)
+                    elif os.path.exists(removed):
+                        os.remove(removed)
+                    self._prune_empty_parents(removed)
+                for directory in sorted(self.dirs):
+                    os.makedirs(directory, exist_ok=True)
+                # The project lock goes in last: a commit interrupted before it leaves the previous lock, whose
+                # hashes no longer match the files already replaced, so the next run regenerates their cores
+                lock_path = os.path.join(self.root, PROJECT_LOCK_FILE)
+                for target, destination in sorted(written, key=lambda pair: pair[1] == lock_path):
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    os.replace(target, destination)
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        logger.info(
+            f"{len(self.files) - self.unchanged} files written to {self.root}, {self.unchanged} unchanged.",
+            extra=fields(written=len(self.files) - self.unchanged, unchanged=self.unchanged),
+        )
+
+    def _prune_empty_parents(self, path: str) -> None:
+        # Directories emptied by a removal go too, unless something is staged in them
+        directory = os.path.dirname(path)
+        while directory != self.root and directory not in self.dirs:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+    def _write_all(self, destination_of, staging_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Writes the staged files to 'destination_of(key)', or with a staging_dir, writes the ones that
+        differ from their destination into it and returns them as (written file, destination) pairs.
+        """
+        default_mode = 0o666 & ~UMASK
+        written = []
+        if staging_dir is None:
+            for directory in sorted(self.dirs):
+                os.makedirs(destination_of(directory), exist_ok=True)
+        for key, content in sorted(self.files.items()):
+            destination = destination_of(key)
+            mode = self.modes.get(key, default_mode)
+            if staging_dir is None:
+                target = destination
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+            elif not self._is_removed(key) and _is_unchanged(destination, content, mode):
+                # Leave identical files alone so their mtime does not trigger a rebuild
+                self.unchanged += 1
+                continue
+            else:
+                descriptor, target = tempfile.mkstemp(dir=staging_dir)
+                os.close(descriptor)
+            source = self.sources.get(key)
+            if source is None:
+                with open(target, "wb") as file:
+                    file.write(content)
+            else:
+                materialize(source[0], target, content, source[1])
+            os.chmod(target, mode)
+            written.append((target, destination))
+        return written
+
+
+def materialize(source: str, target: str, content: bytes, method: str) -> None:
+    """
+    Creates 'target' with the content of 'source': a copy-on-write clone when 'method' is reflink,
+    or a plain write of 'content' where the file system cannot clone (or 'source' is gone).
+    """
+    with open(target, "wb") as file:
+        if method == REFLINK:
+            device = os.fstat(file.fileno()).st_dev
+            if device not in _reflink_unsupported:
+                try:
+                    with open(source, "rb") as source_file:
+                        fcntl.ioctl(file.fileno(), FICLONE, source_file.fileno())
+                    return
+                except OSError as e:
+                    if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV):
+                        _reflink_unsupported.add(device)
+        file.write(content)
+
+
+def _is_unchanged(path: str, content: bytes, mode: int) -> bool:
+    try:
+        stat = os.stat(path)
+        if stat.st_size != len(content) or stat.st_mode & 0o7777 != mode:
+            return False
+        with open(path, "rb") as file:
+            return file.read() == content
+    except OSError:
+        return False
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# os.umask can only be read by changing it for the whole process, which would give the files created by
+# other threads in the meantime (cores are generated on a thread pool) the wrong mode: read it once, at import
+UMASK = _read_umask()
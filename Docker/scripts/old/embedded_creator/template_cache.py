@@ -0,0 +1,324 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .constants import (
+    QUICKSTART_GIT_URL,
+    QUICKSTART_REVISION,
+    CARGO_PROJECT_TEMPLATE_DIR,
+    DEFAULT_TEMPLATE_CACHE_DIR,
+    NETWORK_COMMAND_TIMEOUT,
+    NETWORK_COMMAND_RETRIES,
+)
+from .command_runner import CommandError, run_command
+from .tracing import get_logger, fields
+
+logger = get_logger("template_cache")
+
+COMMIT_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+class TemplateCache:
+    """
+    Local store of cargo-generate templates.
+
+    The cortex-m-quickstart repository is fetched once per revision (or seeded from a local
+    checkout) into '<cache_dir>/<commit>/quickstart'. A branch or a tag is resolved to its commit on
+    that first fetch and 'refs/<revision>' pins it, so the store keeps generating from the same
+    snapshot until it is refreshed; a seed that is not a git checkout is identified by its content.
+    Each template shipped under 'cargo_project_template' is then assembled on top of that snapshot
+    into '<cache_dir>/<commit>/<template_name>', so every later project creation is fully offline.
+    A lock file serializes writers, which lets concurrent runs share the same store. A read only store
+    (e.g. of a dry run) is offline and never writes: a template that is not assembled yet is assembled
+    into a temporary directory of the instance instead.
+    """
+
+    LOCK_FILE = ".lock"
+    STATS_FILE = "stats.json"
+    SNAPSHOT_DIR = "quickstart"
+    REFS_DIR = "refs"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        revision: Optional[str] = QUICKSTART_REVISION,
+        templates_dir: Optional[str] = CARGO_PROJECT_TEMPLATE_DIR,
+        git_url: Optional[str] = QUICKSTART_GIT_URL,
+        offline: Optional[bool] = False,
+        read_only: Optional[bool] = False,
+    ):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_TEMPLATE_CACHE_DIR)
+        self.revision = revision
+        self.templates_dir = os.path.abspath(templates_dir)
+        self.git_url = git_url
+        # An offline store only uses snapshots already fetched, it never runs git
+        self.offline = offline or read_only
+        self.read_only = read_only
+        # Hits and misses of this instance only, the stats file counts those of every run sharing the store
+        self.session_stats = {"hits": 0, "misses": 0}
+        self._scratch_dir: Optional[str] = None
+        self._scratch_lock = threading.Lock()
+        if not read_only:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def commit(self) -> Optional[str]:
+        """
+        Commit of the snapshot the revision resolves to, None until it was fetched.
+        """
+        if COMMIT_PATTERN.match(self.revision):
+            return self.revision
+        try:
+            with open(self._ref_path(), "r") as file:
+                return file.read().strip() or None
+        except OSError:
+            return None
+
+    @property
+    def revision_dir(self) -> str:
+        return os.path.join(self.cache_dir, self.commit or self.revision)
+
+    def _ref_path(self) -> str:
+        # Branch names may contain slashes
+        return os.path.join(self.cache_dir, self.REFS_DIR, self.revision.replace("/", "%2F"))
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.revision_dir, self.SNAPSHOT_DIR)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.cache_dir, self.LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def template_path(self, template_name: str) -> str:
+        """
+        Returns the path of an assembled template, building it on the first request.
+
+        Args:
+        - template_name (str): Name of a template directory under 'cargo_project_template'.
+
+        Returns:
+        - str: Path usable as 'cargo generate --path <path>'.
+        """
+        # Fast path: an assembled template is never modified in place, so no lock is needed to read it
+        if self.commit is not None and os.path.isdir(os.path.join(self.revision_dir, template_name)):
+            self._record("hits")
+            return os.path.join(self.revision_dir, template_name)
+        if self.read_only:
+            return self._scratch_template_path(template_name)
+
+        with self._locked():
+            if self.commit is None or not os.path.isdir(self.snapshot_path):
+                self._fetch_snapshot()
+            path = os.path.join(self.revision_dir, template_name)
+            if os.path.isdir(path):
+                self._record("hits", locked=True)
+                return path
+            self._assemble_template(template_name, path)
+            self._record("misses", locked=True)
+        logger.info("Template cached", extra=fields(template=template_name, path=path))
+        return path
+
+    def template_digest(self, template_name: str, template_path: Optional[str] = None) -> str:
+        """
+        Content hash of an assembled template. Templates are never modified in place, so the hash is
+        computed once and kept next to the template.
+
+        Args:
+        - template_name (str): Name of a template directory under 'cargo_project_template'.
+        - template_path (str): Path already returned by template_path for this lookup, so that it is
+          not resolved (and counted in the stats) a second time.
+        """
+        if template_path is None and self.commit is None:
+            template_path = self.template_path(template_name)
+        digest_path = os.path.join(self.revision_dir, f"{template_name}.sha256")
+        if os.path.isfile(digest_path):
+            with open(digest_path, "r") as file:
+                return file.read().strip()
+        if template_path is None:
+            template_path = self.template_path(template_name)
+        digest = directory_digest(template_path)
+        if self.read_only:
+            return digest
+        temporary_path = f"{digest_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(digest)
+        os.replace(temporary_path, digest_path)
+        return digest
+
+    def refresh(self, seed: Optional[str] = None) -> None:
+        """
+        Replaces the quickstart snapshot of the current revision and drops every template assembled from it.
+
+        Args:
+        - seed (str): Optional local quickstart checkout to copy instead of fetching over the network.
+        """
+        with self._locked():
+            if self.commit is not None and os.path.isdir(self.revision_dir):
+                shutil.rmtree(self.revision_dir)
+            self._fetch_snapshot(seed=seed)
+        logger.info("Template snapshot refreshed", extra=fields(revision=self.revision, commit=self.commit, path=self.snapshot_path))
+
+    def stats(self) -> Dict[str, int]:
+        stats_path = os.path.join(self.cache_dir, self.STATS_FILE)
+        if not os.path.isfile(stats_path):
+            return {"hits": 0, "misses": 0}
+        with open(stats_path, "r") as file:
+            return json.load(file)
+
+    def _record(self, counter: str, locked: Optional[bool] = False) -> None:
+        if self.read_only:
+            self.session_stats[counter] += 1
+            return
+        if not locked:
+            with self._locked():
+                return self._record(counter, locked=True)
+        self.session_stats[counter] += 1
+        stats = self.stats()
+        stats[counter] = stats.get(counter, 0) + 1
+        # stats() reads without the lock, it must never see a partly written file
+        stats_path = os.path.join(self.cache_dir, self.STATS_FILE)
+        temporary_path = f"{stats_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(stats, file)
+        os.replace(temporary_path, stats_path)
+
+    def _fetch_snapshot(self, seed: Optional[str] = None) -> None:
+        if seed is None and self.offline:
+            raise RuntimeError(
+                f"The quickstart snapshot for revision {self.revision} is not cached in {self.cache_dir}, run cache-refresh first"
+            )
+        # Build into a temporary directory first so an interrupted fetch never leaves a partial snapshot behind
+        staging_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".snapshot-")
+        try:
+            if seed is not None:
+                commit = _checkout_commit(seed)
+                shutil.copytree(seed, staging_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".git"))
+                # A seed outside of git is identified by its content, it never stands for a commit
+                commit = commit or f"seed-{directory_digest(staging_dir)[:40]}"
+            else:
+                commands = [
+                    ["git", "init", "--quiet", staging_dir],
+                    ["git", "-C", staging_dir, "fetch", "--quiet", "--depth", "1", self.git_url, self.revision],
+                    ["git", "-C", staging_dir, "checkout", "--quiet", "FETCH_HEAD"],
+                ]
+                for command in commands:
+                    run_command(command, timeout=NETWORK_COMMAND_TIMEOUT, retries=NETWORK_COMMAND_RETRIES)
+                commit = run_command(["git", "-C", staging_dir, "rev-parse", "HEAD"]).stdout.strip()
+                shutil.rmtree(os.path.join(staging_dir, ".git"))
+            if COMMIT_PATTERN.match(self.revision) and commit != self.revision:
+                raise RuntimeError(f"the snapshot is at commit {commit}")
+            snapshot_path = os.path.join(self.cache_dir, commit, self.SNAPSHOT_DIR)
+            if os.path.isdir(snapshot_path):
+                shutil.rmtree(staging_dir)
+            else:
+                os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+                os.replace(staging_dir, snapshot_path)
+        except (RuntimeError, OSError) as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise RuntimeError(f"Unable to populate the template snapshot for revision {self.revision}: {e}") from e
+        if not COMMIT_PATTERN.match(self.revision):
+            # Pins the revision to this commit until the next refresh
+            os.makedirs(os.path.join(self.cache_dir, self.REFS_DIR), exist_ok=True)
+            temporary_path = f"{self._ref_path()}.{os.getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                file.write(commit)
+            os.replace(temporary_path, self._ref_path())
+        logger.info("Template snapshot stored", extra=fields(revision=self.revision, commit=commit))
+
+    def _scratch_template_path(self, template_name: str) -> str:
+        if self.commit is None or not os.path.isdir(self.snapshot_path):
+            # Raises, a read only store is offline
+            self._fetch_snapshot()
+        with self._scratch_lock:
+            if self._scratch_dir is None:
+                self._scratch_dir = tempfile.mkdtemp(prefix="template-cache-")
+                weakref.finalize(self, shutil.rmtree, self._scratch_dir, True)
+            path = os.path.join(self._scratch_dir, template_name)
+            if not os.path.isdir(path):
+                self._assemble_template(template_name, path)
+                self._record("misses")
+        return path
+
+    def _assemble_template(self, template_name: str, path: str) -> None:
+        template_source = os.path.join(self.templates_dir, template_name)
+        if not os.path.isdir(template_source):
+            raise ValueError(f"Template {template_name} does not exist in {self.templates_dir}")
+
+        staging_dir = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=f".{template_name}-")
+        shutil.copytree(self.snapshot_path, staging_dir, dirs_exist_ok=True)
+        # Files shipped under '<template>/template' override the quickstart ones
+        overlay = os.path.join(template_source, "template")
+        if os.path.isdir(overlay):
+            shutil.copytree(overlay, staging_dir, dirs_exist_ok=True)
+        for file_name in ("cargo-generate.toml", "cargo-generate-values.toml"):
+            if os.path.isfile(os.path.join(template_source, file_name)):
+                shutil.copy2(os.path.join(template_source, file_name), staging_dir)
+        os.replace(staging_dir, path)
+
+
+_shared_template_caches: Dict[Tuple[str, bool, bool], TemplateCache] = {}
+_shared_template_caches_lock = threading.Lock()
+
+
+def shared_template_cache(
+    cache_dir: Optional[str] = None, offline: Optional[bool] = False, read_only: Optional[bool] = False
+) -> TemplateCache:
+    """
+    Template store of 'cache_dir', created once per process, so that the runs of a long-lived process
+    (see daemon) share one instance and its counters.
+    """
+    key = (os.path.abspath(cache_dir or DEFAULT_TEMPLATE_CACHE_DIR), bool(offline), bool(read_only))
+    with _shared_template_caches_lock:
+        if key not in _shared_template_caches:
+            _shared_template_caches[key] = TemplateCache(cache_dir=cache_dir, offline=offline, read_only=read_only)
+        return _shared_template_caches[key]
+
+
+def shared_template_caches() -> List[TemplateCache]:
+    with _shared_template_caches_lock:
+        return list(_shared_template_caches.values())
+
+
+def _checkout_commit(path: str) -> Optional[str]:
+    # Commit checked out in a local quickstart clone, None when it is not a git checkout
+    if not os.path.exists(os.path.join(path, ".git")):
+        return None
+    try:
+        commit = run_command(["git", "-C", path, "rev-parse", "HEAD"]).stdout.strip()
+    except CommandError:
+        return None
+    return commit if COMMIT_PATTERN.match(commit) else None
+
+
+def directory_digest(path: str) -> str:
+    """
+    sha256 over the relative path and content of every file of a directory, in a stable order.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+            with open(file_path, "rb") as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+## Example usage
+#cache = TemplateCache(cache_dir='/tmp/templates')
+#cache.refresh(seed='/path/to/cortex-m-quickstart')
+#print(cache.template_path('single_core_template'), cache.stats())
@@ -0,0 +1,330 @@
+import configparser
+import filecmp
+import os
+import re
+import tempfile
+import tomllib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .project_types import ProjectConfig, CoreConfig
+from .staged_tree import DiskTree, DISK
+from .command_runner import run_command
+from .tracing import get_logger, fields
+
+logger = get_logger("template_renderer")
+
+# Liquid output tags as used by the templates, e.g. '{{target_architecture}}' or '{{ project-name }}'
+PLACEHOLDER_PATTERN = re.compile(r"{{\s*([A-Za-z0-9_-]+)\s*}}")
+# Any other Liquid markup: tags ('{% if %}', '{% raw %}') and outputs with filters or expressions ('{{ x | upcase }}')
+LIQUID_MARKUP_PATTERN = re.compile(r"{%|{{(?!\s*[A-Za-z0-9_-]+\s*}})")
+# Files cargo-generate never copies into the generated project
+TEMPLATE_METADATA_FILES = ["cargo-generate.toml", ".git"]
+# Files cargo-generate gives a meaning the native renderer does not implement: ignore patterns and Liquid files
+GENIGNORE_FILE = ".genignore"
+LIQUID_SUFFIX = ".liquid"
+# Tables and keys of 'cargo-generate.toml' the native renderer implements, any other (hooks, conditionals,
+# include/exclude lists...) needs cargo-generate
+SUPPORTED_TEMPLATE_CONFIG = {"template": {"ignore", "cargo_generate_version"}, "placeholders": None}
+
+LineTransform = Callable[[List[str]], List[str]]
+
+
+class UnsupportedTemplateError(ValueError):
+    """
+    Raised when a template uses a feature the native renderer does not implement (Liquid markup other
+    than placeholders, a placeholder without a value, templated paths, .liquid files, .genignore, hooks...);
+    only cargo-generate can render it.
+    """
+
+
+@dataclass
+class TemplateFile:
+    relative_path: str
+    raw: bytes
+    mode: int
+    # Decoded content, None for binary files, which are copied verbatim
+    text: Optional[str]
+
+    @property
+    def placeholders(self) -> List[str]:
+        return sorted(set(PLACEHOLDER_PATTERN.findall(self.text))) if self.text is not None else []
+
+    def check_supported(self) -> None:
+        if "{{" in self.relative_path:
+            raise UnsupportedTemplateError(f"{self.relative_path}: templated paths can only be rendered by cargo-generate")
+        if self.relative_path.endswith(LIQUID_SUFFIX):
+            raise UnsupportedTemplateError(f"{self.relative_path}: {LIQUID_SUFFIX} files can only be rendered by cargo-generate")
+        if self.text is None:
+            return
+        match = LIQUID_MARKUP_PATTERN.search(self.text)
+        if match is not None:
+            line = self.text.count("\n", 0, match.start()) + 1
+            markup = self.text[match.start():].splitlines()[0][:40]
+            raise UnsupportedTemplateError(
+                f"{self.relative_path}:{line}: unsupported Liquid markup '{markup}', only '{{{{ name }}}}' placeholders can be rendered natively"
+            )
+
+
+def core_template_values(project_config: ProjectConfig, config: CoreConfig) -> Dict[str, str]:
+    """
+    Builds the values of the placeholders declared in 'cargo-generate.toml' for a core.
+    """
+    return {
+        "gdb_degugger_option": f"{project_config.core_debugger_option(config)} -q -x openocd.gdb",
+        "target_architecture": project_config.core_arch(config),
+    }
+
+
+def load_template_values(template_path: str) -> Dict[str, str]:
+    """
+    Reads the placeholder defaults from 'cargo-generate.toml' and overrides them with 'cargo-generate-values.toml'.
+    """
+    values = {}
+    placeholders_file = os.path.join(template_path, "cargo-generate.toml")
+    if os.path.isfile(placeholders_file):
+        with open(placeholders_file, "rb") as file:
+            placeholders = tomllib.load(file).get("placeholders", {})
+        for name, placeholder in placeholders.items():
+            if isinstance(placeholder, dict) and "default" in placeholder:
+                values[name] = str(placeholder["default"])
+
+    values_file = os.path.join(template_path, "cargo-generate-values.toml")
+    if os.path.isfile(values_file):
+        with open(values_file, "rb") as file:
+            values.update({name: str(value) for name, value in tomllib.load(file).get("values", {}).items()})
+    return values
+
+
+def load_template_config(template_path: str) -> Dict:
+    """
+    Reads 'cargo-generate.toml', raising UnsupportedTemplateError when it uses a feature the native renderer does not implement.
+    """
+    config_file = os.path.join(template_path, "cargo-generate.toml")
+    if not os.path.isfile(config_file):
+        return {}
+    with open(config_file, "rb") as file:
+        config = tomllib.load(file)
+    for table, value in config.items():
+        if table not in SUPPORTED_TEMPLATE_CONFIG:
+            raise UnsupportedTemplateError(f"cargo-generate.toml: [{table}] is only implemented by cargo-generate")
+        supported_keys = SUPPORTED_TEMPLATE_CONFIG[table]
+        unsupported_keys = sorted(set(value) - supported_keys) if supported_keys is not None else []
+        if unsupported_keys:
+            raise UnsupportedTemplateError(
+                f"cargo-generate.toml: {table}.{unsupported_keys[0]} is only implemented by cargo-generate"
+            )
+    return config
+
+
+def load_ignored_files(template_path: str) -> List[str]:
+    return list(load_template_config(template_path).get("template", {}).get("ignore", []))
+
+
+def default_authors() -> str:
+    """
+    Resolves the 'authors' value the same way cargo-generate does, without spawning git.
+    """
+    env = os.environ
+    name = env.get("CARGO_NAME") or env.get("GIT_AUTHOR_NAME") or env.get("GIT_COMMITTER_NAME")
+    email = env.get("CARGO_EMAIL") or env.get("GIT_AUTHOR_EMAIL") or env.get("GIT_COMMITTER_EMAIL")
+
+    if name is None or email is None:
+        git_config = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            git_config.read(os.path.join(os.path.expanduser("~"), ".gitconfig"))
+        except configparser.Error:
+            pass
+        if git_config.has_section("user"):
+            name = name or git_config["user"].get("name")
+            email = email or git_config["user"].get("email")
+
+    name = name or env.get("USER") or env.get("USERNAME") or ""
+    email = email or env.get("EMAIL")
+    return f"{name} <{email}>" if email else name
+
+
+def render_text(content: str, values: Dict[str, str]) -> str:
+    """
+    Raises UnsupportedTemplateError for a placeholder without a value, which cargo-generate would prompt for.
+    """
+
+    def substitute(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in values:
+            raise UnsupportedTemplateError(f"placeholder '{name}' has no value, only cargo-generate can prompt for it")
+        return values[name]
+
+    return PLACEHOLDER_PATTERN.sub(substitute, content)
+
+
+def check_placeholders(template_files: List[TemplateFile], values: Dict[str, str]) -> None:
+    """
+    Raises UnsupportedTemplateError when a file uses a placeholder without a value, before anything is written.
+    """
+    for template_file in template_files:
+        missing = [name for name in template_file.placeholders if name not in values]
+        if missing:
+            raise UnsupportedTemplateError(
+                f"{template_file.relative_path}: placeholder '{missing[0]}' has no value, only cargo-generate can prompt for it"
+            )
+
+
+def template_render_values(template_path: str, project_name: str, values: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    render_values = {
+        "project-name": project_name,
+        "crate_name": project_name.replace("-", "_"),
+        "authors": default_authors(),
+    }
+    render_values.update(load_template_values(template_path))
+    render_values.update(values or {})
+    return render_values
+
+
+def load_template(template_path: str, names_to_delete: Optional[List[str]] = None) -> Tuple[List[str], List[TemplateFile]]:
+    """
+    Reads every file of a template that ends up in a generated project.
+
+    Returns:
+    - tuple: The relative directories, parents first, and the files of the template.
+
+    Raises UnsupportedTemplateError when the template uses a feature only cargo-generate implements.
+    """
+    if os.path.exists(os.path.join(template_path, GENIGNORE_FILE)):
+        raise UnsupportedTemplateError(f"{GENIGNORE_FILE}: ignore patterns are only implemented by cargo-generate")
+    skipped = set(TEMPLATE_METADATA_FILES + load_ignored_files(template_path))
+    skipped.update(name for name in (names_to_delete or []) if name)
+    directories = []
+    template_files = []
+    for root, dirs, files in os.walk(template_path):
+        relative_root = os.path.relpath(root, template_path)
+        if relative_root == ".":
+            dirs[:] = [d for d in dirs if d not in skipped]
+            files = [f for f in files if f not in skipped]
+        if relative_root != "." and "{{" in relative_root:
+            raise UnsupportedTemplateError(f"{relative_root}: templated paths can only be rendered by cargo-generate")
+        directories.append(relative_root)
+        for file_name in files:
+            source = os.path.join(root, file_name)
+            with open(source, "rb") as file:
+                raw = file.read()
+            try:
+                text = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                text = None
+            relative_path = os.path.normpath(os.path.join(relative_root, file_name))
+            template_file = TemplateFile(relative_path, raw, os.stat(source).st_mode & 0o7777, text)
+            template_file.check_supported()
+            template_files.append(template_file)
+    return directories, template_files
+
+
+def write_template_file(
+    template_file: TemplateFile,
+    project_path: str,
+    render_values: Dict[str, str],
+    transform: Optional[LineTransform] = None,
+    tree: Optional[DiskTree] = DISK,
+) -> None:
+    target = os.path.join(project_path, template_file.relative_path)
+    if template_file.text is None:
+        tree.write_bytes(target, template_file.raw, template_file.mode)
+        return
+    content = render_text(template_file.text, render_values)
+    if transform is not None:
+        content = "".join(transform(content.splitlines(keepends=True)))
+    tree.write_text(target, content, template_file.mode)
+
+
+def render_template(
+    template_path: str,
+    destination: str,
+    project_name: str,
+    values: Optional[Dict[str, str]] = None,
+    transforms: Optional[Dict[str, LineTransform]] = None,
+    names_to_delete: Optional[List[str]] = None,
+    tree: Optional[DiskTree] = DISK,
+) -> str:
+    """
+    Renders a cargo-generate template into '<destination>/<project_name>' in a single pass.
+
+    Each file is read once, its placeholders are substituted, the transform registered for its
+    relative path (if any) is applied to the rendered lines and the result is written once. A template
+    using a feature only cargo-generate implements raises UnsupportedTemplateError before anything is written.
+
+    Args:
+    - template_path (str): Path of the template, e.g. one returned by TemplateCache.template_path.
+    - destination (str): Directory in which the project directory is created.
+    - project_name (str): Name of the generated project directory and crate.
+    - values (Dict[str, str]): Placeholder values, overriding the template defaults.
+    - transforms (Dict[str, LineTransform]): Line transforms keyed by relative path, e.g. 'memory.x'.
+    - names_to_delete (List[str]): Top level entries of the template that must not be generated.
+    - tree (DiskTree): Where the files are written, either the disk or a StagedTree.
+
+    Returns:
+    - str: Path of the generated project.
+    """
+    render_values = template_render_values(template_path, project_name, values)
+    transforms = transforms or {}
+    directories, template_files = load_template(template_path, names_to_delete)
+    check_placeholders(template_files, render_values)
+
+    project_path = os.path.join(destination, project_name)
+    for directory in directories:
+        tree.makedirs(os.path.join(project_path, directory))
+    for template_file in template_files:
+        write_template_file(template_file, project_path, render_values, transforms.get(template_file.relative_path), tree)
+
+    logger.info("Project rendered", extra=fields(project=project_name, path=destination))
+    return project_path
+
+
+def compare_trees(left: str, right: str, ignore: Optional[List[str]] = None) -> List[str]:
+    """
+    Returns the relative paths that differ between two directory trees, byte by byte.
+    """
+    ignore = ignore or [".git"]
+    differences = []
+    comparison = filecmp.dircmp(left, right, ignore=ignore)
+
+    def collect(comparison: filecmp.dircmp, prefix: str) -> None:
+        for name in comparison.left_only + comparison.right_only + comparison.funny_files:
+            differences.append(os.path.join(prefix, name))
+        _, mismatch, errors = filecmp.cmpfiles(comparison.left, comparison.right, comparison.common_files, shallow=False)
+        differences.extend(os.path.join(prefix, name) for name in mismatch + errors)
+        for name, sub_comparison in comparison.subdirs.items():
+            collect(sub_comparison, os.path.join(prefix, name))
+
+    collect(comparison, "")
+    return sorted(differences)
+
+
+def cargo_generate(template_path: str, destination: str, project_name: str, values: Dict[str, str]) -> str:
+    """
+    Generates the project with 'cargo generate', the reference implementation of the native renderer.
+
+    Returns:
+    - str: The path of the generated project.
+    """
+    command = [
+        "cargo", "generate",
+        "--path", template_path,
+        "--name", project_name,
+        "--destination", destination,
+        "--silent",
+    ]
+    for key, value in values.items():
+        command += ["--define", f"{key}={value}"]
+    run_command(command)
+    return os.path.join(destination, project_name)
+
+
+def check_parity(template_path: str, values: Dict[str, str], project_name: Optional[str] = "parity-check") -> List[str]:
+    """
+    Generates the same project with 'cargo generate' and with the native renderer and returns the differing files.
+    """
+    with tempfile.TemporaryDirectory() as cargo_dir, tempfile.TemporaryDirectory() as native_dir:
+        cargo_generate(template_path, cargo_dir, project_name, values)
+        render_template(template_path, native_dir, project_name, values=values)
+        return compare_trees(os.path.join(cargo_dir, project_name), os.path.join(native_dir, project_name))
+
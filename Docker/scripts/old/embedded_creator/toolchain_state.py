@@ -0,0 +1,211 @@
+import fcntl
+import json
+import os
+import threading
+import tomllib
+from contextlib import contextmanager
+from difflib import get_close_matches
+from typing import Dict, List, Optional, Tuple
+
+from .constants import DEFAULT_TOOLCHAIN_STATE_DIR
+from .project_types import ProjectConfig
+from .rustup_add_target_arch import rustup_add_target_arch
+from .command_runner import CommandError, run_command
+
+
+class ToolchainState:
+    """
+    Cached view of the active Rust toolchain: its version, the installed targets and every target rustc knows.
+
+    The state is stored on disk per toolchain together with a fingerprint of the toolchain directory
+    (rustup rewrites 'lib/rustlib/components' whenever a target or component is installed). While the
+    fingerprint matches, the cached lists are used as is and no rustup or rustc process is spawned.
+    Without a rustup layout to fingerprint, one 'rustc --version' call checks the cached state is current.
+    A lock file lets concurrent runs share the same state. A read only state (e.g. of a dry run) uses the
+    stored state but never writes the cache directory, a stale one is queried again on every run.
+    """
+
+    LOCK_FILE = ".lock"
+
+    def __init__(self, cache_dir: Optional[str] = None, read_only: Optional[bool] = False):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_TOOLCHAIN_STATE_DIR)
+        self.read_only = read_only
+        self.calls = 0
+        self._state: Optional[Dict] = None
+        self._recheck = False
+        if not read_only:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def rustup_home(self) -> str:
+        return os.environ.get("RUSTUP_HOME", os.path.join(os.path.expanduser("~"), ".rustup"))
+
+    def active_toolchain(self) -> Optional[str]:
+        toolchain = os.environ.get("RUSTUP_TOOLCHAIN")
+        if toolchain:
+            return toolchain
+        settings_path = os.path.join(self.rustup_home, "settings.toml")
+        if not os.path.isfile(settings_path):
+            return None
+        with open(settings_path, "rb") as file:
+            return tomllib.load(file).get("default_toolchain")
+
+    def fingerprint(self) -> Optional[str]:
+        toolchain = self.active_toolchain()
+        if toolchain is None:
+            return None
+        components = os.path.join(self.rustup_home, "toolchains", toolchain, "lib", "rustlib", "components")
+        try:
+            stat = os.stat(components)
+        except OSError:
+            return None
+        return f"{toolchain}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.active_toolchain() or 'default'}.json")
+
+    @contextmanager
+    def _locked(self):
+        if self.read_only:
+            # The state file is replaced in one step, it can be read without the lock
+            yield
+            return
+        with open(os.path.join(self.cache_dir, self.LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _run(self, command: List[str]) -> str:
+        self.calls += 1
+        try:
+            return run_command(command).stdout
+        except CommandError as e:
+            raise RuntimeError(f"Unable to query the toolchain with '{' '.join(command)}': {e}") from e
+
+    def _read_state(self) -> Optional[Dict]:
+        if not os.path.isfile(self.state_path):
+            return None
+        with open(self.state_path, "r") as file:
+            return json.load(file)
+
+    def _write_state(self, state: Dict) -> None:
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temporary_path, self.state_path)
+
+    def _query(self) -> Dict:
+        return {
+            "fingerprint": self.fingerprint(),
+            "version": self._run(["rustc", "--version"]).strip(),
+            "installed": sorted(self._run(["rustup", "target", "list", "--installed"]).split()),
+            "available": sorted(self._run(["rustc", "--print", "target-list"]).split()),
+        }
+
+    def _is_fresh(self, state: Optional[Dict]) -> bool:
+        if state is None:
+            return False
+        fingerprint = self.fingerprint()
+        if fingerprint is not None:
+            return state.get("fingerprint") == fingerprint
+        # Without a rustup layout to fingerprint, the rustc version is the only staleness check
+        return state.get("version") == self._run(["rustc", "--version"]).strip()
+
+    def state(self) -> Dict:
+        if self._state is not None and self._recheck:
+            self._recheck = False
+            if not self._is_fresh(self._state):
+                self._state = None
+        if self._state is not None:
+            return self._state
+        with self._locked():
+            state = self._read_state()
+            if not self._is_fresh(state):
+                state = self._query()
+                if not self.read_only:
+                    self._write_state(state)
+        self._state = state
+        return state
+
+    def recheck(self) -> None:
+        """
+        Makes the next use of the state kept in memory check that the toolchain did not change since
+        it was loaded, for processes that outlive a single run (see daemon).
+        """
+        self._recheck = True
+
+    @property
+    def installed_targets(self) -> List[str]:
+        return self.state()["installed"]
+
+    @property
+    def available_targets(self) -> List[str]:
+        return self.state()["available"]
+
+    def validate_arch(self, arch: str, field_name: Optional[str] = "arch") -> None:
+        if arch not in self.available_targets:
+            suggestions = get_close_matches(arch, self.available_targets, n=3)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            raise ValueError(f"{field_name} '{arch}' is not a target supported by {self.state()['version']}.{hint}")
+
+    def ensure_targets(self, archs: List[str]) -> List[str]:
+        """
+        Installs every missing target with a single 'rustup target add' call.
+
+        Returns:
+        - List[str]: The targets that were installed, empty when all of them were already present.
+        """
+        missing = sorted(set(archs) - set(self.installed_targets))
+        if not missing:
+            return []
+        if self.read_only:
+            raise RuntimeError(f"Unable to install the targets {', '.join(missing)} with a read only toolchain state")
+        with self._locked():
+            # Another run may have installed them while waiting for the lock
+            state = self._read_state() or self._state
+            missing = sorted(set(missing) - set(state["installed"]))
+            if missing:
+                self.calls += 1
+                rustup_add_target_arch(missing)
+                state["installed"] = sorted(set(state["installed"]) | set(missing))
+                state["fingerprint"] = self.fingerprint()
+                self._write_state(state)
+        self._state = state
+        return missing
+
+
+_shared_toolchain_states: Dict[Tuple[str, bool], ToolchainState] = {}
+_shared_toolchain_states_lock = threading.Lock()
+
+
+def shared_toolchain_state(cache_dir: Optional[str] = None, read_only: Optional[bool] = False) -> ToolchainState:
+    """
+    Toolchain state of 'cache_dir', created once per process, so that the runs of a long-lived process
+    (see daemon) keep the state in memory instead of reading it again.
+    """
+    key = (os.path.abspath(cache_dir or DEFAULT_TOOLCHAIN_STATE_DIR), bool(read_only))
+    with _shared_toolchain_states_lock:
+        if key not in _shared_toolchain_states:
+            _shared_toolchain_states[key] = ToolchainState(cache_dir=cache_dir, read_only=read_only)
+        return _shared_toolchain_states[key]
+
+
+def shared_toolchain_states() -> List[ToolchainState]:
+    with _shared_toolchain_states_lock:
+        return list(_shared_toolchain_states.values())
+
+
+def validate_project_archs(project_config: ProjectConfig, toolchain_state: ToolchainState) -> None:
+    if project_config.arch is not None:
+        toolchain_state.validate_arch(project_config.arch, "arch")
+    for index, config in enumerate(project_config.config):
+        toolchain_state.validate_arch(config.arch, f"config[{index}].arch")
+
+## Example usage
+#toolchain_state = ToolchainState()
+#toolchain_state.validate_arch('thumbv7em-none-eabi')
+#toolchain_state.ensure_targets(['thumbv7em-none-eabi', 'thumbv6m-none-eabi'])
+#print(toolchain_state.calls)
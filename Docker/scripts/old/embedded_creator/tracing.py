@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+LOGGER_NAME = "create_project"
+LOG_LEVELS = ["debug", "info", "warning", "error"]
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def fields(**values) -> Dict[str, Dict[str, Any]]:
+    """
+    Structured fields of a log record, e.g. logger.info("Template cached", extra=fields(path=path)).
+    """
+    return {"fields": values}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    'LEVEL logger: message key=value ...', or one JSON object per record.
+    """
+
+    def __init__(self, json_output: Optional[bool] = False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        record_fields = getattr(record, "fields", {})
+        name = record.name.split(".", 1)[-1]
+        if self.json_output:
+            return json.dumps({"level": record.levelname.lower(), "logger": name, "message": record.getMessage(), **record_fields}, default=str)
+        line = f"{record.levelname:<7} {name}: {record.getMessage()}"
+        if record_fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in record_fields.items())
+        return line
+
+
+def configure_logging(level: Optional[str] = None, json_output: Optional[bool] = None) -> None:
+    """
+    Sends the records of every module to stderr. The level and format default to the LOG_LEVEL
+    and LOG_FORMAT environment variables, then to 'info' and plain text. A level outside LOG_LEVELS
+    is reported and replaced by 'info'.
+    """
+    level = level or os.environ.get("LOG_LEVEL", "info")
+    invalid_level = None if level.lower() in LOG_LEVELS else level
+    if invalid_level is not None:
+        level = "info"
+    if json_output is None:
+        json_output = os.environ.get("LOG_FORMAT", "") == "json"
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(StructuredFormatter(json_output))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    if invalid_level is not None:
+        get_logger("logging").warning(
+            f"Unknown log level '{invalid_level}', using 'info' (expected one of {', '.join(LOG_LEVELS)})",
+            extra=fields(level=invalid_level),
+        )
+
+
+span_logger = get_logger("span")
+
+
+class _NullSpan:
+    """
+    Returned while neither tracing nor debug logging is on, so a disabled span costs one call.
+    """
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def set(self, **args) -> None:
+        self.args.update(args)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        duration = time.perf_counter_ns() - self.start
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.record(self, duration)
+        span_logger.debug(f"{self.name} took {duration / 1e6:.2f} ms", extra=fields(category=self.category, **self.args))
+        return False
+
+
+class Tracer:
+    """
+    Collects spans as Chrome trace events ('X' complete events), drawn in one lane per thread.
+
+    Work done under 'lane' is drawn in a lane of its own instead, e.g. one per core, whatever thread runs it.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._lanes: Dict[str, int] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def reset(self) -> None:
+        """
+        Disables the tracer and drops every event, so that a process running several commands (see daemon) traces each on its own.
+        """
+        with self._lock:
+            self.enabled = False
+            self.events = []
+            self._lanes = {}
+            self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, category: Optional[str] = "stage", **args):
+        if not self.enabled and not span_logger.isEnabledFor(logging.DEBUG):
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    def lane(self, name: str) -> "_Lane":
+        return _Lane(self, name)
+
+    def _lane_id(self) -> int:
+        lane = getattr(self._local, "lane", None) or threading.current_thread().name
+        with self._lock:
+            return self._lanes.setdefault(lane, len(self._lanes) + 1)
+
+    def record(self, span: Span, duration: int) -> None:
+        if not self.enabled:
+            return
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start - self._origin) / 1000,
+            "dur": duration / 1000,
+            "pid": os.getpid(),
+            "tid": self._lane_id(),
+            "args": {key: str(value) for key, value in span.args.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, path: str) -> None:
+        with self._lock:
+            events = list(self.events)
+            lanes = dict(self._lanes)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": lane_id, "args": {"name": lane}}
+            for lane, lane_id in lanes.items()
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, file)
+
+
+class _Lane:
+    def __init__(self, tracer: Tracer, name: str):
+        self.tracer = tracer
+        self.name = name
+        self.previous = None
+
+    def __enter__(self) -> "_Lane":
+        self.previous = getattr(self.tracer._local, "lane", None)
+        self.tracer._local.lane = self.name
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.tracer._local.lane = self.previous
+        return False
+
+
+TRACER = Tracer()
+
+
+def span(name: str, category: Optional[str] = "stage", **args):
+    return TRACER.span(name, category, **args)
+
+
+## Example usage
+#configure_logging("debug")
+#TRACER.enable()
+#with span("generate", core="cortex-m7"):
+#    generate_core(...)
+#TRACER.write("trace.json")
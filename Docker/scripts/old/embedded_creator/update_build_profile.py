@@ -0,0 +1,195 @@
+import json
+import os
+import re
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from .constants import WORKSPACE_PROFILE_FIELDS
+from .line_transform import LineTransformer, Rule, Section, regex
+from .project_types import BuildProfile
+from .staged_tree import DiskTree, DISK
+from .tracing import get_logger, fields
+
+logger = get_logger("update_build_profile")
+
+# BuildProfile field to key of the cargo profile
+CARGO_PROFILE_KEYS = {
+    "opt_level": "opt-level",
+    "lto": "lto",
+    "codegen_units": "codegen-units",
+    "debug": "debug",
+    "panic": "panic",
+}
+# BuildProfile field to key of the [unstable] table of .cargo/config.toml
+UNSTABLE_KEYS = {
+    "build_std": "build-std",
+    "build_std_features": "build-std-features",
+}
+# Settings cargo can override per package of a workspace, the others apply to the whole build
+PACKAGE_PROFILE_FIELDS = ["opt_level", "codegen_units", "debug"]
+RELEASE_PROFILE = "profile.release"
+# Target table of the template .cargo/config.toml and the cortex-m-rt linker script it links with
+CORTEX_M_TARGET_TABLE = "target.'cfg(all(target_arch = \"arm\", target_os = \"none\"))'"
+LINKER_SCRIPT_FLAGS = ["-C", "link-arg=-Tlink.x"]
+
+
+def toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(toml_value(item) for item in value) + "]"
+    # TOML basic strings share the JSON escapes
+    return json.dumps(str(value))
+
+
+def profile_keys(profile: Optional[BuildProfile], keys: Dict[str, str]) -> Dict[str, str]:
+    """
+    Returns the TOML key and rendered value of every setting of the profile listed in 'keys'.
+    """
+    if profile is None:
+        return {}
+    settings = profile.resolved().settings()
+    return {toml_key: toml_value(settings[name]) for name, toml_key in keys.items() if name in settings}
+
+
+def table_transformer(table: str, values: Dict[str, str]) -> LineTransformer:
+    """
+    Rules setting 'key = value' lines of a TOML table: keys already in the table are replaced in place,
+    the missing ones are added at the end of the table, and the table is appended when the file has none.
+
+    Args:
+    - table (str): Name of the table, e.g. 'profile.release'.
+    - values (dict): TOML key to rendered value.
+
+    Returns:
+    - LineTransformer: The rules, which leave the lines untouched when 'values' is empty.
+    """
+    if not values:
+        return LineTransformer()
+    key_line = regex(r"^\s*(" + "|".join(re.escape(key) for key in values) + r")\s*=[^#\n]*(\s#.*)?$")
+
+    def set_key(line, match, state):
+        key = match.group(1)
+        state.setdefault("keys_set", set()).add(key)
+        # The comment of the template line, e.g. '# better optimizations', is kept
+        return f"{key} = {values[key]}{match.group(2) or ''}\n"
+
+    def track_blank(line, match, state):
+        state["last_blank"] = not line.strip()
+        return line
+
+    def add_missing_keys(state, at_eof):
+        keys_set = state.get("keys_set", set())
+        return [f"{key} = {value}\n" for key, value in values.items() if key not in keys_set]
+
+    def add_table(state):
+        separator = [] if state.get("last_blank", True) else ["\n"]
+        return separator + [f"[{table}]\n"] + add_missing_keys(state, True)
+
+    return LineTransformer(
+        [Rule(lambda line: True, track_blank, final=False), Rule(key_line, set_key, section=table)],
+        [
+            Section(
+                table,
+                start=regex(r"^\s*\[" + re.escape(table) + r"\]\s*(#.*)?$"),
+                end=regex(r"^\s*\["),
+                on_exit=add_missing_keys,
+                on_missing=add_table,
+                once=True,
+            )
+        ],
+    )
+
+
+def update_profile_lines(lines: List[str], profile: Optional[BuildProfile]) -> List[str]:
+    return table_transformer(RELEASE_PROFILE, profile_keys(profile, CARGO_PROFILE_KEYS)).apply(lines)
+
+
+def update_unstable_lines(lines: List[str], profile: Optional[BuildProfile]) -> List[str]:
+    return table_transformer("unstable", profile_keys(profile, UNSTABLE_KEYS)).apply(lines)
+
+
+def package_profile_lines(package: str, profile: BuildProfile, base: Optional[BuildProfile]) -> List[str]:
+    """
+    Returns the [profile.release.package.<package>] table holding the settings of 'profile' that differ from 'base'.
+    """
+    settings = profile.resolved().settings()
+    base_settings = base.resolved().settings() if base is not None else {}
+    overrides = [
+        f"{CARGO_PROFILE_KEYS[name]} = {toml_value(settings[name])}\n"
+        for name in PACKAGE_PROFILE_FIELDS
+        if name in settings and settings[name] != base_settings.get(name)
+    ]
+    if not overrides:
+        return []
+    return ["\n", f"[{RELEASE_PROFILE}.package.{package}]\n"] + overrides
+
+
+def workspace_base_profile(project_profile: Optional[BuildProfile], core_profiles: List[Optional[BuildProfile]]) -> BuildProfile:
+    """
+    Returns the profile of a workspace root: the project profile, plus the settings every core must share
+    (see ProjectConfig.validate_workspace_profiles), which may come from the core profiles only.
+    """
+    base = project_profile.resolved() if project_profile is not None else BuildProfile()
+    shared = core_profiles[0] if core_profiles and core_profiles[0] is not None else BuildProfile()
+    return replace(base, **{name: getattr(shared, name) for name in WORKSPACE_PROFILE_FIELDS if getattr(shared, name) is not None})
+
+
+def workspace_profile_lines(profiles: List[str], base: BuildProfile, core_profiles: Dict[str, Optional[BuildProfile]]) -> List[str]:
+    """
+    Applies the base profile to the profile tables of the workspace root, followed by one package
+    table per core whose settings differ from it.
+
+    Args:
+    - profiles (list): Profile tables of the template manifest.
+    - base (BuildProfile): Profile of the whole workspace, see workspace_base_profile.
+    - core_profiles (dict): Member name to the profile of its core.
+
+    Returns:
+    - list: The lines of the profile tables.
+    """
+    lines = update_profile_lines(profiles, base)
+    for member, profile in core_profiles.items():
+        if profile is not None:
+            lines += package_profile_lines(member, profile, base)
+    return lines
+
+
+def workspace_cargo_config(base: Optional[BuildProfile], debugger_option: str) -> str:
+    """
+    Returns the .cargo/config.toml of the workspace root. cargo reads the config of the directory it runs
+    in and of its parents only, never the one of a member, so the builds started from the root need the
+    runner and the linker script there, plus the build-std settings of the profile.
+    """
+    lines = [
+        f"[{CORTEX_M_TARGET_TABLE}]\n",
+        f"runner = {toml_value(f'{debugger_option} -q -x openocd.gdb')}\n",
+        f"rustflags = {toml_value(LINKER_SCRIPT_FLAGS)}\n",
+    ]
+    return "".join(update_unstable_lines(lines, base))
+
+
+def update_build_profile(path: str, profile: Optional[BuildProfile], tree: Optional[DiskTree] = DISK) -> None:
+    """
+    Writes the profile of a generated core: the release profile of Cargo.toml and the build-std
+    settings of .cargo/config.toml. Nothing is touched when the profile is None.
+    """
+    if profile is None:
+        return
+    for file_path, update_lines in (
+        (os.path.join(path, "Cargo.toml"), update_profile_lines),
+        (os.path.join(path, ".cargo", "config.toml"), update_unstable_lines),
+    ):
+        if not tree.isfile(file_path):
+            logger.warning("The file does not exist", extra=fields(path=file_path))
+            continue
+        lines = tree.read_text(file_path).splitlines(keepends=True)
+        tree.write_text(file_path, "".join(update_lines(lines, profile)))
+        logger.debug("Build profile updated", extra=fields(path=file_path))
+
+## Example usage
+#profile = BuildProfile(preset="size", build_std=["core"])
+#update_build_profile('/path/to/project/cortex-m7', profile)
+#print(''.join(workspace_profile_lines(template_profiles(None), profile, {'cortex-m7': BuildProfile(opt_level=3)})))
@@ -0,0 +1,65 @@
+import os
+import re
+from typing import Optional
+from .staged_tree import DiskTree, DISK
+from .line_transform import LineTransformer, Rule, Section, all_of, contains, regex
+from .tracing import get_logger, fields
+
+logger = get_logger("update_cargo_toml")
+
+
+def update_cargo_toml(path: str, file_name: str, arch: str, mcu_family: str, debugger_option: str, tree: Optional[DiskTree] = DISK):
+    file_path = os.path.join(path, file_name)
+    if not tree.isfile(file_path):
+        logger.warning("The file does not exist", extra=fields(path=file_path))
+        return
+    
+    lines = tree.read_text(file_path).splitlines(keepends=True)
+
+    new_lines = update_cargo_toml_lines(lines, arch, mcu_family, debugger_option)
+
+    tree.write_text(file_path, "".join(new_lines))
+    logger.debug("Configuration updated", extra=fields(path=file_path))
+
+
+def update_cargo_toml_lines(lines, arch: str, mcu_family: str, debugger_option: str):
+    return cargo_config_transformer(arch, mcu_family, debugger_option).apply(lines)
+
+
+def cargo_config_transformer(arch: str, mcu_family: str, debugger_option: str) -> LineTransformer:
+    """
+    Rules of .cargo/config.toml: uncomment the runner of the debugger option and make 'arch' the only
+    target of the [build] section, adding it when the section has none.
+    """
+    target_line = f'target = "{arch}" # {mcu_family}\n'
+
+    def set_target(line, match, state):
+        state["target_set"] = True
+        return target_line
+
+    def add_missing_target(state, at_eof):
+        # The target line goes at the end of the [build] section, before the next one starts
+        return [] if state.get("target_set") else [target_line]
+
+    rules = [
+        # Uncomment the specified debugger option
+        Rule(
+            all_of(contains("runner ="), contains(debugger_option), regex(r"^\s*#")),
+            lambda line, match, state: line.lstrip("#").lstrip(),
+            final=False,
+        ),
+        # The commented out architecture line, with optional leading whitespace. An active line of the same
+        # architecture is commented out by the next rule and the target added at the end of the section
+        Rule(regex(r'^\s*#\s*target\s*=\s*"' + re.escape(arch) + r'"\s*(#.*)?$'), set_target, section="build"),
+        # Comment out any other architecture
+        Rule(all_of(contains("target ="), lambda line: not line.strip().startswith("#")), lambda line, match, state: f"# {line}", section="build"),
+    ]
+    sections = [
+        Section(
+            "build",
+            start=contains("[build]"),
+            end=lambda line: line.strip().startswith("["),
+            on_exit=add_missing_target,
+        )
+    ]
+    return LineTransformer(rules, sections)
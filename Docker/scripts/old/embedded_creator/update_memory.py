@@ -0,0 +1,77 @@
+import re
+import os
+from typing import List, Optional
+from .project_types import CoreConfig
+from .memory_map import MemoryRegion, core_memory_regions
+from .constants import LINES_TO_DELETE_FROM_MEMORY_X_FILE
+from .staged_tree import DiskTree, DISK
+from .line_transform import LineTransformer, Rule, Section, contains, delete, replace_with, stripped_in
+from .tracing import get_logger, fields
+
+logger = get_logger("update_memory")
+
+MEMORY_X_TODO_COMMENT = "  /* TODO Adjust these memory regions to match your device memory layout */ "
+
+
+def modify_memory_x(path: str, mcu_family: str, config: CoreConfig, lines_to_delete: Optional[list] = LINES_TO_DELETE_FROM_MEMORY_X_FILE, file_name : Optional[str] = 'memory.x', tree: Optional[DiskTree] = DISK, regions: Optional[List[MemoryRegion]] = None):
+    memory_x_path = os.path.join(path, file_name)
+    # Check if the file exists
+    if tree.isfile(memory_x_path):
+        lines = read_file_contents(memory_x_path, tree)
+        lines = update_memory_x_lines(lines, mcu_family, config, lines_to_delete, regions)
+        write_file_contents(memory_x_path, lines, tree)
+    else:
+        logger.warning("The file does not exist", extra=fields(path=memory_x_path))
+
+
+def update_memory_x_lines(lines, mcu_family: str, config: CoreConfig, lines_to_delete: Optional[list] = LINES_TO_DELETE_FROM_MEMORY_X_FILE, regions: Optional[List[MemoryRegion]] = None):
+    """Applies every memory.x edit to already loaded lines, so callers that hold the file in memory can skip the disk round trip.
+    The regions are the ones of the project memory map when given, otherwise they are computed from 'config'."""
+    regions = regions if regions is not None else core_memory_regions(config)
+    return memory_x_transformer(mcu_family, regions, lines_to_delete).apply(lines)
+
+
+def memory_x_transformer(mcu_family: str, regions: List[MemoryRegion], lines_to_delete: Optional[list] = LINES_TO_DELETE_FROM_MEMORY_X_FILE) -> LineTransformer:
+    """
+    Rules of memory.x: drop the template notes, set FLASH and RAM, add the extra sections at the end
+    of the MEMORY block and replace the TODO comment, all in one pass.
+    """
+    by_section = {region.section: region for region in regions if region.section in ("flash", "ram")}
+    extra_section_lines = [region.render() for region in regions if region.section == "extra_sections"]
+    todo_pattern = re.compile(re.escape(MEMORY_X_TODO_COMMENT.strip()), re.IGNORECASE)
+
+    rules = [
+        Rule(stripped_in(lines_to_delete or []), delete()),
+        Rule(contains("FLASH :"), replace_with(by_section["flash"].render()), final=False),
+        Rule(contains("RAM :"), replace_with(by_section["ram"].render()), final=False),
+        Rule(todo_pattern.search, lambda line, match, state: todo_pattern.sub(f"/* Values adjusted for {mcu_family} */", line)),
+    ]
+    sections = []
+    if extra_section_lines:
+        sections.append(
+            Section(
+                "memory",
+                start=contains("MEMORY"),
+                # The opening brace may sit on its own line, only the closing one ends the block
+                end=lambda line: "}" in line and "{" not in line,
+                on_exit=lambda state, at_eof: _memory_block_end(extra_section_lines, at_eof),
+                on_missing=lambda state: _memory_block_end(extra_section_lines, True),
+                once=True,
+            )
+        )
+    return LineTransformer(rules, sections)
+
+
+def _memory_block_end(extra_section_lines: List[str], at_eof: bool) -> List[str]:
+    if at_eof:
+        logger.warning("Failed to identify MEMORY block accurately. Extra sections not added.")
+        return []
+    # Inserted before the MEMORY block's closing brace
+    return extra_section_lines
+
+
+def read_file_contents(file_path: str, tree: Optional[DiskTree] = DISK):
+    return tree.read_text(file_path).splitlines(keepends=True)
+
+def write_file_contents(file_path: str, lines, tree: Optional[DiskTree] = DISK):
+    tree.write_text(file_path, "".join(lines))
@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+from .staged_tree import DiskTree, DISK
+from .line_transform import LineTransformer, Rule, contains, replace_with, startswith, substitute
+from .tracing import get_logger, fields
+
+logger = get_logger("update_openocd_cfg")
+
+def update_openocd_cfg(path: str, header: str, interface_cfg: str, target_cfg: str, tree: Optional[DiskTree] = DISK):
+    # Check if the file exists
+    file_path = os.path.join(path, 'openocd.cfg')
+    if not tree.isfile(file_path):
+        logger.warning("The file does not exist", extra=fields(path=file_path))
+        return
+    
+    # Read the file contents
+    lines = tree.read_text(file_path).splitlines(keepends=True)
+    
+    # Update the file contents
+    new_lines = update_openocd_cfg_lines(lines, header, interface_cfg, target_cfg)
+    
+    # Write the modified contents back to the file
+    tree.write_text(file_path, "".join(new_lines))
+    logger.debug("OpenOCD configuration updated", extra=fields(path=file_path))
+
+
+def update_openocd_cfg_lines(lines, header: str, interface_cfg: str, target_cfg: str):
+    return openocd_cfg_transformer(header, interface_cfg, target_cfg).apply(lines)
+
+
+def openocd_cfg_transformer(header: str, interface_cfg: str, target_cfg: str) -> LineTransformer:
+    # The first matching rule wins, as with the sample configuration only one of them applies per line
+    return LineTransformer([
+        Rule(startswith("# Sample OpenOCD configuration"), replace_with(f"# {header}\n")),
+        Rule(contains("interface/"), substitute("stlink.cfg", interface_cfg)),
+        Rule(contains("target/"), substitute("stm32f3x.cfg", target_cfg)),
+    ])
@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .config_loader import build_project_config, resolve_config_data
+from .config_resolver import ConfigResolver
+from .constants import DEFAULT_RENDERER, DIRECTORIES_TO_DELETE_FROM_TEMPLATE, NATIVE_RENDERER
+from .device_catalog import device_regions_for
+from .memory_map import core_memory_regions, validate_memory_map
+from .project_creator import (
+    core_directory_name,
+    core_file_transforms,
+    core_transform_inputs,
+    project_creator,
+    project_template_name,
+    template_entry,
+)
+from .project_lock import ProjectLock, core_inputs_hash, data_hash, update_lock
+from .project_types import CoreConfig, ProjectConfig
+from .staged_tree import StagedTree
+from .template_cache import TemplateCache
+from .template_renderer import TemplateFile, core_template_values, load_template, template_render_values, write_template_file
+from .toolchain_state import ToolchainState, validate_project_archs
+from .tracing import get_logger, fields
+from .utils import normalize_string
+
+logger = get_logger("watch")
+
+# Seconds the watch loop blocks for before checking whether it was asked to stop
+WAIT_TIMEOUT = 0.5
+
+
+@dataclass
+class WatchUpdate:
+    # Core directory to the files regenerated in it, relative to the core directory
+    cores: Dict[str, List[str]] = field(default_factory=dict)
+    # The project went through the whole creator, e.g. because a core was added or renamed
+    full: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def files(self) -> List[str]:
+        return [os.path.join(core_name, file_name) for core_name, files in self.cores.items() for file_name in files]
+
+
+class ProjectWatcher:
+    """
+    Keeps a generated project in step with its config: the config, the template files and the inputs
+    of every generated file stay in memory, so that an edit of the config (or of a config it extends)
+    only re-renders the files whose inputs changed, e.g. memory.x of one core for a new RAM length.
+
+    Changes that alter the layout of the project (cores added, removed, renamed or reordered, the
+    template, the directories or the workspace) go through the whole creator instead, which still only
+    regenerates the cores the .project-lock reports as changed. The incremental updates need the native
+    renderer: with cargo-generate, every change goes through the whole creator.
+    """
+
+    def __init__(
+        self,
+        project_name: str,
+        config_path: str,
+        template_cache: TemplateCache,
+        toolchain_state: Optional[ToolchainState] = None,
+        destination: Optional[str] = None,
+        resolver: Optional[ConfigResolver] = None,
+        renderer: Optional[str] = DEFAULT_RENDERER,
+    ):
+        self.project_name = project_name
+        self.renderer = renderer
+        self.config_path = os.path.abspath(config_path)
+        self.template_cache = template_cache
+        self.toolchain_state = toolchain_state or ToolchainState()
+        self.resolver = resolver or ConfigResolver()
+        self.destination = destination or os.getcwd()
+        normalized_project_name = normalize_string(input_str=project_name, chars_to_normalize=[":"], normalizer="_")
+        self.project_path = os.path.join(self.destination, normalized_project_name)
+        self.project_config: Optional[ProjectConfig] = None
+        self._template: Optional[Dict[str, str]] = None
+        self._template_path: Optional[str] = None
+        self._template_files: List[TemplateFile] = []
+        # Core directory to the template values that do not depend on the config
+        self._base_values: Dict[str, Dict[str, str]] = {}
+        self._project_inputs: Optional[str] = None
+        # Core directory to the inputs hash of every file of the core, relative to the core directory
+        self._file_inputs: Dict[str, Dict[str, str]] = {}
+
+    def sources(self) -> List[str]:
+        return self.resolver.sources(self.config_path)
+
+    def load_config(self) -> ProjectConfig:
+        """
+        Raises ValueError (ConfigValidationError included) or RuntimeError when the config cannot be used.
+        """
+        project_config = build_project_config(resolve_config_data(self.resolver.load(self.config_path)))
+        validate_project_archs(project_config, self.toolchain_state)
+        validate_memory_map(project_config, device_regions_for(project_config))
+        return project_config
+
+    def start(self) -> WatchUpdate:
+        """
+        Creates or updates the project from the current config and builds the model the next updates are diffed against.
+
+        Raises ValueError or RuntimeError when the config cannot be used or the project cannot be created.
+        """
+        start = time.perf_counter()
+        update = self._regenerate(self.load_config())
+        update.elapsed = time.perf_counter() - start
+        return update
+
+    def update(self) -> Optional[WatchUpdate]:
+        """
+        Reloads the config and regenerates what its changes affect. A config that cannot be used is
+        reported and ignored, the project and the model are left as they are until the next change.
+
+        Returns:
+        - WatchUpdate: What was regenerated, None when the config was ignored.
+        """
+        start = time.perf_counter()
+        try:
+            project_config = self.load_config()
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"Config change ignored: {e}", extra=fields(path=self.config_path))
+            return None
+        if self.renderer != NATIVE_RENDERER or self._inputs_of_project(project_config) != self._project_inputs:
+            update = self._regenerate(project_config)
+        else:
+            update = self._apply(project_config)
+        update.elapsed = time.perf_counter() - start
+        return update
+
+    def run(
+        self,
+        watcher,
+        stop: Optional[threading.Event] = None,
+        on_update: Optional[Callable[[WatchUpdate], None]] = None,
+    ) -> None:
+        """
+        Updates the project on every change reported by 'watcher' (see file_watcher), until 'stop' is set.
+        """
+        while stop is None or not stop.is_set():
+            if not watcher.wait(WAIT_TIMEOUT):
+                continue
+            update = self.update()
+            # The edit may have changed which files the config extends
+            watcher.watch(self.sources())
+            if update is None:
+                continue
+            log_update(update)
+            if on_update is not None:
+                on_update(update)
+
+    def _regenerate(self, project_config: ProjectConfig) -> WatchUpdate:
+        tree = project_creator(
+            self.project_name,
+            project_config,
+            template_cache=self.template_cache,
+            renderer=self.renderer,
+            destination=self.destination,
+            toolchain_state=self.toolchain_state,
+        )
+        if self.renderer == NATIVE_RENDERER:
+            self._build_model(project_config)
+        else:
+            self.project_config = project_config
+        core_names = {core_directory_name(config) for config in project_config.config}
+        update = WatchUpdate(full=True)
+        for relative_path in tree.staged_files():
+            core_name, separator, file_name = relative_path.partition(os.sep)
+            if separator and core_name in core_names:
+                update.cores.setdefault(core_name, []).append(file_name)
+        return update
+
+    def _build_model(self, project_config: ProjectConfig) -> None:
+        template_name = project_template_name(project_config)
+        if self._template is None or self._template["name"] != template_name:
+            self._template_path = self.template_cache.template_path(template_name)
+            self._template = template_entry(self.template_cache, template_name, self._template_path)
+            _, self._template_files = load_template(self._template_path, DIRECTORIES_TO_DELETE_FROM_TEMPLATE)
+            self._base_values = {}
+        self.project_config = project_config
+        self._project_inputs = self._inputs_of_project(project_config)
+        self._file_inputs = {
+            core_directory_name(config): self._core_file_inputs(project_config, config, index)
+            for index, config in enumerate(project_config.config)
+        }
+
+    def _inputs_of_project(self, project_config: ProjectConfig) -> str:
+        workspace = bool(project_config.workspace)
+        return data_hash(
+            {
+                "cores": [core_directory_name(config) for config in project_config.config],
+                "template": project_template_name(project_config),
+                "directories": project_config.directories,
+                "workspace": workspace,
+                # The workspace root lists the target and the profile of every member, and the runner of the first
+                "members": [
+                    [project_config.core_arch(config), project_config.core_profile(config)] for config in project_config.config
+                ]
+                if workspace
+                else None,
+                "runner": project_config.core_debugger_option(project_config.config[0]) if workspace else None,
+            }
+        )
+
+    def _render_values(self, project_config: ProjectConfig, config: CoreConfig) -> Dict[str, str]:
+        core_name = core_directory_name(config)
+        if core_name not in self._base_values:
+            self._base_values[core_name] = template_render_values(self._template_path, core_name)
+        return {**self._base_values[core_name], **core_template_values(project_config, config)}
+
+    def _core_file_inputs(self, project_config: ProjectConfig, config: CoreConfig, index: int) -> Dict[str, str]:
+        # A file changes when a placeholder it uses or the inputs of its transform change
+        values = self._render_values(project_config, config)
+        transform_inputs = core_transform_inputs(project_config, config, core_memory_regions(config, index))
+        return {
+            template_file.relative_path: data_hash(
+                [
+                    {name: values.get(name) for name in template_file.placeholders},
+                    transform_inputs.get(template_file.relative_path),
+                ]
+            )
+            for template_file in self._template_files
+        }
+
+    def _apply(self, project_config: ProjectConfig) -> WatchUpdate:
+        update = WatchUpdate()
+        tree = StagedTree(self.project_path)
+        core_inputs = {}
+        file_inputs = {}
+        for index, config in enumerate(project_config.config):
+            core_name = core_directory_name(config)
+            core_inputs[core_name] = core_inputs_hash(project_config, config, NATIVE_RENDERER, self._template)
+            file_inputs[core_name] = self._core_file_inputs(project_config, config, index)
+            previous_inputs = self._file_inputs.get(core_name, {})
+            affected = [
+                template_file
+                for template_file in self._template_files
+                if file_inputs[core_name][template_file.relative_path] != previous_inputs.get(template_file.relative_path)
+            ]
+            if not affected:
+                continue
+            regions = core_memory_regions(config, index)
+            transforms = core_file_transforms(
+                project_config.mcu_family,
+                config,
+                project_config.core_arch(config),
+                project_config.core_debugger_option(config),
+                regions,
+                bool(project_config.workspace),
+                project_config.core_profile(config),
+            )
+            values = self._render_values(project_config, config)
+            core_path = os.path.join(self.project_path, core_name)
+            for template_file in affected:
+                write_template_file(template_file, core_path, values, transforms.get(template_file.relative_path), tree)
+            update.cores[core_name] = [template_file.relative_path for template_file in affected]
+
+        archs = [project_config.core_arch(config) for config in project_config.config]
+        if set(archs) != {self.project_config.core_arch(config) for config in self.project_config.config}:
+            self.toolchain_state.ensure_targets(archs)
+        update_lock(tree, ProjectLock.load(self.project_path), self._template, core_inputs, [], partial=True)
+        tree.commit()
+        self.project_config = project_config
+        self._file_inputs = file_inputs
+        return update
+
+
+def log_update(update: WatchUpdate) -> None:
+    elapsed = f"{update.elapsed * 1000:.1f} ms"
+    if update.full:
+        logger.info(f"Project regenerated in {elapsed}", extra=fields(files=len(update.files), elapsed=update.elapsed))
+        return
+    if not update.cores:
+        logger.info(f"No generated file affected ({elapsed})", extra=fields(elapsed=update.elapsed))
+    for core_name, files in update.cores.items():
+        logger.info(f"{core_name}: {', '.join(files)} updated in {elapsed}", extra=fields(core=core_name, files=",".join(files)))
+
+## Example usage
+#project_watcher = ProjectWatcher('my_project', 'config.json', TemplateCache())
+#project_watcher.start()
+#project_watcher.run(file_watcher(project_watcher.sources()))
@@ -0,0 +1,41 @@
+import random
+from typing import List, Tuple
+
+import pytest
+
+from embedded_creator.bloat_diff import bloat_diff
+
+from conftest import best_time
+from elf_fixtures import write_synthetic_elf
+
+pytestmark = pytest.mark.benchmark
+
+
+def synthetic_symbols(count: int, seed: int = 0) -> List[Tuple[str, str, int]]:
+    """
+    Legacy mangled functions and objects spread over a few crates, as (name, section, size).
+    """
+    generator = random.Random(seed)
+    crates = ["core", "alloc", "cortex_m", "cortex_m_rt", "embedded_hal", "firmware"]
+    symbols = []
+    for index in range(count):
+        crate = crates[index % len(crates)]
+        path = [crate, f"module{index % 97}", f"item{index}"]
+        mangled = "_ZN" + "".join(f"{len(part)}{part}" for part in path) + f"17h{generator.getrandbits(64):016x}E"
+        section = ".text" if index % 5 else generator.choice([".data", ".bss"])
+        symbols.append((mangled, section, generator.randint(4, 512)))
+    return symbols
+
+
+def test_diff_of_large_firmwares_takes_under_a_second(tmp_path):
+    # 50000 symbols, about one in ten changed, and 50 MiB of debug sections
+    old_symbols = synthetic_symbols(50000)
+    generator = random.Random(1)
+    new_symbols = [
+        (name, section, max(1, size + generator.randint(-8, 64)) if generator.random() < 0.1 else size)
+        for name, section, size in old_symbols
+    ]
+    old_path, new_path = str(tmp_path / "old.elf"), str(tmp_path / "new.elf")
+    write_synthetic_elf(old_path, 50 << 20, text_size=0x800000, data_size=0x800000, symbols=old_symbols)
+    write_synthetic_elf(new_path, 50 << 20, text_size=0x800000, data_size=0x800000, symbols=new_symbols)
+    assert best_time(lambda: bloat_diff(old_path, new_path)) < 1.0
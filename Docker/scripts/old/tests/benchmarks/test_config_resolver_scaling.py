@@ -0,0 +1,69 @@
+import json
+import os
+from typing import List
+
+import pytest
+
+from embedded_creator.config_resolver import ConfigResolver
+
+from conftest import best_time
+
+pytestmark = pytest.mark.benchmark
+
+
+def synthetic_board_configs(directory: str, boards: int, families: int = 4) -> List[str]:
+    """
+    Writes 'families' base configs and 'boards' configs extending one of them, returns the board paths.
+    """
+    for family in range(families):
+        base = {
+            "mcu_family": "STM32H7",
+            "debug_configuration": "probe_rs",
+            "config": [
+                {
+                    "core": "cortex-m7",
+                    "arch": "thumbv7em-none-eabihf",
+                    "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+                    "memory": {
+                        "flash": ["0x08000000", f"{1024 + family}K"],
+                        "ram": ["0x20000000", "128K"],
+                        "extra_sections": [{"memory_type": f"itcm_ram_{index}", "origin": f"0x{index:08X}", "length": "1K"} for index in range(64)],
+                    },
+                }
+            ],
+        }
+        with open(os.path.join(directory, f"_family{family}.json"), "w") as file:
+            json.dump(base, file)
+    paths = []
+    for board in range(boards):
+        path = os.path.join(directory, f"board{board}.json")
+        overlay = {
+            "extends": f"_family{board % families}.json",
+            "directories": [f"board{board}"],
+            "config": {"core": "cortex-m7", "memory": {"ram": ["0x20000000", f"{64 + board % 64}K"]}},
+        }
+        with open(path, "w") as file:
+            json.dump(overlay, file)
+        paths.append(path)
+    return paths
+
+
+def test_shared_resolver_parses_every_base_once(tmp_path):
+    paths = synthetic_board_configs(str(tmp_path), 200)
+    resolvers = []
+
+    def load_shared():
+        resolver = ConfigResolver()
+        for path in paths:
+            resolver.load(path)
+        resolvers.append(resolver)
+
+    def load_separately():
+        for path in paths:
+            ConfigResolver().load(path)
+
+    cached = best_time(load_shared)
+    uncached = best_time(load_separately)
+    # 200 boards plus 4 bases
+    assert resolvers[-1].stats["parsed"] == 204
+    assert cached < uncached
@@ -0,0 +1,26 @@
+import pytest
+
+from embedded_creator.config_schema import validate
+
+from conftest import assert_linear, best_time
+
+pytestmark = pytest.mark.benchmark
+
+CORE = {
+    "core": "cortex-m7",
+    "arch": "thumbv7em-none-eabi",
+    "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+    "memory": {
+        "flash": ["0x08000000", "1024K"],
+        "ram": ["0x20000000", "128K"],
+        "extra_sections": [{"memory_type": "itcm_ram", "origin": "0x00000000", "length": "64K"}],
+    },
+}
+
+
+def test_validate_scales_linearly_with_the_cores():
+    timings = {}
+    for count in [1000, 2000, 4000, 8000]:
+        config = {"mcu_family": "STM32H7", "config": [CORE] * count}
+        timings[count] = best_time(lambda: validate(config))
+    assert_linear(timings)
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from embedded_creator.daemon_client import send_request
+
+from conftest import SCRIPTS_DIR, best_time
+
+from test_project_creator import M4_CORE, M7_CORE
+
+pytestmark = pytest.mark.benchmark
+
+REPEAT = 5
+
+
+@pytest.mark.parametrize("command", ["validate", "create"])
+def test_forwarded_command_is_faster_than_a_fresh_process(command, tmp_path, daemon_environment):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"mcu_family": "STM32H7", "config": [M4_CORE, M7_CORE]}))
+    script = os.path.join(SCRIPTS_DIR, "create_project.py")
+    args = {"validate": [sys.executable, script, "validate", str(config_path)], "create": [sys.executable, script, "bench", str(config_path)]}[command]
+
+    def run(environment):
+        # Every create starts from an empty directory
+        def run_once():
+            working_dir = tmp_path / f"run-{time.perf_counter_ns()}"
+            working_dir.mkdir()
+            subprocess.run(args, cwd=working_dir, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+        run_once()
+        return best_time(run_once, repeat=REPEAT)
+
+    local = run({**daemon_environment, "DAEMON_SOCKET": ""})
+    forwarded = run(daemon_environment)
+
+    assert forwarded < local
+    command_stats = send_request({"type": "stats"}, daemon_environment["DAEMON_SOCKET"], timeout=5.0)["commands"][command]
+    assert command_stats["jobs"] == REPEAT + 1
+    assert not command_stats["failed"]
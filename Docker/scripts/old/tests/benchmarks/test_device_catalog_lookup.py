@@ -0,0 +1,22 @@
+import pytest
+
+from embedded_creator.device_catalog import DeviceCatalog
+
+from conftest import best_time
+
+pytestmark = pytest.mark.benchmark
+
+ROUNDS = 10000
+
+
+@pytest.mark.parametrize("query", ["STM32H755ZI", "STM32H755ZIT6", "STM32WL"], ids=["exact", "ordering code", "prefix"])
+def test_lookups_bisect_the_packed_index(query):
+    catalog = DeviceCatalog(overlay_path=None)
+    catalog.resolve(query)
+
+    def lookups():
+        for _ in range(ROUNDS):
+            catalog.resolve(query)
+
+    # A few microseconds each, parsing the records would take orders of magnitude more
+    assert best_time(lookups) / ROUNDS < 50e-6
@@ -0,0 +1,30 @@
+import pytest
+
+from embedded_creator.elf_file import ElfFile
+from embedded_creator.firmware_size import region_usage
+from embedded_creator.memory_map import _region
+
+from conftest import best_time
+from elf_fixtures import write_synthetic_elf
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_region_usage_does_not_read_the_debug_sections(tmp_path):
+    regions = [
+        _region("core", "FLASH", "flash", "flash", "0x08000000", "1024K"),
+        _region("core", "RAM", "ram", "ram", "0x20000000", "128K"),
+    ]
+
+    def measure(path):
+        with ElfFile(path) as elf:
+            region_usage(elf, regions)
+
+    timings = {}
+    for debug_size in [16 << 20, 64 << 20, 256 << 20, 1 << 30]:
+        path = str(tmp_path / f"firmware-{debug_size}")
+        write_synthetic_elf(path, debug_size)
+        timings[debug_size] = best_time(lambda: measure(path), repeat=5)
+    # Only the headers are read, the time must not grow with the size of the file
+    sizes = sorted(timings)
+    assert timings[sizes[-1]] / timings[sizes[0]] < 2
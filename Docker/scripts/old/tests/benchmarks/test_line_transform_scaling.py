@@ -0,0 +1,40 @@
+from typing import List
+
+import pytest
+
+from embedded_creator.memory_map import MemoryRegion
+from embedded_creator.update_memory import memory_x_transformer
+
+from conftest import assert_linear, best_time
+
+pytestmark = pytest.mark.benchmark
+
+
+def synthetic_lines(size: int) -> List[str]:
+    """
+    Builds about 'size' bytes of memory.x-like lines, with a MEMORY block every 50 lines.
+    """
+    block = [
+        "MEMORY\n",
+        "{\n",
+        "  /* TODO Adjust these memory regions to match your device memory layout */\n",
+        "  FLASH : ORIGIN = 0x00000000, LENGTH = 256K\n",
+        "  RAM : ORIGIN = 0x20000000, LENGTH = 64K\n",
+        "}\n",
+    ] + [f"/* filler line {index} of the synthetic file */\n" for index in range(44)]
+    block_size = sum(len(line) for line in block)
+    return block * max(1, size // block_size)
+
+
+def test_memory_x_rules_scale_linearly_with_the_file():
+    regions = [
+        MemoryRegion("core", "FLASH", "flash", "flash", 0x08000000, 0x100000, "0x08000000", "1024K"),
+        MemoryRegion("core", "RAM", "ram", "ram", 0x20000000, 0x20000, "0x20000000", "128K"),
+        MemoryRegion("core", "ITCM_RAM", "extra_sections", "itcm", 0, 0x10000, "0x00000000", "64K"),
+    ]
+    transformer = memory_x_transformer("STM32H7", regions)
+    timings = {}
+    for size in [1 << 20, 2 << 20, 4 << 20, 8 << 20]:
+        lines = synthetic_lines(size)
+        timings[size] = best_time(lambda: transformer.apply(lines))
+    assert_linear(timings)
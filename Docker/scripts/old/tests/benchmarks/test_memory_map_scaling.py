@@ -0,0 +1,37 @@
+import random
+from typing import List
+
+import pytest
+
+from embedded_creator.memory_map import MemoryMap, MemoryRegion
+
+from conftest import assert_linear, best_time
+
+pytestmark = pytest.mark.benchmark
+
+
+def synthetic_regions(count: int, overlap_ratio: float = 0.01, seed: int = 0) -> List[MemoryRegion]:
+    """
+    Builds 'count' word aligned regions laid out back to back, a fraction of them shifted onto their neighbour.
+    """
+    generator = random.Random(seed)
+    regions = []
+    origin = 0x08000000
+    for index in range(count):
+        length = generator.choice([1, 2, 4, 16, 64]) * 1024
+        start = origin - 1024 if index and generator.random() < overlap_ratio else origin
+        regions.append(
+            MemoryRegion(f"core{index // 4}", f"REGION{index % 4}", "extra_sections", f"config[{index // 4}].memory", start, length, hex(start), f"{length // 1024}K")
+        )
+        origin += length
+    generator.shuffle(regions)
+    return regions
+
+
+def test_memory_map_check_is_n_log_n():
+    timings = {}
+    for count in [10000, 20000, 40000, 80000]:
+        regions = synthetic_regions(count)
+        timings[count] = best_time(lambda: MemoryMap(regions).check())
+    # O(n log n) keeps the per-region cost nearly flat, a quadratic check would grow it 8 times
+    assert_linear(timings, tolerance=3)
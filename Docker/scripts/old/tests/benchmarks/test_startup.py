@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR, best_time
+
+from test_project_creator import M4_CORE, M7_CORE
+
+pytestmark = pytest.mark.benchmark
+
+# Seconds 'create_project validate' may take on top of the start of a bare interpreter
+STARTUP_BUDGET = 0.15
+# Modules 'validate' must not import, it only needs the config loader
+STARTUP_FORBIDDEN_MODULES = [
+    "embedded_creator.project_creator",
+    "embedded_creator.template_cache",
+    "embedded_creator.command_runner",
+    "asyncio",
+    "concurrent.futures",
+]
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"mcu_family": "STM32H7", "config": [M4_CORE, M7_CORE]}))
+    return str(path)
+
+
+def test_validate_starts_within_budget(config_path, monkeypatch):
+    # Nothing to forward the command to
+    monkeypatch.setenv("DAEMON_SOCKET", "")
+
+    def run(command):
+        return lambda: subprocess.run(command, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, check=True)
+
+    interpreter = best_time(run([sys.executable, "-c", "pass"]), repeat=5)
+    validate = best_time(run([sys.executable, "-m", "embedded_creator", "validate", config_path]), repeat=5)
+
+    assert validate - interpreter < STARTUP_BUDGET
+
+
+def test_validate_only_imports_the_config_loader(config_path, monkeypatch):
+    monkeypatch.setenv("DAEMON_SOCKET", "")
+    script = "import sys\nfrom embedded_creator.cli import main\nmain(['validate', sys.argv[1]])\nprint('\\n'.join(sys.modules))"
+
+    output = subprocess.run([sys.executable, "-c", script, config_path], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True).stdout
+
+    assert sorted(set(output.splitlines()) & set(STARTUP_FORBIDDEN_MODULES)) == []
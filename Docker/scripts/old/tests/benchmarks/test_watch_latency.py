@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from embedded_creator.constants import NATIVE_RENDERER
+from embedded_creator.file_watcher import file_watcher
+from embedded_creator.toolchain_state import ToolchainState
+from embedded_creator.watch import ProjectWatcher
+
+from test_project_creator import M4_CORE, M7_CORE
+
+pytestmark = pytest.mark.benchmark
+
+# Seconds from saving a config to the affected files being on disk
+WATCH_BUDGET = 0.1
+
+
+def wait_for(path, text, timeout=5.0):
+    start = time.perf_counter()
+    while True:
+        with open(path, "r") as file:
+            if text in file.read():
+                return
+        assert time.perf_counter() - start < timeout, f"{path} was not updated within {timeout} s"
+        time.sleep(0.001)
+
+
+def test_ram_edit_reaches_memory_x_within_budget(tmp_path, template_cache, offline_tools):
+    config_path = tmp_path / "watch.json"
+    config_data = {"mcu_family": "STM32H7", "config": [json.loads(json.dumps(M4_CORE)), M7_CORE]}
+    config_path.write_text(json.dumps(config_data))
+    project_watcher = ProjectWatcher(
+        "watch", str(config_path), template_cache, ToolchainState(str(tmp_path / "toolchain")),
+        destination=str(tmp_path),
+        renderer=NATIVE_RENDERER,
+    )
+    project_watcher.start()
+    memory_x = os.path.join(project_watcher.project_path, "cortex-m4", "memory.x")
+    watcher = file_watcher(project_watcher.sources())
+    updates = []
+    stop = threading.Event()
+    thread = threading.Thread(target=project_watcher.run, args=(watcher, stop, updates.append))
+    thread.start()
+    timings = []
+    try:
+        for index in range(5):
+            length = f"{2 + 2 * index}K"
+            config_data["config"][0]["memory"]["ram"][1] = length
+            start = time.perf_counter()
+            config_path.write_text(json.dumps(config_data))
+            wait_for(memory_x, f"RAM : ORIGIN = 0x10000000, LENGTH = {length}\n")
+            timings.append(time.perf_counter() - start)
+    finally:
+        stop.set()
+        thread.join()
+        watcher.close()
+
+    assert min(timings) < WATCH_BUDGET
+    # Only memory.x of the edited core was regenerated, and never the whole project
+    assert [update.files for update in updates if update.full or update.files != [os.path.join("cortex-m4", "memory.x")]] == []
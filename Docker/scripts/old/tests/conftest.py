@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import time
+from typing import Callable
+
+import pytest
+
+from embedded_creator.template_cache import TemplateCache
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(TESTS_DIR)
+# Local stand-in of the cortex-m-quickstart repository, shared with benchmark.py
+QUICKSTART_FIXTURE = os.path.join(SCRIPTS_DIR, "benchmark_fixtures", "quickstart")
+GOLDEN_DIR = os.path.join(TESTS_DIR, "golden")
+FAKE_BIN_DIR = os.path.join(SCRIPTS_DIR, "benchmark_fixtures", "bin")
+# Worker processes of the daemons started by the tests
+DAEMON_WORKERS = 2
+
+
+def best_time(function: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Best wall time of 'function' over 'repeat' runs, in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def assert_linear(timings: dict, tolerance: float = 2.0) -> None:
+    """
+    Checks the per-item cost of 'timings' (size -> seconds) stays flat between the smallest and largest size.
+    """
+    sizes = sorted(timings)
+    ratio = (timings[sizes[-1]] / sizes[-1]) / (timings[sizes[0]] / sizes[0])
+    assert ratio < tolerance, f"per-item cost grew {ratio:.2f}x from {sizes[0]} to {sizes[-1]}"
+
+
+@pytest.fixture
+def author_environment(monkeypatch, tmp_path):
+    # The rendered 'authors' come from the environment, pin them and keep ~/.gitconfig out of the way
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("CARGO_NAME", "Golden Author")
+    monkeypatch.setenv("CARGO_EMAIL", "golden@example.com")
+
+
+@pytest.fixture
+def template_cache(tmp_path) -> TemplateCache:
+    """
+    Template store seeded from the quickstart fixture, nothing is fetched.
+    """
+    cache = TemplateCache(cache_dir=str(tmp_path / "templates"), offline=True)
+    cache.refresh(seed=QUICKSTART_FIXTURE)
+    return cache
+
+
+@pytest.fixture
+def offline_tools(monkeypatch, tmp_path, author_environment):
+    """
+    cargo, rustup and rustc resolve to the instant stand-ins of 'benchmark_fixtures/bin'.
+    """
+    monkeypatch.setenv("PATH", FAKE_BIN_DIR + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("BENCHMARK_TOOL_LATENCY", "0")
+    monkeypatch.setenv("FAKE_RUSTUP_STATE", str(tmp_path / "rustup-targets"))
+    monkeypatch.setenv("RUSTUP_HOME", str(tmp_path / "rustup"))
+    monkeypatch.setenv("RUSTUP_TOOLCHAIN", "tests")
+
+
+@pytest.fixture
+def daemon_environment(tmp_path, template_cache, offline_tools, monkeypatch):
+    """
+    Environment of the clients of a 'create_project daemon' started on a socket of the test directory.
+    """
+    monkeypatch.setenv("DAEMON_SOCKET", str(tmp_path / "daemon.sock"))
+    monkeypatch.setenv("TEMPLATE_CACHE_DIR", template_cache.cache_dir)
+    monkeypatch.setenv("TOOLCHAIN_STATE_DIR", str(tmp_path / "toolchain"))
+    monkeypatch.setenv("CORE_CACHE_DIR", str(tmp_path / "cores"))
+    environment = dict(os.environ)
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "embedded_creator", "daemon", "start", "--workers", str(DAEMON_WORKERS)],
+        cwd=SCRIPTS_DIR,
+        env=environment,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        start = time.perf_counter()
+        while not os.path.exists(environment["DAEMON_SOCKET"]):
+            assert daemon.poll() is None and time.perf_counter() - start < 30, "the daemon did not start listening within 30 s"
+            time.sleep(0.01)
+        yield environment
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=30)
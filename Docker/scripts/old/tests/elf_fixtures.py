@@ -0,0 +1,72 @@
+import struct
+from typing import List, Optional, Tuple
+
+from embedded_creator.elf_file import ELF_CLASS_32, ELF_DATA_LSB, ELF_MAGIC, PT_LOAD, SHF_ALLOC, SHT_NOBITS, SHT_SYMTAB
+
+
+def write_synthetic_elf(
+    path: str,
+    debug_size: int,
+    text_size: Optional[int] = 0x4000,
+    data_size: Optional[int] = 0x400,
+    flash: Optional[int] = 0x08000000,
+    ram: Optional[int] = 0x20000000,
+    symbols: Optional[List[Tuple[str, str, int]]] = None,
+) -> None:
+    """
+    Writes a 32-bit little endian Cortex-M like ELF file: .vector_table and .text in flash, .data run
+    from RAM and loaded from flash, .bss, and a sparse .debug_info of 'debug_size' bytes.
+    'symbols' adds a .symtab of (name, section name, size) functions and objects, laid out one after
+    the other in their section.
+    """
+    names = [b"", b".vector_table", b".text", b".data", b".bss", b".debug_info", b".shstrtab", b".symtab", b".strtab"]
+    names_table = b"\0".join(names) + b"\0"
+    name_offsets = [names_table.index(name + b"\0") if name else 0 for name in names]
+
+    header_size, segment_size, section_size, symbol_size = 52, 32, 40, 16
+    vector_offset = header_size + 2 * segment_size
+    text_offset = vector_offset + 0x400
+    data_offset = text_offset + text_size
+    debug_offset = data_offset + data_size
+    names_offset = debug_offset + debug_size
+    data_load_address = flash + 0x400 + text_size
+    section_addresses = {".vector_table": flash, ".text": flash + 0x400, ".data": ram, ".bss": ram + data_size}
+
+    symbol_names = bytearray(b"\0")
+    symbol_entries = [bytes(symbol_size)]
+    next_address = dict(section_addresses)
+    for name, section_name, size in symbols or []:
+        address = next_address[section_name]
+        next_address[section_name] += size
+        kind = 2 if section_name in (".vector_table", ".text") else 1
+        symbol_entries.append(
+            struct.pack("<IIIBBH", len(symbol_names), address, size, 0x10 | kind, 0, names.index(section_name.encode()))
+        )
+        symbol_names += name.encode() + b"\0"
+    symbols_offset = names_offset + len(names_table)
+    symbol_names_offset = symbols_offset + symbol_size * len(symbol_entries)
+    sections_offset = symbol_names_offset + len(symbol_names)
+
+    # type, flags, address, offset, size, link, alignment, entry size
+    sections = [
+        (0, 0, 0, 0, 0, 0, 0, 0),
+        (1, SHF_ALLOC, flash, vector_offset, 0x400, 0, 4, 0),
+        (1, SHF_ALLOC | 0x4, flash + 0x400, text_offset, text_size, 0, 4, 0),
+        (1, SHF_ALLOC | 0x1, ram, data_offset, data_size, 0, 4, 0),
+        (SHT_NOBITS, SHF_ALLOC | 0x1, ram + data_size, debug_offset, 0x800, 0, 4, 0),
+        (1, 0, 0, debug_offset, debug_size, 0, 1, 0),
+        (3, 0, 0, names_offset, len(names_table), 0, 1, 0),
+        (SHT_SYMTAB, 0, 0, symbols_offset, symbol_size * len(symbol_entries), 8, 4, symbol_size),
+        (3, 0, 0, symbol_names_offset, len(symbol_names), 0, 1, 0),
+    ]
+    with open(path, "wb") as file:
+        ident = ELF_MAGIC + bytes([ELF_CLASS_32, ELF_DATA_LSB, 1]) + bytes(9)
+        file.write(ident + struct.pack("<HHIIIIIHHHHHH", 2, 40, 1, flash, header_size, sections_offset, 0x5000400, header_size, segment_size, 2, section_size, len(sections), 6))
+        file.write(struct.pack("<IIIIIIII", PT_LOAD, vector_offset, flash, flash, 0x400 + text_size, 0x400 + text_size, 5, 4))
+        file.write(struct.pack("<IIIIIIII", PT_LOAD, data_offset, ram, data_load_address, data_size, data_size + 0x800, 6, 4))
+        file.seek(names_offset)
+        file.write(names_table)
+        file.write(b"".join(symbol_entries))
+        file.write(symbol_names)
+        for name_offset, (kind, flags, address, offset, size, link, align, entry_size) in zip(name_offsets, sections):
+            file.write(struct.pack("<IIIIIIIIII", name_offset, kind, flags, address, offset, size, link, 1 if kind == SHT_SYMTAB else 0, align, entry_size))
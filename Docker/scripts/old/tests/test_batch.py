@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from embedded_creator.batch import batch_cache_stats, iter_manifest, print_summary, run_batch
+from embedded_creator.commands.batch import batch
+
+from test_project_creator import M4_CORE
+
+CONFIG = {"mcu_family": "STM32H7", "config": [M4_CORE]}
+
+
+def write_manifest(tmp_path, lines):
+    manifest = tmp_path / "boards.jsonl"
+    manifest.write_text("".join(line + "\n" for line in lines))
+    return manifest
+
+
+def test_bad_manifest_line_fails_only_its_own_project(tmp_path, template_cache, offline_tools):
+    manifest = write_manifest(
+        tmp_path,
+        [
+            json.dumps({"project_name": "first", "config": CONFIG}),
+            '{"project_name": "broken", "config": ',
+            json.dumps({"project_name": "second", "config": CONFIG}),
+        ],
+    )
+    results = run_batch(
+        str(manifest),
+        destination=str(tmp_path / "out"),
+        cache_dir=template_cache.cache_dir,
+        toolchain_state_dir=str(tmp_path / "toolchain"),
+        workers=2,
+        use_core_cache=False,
+    )
+
+    outcomes = {result.project_name: result.success for result in results}
+    assert outcomes == {"<line 2>": False, "first": True, "second": True}
+    assert "invalid manifest entry" in next(result.error for result in results if not result.success)
+    assert (tmp_path / "out" / "first" / "cortex-m4" / "memory.x").is_file()
+    assert (tmp_path / "out" / "second" / "cortex-m4" / "memory.x").is_file()
+
+
+def test_directory_manifest_skips_bases(tmp_path):
+    (tmp_path / "_base.json").write_text(json.dumps(CONFIG))
+    (tmp_path / "board.yaml").write_text("extends: _base.json\n")
+    (tmp_path / "other.json").write_text(json.dumps(CONFIG))
+    (tmp_path / "notes.txt").write_text("not a config\n")
+
+    entries = list(iter_manifest(str(tmp_path)))
+
+    assert entries == [("board", str(tmp_path / "board.yaml")), ("other", str(tmp_path / "other.json"))]
+
+
+def test_batch_command_exits_non_zero_when_a_project_fails(tmp_path, template_cache, offline_tools, capsys):
+    manifest = write_manifest(
+        tmp_path,
+        [
+            json.dumps({"project_name": "good", "config": CONFIG}),
+            json.dumps({"project_name": "bad", "config": {"mcu_family": "STM32H7", "config": [dict(M4_CORE, arch="x86")]}}),
+        ],
+    )
+    summary = tmp_path / "summary.json"
+    with pytest.raises(SystemExit) as exit_info:
+        batch(
+            [
+                str(manifest),
+                "--output", str(tmp_path / "out"),
+                "--template-cache", template_cache.cache_dir,
+                "--toolchain-state", str(tmp_path / "toolchain"),
+                "--no-core-cache",
+                "--workers", "1",
+                "--summary-json", str(summary),
+            ]
+        )
+
+    assert exit_info.value.code == 1
+    assert {entry["project_name"]: entry["success"] for entry in json.loads(summary.read_text())} == {"bad": False, "good": True}
+    assert "1 succeeded, 1 failed" in capsys.readouterr().out
+
+
+def test_cache_stats_are_the_ones_of_the_batch(tmp_path, template_cache, offline_tools, capsys):
+    manifest = write_manifest(tmp_path, [json.dumps({"project_name": name, "config": CONFIG}) for name in ("first", "second")])
+    run = lambda destination: run_batch(
+        str(manifest),
+        destination=str(tmp_path / destination),
+        cache_dir=template_cache.cache_dir,
+        toolchain_state_dir=str(tmp_path / "toolchain"),
+        workers=1,
+        core_cache_dir=str(tmp_path / "cores"),
+    )
+    run("warm")
+
+    results = run("out")
+    print_summary(results, 0.0)
+
+    # Only the second batch is counted, not the totals of the shared stores on disk
+    assert batch_cache_stats(results) == {"template_hits": 2, "template_misses": 0, "core_hits": 2, "core_misses": 0}
+    assert results[0].serialize()["caches"] == {"template_hits": 1, "template_misses": 0, "core_hits": 1, "core_misses": 0}
+    assert "Template cache: 2 hits, 0 misses; core cache: 2 cores restored, 0 generated" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+from embedded_creator.bloat_diff import diff_symbol_sizes, render_bloat_diff
+
+OLD = {
+    (".text", "core::fmt::write"): 400,
+    (".text", "firmware::main"): 100,
+    (".text", "firmware::init"): 50,
+    (".text", "cortex_m::asm::delay"): 20,
+    (".bss", "firmware::BUFFER"): 1024,
+    (".text", "main"): 8,
+}
+NEW = {
+    (".text", "core::fmt::write"): 300,
+    (".text", "firmware::main"): 160,
+    (".text", "firmware::init"): 110,
+    (".text", "firmware::radio"): 200,
+    (".bss", "firmware::BUFFER"): 1024,
+    (".text", "main"): 8,
+}
+
+
+def diff():
+    return diff_symbol_sizes("old.elf", "new.elf", OLD, NEW)
+
+
+def test_only_changed_symbols_are_listed():
+    names = sorted(symbol.name for symbol in diff().symbols)
+    assert names == ["core::fmt::write", "cortex_m::asm::delay", "firmware::init", "firmware::main", "firmware::radio"]
+
+
+def test_growth_and_shrink_are_ordered_by_delta_then_name():
+    growth, shrink = diff().top(".text")
+    assert [(symbol.name, symbol.delta) for symbol in growth] == [
+        ("firmware::radio", 200),
+        ("firmware::init", 60),
+        ("firmware::main", 60),
+    ]
+    assert [(symbol.name, symbol.delta) for symbol in shrink] == [("core::fmt::write", -100), ("cortex_m::asm::delay", -20)]
+    growth, shrink = diff().top(".text", count=1)
+    assert [symbol.name for symbol in growth] == ["firmware::radio"]
+    assert [symbol.name for symbol in shrink] == ["core::fmt::write"]
+
+
+def test_totals_per_section_and_crate():
+    result = diff()
+    assert result.sections == {".text": (578, 778), ".bss": (1024, 1024)}
+    assert result.crates == {
+        "core": (400, 300),
+        "firmware": (1174, 1494),
+        "cortex_m": (20, 0),
+        "[Unknown]": (8, 8),
+    }
+    # Crates are listed by the size of their change
+    assert list(result.serialize()["crates"]) == ["firmware", "core", "cortex_m", "[Unknown]"]
+
+
+def test_render_skips_unchanged_sections_and_crates():
+    rendered = render_bloat_diff(diff())
+    assert ".text: 578 -> 778 (+200)" in rendered
+    assert ".bss" not in rendered
+    assert "[Unknown]" not in rendered
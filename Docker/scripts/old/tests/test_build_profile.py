@@ -0,0 +1,113 @@
+import pytest
+
+from embedded_creator.cargo_workspace import DEFAULT_WORKSPACE_PROFILES
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.config_schema import ConfigValidationError
+from embedded_creator.project_types import BuildProfile
+from embedded_creator.staged_tree import StagedTree
+from embedded_creator.update_build_profile import (
+    update_build_profile,
+    update_profile_lines,
+    update_unstable_lines,
+    workspace_base_profile,
+    workspace_cargo_config,
+    workspace_profile_lines,
+)
+
+from test_project_creator import M4_CORE, M7_CORE
+
+SIZE_RELEASE_PROFILE = """\
+[profile.release]
+codegen-units = 1 # better optimizations
+debug = true # symbols are nice and they don't increase the size on Flash
+lto = "fat" # better optimizations
+opt-level = "z"
+panic = "abort"
+"""
+
+
+def project(profile=None, m4_profile=None, m7_profile=None, workspace=None):
+    cores = [dict(M4_CORE, profile=m4_profile), dict(M7_CORE, profile=m7_profile)]
+    return build_project_config({"mcu_family": "STM32H7", "workspace": workspace, "profile": profile, "config": cores})
+
+
+def test_preset_expands_under_the_keys_set_with_it():
+    assert BuildProfile(preset="speed", lto="thin").resolved().settings() == {
+        "preset": "speed",
+        "opt_level": 3,
+        "lto": "thin",
+        "codegen_units": 1,
+        "debug": True,
+        "panic": "abort",
+    }
+    assert BuildProfile(opt_level="s").resolved() == BuildProfile(opt_level="s")
+
+
+def test_core_profile_refines_the_project_profile():
+    project_config = project(profile={"preset": "size"}, m7_profile={"preset": "speed", "debug": False}, m4_profile={"panic": "unwind"})
+    m4, m7 = project_config.config
+
+    assert project_config.core_profile(m4).settings() == {
+        "preset": "size", "opt_level": "z", "lto": "fat", "codegen_units": 1, "debug": True, "panic": "unwind"
+    }
+    # The core preset is expanded before being merged, so each of its values wins over the project ones
+    assert project_config.core_profile(m7).settings() == {
+        "preset": "speed", "opt_level": 3, "lto": "fat", "codegen_units": 1, "debug": False, "panic": "abort"
+    }
+    without_profiles = project()
+    assert without_profiles.core_profile(without_profiles.config[0]) is None
+
+
+def test_release_profile_keeps_the_template_comments_and_adds_the_missing_keys():
+    assert "".join(update_profile_lines(DEFAULT_WORKSPACE_PROFILES, BuildProfile(preset="size"))) == SIZE_RELEASE_PROFILE
+
+
+def test_release_profile_is_appended_when_the_manifest_has_none():
+    lines = ["[package]\n", 'name = "core"\n']
+    assert "".join(update_profile_lines(lines, BuildProfile(opt_level="s"))) == '[package]\nname = "core"\n\n[profile.release]\nopt-level = "s"\n'
+    assert update_profile_lines(lines, None) == lines
+
+
+def test_build_std_goes_to_the_unstable_table():
+    lines = ["[build]\n", 'target = "thumbv7em-none-eabihf"\n', "\n"]
+    profile = BuildProfile(build_std=["core", "alloc"], build_std_features=["panic_immediate_abort"])
+    assert "".join(update_unstable_lines(lines, profile)) == (
+        '[build]\ntarget = "thumbv7em-none-eabihf"\n\n[unstable]\nbuild-std = ["core", "alloc"]\nbuild-std-features = ["panic_immediate_abort"]\n'
+    )
+
+
+def test_update_build_profile_writes_both_files_of_a_core(tmp_path):
+    tree = StagedTree(str(tmp_path))
+    tree.write_text(str(tmp_path / "Cargo.toml"), "".join(DEFAULT_WORKSPACE_PROFILES))
+    tree.write_text(str(tmp_path / ".cargo" / "config.toml"), "[build]\n")
+
+    update_build_profile(str(tmp_path), BuildProfile(preset="size", build_std=["core"]), tree=tree)
+
+    assert tree.read_text(str(tmp_path / "Cargo.toml")) == SIZE_RELEASE_PROFILE
+    assert tree.read_text(str(tmp_path / ".cargo" / "config.toml")) == '[build]\n\n[unstable]\nbuild-std = ["core"]\n'
+
+
+def test_workspace_rejects_cores_with_conflicting_whole_build_settings():
+    with pytest.raises(ConfigValidationError, match="profile.lto must be the same for every core of a workspace, got: 'fat', 'thin'"):
+        project(profile={"preset": "size"}, m4_profile={"lto": "thin"}, workspace=True)
+    with pytest.raises(ConfigValidationError, match="profile.build_std must be the same"):
+        project(m7_profile={"build_std": ["core"]}, workspace=True)
+    # Only separate projects may differ there
+    project(profile={"preset": "size"}, m4_profile={"lto": "thin"})
+
+
+def test_workspace_profiles_override_the_per_package_settings_only():
+    project_config = project(profile={"preset": "size", "build_std": ["core"]}, m7_profile={"opt_level": 3, "debug": False}, workspace=True)
+    core_profiles = {config.core: project_config.core_profile(config) for config in project_config.config}
+    base = workspace_base_profile(project_config.profile, list(core_profiles.values()))
+
+    assert "".join(workspace_profile_lines(DEFAULT_WORKSPACE_PROFILES, base, core_profiles)) == (
+        SIZE_RELEASE_PROFILE + "\n[profile.release.package.cortex-m7]\nopt-level = 3\ndebug = false\n"
+    )
+    target_table = (
+        "[target.'cfg(all(target_arch = \"arm\", target_os = \"none\"))']\n"
+        'runner = "gdb-multiarch -q -x openocd.gdb"\n'
+        'rustflags = ["-C", "link-arg=-Tlink.x"]\n'
+    )
+    assert workspace_cargo_config(base, "gdb-multiarch") == target_table + '\n[unstable]\nbuild-std = ["core"]\n'
+    assert workspace_cargo_config(BuildProfile(preset="size"), "gdb-multiarch") == target_table
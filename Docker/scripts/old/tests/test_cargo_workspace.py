@@ -0,0 +1,102 @@
+from embedded_creator.cargo_workspace import (
+    DEFAULT_WORKSPACE_PROFILES,
+    template_profiles,
+    update_member_cargo_toml_lines,
+    workspace_cargo_toml,
+)
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.create_makefile import workspace_makefile
+from embedded_creator.project_creator import project_creator
+from embedded_creator.toolchain_state import ToolchainState
+
+from conftest import QUICKSTART_FIXTURE
+from test_project_creator import M4_CORE, M7_CORE
+
+MEMBER_MANIFEST = """\
+[package]
+name = "cortex-m4"
+version = "0.1.0"
+
+[profile.release]
+codegen-units = 1
+lto = true
+
+[profile.dev.package."*"]
+opt-level = "s"
+
+[dependencies]
+cortex-m = "0.7"
+
+[profile.dev]
+debug = true
+
+"""
+
+
+def test_member_manifest_loses_every_profile_table():
+    lines = update_member_cargo_toml_lines(MEMBER_MANIFEST.splitlines(keepends=True))
+
+    assert "".join(lines) == '[package]\nname = "cortex-m4"\nversion = "0.1.0"\n\n[dependencies]\ncortex-m = "0.7"\n'
+
+
+def test_template_profiles_come_from_the_template_manifest():
+    assert template_profiles(QUICKSTART_FIXTURE) == DEFAULT_WORKSPACE_PROFILES
+    assert template_profiles(None) == DEFAULT_WORKSPACE_PROFILES
+
+
+def test_root_manifest_lists_the_members_and_the_profiles():
+    assert workspace_cargo_toml(["cortex-m4", "cortex-m7"], ["[profile.release]\n", "lto = true"]) == (
+        "[workspace]\n"
+        'resolver = "2"\n'
+        "members = [\n"
+        '    "cortex-m4",\n'
+        '    "cortex-m7",\n'
+        "]\n"
+        "\n"
+        "[profile.release]\n"
+        "lto = true\n"
+    )
+
+
+def test_workspace_makefile_builds_each_triple_once():
+    makefile = workspace_makefile(
+        {"cortex-m4": "thumbv7em-none-eabi", "cortex-m7": "thumbv7em-none-eabihf", "cortex-m0": "thumbv7em-none-eabi"}
+    )
+
+    assert makefile.variables["CARGO"].render() == "CARGO ?= cargo\n"
+    assert makefile.variables["SUBDIRS"].render() == "SUBDIRS := cortex-m4 cortex-m7 cortex-m0\n"
+    assert makefile.rules["build"].recipe == [
+        "$(CARGO) build --target thumbv7em-none-eabi -p cortex-m4 -p cortex-m0",
+        "$(CARGO) build --target thumbv7em-none-eabihf -p cortex-m7",
+    ]
+    assert makefile.rules["clean"].recipe == ["$(CARGO) clean"]
+    assert makefile.rules["clean-cortex-m7"].recipe == ["$(CARGO) clean --target thumbv7em-none-eabihf -p cortex-m7"]
+    assert makefile.rules["all-cortex-m0"].recipe == ["$(MAKE) clean-cortex-m0", "$(MAKE) build-cortex-m0"]
+    assert makefile.phony_targets == list(makefile.rules)
+
+
+def test_workspace_project(tmp_path, template_cache, offline_tools):
+    m7_core = dict(M7_CORE, arch="thumbv7em-none-eabihf")
+    project_config = build_project_config({"mcu_family": "STM32H7", "workspace": True, "config": [M4_CORE, m7_core]})
+    project_creator(
+        "project",
+        project_config,
+        template_cache=template_cache,
+        destination=str(tmp_path),
+        toolchain_state=ToolchainState(str(tmp_path / "toolchain")),
+    )
+    project = tmp_path / "project"
+
+    assert (project / "Cargo.toml").read_text() == workspace_cargo_toml(["cortex-m4", "cortex-m7"], DEFAULT_WORKSPACE_PROFILES)
+    assert (project / "Makefile").read_text() == workspace_makefile(
+        {"cortex-m4": "thumbv7em-none-eabi", "cortex-m7": "thumbv7em-none-eabihf"}
+    ).render()
+    for core_name in ["cortex-m4", "cortex-m7"]:
+        member_manifest = (project / core_name / "Cargo.toml").read_text()
+        assert "[profile." not in member_manifest
+        assert f'name = "{core_name}"' in member_manifest
+        assert "\tcargo clean -p " + core_name + "\n" in (project / core_name / "Makefile").read_text()
+    # cargo does not read the .cargo/config.toml of the members when it runs from the root
+    root_config = (project / ".cargo" / "config.toml").read_text()
+    assert 'rustflags = ["-C", "link-arg=-Tlink.x"]' in root_config
+    assert 'runner = "gdb-multiarch -q -x openocd.gdb"' in root_config
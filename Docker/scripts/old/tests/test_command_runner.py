@@ -0,0 +1,42 @@
+import pytest
+
+from embedded_creator.command_runner import CommandError, CommandResult, CommandTimeout, is_transient_failure
+
+
+def failure(stderr: str) -> CommandError:
+    return CommandError("failed", CommandResult(["git", "fetch"], 128, "", stderr))
+
+
+@pytest.mark.parametrize(
+    "stderr",
+    [
+        "fatal: unable to access 'https://github.com/rust-embedded/cortex-m-quickstart/': Could not resolve host: github.com",
+        "fatal: unable to access 'https://github.com/x/y/': Failed to connect to github.com port 443: Connection refused",
+        "fatal: unable to access 'https://github.com/x/y/': The requested URL returned error: 503",
+        "error: RPC failed; curl 56 GnuTLS recv error (-9)\nfatal: early EOF",
+        "error: could not download file: http request returned an unsuccessful status code: 502",
+        "warning: spurious network error (2 tries remaining): [28] Timeout was reached",
+        "ssh: connect to host github.com port 22: Connection timed out",
+        "fatal: unable to access 'https://github.com/x/y/': Temporary failure in name resolution",
+    ],
+)
+def test_network_failures_are_transient(stderr):
+    assert is_transient_failure(failure(stderr))
+
+
+@pytest.mark.parametrize(
+    "stderr",
+    [
+        "fatal: unable to access 'https://github.com/x/y/': The requested URL returned error: 403",
+        "fatal: unable to access 'https://github.com/x/y/': The requested URL returned error: 404",
+        "remote: Repository not found.\nfatal: repository 'https://github.com/x/repo-500/' not found",
+        "error: toolchain 'nightly' does not contain component 'rust-std' for target 'thumbv9-none-eabi'",
+        "Error: template 'cortex-m-quickstart' has no variable 'mcu'",
+    ],
+)
+def test_other_failures_are_permanent(stderr):
+    assert not is_transient_failure(failure(stderr))
+
+
+def test_timeouts_are_transient():
+    assert is_transient_failure(CommandTimeout("cargo generate timed out"))
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from embedded_creator.config_resolver import ConfigResolver, deep_merge, parse_config_text
+from embedded_creator.config_schema import ConfigValidationError
+
+
+def test_deep_merge_merges_objects_key_by_key():
+    base = {"mcu_family": "STM32H7", "openocd": {"interface": "stlink", "target": "stm32h7x"}}
+    overlay = {"openocd": {"target": "stm32h7x_dual_bank"}}
+
+    merged = deep_merge(base, overlay)
+
+    assert merged == {"mcu_family": "STM32H7", "openocd": {"interface": "stlink", "target": "stm32h7x_dual_bank"}}
+    # Neither argument is modified
+    assert base["openocd"]["target"] == "stm32h7x"
+
+
+def test_deep_merge_null_removes_the_key():
+    merged = deep_merge({"mcu_family": "STM32H7", "openocd": {"interface": "stlink"}}, {"openocd": None, "missing": None})
+
+    assert merged == {"mcu_family": "STM32H7"}
+
+
+def test_deep_merge_merges_cores_by_name():
+    base = {"config": [{"core": "cortex-m7", "memory": {"flash": "1M"}}, {"core": "cortex-m4", "arch": "thumbv7em-none-eabihf"}]}
+    overlay = {"config": [{"core": "cortex-m7", "memory": {"ram": "512K"}}, {"core": "cortex-m0", "arch": "thumbv6m-none-eabi"}]}
+
+    merged = deep_merge(base, overlay)
+
+    assert merged["config"] == [
+        {"core": "cortex-m7", "memory": {"flash": "1M", "ram": "512K"}},
+        {"core": "cortex-m4", "arch": "thumbv7em-none-eabihf"},
+        {"core": "cortex-m0", "arch": "thumbv6m-none-eabi"},
+    ]
+
+
+def test_deep_merge_merges_a_single_core_into_a_list():
+    merged = deep_merge({"config": [{"core": "cortex-m4", "memory": {"flash": "1M"}}]}, {"config": {"core": "cortex-m4", "memory": {"flash": "2M"}}})
+
+    assert merged["config"] == [{"core": "cortex-m4", "memory": {"flash": "2M"}}]
+
+
+def test_extends_chain_is_resolved_relative_to_each_file(tmp_path):
+    (tmp_path / "bases").mkdir()
+    (tmp_path / "bases" / "family.json").write_text(json.dumps({"mcu_family": "STM32H7", "openocd": {"interface": "stlink"}}))
+    (tmp_path / "bases" / "board.json").write_text(json.dumps({"extends": "family.json", "openocd": {"target": "stm32h7x"}}))
+    (tmp_path / "project.json").write_text(json.dumps({"extends": "bases/board.json", "mcu": "STM32H743ZI"}))
+
+    config_data = ConfigResolver().load(str(tmp_path / "project.json"))
+
+    assert config_data == {"mcu_family": "STM32H7", "openocd": {"interface": "stlink", "target": "stm32h7x"}, "mcu": "STM32H743ZI"}
+
+
+def test_extends_cycle_raises(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps({"extends": "b.json"}))
+    (tmp_path / "b.json").write_text(json.dumps({"extends": "a.json"}))
+
+    with pytest.raises(ConfigValidationError) as error_info:
+        ConfigResolver().load(str(tmp_path / "a.json"))
+
+    assert "cycle" in str(error_info.value.errors[0])
+
+
+def test_yaml_and_toml_configs_parse_alike(tmp_path):
+    yaml_text = "mcu_family: STM32H7\nconfig:\n  - core: cortex-m7\n    memory:\n      flash: 1M\n"
+    toml_text = 'mcu_family = "STM32H7"\n\n[[config]]\ncore = "cortex-m7"\n\n[config.memory]\nflash = "1M"\n'
+    expected = {"mcu_family": "STM32H7", "config": [{"core": "cortex-m7", "memory": {"flash": "1M"}}]}
+
+    assert parse_config_text(yaml_text, "board.yaml") == expected
+    assert parse_config_text(toml_text, "board.toml") == expected
+
+
+def test_malformed_and_non_mapping_configs_raise():
+    with pytest.raises(ConfigValidationError):
+        parse_config_text('mcu_family = "STM32H7', "board.toml")
+    with pytest.raises(ConfigValidationError):
+        parse_config_text("- cortex-m7\n", "board.yaml")
+
+
+def test_changed_base_is_read_again(tmp_path):
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps({"mcu_family": "STM32H7"}))
+    (tmp_path / "board.json").write_text(json.dumps({"extends": "base.json", "mcu": "STM32H743ZI"}))
+    resolver = ConfigResolver()
+
+    assert resolver.load(str(tmp_path / "board.json"))["mcu_family"] == "STM32H7"
+    resolver.load(str(tmp_path / "board.json"))
+    assert resolver.stats["parsed"] == 2
+    assert resolver.stats["hits"] >= 1
+
+    base.write_text(json.dumps({"mcu_family": "STM32F4"}))
+    # Same size, the new mtime alone must invalidate the cached digest
+    stat = os.stat(base)
+    os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert resolver.load(str(tmp_path / "board.json"))["mcu_family"] == "STM32F4"
+    assert resolver.stats["parsed"] == 3
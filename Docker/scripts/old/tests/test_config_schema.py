@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+from embedded_creator.commands.validate import validate_configs
+from embedded_creator.config_schema import PROJECT_CONFIG_VALIDATOR, SchemaNode, ValidationError, validate
+
+M4_CORE = {
+    "core": "cortex-m4",
+    "arch": "thumbv7em-none-eabihf",
+    "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+    "memory": {"flash": ["0x08100000", "1024K"], "ram": ["0x30000000", "288K"]},
+}
+
+
+def messages(errors):
+    return [str(error) for error in errors]
+
+
+def test_valid_config_has_no_errors():
+    assert validate({"mcu_family": "STM32H7", "config": [M4_CORE]}) == []
+
+
+@pytest.mark.parametrize("length, valid", [("1M", True), ("2M", True), ("2K", True), ("1024k", True), ("1K", False), ("3K", False)])
+def test_memory_size_must_be_a_multiple_of_2k(length, valid):
+    core = dict(M4_CORE, memory={"flash": ["0x08100000", length], "ram": M4_CORE["memory"]["ram"]})
+    assert (validate({"mcu_family": "STM32H7", "config": [core]}) == []) == valid
+
+
+def test_every_mistake_is_reported_with_its_path():
+    config = {
+        "mcu_family": 7,
+        "workspace": "yes",
+        "directories": ["docs", 3],
+        "config": [
+            M4_CORE,
+            {
+                "core": "cortex-m7",
+                "arch": "thumbv7em-none-eabi",
+                "openocd_cfg": {"interface": "stlink.cfg"},
+                "memory": {
+                    "flash": ["0x8000", "1023K"],
+                    "ram": ["0x20000000"],
+                    "extra_sections": {"memory_type": "itcm", "origin": "0x00000000"},
+                },
+                "profile": {"opt_level": "4", "codegen_units": 0},
+                "unknown": 1,
+            },
+        ],
+    }
+    assert messages(validate(config)) == [
+        "mcu_family: must be of type str, got int",
+        "config[1].memory.flash[0]: must be a hexadecimal number with digits between 6 and 8, got: 0x8000",
+        "config[1].memory.flash[1]: must be a string representing a memory size multiple of 2K followed by one of K, M units, got: 1023K",
+        "config[1].memory.ram: must have exactly 2 elements, got 1",
+        # A single section is checked as the first element of the list it stands for
+        "config[1].memory.extra_sections[0].length: key not set or is empty. Got: None",
+        "config[1].openocd_cfg.target: key not set or is empty. Got: None",
+        'config[1].profile.opt_level: must be one of 0, 1, 2, 3, "s", "z", got: "4"',
+        "config[1].profile.codegen_units: must be at least 1, got: 0",
+        "config[1].unknown: unknown key",
+        "directories[1]: must be of type str, got int",
+        "workspace: must be of type bool, got str",
+    ]
+
+
+def test_unknown_keys_are_reported_with_the_closest_known_key():
+    core = dict(M4_CORE, memroy=M4_CORE["memory"])
+    config = {"mcu_family": "STM32H7", "config": [core], "projectTypo": 1, "worksapce": True}
+    assert messages(validate(config)) == [
+        "config[0].memroy: unknown key, did you mean: memory?",
+        "projectTypo: unknown key",
+        "worksapce: unknown key, did you mean: workspace?",
+    ]
+
+
+def test_missing_required_keys():
+    assert messages(validate({})) == [
+        "mcu_family: key not set or is empty. Got: None",
+        "config: key not set or is empty. Got: None",
+    ]
+
+
+def test_top_level_must_be_an_object():
+    assert validate([]) == [ValidationError(path="", message="must be an object, got list")]
+
+
+def test_schema_key_is_accepted():
+    assert validate({"$schema": "./config.schema.json", "mcu_family": "STM32H7", "config": [M4_CORE]}) == []
+
+
+def test_json_schema_requires_the_top_level_keys_of_standalone_configs_only():
+    schema = PROJECT_CONFIG_VALIDATOR.json_schema()
+    assert schema["type"] == "object"
+    assert schema["required"] == []
+    assert schema["if"] == {"anyOf": [{"required": ["extends"]}, {"required": ["mcu"]}]}
+    assert {"mcu_family", "config"} <= set(schema["else"]["required"])
+    assert set(schema["else"]["properties"]["config"]["oneOf"][0]["required"]) == {"core", "arch", "memory", "openocd_cfg"}
+
+
+def test_json_schema_lets_merged_configs_set_some_keys_only():
+    schema = PROJECT_CONFIG_VALIDATOR.json_schema()
+    core_schema = schema["properties"]["config"]["oneOf"][0]
+    # A catalog config may only override the arch of a core, or the RAM of its memory
+    assert core_schema["required"] == ["core"]
+    assert core_schema["properties"]["memory"]["required"] == []
+    assert {"$schema", "extends", "mcu"} <= set(schema["properties"])
+
+
+def test_json_schema_rejects_additional_properties():
+    schema = PROJECT_CONFIG_VALIDATOR.json_schema()
+    core_schema = schema["properties"]["config"]["oneOf"][0]
+    assert schema["additionalProperties"] is False
+    assert core_schema["additionalProperties"] is False
+    assert core_schema["properties"]["memory"]["additionalProperties"] is False
+
+
+def test_schema_nodes_must_implement_compile_and_json_schema():
+    class Incomplete(SchemaNode):
+        def compile(self):
+            return lambda value, path, errors: None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_validate_command_reports_every_file(tmp_path, capsys):
+    (tmp_path / "bad.json").write_text(json.dumps({"mcu_family": "STM32H7", "config": [dict(M4_CORE, arch=1)]}))
+    (tmp_path / "broken.json").write_text("{")
+    (tmp_path / "good.json").write_text(json.dumps({"$schema": "schema.json", "mcu_family": "STM32H7", "config": [M4_CORE]}))
+    files = [str(tmp_path / name) for name in ("bad.json", "missing.json", "broken.json", "good.json")]
+
+    with pytest.raises(SystemExit) as exit_info:
+        validate_configs(files + ["--json"])
+
+    assert exit_info.value.code == 1
+    report = json.loads(capsys.readouterr().out)
+    assert list(report) == files
+    assert report[files[0]] == [{"path": "config[0].arch", "message": "must be of type str, got int"}]
+    assert report[files[1]] == [{"path": files[1], "message": "the file does not exist"}]
+    assert len(report[files[2]]) == 1 and "is not a valid JSON file" in report[files[2]][0]["message"]
+    assert report[files[3]] == []
@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+from embedded_creator.constants import COPY, REFLINK
+from embedded_creator.core_cache import OBJECT_MODE, CoreCache, core_cache_key, format_size, parse_size
+from embedded_creator.project_lock import content_hash
+from embedded_creator.staged_tree import StagedTree
+
+MEMORY_X = b"MEMORY\n{\n  FLASH : ORIGIN = 0x08000000, LENGTH = 1024K\n}\n"
+SCRIPT = b"#!/bin/sh\nexec cargo build\n"
+
+
+def stage_core(tree: StagedTree, core_name: str, files=None) -> str:
+    core_path = os.path.join(tree.root, core_name)
+    tree.makedirs(os.path.join(core_path, "src"))
+    for relative_path, (content, mode) in (files or {"memory.x": (MEMORY_X, 0o644), "build.sh": (SCRIPT, 0o755)}).items():
+        tree.write_bytes(os.path.join(core_path, relative_path), content, mode)
+    return core_path
+
+
+def restore(core_cache: CoreCache, project: str, key: str) -> bool:
+    tree = StagedTree(project)
+    restored = core_cache.restore({os.path.join(project, "core"): key}, tree)
+    if restored:
+        tree.commit()
+    return bool(restored)
+
+
+@pytest.fixture(params=[REFLINK, COPY])
+def core_cache(request, tmp_path) -> CoreCache:
+    return CoreCache(cache_dir=str(tmp_path / "cores"), materialize=request.param)
+
+
+@pytest.fixture
+def stored(core_cache, tmp_path) -> str:
+    tree = StagedTree(str(tmp_path / "generated"))
+    core_cache.store("key", stage_core(tree, "core"), tree)
+    return "key"
+
+
+def test_restore_recreates_the_files_and_their_modes(core_cache, stored, tmp_path):
+    assert restore(core_cache, str(tmp_path / "project"), stored)
+    core = tmp_path / "project" / "core"
+    assert (core / "memory.x").read_bytes() == MEMORY_X
+    assert (core / "src").is_dir()
+    assert os.stat(core / "memory.x").st_mode & 0o7777 == 0o644
+    assert os.stat(core / "build.sh").st_mode & 0o7777 == 0o755
+    assert core_cache.session_stats == {"hits": 1, "misses": 0}
+
+
+def test_objects_are_named_by_content_and_read_only(core_cache, stored):
+    objects = {name: path for name, path in core_cache._objects()}
+    assert set(objects) == {content_hash(MEMORY_X), content_hash(SCRIPT)}
+    assert all(os.stat(path).st_mode & 0o7777 == OBJECT_MODE for path in objects.values())
+
+
+def test_mode_is_kept_per_file_not_per_object(core_cache, tmp_path):
+    # The same content, executable in one place only, is stored once
+    tree = StagedTree(str(tmp_path / "generated"))
+    core_path = stage_core(tree, "core", {"memory.x": (MEMORY_X, 0o644), "memory.sh": (MEMORY_X, 0o755)})
+    core_cache.store("key", core_path, tree)
+    assert len(list(core_cache._objects())) == 1
+    assert restore(core_cache, str(tmp_path / "project"), "key")
+    core = tmp_path / "project" / "core"
+    assert not os.stat(core / "memory.x").st_mode & 0o111
+    assert os.stat(core / "memory.sh").st_mode & 0o111
+
+
+def test_editing_a_restored_file_does_not_reach_the_cache(core_cache, stored, tmp_path):
+    assert restore(core_cache, str(tmp_path / "first"), stored)
+    with open(tmp_path / "first" / "core" / "memory.x", "ab") as file:
+        file.write(b"/* edited */\n")
+    assert restore(core_cache, str(tmp_path / "second"), stored)
+    assert (tmp_path / "second" / "core" / "memory.x").read_bytes() == MEMORY_X
+
+
+def test_corrupt_objects_drop_the_entry(core_cache, stored, tmp_path):
+    _, path = next((name, path) for name, path in core_cache._objects() if name == content_hash(MEMORY_X))
+    os.chmod(path, 0o644)
+    with open(path, "ab") as file:
+        file.write(b"corrupt")
+    assert not restore(core_cache, str(tmp_path / "project"), stored)
+    assert not (tmp_path / "project").exists()
+    assert core_cache.stats()["entries"] == 0
+    assert core_cache.session_stats == {"hits": 0, "misses": 1}
+
+
+def test_entries_of_another_version_are_not_restored(core_cache, stored, tmp_path):
+    entry_path = core_cache._entry_path(stored)
+    with open(entry_path, "r") as file:
+        entry = json.load(file)
+    entry["version"] -= 1
+    with open(entry_path, "w") as file:
+        json.dump(entry, file)
+    assert not restore(core_cache, str(tmp_path / "project"), stored)
+
+
+def test_prune_evicts_the_least_recently_used_cores(core_cache, tmp_path):
+    tree = StagedTree(str(tmp_path / "generated"))
+    for index, key in enumerate(["old", "middle", "new"]):
+        content = f"core {key}\n".encode() * 100
+        core_cache.store(key, stage_core(tree, key, {"memory.x": (content, 0o644)}), tree)
+        os.utime(core_cache._entry_path(key), (1000 + index, 1000 + index))
+    # Restoring a core makes it the most recently used one
+    assert restore(core_cache, str(tmp_path / "project"), "old")
+
+    evicted, freed = core_cache.prune(max_size=2 * len(b"core middle\n" * 100))
+    assert (evicted, freed) == (1, len(b"core middle\n" * 100))
+    assert sorted(core_cache._entry_keys()) == ["new", "old"]
+    assert core_cache.prune(max_size=0) == (2, len(b"core new\n" * 100) + len(b"core old\n" * 100))
+    assert core_cache.stats()["objects"] == 0
+
+
+def test_store_prunes_beyond_the_size_limit(tmp_path):
+    core_cache = CoreCache(cache_dir=str(tmp_path / "cores"), max_size=len(MEMORY_X) + len(SCRIPT))
+    tree = StagedTree(str(tmp_path / "generated"))
+    core_cache.store("first", stage_core(tree, "first"), tree)
+    os.utime(core_cache._entry_path("first"), (1000, 1000))
+    core_cache.store("second", stage_core(tree, "second", {"memory.x": (b"other\n", 0o644)}), tree)
+    assert core_cache._entry_keys() == ["second"]
+
+
+def test_key_depends_on_the_inputs_and_the_authors():
+    assert core_cache_key("inputs", "Author") == core_cache_key("inputs", "Author")
+    assert core_cache_key("inputs", "Author") != core_cache_key("other", "Author")
+    assert core_cache_key("inputs", "Author") != core_cache_key("inputs", "Someone else")
+
+
+def test_unknown_materialize_method(tmp_path):
+    with pytest.raises(ValueError, match="Unknown materialize method hardlink"):
+        CoreCache(cache_dir=str(tmp_path), materialize="hardlink")
+
+
+@pytest.mark.parametrize("size, expected", [("1048576", 1 << 20), ("512K", 512 << 10), ("1.5M", 3 << 19), ("2GiB", 2 << 30)])
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+def test_parse_size_rejects_other_units():
+    with pytest.raises(ValueError):
+        parse_size("12T")
+
+
+def test_format_size():
+    assert [format_size(size) for size in (512, 1536, 3 << 20)] == ["512 B", "1.5 KiB", "3.0 MiB"]
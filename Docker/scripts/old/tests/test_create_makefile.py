@@ -0,0 +1,87 @@
+import pytest
+
+from embedded_creator.create_makefile import Makefile, core_makefile, project_makefile
+from embedded_creator.staged_tree import StagedTree
+
+CORE_MAKEFILE = """\
+.PHONY: all build clean
+
+all:
+\techo "Cleaning..."
+\t$(MAKE) clean
+\techo "Building all targets"
+\t$(MAKE) build
+
+build:
+\techo 'Building target'
+\tcargo build
+
+clean:
+\techo "Cleaning up"
+\tcargo clean
+"""
+
+PROJECT_MAKEFILE = """\
+SUBDIRS := cortex-m4 cortex-m7
+
+.PHONY: all build clean build-cortex-m4 clean-cortex-m4 all-cortex-m4 build-cortex-m7 clean-cortex-m7 all-cortex-m7
+
+all: all-cortex-m4 all-cortex-m7
+
+build: build-cortex-m4 build-cortex-m7
+
+clean: clean-cortex-m4 clean-cortex-m7
+
+build-cortex-m4:
+\t$(MAKE) -C cortex-m4 build
+
+clean-cortex-m4:
+\t$(MAKE) -C cortex-m4 clean
+
+all-cortex-m4:
+\t$(MAKE) -C cortex-m4 all
+
+build-cortex-m7:
+\t$(MAKE) -C cortex-m7 build
+
+clean-cortex-m7:
+\t$(MAKE) -C cortex-m7 clean
+
+all-cortex-m7:
+\t$(MAKE) -C cortex-m7 all
+"""
+
+
+def test_core_makefile():
+    assert core_makefile().render() == CORE_MAKEFILE
+
+
+def test_core_makefile_of_a_workspace_member_only_cleans_its_package():
+    assert core_makefile("cortex-m4").render() == CORE_MAKEFILE.replace("\tcargo clean\n", "\tcargo clean -p cortex-m4\n")
+
+
+def test_project_makefile():
+    assert project_makefile(["cortex-m4", "cortex-m7"]).render() == PROJECT_MAKEFILE
+
+
+def test_phony_targets_leave_out_file_rules():
+    makefile = Makefile()
+    makefile.add_rule("build", ["memory.x"], ["cargo build"])
+    makefile.add_rule("memory.x", recipe=["cp memory.x.in memory.x"], phony=False)
+
+    assert makefile.phony_targets == ["build"]
+    assert makefile.render().startswith(".PHONY: build\n\nbuild: memory.x\n")
+
+
+def test_duplicate_rule_is_rejected():
+    makefile = core_makefile()
+    with pytest.raises(ValueError, match="'build' is already defined"):
+        makefile.add_rule("build")
+
+
+def test_write_stages_the_rendered_makefile(tmp_path):
+    tree = StagedTree(str(tmp_path))
+    core_makefile().write(str(tmp_path / "cortex-m4"), tree=tree)
+
+    assert tree.read_text(str(tmp_path / "cortex-m4" / "Makefile")) == CORE_MAKEFILE
+    assert not (tmp_path / "cortex-m4").exists()
@@ -0,0 +1,140 @@
+import functools
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from embedded_creator import cli, daemon_client
+from embedded_creator.daemon import Daemon, Job, _Server
+from embedded_creator.daemon_client import BUSY, UNKNOWN_OUTCOME_EXIT_CODE, UNSUPPORTED, forward, send_request
+from embedded_creator.template_renderer import compare_trees
+
+from conftest import SCRIPTS_DIR
+
+from test_project_creator import M4_CORE, M7_CORE
+
+CONFIG = {"mcu_family": "STM32H7", "config": [M4_CORE, M7_CORE]}
+CREATE_PROJECT = os.path.join(SCRIPTS_DIR, "create_project.py")
+
+
+def job_request(command, args, cwd):
+    return {"type": "job", "command": command, "args": args, "cwd": str(cwd), "env": dict(os.environ)}
+
+
+def run_client(args, cwd, environment):
+    completed = subprocess.run([sys.executable, CREATE_PROJECT] + args, cwd=cwd, env=environment, capture_output=True, text=True)
+    # Both runs are compared, each from its own directory. The info logs report how warm the caches were, they differ
+    reported = [line for line in completed.stderr.splitlines() if not line.startswith("INFO")]
+    return completed.returncode, completed.stdout.replace(str(cwd), "<cwd>"), [line.replace(str(cwd), "<cwd>") for line in reported]
+
+
+@pytest.mark.parametrize(
+    "command, args, config",
+    [
+        ("validate", ["validate", "config.json"], CONFIG),
+        ("validate", ["validate", "config.json"], {"mcu_family": "STM32H7", "config": [dict(M4_CORE, arch="x86")]}),
+        ("create", ["project", "config.json"], CONFIG),
+        ("create", ["project", "config.json"], {"mcu_family": "STM32H7", "config": [dict(M4_CORE, arch="x86")]}),
+        ("plan", ["plan", "project", "config.json"], CONFIG),
+    ],
+    ids=["validate", "validate invalid config", "create", "create invalid config", "plan"],
+)
+def test_forwarded_command_matches_a_local_run(tmp_path, daemon_environment, command, args, config):
+    local_dir, forwarded_dir = tmp_path / "local", tmp_path / "forwarded"
+    for directory in (local_dir, forwarded_dir):
+        directory.mkdir()
+        (directory / "config.json").write_text(json.dumps(config))
+
+    local = run_client(args, local_dir, {**daemon_environment, "DAEMON_SOCKET": ""})
+    forwarded = run_client(args, forwarded_dir, daemon_environment)
+
+    assert forwarded == local
+    stats = send_request({"type": "stats"}, daemon_environment["DAEMON_SOCKET"], timeout=5.0)
+    assert stats["commands"][command]["jobs"] == 1
+    if (local_dir / "project").exists():
+        assert compare_trees(str(local_dir / "project"), str(forwarded_dir / "project")) == []
+
+
+@pytest.fixture
+def listening_daemon(tmp_path):
+    """
+    Daemon answering on its socket without any dispatcher: queued jobs are never run.
+    """
+    creator_daemon = Daemon(str(tmp_path / "daemon.sock"), workers=1, queue_size=1, job_timeout=0.2)
+    server = _Server(creator_daemon.socket_path, creator_daemon)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield creator_daemon
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_full_queue_makes_the_client_run_the_command(tmp_path, listening_daemon, monkeypatch, capsys):
+    (tmp_path / "config.json").write_text(json.dumps(CONFIG))
+    monkeypatch.chdir(tmp_path)
+    listening_daemon.jobs.put_nowait(Job(job_request("validate", ["config.json"], tmp_path)))
+
+    assert listening_daemon.handle(job_request("validate", ["config.json"], tmp_path))["status"] == BUSY
+    assert forward("validate", ["config.json"], listening_daemon.socket_path) is None
+    # cli.main falls back to running the command in the calling process
+    monkeypatch.setattr(daemon_client, "forward", functools.partial(forward, socket_path=listening_daemon.socket_path))
+    assert cli.main(["validate", "config.json"]) == 0
+
+    assert listening_daemon.commands["validate"].rejected == 3
+    assert capsys.readouterr().out == "config.json: OK\n"
+
+
+def test_job_no_worker_takes_is_handed_back_after_the_timeout(tmp_path, listening_daemon):
+    reply = listening_daemon.handle(job_request("validate", ["config.json"], tmp_path))
+
+    assert reply["status"] == BUSY
+    # The dispatcher skips the job its client gave up on
+    assert listening_daemon.jobs.get_nowait().cancelled
+
+
+def test_job_running_past_the_timeout_has_an_unknown_outcome(tmp_path, listening_daemon, capsys):
+    def take_the_job():
+        job = listening_daemon.jobs.get()
+        with listening_daemon._lock:
+            job.started = True
+
+    thread = threading.Thread(target=take_the_job)
+    thread.start()
+    exit_code = forward("validate", ["config.json"], listening_daemon.socket_path)
+    thread.join()
+
+    # Not handed back to the client, the job may still run to completion in the daemon
+    assert exit_code == UNKNOWN_OUTCOME_EXIT_CODE
+    assert "did not finish validate within 0 s, it is still running and its outcome is unknown" in capsys.readouterr().err
+
+
+def test_settings_differing_from_the_daemon_are_unsupported(tmp_path):
+    request = job_request("validate", ["config.json"], tmp_path)
+    request["env"]["CORE_CACHE_DIR"] = str(tmp_path / "other-cores")
+
+    reply = Daemon(str(tmp_path / "daemon.sock")).handle(request)
+
+    assert reply["status"] == UNSUPPORTED
+    assert "CORE_CACHE_DIR" in reply["reason"]
+
+
+def test_killed_worker_replaces_the_pool_and_runs_the_job_again(tmp_path, offline_tools, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps(CONFIG))
+    monkeypatch.setenv("TOOLCHAIN_STATE_DIR", str(tmp_path / "toolchain"))
+    creator_daemon = Daemon(str(tmp_path / "daemon.sock"), workers=1)
+    creator_daemon._executor = executor = creator_daemon._new_executor()
+    try:
+        os.kill(executor.submit(os.getpid).result(), signal.SIGKILL)
+
+        reply = creator_daemon._run(job_request("validate", ["config.json"], tmp_path))
+
+        assert reply["exit_code"] == 0, reply["stderr"]
+        assert creator_daemon._executor is not executor
+    finally:
+        creator_daemon._executor.shutdown()
+        executor.shutdown()
@@ -0,0 +1,52 @@
+import pytest
+
+from embedded_creator.demangle import UNKNOWN_CRATE, crate_of, demangle
+
+
+@pytest.mark.parametrize(
+    "symbol, demangled",
+    [
+        ("_ZN4core3ptr13drop_in_place17h0123456789abcdefE", "core::ptr::drop_in_place"),
+        ("_ZN62_$LT$cortex_m..peripheral..SCB$u20$as$u20$core..fmt..Debug$GT$3fmt17h0123456789abcdefE", "<cortex_m::peripheral::SCB as core::fmt::Debug>::fmt"),
+        ("_RNvNtCs1234_7mycrate6module4func", "mycrate::module::func"),
+        ("_RNCNCNgCs6DXkGYLi8lr_2cc5spawn00B5_", "cc::spawn::{closure}::{closure}"),
+        # Generic arguments, with a backreference to the crate
+        ("_RINvNtCs1_4core3ptr13drop_in_placeINtNtCs2_5alloc3vec3VechEEB6_", "core::ptr::drop_in_place::<alloc::vec::Vec<u8>>"),
+        ("_RINvNtCs1_4core3ptr13drop_in_placeRSNtCs2_7mycrate3FooEB4_", "core::ptr::drop_in_place::<&[mycrate::Foo]>"),
+        ("_RINbNbCskIICzLVDPPb_5alloc5alloc8box_freeDINbNiB4_5boxed5FnBoxuEp6OutputuEL_ECs1iopQbuBiw2_3std", "alloc::alloc::box_free::<dyn alloc::boxed::FnBox<(), Output = ()>>"),
+        # Inherent and trait impls
+        ("_RNvMNtCs1_7mycrate6moduleNtB2_3Foo3new", "<mycrate::module::Foo>::new"),
+        ("_RNvXs_NtCs1_7mycrate6moduleNtB4_3FooNtNtCs2_4core3fmt5Debug3fmt", "<mycrate::module::Foo as core::fmt::Debug>::fmt"),
+        ("_RNvXCs1_7mycrateTmRAhj4_ENtCs2_4core5Clone5clone", "<(u32, &[u8; 4]) as core::Clone>::clone"),
+        ("_RNvXNtCs1_7mycrate1aFUKCcEuNtNtCs2_4core3fmt5Debug3fmt", '<unsafe extern "C" fn(char) as core::fmt::Debug>::fmt'),
+        # Consts
+        ("_RNvNvMCs4fqI2P2rA04_13const_genericINtB4_3FooKpE3foo3FOO", "<const_generic::Foo<_>>::foo::FOO"),
+        ("_RNvNvMCs4fqI2P2rA04_13const_genericINtB4_6SignedKanb_E3bar3BAR", "<const_generic::Signed<-11>>::bar::BAR"),
+        ("_RNvNvMCs4fqI2P2rA04_13const_genericINtB4_4BoolKb1_E3bar3BAR", "<const_generic::Bool<true>>::bar::BAR"),
+        ("_RNvNvMCs4fqI2P2rA04_13const_genericINtB4_4CharKc76_E3bar3BAR", "<const_generic::Char<'v'>>::bar::BAR"),
+    ],
+)
+def test_demangle(symbol, demangled):
+    assert demangle(symbol) == demangled
+
+
+@pytest.mark.parametrize("symbol", ["main", "__aeabi_memcpy", "_RNvNtC", "_RNvB9_4func", "_ZN4core3ptr"])
+def test_other_and_invalid_symbols_are_kept(symbol):
+    assert demangle(symbol) == symbol
+
+
+@pytest.mark.parametrize(
+    "demangled, crate",
+    [
+        ("core::ptr::drop_in_place", "core"),
+        ("<cortex_m::peripheral::SCB as core::fmt::Debug>::fmt", "cortex_m"),
+        ("<&mut embedded_hal::Pin as core::fmt::Debug>::fmt", "embedded_hal"),
+        ("<mycrate::module::Foo>::new", "mycrate"),
+        ("main", UNKNOWN_CRATE),
+        ("<(u32, &[u8; 4]) as core::Clone>::clone", UNKNOWN_CRATE),
+        # Symbols the demangler could not parse are still attributed to their first crate
+        ("_RNvCs1_7mycrateZZ", "mycrate"),
+    ],
+)
+def test_crate_of(demangled, crate):
+    assert crate_of(demangled) == crate
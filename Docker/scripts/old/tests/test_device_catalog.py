@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.device_catalog import DeviceCatalog, build_catalog, device_regions_for, expand_mcu, is_catalog_stale
+
+
+def device(mcu_family, flash_origin="0x08000000"):
+    return {
+        "mcu_family": mcu_family,
+        "memory": [["FLASH", flash_origin, "1024K"], ["RAM", "0x20000000", "128K"]],
+        "config": [
+            {
+                "core": "cortex-m7",
+                "arch": "thumbv7em-none-eabihf",
+                "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+                "memory": {"flash": [flash_origin, "1024K"], "ram": ["0x20000000", "128K"]},
+            }
+        ],
+    }
+
+
+DEVICES = {
+    "STM32H743VI": device("STM32H7"),
+    "STM32H743ZI": device("STM32H7"),
+    "STM32H750VB": device("STM32H7"),
+    "stm32f411re": device("STM32F4"),
+}
+
+
+@pytest.fixture
+def catalog_files(tmp_path):
+    source = tmp_path / "device_catalog.json"
+    source.write_text(json.dumps(DEVICES))
+    packed = tmp_path / "device_catalog.bin"
+    build_catalog(str(source), str(packed))
+    return source, packed
+
+
+@pytest.fixture
+def catalog(catalog_files):
+    return DeviceCatalog(str(catalog_files[1]), overlay_path=None)
+
+
+def test_exact_part_resolves_case_insensitively(catalog):
+    assert catalog.resolve("stm32h743zi") == ("STM32H743ZI", DEVICES["STM32H743ZI"])
+    assert catalog.resolve("STM32F411RE")[0] == "STM32F411RE"
+
+
+def test_ordering_code_resolves_to_its_part(catalog):
+    # Package and temperature range suffixes of the ordering code are not catalog parts
+    assert catalog.resolve("STM32H743ZIT6")[0] == "STM32H743ZI"
+
+
+def test_unique_prefix_resolves_to_its_part(catalog):
+    assert catalog.resolve("STM32H750")[0] == "STM32H750VB"
+
+
+def test_ambiguous_prefix_raises(catalog):
+    with pytest.raises(ValueError, match="mcu 'STM32H743' is ambiguous, it matches: STM32H743VI, STM32H743ZI"):
+        catalog.resolve("STM32H743")
+
+
+def test_unknown_part_suggests_close_parts(catalog):
+    with pytest.raises(ValueError, match="not in the device catalog. Did you mean: STM32F411RE"):
+        catalog.resolve("STM32F412RE")
+
+
+def test_overlay_overrides_a_packed_part_and_adds_new_ones(tmp_path, catalog_files):
+    overlay = tmp_path / "overlay.json"
+    overlay.write_text(json.dumps({"stm32h743zi": device("STM32H7", "0x08100000"), "STM32H7B3LI": device("STM32H7")}))
+    catalog = DeviceCatalog(str(catalog_files[1]), overlay_path=str(overlay))
+
+    assert catalog.get("STM32H743ZI")["memory"][0] == ["FLASH", "0x08100000", "1024K"]
+    assert catalog.get("STM32H743VI") == DEVICES["STM32H743VI"]
+    assert catalog.parts("STM32H7") == ["STM32H743VI", "STM32H743ZI", "STM32H750VB", "STM32H7B3LI"]
+
+
+def test_catalog_is_stale_after_the_source_changes(catalog_files):
+    source, packed = catalog_files
+    assert not is_catalog_stale(str(source), str(packed))
+
+    source.write_text(json.dumps(dict(DEVICES, STM32H723ZG=device("STM32H7"))))
+    assert is_catalog_stale(str(source), str(packed))
+
+    build_catalog(str(source), str(packed))
+    assert not is_catalog_stale(str(source), str(packed))
+    assert DeviceCatalog(str(packed), overlay_path=None).resolve("STM32H723")[0] == "STM32H723ZG"
+
+
+def test_missing_packed_catalog_is_stale(tmp_path, catalog_files):
+    assert is_catalog_stale(str(catalog_files[0]), str(tmp_path / "missing.bin"))
+
+
+def test_expand_mcu_merges_the_config_over_the_device(catalog):
+    config = {"mcu": "STM32H743ZIT6", "workspace": True, "config": [{"core": "cortex-m7", "arch": "thumbv7em-none-eabi"}]}
+
+    expanded = expand_mcu(config, catalog)
+
+    assert expanded["mcu"] == "STM32H743ZI"
+    assert expanded["mcu_family"] == "STM32H7"
+    assert expanded["workspace"] is True
+    assert expanded["config"][0]["arch"] == "thumbv7em-none-eabi"
+    assert expanded["config"][0]["memory"] == DEVICES["STM32H743ZI"]["config"][0]["memory"]
+    # The catalog entry itself is left untouched
+    assert catalog.get("STM32H743ZI")["config"][0]["arch"] == "thumbv7em-none-eabihf"
+
+
+def test_expand_mcu_rejects_a_core_of_another_device(catalog):
+    with pytest.raises(ValueError, match="core 'cortex-m4' is not a core of STM32H743ZI, expected one of: cortex-m7"):
+        expand_mcu({"mcu": "STM32H743ZI", "config": {"core": "cortex-m4"}}, catalog)
+
+
+def test_device_regions_of_a_project(catalog):
+    expanded = expand_mcu({"mcu": "STM32H743ZIT6"}, catalog)
+    # build_project_config would expand the part again, from the bundled catalog
+    project_config = build_project_config({key: value for key, value in expanded.items() if key != "mcu"})
+    project_config.mcu = expanded["mcu"]
+
+    assert device_regions_for(project_config, catalog) == [(0x08000000, 1024 * 1024), (0x20000000, 128 * 1024)]
@@ -0,0 +1,59 @@
+import pytest
+
+from embedded_creator.elf_file import ELF_CLASS_32, ELF_DATA_LSB, ELF_MAGIC, STT_FUNC, STT_OBJECT, ElfFile
+
+from elf_fixtures import write_synthetic_elf
+
+SYMBOLS = [("_ZN8firmware4main17h0123456789abcdefE", ".text", 64), ("BUFFER", ".bss", 256), ("STATE", ".data", 16)]
+
+
+@pytest.fixture
+def firmware(tmp_path) -> str:
+    path = str(tmp_path / "firmware")
+    write_synthetic_elf(path, debug_size=0x1000, text_size=0x2000, data_size=0x100, symbols=SYMBOLS)
+    return path
+
+
+def test_sections_and_load_addresses(firmware):
+    with ElfFile(firmware) as elf:
+        allocated = [(section.name, section.address, section.size) for section in elf.sections if section.allocated]
+        assert allocated == [
+            (".vector_table", 0x08000000, 0x400),
+            (".text", 0x08000400, 0x2000),
+            (".data", 0x20000000, 0x100),
+            (".bss", 0x20000100, 0x800),
+        ]
+        # .data runs from RAM and is loaded from flash right after .text, .bss has nothing to load
+        assert elf.load_address(elf.section(".data")) == 0x08002400
+        assert elf.load_address(elf.section(".text")) == 0x08000400
+        assert elf.load_address(elf.section(".bss")) == 0x20000100
+
+
+def test_symbols(firmware):
+    with ElfFile(firmware) as elf:
+        symbols = [(symbol.name, symbol.type, symbol.size) for symbol in elf.symbols()]
+        assert symbols == [(SYMBOLS[0][0], STT_FUNC, 64), ("BUFFER", STT_OBJECT, 256), ("STATE", STT_OBJECT, 16)]
+        assert [symbol.name for symbol in elf.symbols([STT_FUNC])] == [SYMBOLS[0][0]]
+
+
+def test_not_an_elf_file(tmp_path):
+    path = tmp_path / "firmware"
+    path.write_bytes(b"#!/bin/sh\necho not a firmware\n")
+    with pytest.raises(ValueError, match="is not an ELF file"):
+        ElfFile(str(path))
+
+
+def test_truncated_header(tmp_path):
+    path = tmp_path / "firmware"
+    path.write_bytes(ELF_MAGIC + bytes([ELF_CLASS_32, ELF_DATA_LSB, 1]) + bytes(11))
+    with pytest.raises(ValueError, match="is not a valid ELF file"):
+        ElfFile(str(path))
+
+
+def test_truncated_section_headers(firmware):
+    with open(firmware, "rb") as file:
+        content = file.read()
+    with open(firmware, "wb") as file:
+        file.write(content[:-100])
+    with pytest.raises(ValueError):
+        ElfFile(firmware)
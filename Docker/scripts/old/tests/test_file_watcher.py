@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+from embedded_creator.file_watcher import InotifyWatcher, PollingWatcher
+
+inotify_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+@pytest.fixture(params=[PollingWatcher, pytest.param(InotifyWatcher, marks=inotify_only)], ids=["polling", "inotify"])
+def make_watcher(request):
+    watchers = []
+
+    def make(paths):
+        watcher = request.param(paths, interval=0.01)
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.close()
+
+
+def save_by_rename(path, content):
+    # What most editors do: write a copy next to the file and rename it over the file
+    copy = f"{path}.swp"
+    with open(copy, "w") as file:
+        file.write(content)
+    os.replace(copy, path)
+
+
+def test_rename_over_the_file_is_detected(tmp_path, make_watcher):
+    config = tmp_path / "config.json"
+    config.write_text("{}")
+    watcher = make_watcher([str(config)])
+
+    # Same size and content, only the inode tells the polling watcher apart
+    save_by_rename(str(config), "{}")
+
+    assert watcher.wait(2.0) == {str(config)}
+
+
+def test_other_files_are_not_reported(tmp_path, make_watcher):
+    config = tmp_path / "config.json"
+    config.write_text("{}")
+    watcher = make_watcher([str(config)])
+
+    (tmp_path / "notes.txt").write_text("not watched\n")
+
+    assert watcher.wait(0.1) == set()
+
+
+def test_rewatch_follows_the_new_files(tmp_path, make_watcher):
+    config, base = tmp_path / "config.json", tmp_path / "bases" / "base.json"
+    base.parent.mkdir()
+    config.write_text("{}")
+    base.write_text("{}")
+    watcher = make_watcher([str(config)])
+
+    watcher.watch([str(config), str(base)])
+    save_by_rename(str(base), '{"mcu_family": "STM32H7"}')
+
+    assert watcher.wait(2.0) == {str(base)}
+
+
+@inotify_only
+def test_removed_directory_is_polled_until_it_is_back(tmp_path):
+    base = tmp_path / "bases" / "base.json"
+    base.parent.mkdir()
+    base.write_text("{}")
+    watcher = InotifyWatcher([str(base)], interval=0.01)
+    try:
+        shutil.rmtree(base.parent)
+        assert watcher.wait(2.0) == {str(base)}
+        # The directory cannot be watched any more, its files are polled instead of raising
+        watcher.watch([str(base)])
+
+        base.parent.mkdir()
+        base.write_text("{}")
+        assert watcher.wait(2.0) == {str(base)}
+        # Back to inotify once the directory exists again
+        watcher.watch([str(base)])
+        save_by_rename(str(base), "{}")
+        assert watcher.wait(2.0) == {str(base)}
+    finally:
+        watcher.close()
@@ -0,0 +1,62 @@
+import pytest
+
+from embedded_creator.elf_file import ElfFile
+from embedded_creator.firmware_size import OK, OVERFLOW, WARNING, region_usage, render_sizes, CoreSize
+from embedded_creator.memory_map import _region
+
+from elf_fixtures import write_synthetic_elf
+
+# .vector_table 0x400 and .text 0x3c00 in flash, .data 0x400 run from RAM and loaded from flash, .bss 0x800
+FLASH_USED = 0x400 + 0x3C00 + 0x400
+RAM_USED = 0x400 + 0x800
+
+
+@pytest.fixture
+def firmware(tmp_path) -> str:
+    path = str(tmp_path / "firmware")
+    write_synthetic_elf(path, debug_size=0x10000, text_size=0x3C00, data_size=0x400)
+    return path
+
+
+def usage(firmware, *regions):
+    with ElfFile(firmware) as elf:
+        return region_usage(elf, list(regions))
+
+
+def test_data_counts_in_flash_and_ram(firmware):
+    (flash, ram), unplaced = usage(
+        firmware,
+        _region("core", "FLASH", "flash", "flash", "0x08000000", "1024K"),
+        _region("core", "RAM", "ram", "ram", "0x20000000", "128K"),
+    )
+    assert unplaced == []
+    assert (flash.used, flash.sections) == (FLASH_USED, [".vector_table", ".text", ".data"])
+    assert (ram.used, ram.sections) == (RAM_USED, [".data", ".bss"])
+    assert flash.status() == ram.status() == OK
+
+
+def test_overflow_and_nearly_full_regions(firmware):
+    (flash, ram), _ = usage(
+        firmware,
+        # The image of .data starts 256 bytes before the end of the region
+        _region("core", "FLASH", "flash", "flash", "0x08000000", str(FLASH_USED - 0x300)),
+        _region("core", "RAM", "ram", "ram", "0x20000000", "4K"),
+    )
+    assert flash.sections == [".vector_table", ".text", ".data"]
+    assert flash.used == FLASH_USED > flash.region.length
+    assert flash.status() == OVERFLOW
+    assert flash.serialize()["status"] == OVERFLOW
+    # 3K of 4K
+    assert ram.ratio == 0.75
+    assert ram.status(threshold=0.9) == OK
+    assert ram.status(threshold=0.7) == WARNING
+
+
+def test_sections_outside_of_every_region_are_unplaced(firmware):
+    (flash,), unplaced = usage(firmware, _region("core", "FLASH", "flash", "flash", "0x08000000", "1024K"))
+    # The image of .data in flash is still counted, only its run address is missing
+    assert flash.used == FLASH_USED
+    assert unplaced == [".data", ".bss"]
+    core_size = CoreSize("cortex-m7", firmware, [flash], unplaced)
+    assert not core_size.passed()
+    assert "outside of every region: .data, .bss" in render_sizes([core_size])
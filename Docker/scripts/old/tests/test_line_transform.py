@@ -0,0 +1,199 @@
+import os
+import re
+
+import pytest
+
+from embedded_creator.config_loader import create_core_configs
+from embedded_creator.constants import LINES_TO_DELETE_FROM_MEMORY_X_FILE
+from embedded_creator.staged_tree import StagedTree
+from embedded_creator.update_cargo_toml import update_cargo_toml, update_cargo_toml_lines
+from embedded_creator.update_memory import modify_memory_x, update_memory_x_lines
+from embedded_creator.update_openocd_cfg import update_openocd_cfg, update_openocd_cfg_lines
+
+from conftest import QUICKSTART_FIXTURE
+
+# The updaters are checked against the implementation they replaced (the baseline commit), kept below
+# with only the file reads and writes taken out
+
+
+def baseline_memory_x(lines, mcu_family, config, lines_to_delete=LINES_TO_DELETE_FROM_MEMORY_X_FILE):
+    replaces = [(
+        "  /* TODO Adjust these memory regions to match your device memory layout */ ",
+        f"/* Values adjusted for {mcu_family} */"
+    )]
+    lines = [line for line in lines if line.strip() not in lines_to_delete]
+    new_lines = []
+    for line in lines:
+        if "FLASH :" in line:
+            line = f"  FLASH : ORIGIN = {config.memory.flash[0]}, LENGTH = {config.memory.flash[1]}\n"
+        elif "RAM :" in line:
+            line = f"  RAM : ORIGIN = {config.memory.ram[0]}, LENGTH = {config.memory.ram[1]}\n"
+        new_lines.append(line)
+    lines = new_lines
+    if config.memory.extra_sections:
+        extra_section_lines = [
+            f"  {section.memory_type.upper()} : ORIGIN = {section.origin}, LENGTH = {section.length}\n"
+            for section in config.memory.extra_sections
+        ]
+        memory_block_start_found = False
+        memory_block_end_index = None
+        for i, line in enumerate(lines):
+            if 'MEMORY' in line:
+                memory_block_start_found = True
+            elif memory_block_start_found and '{' in line:
+                pass
+            elif memory_block_start_found and '}' in line:
+                memory_block_end_index = i
+                break
+        if memory_block_end_index is not None:
+            lines = lines[:memory_block_end_index] + extra_section_lines + lines[memory_block_end_index:]
+    new_lines = []
+    for line in lines:
+        for original, replacement in replaces:
+            pattern = re.compile(re.escape(original.strip()), re.IGNORECASE)
+            if pattern.search(line.strip()):
+                line = pattern.sub(replacement, line)
+                break
+        new_lines.append(line)
+    return new_lines
+
+
+def baseline_cargo_toml(lines, arch, mcu_family, debugger_option):
+    new_lines = []
+    build_section_found = False
+    arch_already_exists = False
+    correct_arch_set = False
+    arch_regex = re.compile(r'^\s*#\s*target\s*=\s*"' + re.escape(arch) + r'"\s*(#.*)?$')
+    target_line_format = f'target = "{arch}" # {mcu_family}\n'
+    for line in lines:
+        if 'runner =' in line and debugger_option in line and line.strip().startswith('#'):
+            line = line.lstrip('#').lstrip()
+        if '[build]' in line:
+            build_section_found = True
+        elif build_section_found:
+            if arch_regex.match(line):
+                line = f"target = \"{arch}\" # {mcu_family}\n"
+                correct_arch_set = True
+                arch_already_exists = True
+            elif 'target =' in line and not correct_arch_set:
+                line = f"# {line}" if not line.strip().startswith('#') else line
+            elif line.strip().startswith('[') and not correct_arch_set:
+                if not arch_already_exists:
+                    new_lines.append(target_line_format)
+                    correct_arch_set = True
+                build_section_found = False
+        new_lines.append(line)
+    if build_section_found and not correct_arch_set and not arch_already_exists:
+        new_lines.append(target_line_format)
+    return new_lines
+
+
+def baseline_openocd_cfg(lines, header, interface_cfg, target_cfg):
+    new_lines = []
+    for line in lines:
+        if line.startswith("# Sample OpenOCD configuration"):
+            new_lines.append(f"# {header}\n")
+        elif "interface/" in line:
+            new_lines.append(line.replace("stlink.cfg", interface_cfg))
+        elif "target/" in line:
+            new_lines.append(line.replace("stm32f3x.cfg", target_cfg))
+        else:
+            new_lines.append(line)
+    return new_lines
+
+
+def fixture_lines(*relative_path):
+    with open(os.path.join(QUICKSTART_FIXTURE, *relative_path), "r") as file:
+        return file.readlines()
+
+
+def core(**memory):
+    return create_core_configs(
+        {
+            "core": "cortex-m7",
+            "arch": "thumbv7em-none-eabihf",
+            "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+            "memory": dict({"flash": ["0x08000000", "1024K"], "ram": ["0x20000000", "128K"]}, **memory),
+        }
+    )[0]
+
+
+MEMORY_CASES = {
+    "flash and ram": core(),
+    "one extra section": core(extra_sections=[{"memory_type": "itcm_ram", "origin": "0x00000000", "length": "64K"}]),
+    "two extra sections": core(
+        extra_sections=[
+            {"memory_type": "itcm_ram", "origin": "0x00000000", "length": "64K"},
+            {"memory_type": "axi_sram", "origin": "0x24000000", "length": "512K"},
+        ]
+    ),
+}
+# The target triples of the [build] section: the active one, commented ones after it and one missing from it.
+# A commented one before the active one is the case the baseline got wrong, see the last cargo test
+ARCHS = ["thumbv7m-none-eabi", "thumbv7em-none-eabi", "thumbv7em-none-eabihf", "thumbv8m.main-none-eabihf"]
+DEBUGGER_OPTIONS = ["gdb-multiarch", "arm-none-eabi-gdb", "probe-rs"]
+
+
+@pytest.mark.parametrize("config", MEMORY_CASES.values(), ids=MEMORY_CASES.keys())
+def test_update_memory_matches_the_baseline(config):
+    lines = fixture_lines("memory.x")
+    assert update_memory_x_lines(lines, "STM32H7", config) == baseline_memory_x(lines, "STM32H7", config)
+
+
+def test_update_memory_with_the_brace_on_the_memory_line_matches_the_baseline():
+    lines = ["MEMORY {\n"] + fixture_lines("memory.x")[2:]
+    config = MEMORY_CASES["one extra section"]
+    assert update_memory_x_lines(lines, "STM32H7", config) == baseline_memory_x(lines, "STM32H7", config)
+
+
+@pytest.mark.parametrize("arch", ARCHS)
+@pytest.mark.parametrize("debugger_option", DEBUGGER_OPTIONS)
+def test_update_cargo_toml_matches_the_baseline(arch, debugger_option):
+    lines = fixture_lines(".cargo", "config.toml")
+    expected = baseline_cargo_toml(lines, arch, "STM32H7", debugger_option)
+    assert update_cargo_toml_lines(lines, arch, "STM32H7", debugger_option) == expected
+
+
+@pytest.mark.parametrize("arch", ARCHS)
+def test_update_cargo_toml_with_a_section_after_build_matches_the_baseline(arch):
+    lines = fixture_lines(".cargo", "config.toml") + ["\n", "[unstable]\n", 'build-std = ["core"]\n']
+    expected = baseline_cargo_toml(lines, arch, "STM32H7", "gdb-multiarch")
+    assert update_cargo_toml_lines(lines, arch, "STM32H7", "gdb-multiarch") == expected
+
+
+def test_update_cargo_toml_comments_out_an_active_target_after_the_matching_one():
+    # The baseline left the active target of the template as is once the requested one was uncommented,
+    # giving a duplicate 'target' key: the only intended difference
+    lines = fixture_lines(".cargo", "config.toml")
+    expected = baseline_cargo_toml(lines, "thumbv6m-none-eabi", "STM32H7", "gdb-multiarch")
+    active = expected.index('target = "thumbv7m-none-eabi"        # Cortex-M3\n')
+    expected[active] = "# " + expected[active]
+    assert update_cargo_toml_lines(lines, "thumbv6m-none-eabi", "STM32H7", "gdb-multiarch") == expected
+
+
+@pytest.mark.parametrize("interface_cfg, target_cfg", [("stlink.cfg", "stm32h7x.cfg"), ("cmsis-dap.cfg", "stm32h7x_dual_bank.cfg")])
+def test_update_openocd_cfg_matches_the_baseline(interface_cfg, target_cfg):
+    lines = fixture_lines("openocd.cfg")
+    header = "Configuration for STM32H7"
+    expected = baseline_openocd_cfg(lines, header, interface_cfg, target_cfg)
+    assert update_openocd_cfg_lines(lines, header, interface_cfg, target_cfg) == expected
+
+
+def test_file_updaters_match_the_baseline(tmp_path):
+    # The same edits through the file functions, on the files of a staged core
+    tree = StagedTree(str(tmp_path))
+    for relative_path in ["memory.x", "openocd.cfg", os.path.join(".cargo", "config.toml")]:
+        tree.write_text(str(tmp_path / relative_path), "".join(fixture_lines(relative_path)))
+    config = MEMORY_CASES["two extra sections"]
+
+    modify_memory_x(str(tmp_path), "STM32H7", config, tree=tree)
+    update_openocd_cfg(str(tmp_path), "Configuration for STM32H7", "stlink.cfg", "stm32h7x.cfg", tree=tree)
+    update_cargo_toml(str(tmp_path / ".cargo"), "config.toml", "thumbv7em-none-eabihf", "STM32H7", "gdb-multiarch", tree=tree)
+
+    assert tree.read_text(str(tmp_path / "memory.x")) == "".join(baseline_memory_x(fixture_lines("memory.x"), "STM32H7", config))
+    assert tree.read_text(str(tmp_path / "openocd.cfg")) == "".join(
+        baseline_openocd_cfg(fixture_lines("openocd.cfg"), "Configuration for STM32H7", "stlink.cfg", "stm32h7x.cfg")
+    )
+    assert tree.read_text(str(tmp_path / ".cargo" / "config.toml")) == "".join(
+        baseline_cargo_toml(fixture_lines(".cargo", "config.toml"), "thumbv7em-none-eabihf", "STM32H7", "gdb-multiarch")
+    )
@@ -0,0 +1,104 @@
+import pytest
+
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.memory_map import MemoryMap, MemoryRegion, parse_size, validate_memory_map
+
+
+def region(core, name, origin, length):
+    return MemoryRegion(core, name, name.lower(), f"{core}.{name}", origin, length, hex(origin), str(length))
+
+
+def kinds(issues):
+    return [(issue.kind, [str(region) for region in issue.regions]) for issue in issues]
+
+
+def test_parse_size_units():
+    assert parse_size("128K") == 128 * 1024
+    assert parse_size("2m") == 2 * 1024 * 1024
+    assert parse_size("512") == 512
+    with pytest.raises(ValueError):
+        parse_size("12G")
+
+
+def test_overlapping_regions_are_reported_once():
+    memory_map = MemoryMap([region("m4", "RAM", 0x20000000, 0x1000), region("m7", "RAM", 0x20000800, 0x1000)])
+
+    issues = memory_map.overlaps()
+
+    assert kinds(issues) == [("overlap", ["m4 RAM [0x20000000, 0x20001000)", "m7 RAM [0x20000800, 0x20001800)"])]
+    assert issues[0].message.endswith("on [0x20000800, 0x20001000)")
+
+
+def test_region_contained_in_another_overlaps_on_its_own_extent():
+    memory_map = MemoryMap([region("m7", "FLASH", 0x08000000, 0x100000), region("m4", "FLASH", 0x08010000, 0x1000)])
+
+    assert [issue.message.rsplit(" on ", 1)[1] for issue in memory_map.overlaps()] == ["[0x08010000, 0x08011000)"]
+
+
+def test_touching_regions_do_not_overlap():
+    memory_map = MemoryMap(
+        [region("m7", "FLASH", 0x08000000, 0x100000), region("m4", "FLASH", 0x08100000, 0x100000), region("m4", "RAM", 0x10000000, 0)]
+    )
+
+    assert memory_map.overlaps() == []
+
+
+def test_misaligned_origin_and_length_are_reported():
+    memory_map = MemoryMap([region("m4", "RAM", 0x20000002, 0x1000), region("m4", "ITCM", 0x0, 0x1001)])
+
+    assert [issue.message for issue in memory_map.misaligned()] == [
+        "m4 ITCM [0x00000000, 0x00001001) length is not a multiple of 4 bytes",
+        "m4 RAM [0x20000002, 0x20001002) origin is not aligned to 4 bytes",
+    ]
+
+
+def test_region_past_the_device_end_is_reported():
+    device_regions = [(0x08000000, 0x200000), (0x20000000, 0x20000)]
+    memory_map = MemoryMap(
+        [
+            region("m7", "FLASH", 0x08000000, 0x200000),
+            region("m7", "RAM", 0x20010000, 0x20000),
+            region("m4", "SRAM4", 0x38000000, 0x10000),
+        ]
+    )
+
+    assert kinds(memory_map.out_of_device(device_regions)) == [
+        ("out-of-device", ["m7 RAM [0x20010000, 0x20030000)"]),
+        ("out-of-device", ["m4 SRAM4 [0x38000000, 0x38010000)"]),
+    ]
+
+
+def test_region_past_the_address_space_is_reported_without_a_device():
+    memory_map = MemoryMap([region("m4", "FLASH", 0xFFFF0000, 0x20000)])
+
+    assert kinds(memory_map.out_of_device()) == [("out-of-device", ["m4 FLASH [0xFFFF0000, 0x100010000)"])]
+
+
+def test_regions_at():
+    m7_flash = region("m7", "FLASH", 0x08000000, 0x100000)
+    m4_flash = region("m4", "FLASH", 0x08080000, 0x100000)
+    memory_map = MemoryMap([m4_flash, m7_flash, region("m4", "RAM", 0x20000000, 0x1000)])
+
+    assert memory_map.regions_at(0x08090000) == [m7_flash, m4_flash]
+    assert memory_map.regions_at(0x08100000) == [m4_flash]
+    assert memory_map.regions_at(0x20001000) == []
+
+
+def test_validate_memory_map_reports_every_issue_of_a_config():
+    core = {
+        "core": "cortex-m4",
+        "arch": "thumbv7em-none-eabihf",
+        "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x.cfg"},
+        "memory": {"flash": ["0x08000000", "1024K"], "ram": ["0x20000000", "256K"]},
+    }
+    overlapping = dict(core, core="cortex-m7", memory={"flash": ["0x080FF000", "1024K"], "ram": ["0x30000000", "256K"]})
+    project_config = build_project_config({"mcu_family": "STM32H7", "config": [core, overlapping]})
+
+    with pytest.raises(ValueError) as error:
+        validate_memory_map(project_config)
+
+    lines = str(error.value).splitlines()
+    assert lines[0] == "Invalid memory map:"
+    assert lines[1:] == [
+        "  config[0].memory.flash: cortex-m4 FLASH [0x08000000, 0x08100000) overlaps cortex-m7 FLASH [0x080FF000, 0x081FF000) on [0x080FF000, 0x08100000)"
+    ]
@@ -0,0 +1,96 @@
+import json
+import shutil
+
+import pytest
+
+from embedded_creator.commands.plan import plan
+from embedded_creator.template_cache import TemplateCache
+
+from conftest import QUICKSTART_FIXTURE
+
+from test_project_creator import M4_CORE, create
+
+
+def write_config(tmp_path, ram_length="288K"):
+    config_path = tmp_path / "config.json"
+    core = dict(M4_CORE, memory={"flash": M4_CORE["memory"]["flash"], "ram": [M4_CORE["memory"]["ram"][0], ram_length]})
+    config_path.write_text(json.dumps({"mcu_family": "STM32H7", "config": [core]}))
+    return str(config_path)
+
+
+def run_plan(tmp_path, template_cache, capsys, *options):
+    args = ["project", write_config(tmp_path, *options[:1]), "--output", str(tmp_path), "--template-cache", template_cache.cache_dir]
+    plan(args + list(options[1:]))
+    return capsys.readouterr()
+
+
+def test_plan_of_a_new_project_shows_every_file_created(tmp_path, template_cache, offline_tools, capsys):
+    output = run_plan(tmp_path, template_cache, capsys)
+
+    assert "--- /dev/null\n+++ b/cortex-m4/memory.x\n" in output.out
+    assert "+  RAM : ORIGIN = 0x10000000, LENGTH = 288K\n" in output.out
+    assert "+++ b/Makefile\n" in output.out
+    assert "+++ b/.project-lock\n" in output.out
+    assert output.err.startswith(f"Plan for {tmp_path / 'project'}: ")
+    assert output.err.endswith(" to create, 0 to modify, 0 to delete\n")
+    # Nothing is written
+    assert not (tmp_path / "project").exists()
+
+
+def test_plan_json_output(tmp_path, template_cache, offline_tools, capsys):
+    output = run_plan(tmp_path, template_cache, capsys, "288K", "--format", "json")
+
+    project_plan = json.loads(output.out)
+    paths = [change["path"] for change in project_plan["changes"]]
+    assert project_plan["root"] == str(tmp_path / "project")
+    assert paths == sorted(paths)
+    assert {".project-lock", "Makefile", "cortex-m4/memory.x", "cortex-m4/Cargo.toml"} <= set(paths)
+    assert {change["action"] for change in project_plan["changes"]} == {"create"}
+    assert project_plan["summary"] == {"create": len(paths), "modify": 0, "delete": 0}
+    assert output.err == ""
+
+
+def test_plan_of_an_edited_config_diffs_the_files_and_the_lock(tmp_path, template_cache, offline_tools, capsys):
+    create(tmp_path, template_cache, [M4_CORE])
+    lock_before = json.loads((tmp_path / "project" / ".project-lock").read_text())
+
+    output = run_plan(tmp_path, template_cache, capsys, "256K", "--format", "json")
+
+    changes = {change["path"]: change for change in json.loads(output.out)["changes"]}
+    assert set(changes) == {".project-lock", "cortex-m4/memory.x"}
+    assert changes["cortex-m4/memory.x"]["action"] == "modify"
+    assert "-  RAM : ORIGIN = 0x10000000, LENGTH = 288K\n+  RAM : ORIGIN = 0x10000000, LENGTH = 256K\n" in changes["cortex-m4/memory.x"]["diff"]
+    lock_diff = changes[".project-lock"]["diff"]
+    assert lock_diff.startswith("--- a/.project-lock\n+++ b/.project-lock\n")
+    # The core inputs hash changes, as does the hash of memory.x
+    assert f'-      "inputs": "{lock_before["cores"]["cortex-m4"]["inputs"]}"\n' in lock_diff
+    assert f'-        "cortex-m4/memory.x": "{lock_before["cores"]["cortex-m4"]["files"]["cortex-m4/memory.x"]}",\n' in lock_diff
+    assert (tmp_path / "project" / "cortex-m4" / "memory.x").read_text().count("288K") == 1
+
+
+def test_plan_exit_code(tmp_path, template_cache, offline_tools, capsys):
+    create(tmp_path, template_cache, [M4_CORE])
+
+    output = run_plan(tmp_path, template_cache, capsys, "288K", "--exit-code")
+    assert output.out == ""
+    assert output.err.endswith(": 0 to create, 0 to modify, 0 to delete\n")
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_plan(tmp_path, template_cache, capsys, "256K", "--exit-code")
+    assert exit_info.value.code == 1
+
+
+def test_plan_of_a_template_only_cargo_generate_renders_fails(tmp_path, capsys):
+    seed = tmp_path / "seed"
+    shutil.copytree(QUICKSTART_FIXTURE, seed)
+    main = seed / "src" / "main.rs"
+    main.write_text(main.read_text() + "// {% if defmt %}use defmt_rtt as _;{% endif %}\n")
+    template_cache = TemplateCache(cache_dir=str(tmp_path / "templates"), offline=True)
+    template_cache.refresh(seed=str(seed))
+
+    # No cargo stand-in on the PATH: the plan must fail before trying to spawn cargo-generate
+    with pytest.raises(SystemExit) as exit_info:
+        run_plan(tmp_path, template_cache, capsys)
+    assert exit_info.value.code == 1
+    assert "Error: Template requires cargo-generate; plan unavailable: " in capsys.readouterr().err
+    assert not (tmp_path / "project").exists()
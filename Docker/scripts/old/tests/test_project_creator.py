@@ -0,0 +1,121 @@
+import os
+import shutil
+
+import pytest
+
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.constants import DEFAULT_RENDERER, NATIVE_RENDERER
+from embedded_creator.project_creator import project_creator
+from embedded_creator.template_cache import TemplateCache
+from embedded_creator.template_renderer import compare_trees
+from embedded_creator.toolchain_state import ToolchainState
+
+from conftest import QUICKSTART_FIXTURE
+
+M4_CORE = {
+    "core": "cortex-m4",
+    "arch": "thumbv7em-none-eabi",
+    "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32f4x.cfg"},
+    "memory": {"flash": ["0x08100000", "1024K"], "ram": ["0x10000000", "288K"]},
+}
+M7_CORE = {
+    "core": "cortex-m7",
+    "arch": "thumbv7em-none-eabi",
+    "openocd_cfg": {"interface": "stlink.cfg", "target": "stm32h7x_dual_bank.cfg"},
+    "memory": {"flash": ["0x08000000", "1024K"], "ram": ["0x20000000", "256K"]},
+}
+
+
+def create(tmp_path, template_cache, cores, force=False, jobs=None, renderer=DEFAULT_RENDERER):
+    project_config = build_project_config({"mcu_family": "STM32H7", "config": cores})
+    project_creator(
+        project_name="project",
+        project_config=project_config,
+        template_cache=template_cache,
+        destination=str(tmp_path),
+        toolchain_state=ToolchainState(str(tmp_path / "toolchain")),
+        force=force,
+        jobs=jobs,
+        renderer=renderer,
+    )
+    return tmp_path / "project"
+
+
+def test_force_regenerates_every_core_and_removes_the_files_no_longer_generated(tmp_path, template_cache, offline_tools):
+    project = create(tmp_path, template_cache, [M4_CORE, M7_CORE])
+    edited = project / "cortex-m7" / "src" / "main.rs"
+    edited.write_text("// edited\n")
+    regenerated = project / "cortex-m4" / "memory.x"
+    regenerated.unlink()
+    (project / "cortex-m4" / "extra.txt").write_text("not generated\n")
+
+    create(tmp_path, template_cache, [M4_CORE], force=True)
+
+    assert regenerated.is_file()
+    # The files of the dropped core are removed, except the edited one
+    assert not (project / "cortex-m7" / "memory.x").exists()
+    assert not (project / "cortex-m7" / "Cargo.toml").exists()
+    assert edited.read_text() == "// edited\n"
+    assert (project / "cortex-m4" / "extra.txt").is_file()
+
+
+def test_liquid_template_falls_back_to_cargo_generate(tmp_path, offline_tools):
+    seed = tmp_path / "seed"
+    shutil.copytree(QUICKSTART_FIXTURE, seed)
+    main = seed / "src" / "main.rs"
+    main.write_text(main.read_text() + "// {% if defmt %}use defmt_rtt as _;{% endif %}\n")
+    template_cache = TemplateCache(cache_dir=str(tmp_path / "templates"), offline=True)
+    template_cache.refresh(seed=str(seed))
+
+    project = create(tmp_path, template_cache, [M4_CORE], renderer=NATIVE_RENDERER)
+
+    # The stand-in cargo-generate of benchmark_fixtures copies the tag as it is, the native renderer would have raised
+    assert "{% if defmt %}" in (project / "cortex-m4" / "src" / "main.rs").read_text()
+    assert (project / "cortex-m4" / "memory.x").is_file()
+
+
+@pytest.mark.parametrize(
+    "path, content",
+    [
+        ("src/main.rs", "// {{ board }}\n"),
+        ("src/{{crate_name}}.rs", ""),
+        ("src/lib.rs.liquid", ""),
+        (".genignore", "target\n"),
+    ],
+    ids=["placeholder without value", "templated path", "liquid file", "genignore"],
+)
+def test_template_only_cargo_generate_implements_falls_back_to_it(tmp_path, offline_tools, caplog, path, content):
+    seed = tmp_path / "seed"
+    shutil.copytree(QUICKSTART_FIXTURE, seed)
+    with open(seed / path, "a") as file:
+        file.write(content)
+    template_cache = TemplateCache(cache_dir=str(tmp_path / "templates"), offline=True)
+    template_cache.refresh(seed=str(seed))
+
+    project = create(tmp_path, template_cache, [M4_CORE], renderer=NATIVE_RENDERER)
+
+    assert "Template not supported by the native renderer, using cargo-generate" in caplog.messages
+    assert (project / "cortex-m4" / "memory.x").is_file()
+
+
+def test_parallel_generation_matches_serial_generation(tmp_path, template_cache, offline_tools):
+    cores = [M4_CORE, M7_CORE, dict(M4_CORE, core="cortex-m4f"), dict(M7_CORE, core="cortex-m33")]
+    serial = create(tmp_path / "serial", template_cache, cores, jobs=1)
+    parallel = create(tmp_path / "parallel", template_cache, cores, jobs=4)
+
+    assert compare_trees(str(serial), str(parallel)) == []
+    for root, _, files in os.walk(serial):
+        for file_name in files:
+            relative_path = os.path.relpath(os.path.join(root, file_name), serial)
+            assert os.stat(serial / relative_path).st_mode == os.stat(parallel / relative_path).st_mode, relative_path
+
+
+def test_template_lookup_is_counted_once_per_run(tmp_path, offline_tools):
+    template_cache = TemplateCache(cache_dir=str(tmp_path / "templates"), offline=True)
+    template_cache.refresh(seed=QUICKSTART_FIXTURE)
+
+    # The first run assembles the template and computes its digest, the second reads both from the store
+    create(tmp_path / "first", template_cache, [M4_CORE])
+    assert template_cache.session_stats == {"hits": 0, "misses": 1}
+    create(tmp_path / "second", template_cache, [M4_CORE])
+    assert template_cache.session_stats == {"hits": 1, "misses": 1}
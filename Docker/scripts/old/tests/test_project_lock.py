@@ -0,0 +1,91 @@
+import os
+
+from embedded_creator.constants import PROJECT_LOCK_FILE
+from embedded_creator.project_lock import LOCK_VERSION, CoreLock, ProjectLock, content_hash, update_lock
+from embedded_creator.staged_tree import StagedTree
+
+TEMPLATE = {"name": "single_core_template", "revision": "test"}
+
+
+def generated_project(tmp_path, files):
+    # A project as a previous run left it, with the lock of the files it generated
+    root = tmp_path / "project"
+    for relative_path, content in files.items():
+        (root / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / relative_path).write_text(content)
+    core_files = {path: content_hash(content.encode()) for path, content in files.items() if os.sep in path}
+    other_files = {path: content_hash(content.encode()) for path, content in files.items() if os.sep not in path}
+    return root, ProjectLock(TEMPLATE, {"cortex-m4": CoreLock("inputs", core_files)}, other_files)
+
+
+def reconcile(root, previous, staged, partial=False):
+    tree = StagedTree(str(root))
+    for relative_path, content in staged.items():
+        tree.write_text(str(root / relative_path), content)
+    lock = update_lock(tree, previous, TEMPLATE, {"cortex-m4": "new-inputs"}, [], partial)
+    tree.commit()
+    return lock
+
+
+def test_edited_file_is_kept(tmp_path):
+    root, previous = generated_project(tmp_path, {"Makefile": "all:\n", "cortex-m4/memory.x": "generated\n"})
+    (root / "cortex-m4" / "memory.x").write_text("edited\n")
+
+    lock = reconcile(root, previous, {"Makefile": "all: build\n", "cortex-m4/memory.x": "regenerated\n"})
+
+    assert (root / "cortex-m4" / "memory.x").read_text() == "edited\n"
+    assert (root / "Makefile").read_text() == "all: build\n"
+    assert lock.cores["cortex-m4"].files["cortex-m4/memory.x"] == content_hash(b"regenerated\n")
+
+
+def test_file_no_longer_generated_is_removed(tmp_path):
+    root, previous = generated_project(
+        tmp_path, {"Makefile": "all:\n", "cortex-m4/memory.x": "generated\n", "cortex-m4/src/old.rs": "old\n"}
+    )
+
+    lock = reconcile(root, previous, {"Makefile": "all:\n", "cortex-m4/memory.x": "generated\n"})
+
+    assert not (root / "cortex-m4" / "src").exists()
+    assert (root / "cortex-m4" / "memory.x").is_file()
+    assert lock.all_files() == {"Makefile": content_hash(b"all:\n"), "cortex-m4/memory.x": content_hash(b"generated\n")}
+    assert ProjectLock.load(str(root)).cores["cortex-m4"].inputs == "new-inputs"
+
+
+def test_edited_file_no_longer_generated_is_kept(tmp_path):
+    root, previous = generated_project(tmp_path, {"cortex-m4/memory.x": "generated\n", "cortex-m4/src/old.rs": "old\n"})
+    (root / "cortex-m4" / "src" / "old.rs").write_text("edited\n")
+
+    reconcile(root, previous, {"cortex-m4/memory.x": "generated\n"})
+
+    assert (root / "cortex-m4" / "src" / "old.rs").read_text() == "edited\n"
+
+
+def test_partial_update_removes_nothing_and_keeps_the_other_entries(tmp_path):
+    root, previous = generated_project(tmp_path, {"Makefile": "all:\n", "cortex-m4/memory.x": "generated\n", "cortex-m4/openocd.cfg": "cfg\n"})
+
+    lock = reconcile(root, previous, {"cortex-m4/memory.x": "resized\n"}, partial=True)
+
+    assert (root / "cortex-m4" / "openocd.cfg").is_file()
+    assert (root / "cortex-m4" / "memory.x").read_text() == "resized\n"
+    assert lock.all_files() == {
+        "Makefile": content_hash(b"all:\n"),
+        "cortex-m4/memory.x": content_hash(b"resized\n"),
+        "cortex-m4/openocd.cfg": content_hash(b"cfg\n"),
+    }
+
+
+def test_lock_of_another_version_is_ignored(tmp_path):
+    root, previous = generated_project(tmp_path, {"Makefile": "all:\n"})
+    (root / PROJECT_LOCK_FILE).write_text(previous.render().replace(f'"version": {LOCK_VERSION}', f'"version": {LOCK_VERSION - 1}'))
+
+    assert ProjectLock.load(str(root)) is None
+
+
+def test_core_with_a_file_changed_on_disk_is_not_current(tmp_path):
+    root, previous = generated_project(tmp_path, {"cortex-m4/memory.x": "generated\n", "cortex-m4/openocd.cfg": "cfg\n"})
+
+    assert previous.is_core_current(str(root), "cortex-m4", "inputs")
+    (root / "cortex-m4" / "memory.x").write_text("older\n")
+    assert not previous.is_core_current(str(root), "cortex-m4", "inputs")
+    (root / "cortex-m4" / "memory.x").unlink()
+    assert not previous.is_core_current(str(root), "cortex-m4", "inputs")
@@ -0,0 +1,174 @@
+import errno
+import json
+import os
+
+import pytest
+
+from embedded_creator import staged_tree
+from embedded_creator.commands.create import create_project
+from embedded_creator.config_loader import build_project_config
+from embedded_creator.constants import PROJECT_LOCK_FILE
+from embedded_creator.project_creator import project_creator
+from embedded_creator.staged_tree import UMASK, StagedTree
+from embedded_creator.toolchain_state import ToolchainState
+
+from test_project_creator import M4_CORE
+
+
+@pytest.fixture
+def fixed_umask(monkeypatch):
+    # The process umask must not be changed by a commit, other threads may be creating files meanwhile
+    def umask(mask):
+        raise AssertionError("os.umask called during the commit")
+
+    monkeypatch.setattr(os, "umask", umask)
+
+
+def leftovers(path):
+    return [name for name in os.listdir(path) if name.startswith(".")]
+
+
+def test_commit_creates_a_new_project_in_one_step(tmp_path, fixed_umask):
+    root = tmp_path / "project"
+    tree = StagedTree(str(root))
+    tree.write_text(str(root / "src" / "main.rs"), "fn main() {}\n")
+    tree.write_text(str(root / "run.sh"), "#!/bin/sh\n", mode=0o755)
+    tree.makedirs(str(root / "empty"))
+    assert not root.exists()
+
+    tree.commit()
+
+    assert (root / "src" / "main.rs").read_text() == "fn main() {}\n"
+    assert os.stat(root / "src" / "main.rs").st_mode & 0o7777 == 0o666 & ~UMASK
+    assert os.stat(root / "run.sh").st_mode & 0o7777 == 0o755
+    assert (root / "empty").is_dir()
+    assert leftovers(tmp_path) == []
+
+
+def test_commit_replaces_changed_files_only(tmp_path, fixed_umask):
+    root = tmp_path / "project"
+    (root / "old").mkdir(parents=True)
+    (root / "same.txt").write_text("same\n")
+    (root / "changed.txt").write_text("before\n")
+    (root / "old" / "gone.txt").write_text("gone\n")
+    os.chmod(root / "same.txt", 0o666 & ~UMASK)
+    same_inode = os.stat(root / "same.txt").st_ino
+
+    tree = StagedTree(str(root))
+    tree.write_text(str(root / "same.txt"), "same\n")
+    tree.write_text(str(root / "changed.txt"), "after\n")
+    tree.remove(str(root / "old" / "gone.txt"))
+    tree.commit()
+
+    assert os.stat(root / "same.txt").st_ino == same_inode
+    assert tree.unchanged == 1
+    assert (root / "changed.txt").read_text() == "after\n"
+    # The directory emptied by the removal is pruned
+    assert not (root / "old").exists()
+    assert leftovers(root) == []
+
+
+def test_failed_commit_leaves_the_existing_project_intact(tmp_path, monkeypatch):
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "a.txt").write_text("old a\n")
+    (root / "b.txt").write_text("old b\n")
+    (root / "removed.txt").write_text("kept\n")
+
+    def disk_full(source, target, content, method):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(staged_tree, "materialize", disk_full)
+    tree = StagedTree(str(root))
+    tree.write_text(str(root / "a.txt"), "new a\n")
+    tree.link_file(str(root / "b.txt"), str(tmp_path / "cache-object"), b"new b\n")
+    tree.remove(str(root / "removed.txt"))
+    with pytest.raises(OSError):
+        tree.commit()
+
+    # 'a.txt' was written before the failure, but only aside
+    assert (root / "a.txt").read_text() == "old a\n"
+    assert (root / "b.txt").read_text() == "old b\n"
+    assert (root / "removed.txt").read_text() == "kept\n"
+    assert leftovers(root) == []
+
+
+def test_interrupted_commit_keeps_the_previous_lock(tmp_path, monkeypatch):
+    root = tmp_path / "project"
+    (root / "cortex-m4").mkdir(parents=True)
+    (root / PROJECT_LOCK_FILE).write_text("old lock\n")
+    (root / "cortex-m4" / "memory.x").write_text("old\n")
+    replace = os.replace
+
+    def interrupted(source, destination):
+        if destination.endswith("memory.x"):
+            raise KeyboardInterrupt
+        replace(source, destination)
+
+    tree = StagedTree(str(root))
+    tree.write_text(str(root / PROJECT_LOCK_FILE), "new lock\n")
+    tree.write_text(str(root / "Makefile"), "all:\n")
+    tree.write_text(str(root / "cortex-m4" / "memory.x"), "new\n")
+    monkeypatch.setattr(os, "replace", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        tree.commit()
+
+    # The lock sorts first but is renamed last, it still describes the files left as they were
+    assert (root / "Makefile").read_text() == "all:\n"
+    assert (root / "cortex-m4" / "memory.x").read_text() == "old\n"
+    assert (root / PROJECT_LOCK_FILE).read_text() == "old lock\n"
+
+
+def test_failed_commit_of_a_new_project_leaves_nothing(tmp_path, monkeypatch):
+    def disk_full(source, target, content, method):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(staged_tree, "materialize", disk_full)
+    tree = StagedTree(str(tmp_path / "project"))
+    tree.write_text(str(tmp_path / "project" / "a.txt"), "a\n")
+    tree.link_file(str(tmp_path / "project" / "b.txt"), str(tmp_path / "cache-object"), b"b\n")
+    with pytest.raises(OSError):
+        tree.commit()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_dry_run_stages_the_project_without_writing_it(tmp_path, template_cache, offline_tools):
+    tree = project_creator(
+        project_name="project",
+        project_config=build_project_config({"mcu_family": "STM32H7", "config": [M4_CORE]}),
+        template_cache=template_cache,
+        destination=str(tmp_path / "out"),
+        dry_run=True,
+        toolchain_state=ToolchainState(str(tmp_path / "toolchain")),
+    )
+
+    assert not (tmp_path / "out" / "project").exists()
+    assert {"Makefile", ".project-lock", os.path.join("cortex-m4", "memory.x")} <= set(tree.staged_files())
+    # No rustup target is added on a dry run
+    assert not os.path.exists(os.environ["FAKE_RUSTUP_STATE"])
+
+
+def test_dry_run_command_writes_neither_the_template_store_nor_the_toolchain_state(tmp_path, template_cache, offline_tools, monkeypatch, capsys):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"mcu_family": "STM32H7", "config": [M4_CORE]}))
+    store_before = sorted(os.walk(template_cache.cache_dir))
+    monkeypatch.chdir(tmp_path)
+
+    create_project(
+        [
+            "--dry-run",
+            "--template-cache",
+            template_cache.cache_dir,
+            "--toolchain-state",
+            str(tmp_path / "toolchain"),
+            "--no-core-cache",
+            "project",
+            str(config_path),
+        ]
+    )
+
+    assert "files would be written" in capsys.readouterr().out
+    assert sorted(os.walk(template_cache.cache_dir)) == store_before
+    assert not (tmp_path / "toolchain").exists()
+    assert not (tmp_path / "project").exists()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from embedded_creator.constants import DIRECTORIES_TO_DELETE_FROM_TEMPLATE, DUAL_CORE_TEMPLATE, SINGLE_CORE_TEMPLATE
+from embedded_creator.delete_files import delete_files_and_directories
+from embedded_creator.template_renderer import (
+    UnsupportedTemplateError,
+    cargo_generate,
+    check_parity,
+    compare_trees,
+    load_template,
+    load_template_values,
+    render_template,
+    render_text,
+)
+
+from conftest import GOLDEN_DIR
+
+TEMPLATES = [SINGLE_CORE_TEMPLATE, DUAL_CORE_TEMPLATE]
+# Set to regenerate the golden trees with cargo-generate after an intended change of the template
+UPDATE_GOLDEN = os.environ.get("UPDATE_GOLDEN") == "1"
+# Records what produced the golden trees: the committed ones are the renderer's own output until they
+# are regenerated with UPDATE_GOLDEN=1, which writes the cargo-generate version there
+GOLDEN_SOURCE = os.path.join(GOLDEN_DIR, "SOURCE")
+
+
+def cargo_generate_available() -> bool:
+    if shutil.which("cargo-generate") is None:
+        return False
+    return subprocess.run(["cargo", "generate", "--version"], capture_output=True).returncode == 0
+
+
+def test_render_text_substitutes_placeholders():
+    assert render_text("{{a}}-{{ b }}", {"a": "1", "b": "2"}) == "1-2"
+
+
+def test_render_text_rejects_placeholder_without_value():
+    with pytest.raises(UnsupportedTemplateError, match="placeholder 'c' has no value"):
+        render_text("{{a}}-{{c}}", {"a": "1"})
+
+
+@pytest.mark.parametrize(
+    "path, message",
+    [
+        ("{{project-name}}/main.rs", "templated paths"),
+        ("src/{{crate_name}}.rs", "templated paths"),
+        ("src/main.rs.liquid", r"\.liquid files"),
+        (".genignore", "ignore patterns"),
+    ],
+)
+def test_load_template_rejects_features_of_cargo_generate(tmp_path, path, message):
+    (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+    (tmp_path / path).write_text("fn main() {}\n")
+    with pytest.raises(UnsupportedTemplateError, match=message):
+        load_template(str(tmp_path), [])
+
+
+def test_load_template_rejects_unsupported_template_config(tmp_path):
+    (tmp_path / "cargo-generate.toml").write_text("[conditional.'defmt']\nignore = ['src/log.rs']\n")
+    with pytest.raises(UnsupportedTemplateError, match=r"\[conditional\]"):
+        load_template(str(tmp_path), [])
+
+
+def test_render_template_writes_nothing_for_placeholder_without_value(tmp_path):
+    template = tmp_path / "template"
+    (template / "src").mkdir(parents=True)
+    (template / "Cargo.toml").write_text("name = '{{project-name}}'\n")
+    (template / "src" / "main.rs").write_text("// {{ board }}\n")
+    with pytest.raises(UnsupportedTemplateError, match=r"main\.rs: placeholder 'board' has no value"):
+        render_template(str(template), str(tmp_path / "out"), "core")
+    assert not (tmp_path / "out").exists()
+
+
+@pytest.mark.parametrize("markup", ["{% if flash %}x{% endif %}", "{{ project-name | upcase }}", "{{ authors[0] }}"])
+def test_load_template_rejects_liquid_markup(tmp_path, markup):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.rs").write_text(f"fn main() {{}}\n// {markup}\n")
+    with pytest.raises(UnsupportedTemplateError, match=r"main\.rs:2: unsupported Liquid markup"):
+        load_template(str(tmp_path), [])
+
+
+def test_load_template_skips_metadata_and_ignored_files(template_cache):
+    template_path = template_cache.template_path(SINGLE_CORE_TEMPLATE)
+    _, template_files = load_template(template_path, DIRECTORIES_TO_DELETE_FROM_TEMPLATE)
+    paths = {template_file.relative_path for template_file in template_files}
+    assert "cargo-generate.toml" not in paths
+    assert "cargo-generate-values.toml" not in paths
+    assert {"Cargo.toml", "memory.x", os.path.join("src", "main.rs")} <= paths
+
+
+def test_render_template_applies_transforms(tmp_path, template_cache, author_environment):
+    template_path = template_cache.template_path(SINGLE_CORE_TEMPLATE)
+    project_path = render_template(
+        template_path,
+        str(tmp_path / "out"),
+        "core",
+        transforms={"memory.x": lambda lines: ["/* transformed */\n"] + lines},
+    )
+    with open(os.path.join(project_path, "memory.x"), "r") as file:
+        assert file.readline() == "/* transformed */\n"
+
+
+@pytest.mark.parametrize("template_name", TEMPLATES)
+def test_native_renderer_matches_golden_tree(tmp_path, template_cache, author_environment, template_name):
+    template_path = template_cache.template_path(template_name)
+    golden_path = os.path.join(GOLDEN_DIR, template_name)
+    if UPDATE_GOLDEN:
+        # The golden trees come from cargo-generate, never from the renderer under test
+        if not cargo_generate_available():
+            pytest.fail("UPDATE_GOLDEN=1 needs cargo-generate")
+        generated = cargo_generate(template_path, str(tmp_path / "cargo"), "golden-core", load_template_values(template_path))
+        delete_files_and_directories(generated, DIRECTORIES_TO_DELETE_FROM_TEMPLATE)
+        shutil.rmtree(golden_path, ignore_errors=True)
+        shutil.copytree(generated, golden_path)
+        version = subprocess.run(["cargo", "generate", "--version"], capture_output=True, text=True, check=True).stdout
+        with open(GOLDEN_SOURCE, "w") as file:
+            file.write(version)
+    project_path = render_template(
+        template_path, str(tmp_path / "out"), "golden-core", names_to_delete=DIRECTORIES_TO_DELETE_FROM_TEMPLATE
+    )
+    assert compare_trees(golden_path, project_path) == []
+
+
+@pytest.mark.skipif(not cargo_generate_available(), reason="cargo-generate is not installed")
+@pytest.mark.parametrize("template_name", TEMPLATES)
+def test_native_renderer_matches_cargo_generate(template_cache, author_environment, template_name):
+    # A stand-in such as the one of benchmark_fixtures would only compare the renderer with itself
+    template_path = template_cache.template_path(template_name)
+    assert check_parity(template_path, load_template_values(template_path)) == []
@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+from embedded_creator import toolchain_state as toolchain_state_module
+from embedded_creator.toolchain_state import ToolchainState
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    # Every rustup and rustc command line run by the toolchain state
+    calls = []
+    run_command = toolchain_state_module.run_command
+
+    def recording_run_command(command, *args, **kwargs):
+        calls.append(" ".join(command))
+        return run_command(command, *args, **kwargs)
+
+    monkeypatch.setattr(toolchain_state_module, "run_command", recording_run_command)
+    return calls
+
+
+@pytest.fixture
+def components(offline_tools):
+    # The file rustup rewrites whenever a target or component of the toolchain is installed
+    path = os.path.join(os.environ["RUSTUP_HOME"], "toolchains", "tests", "lib", "rustlib", "components")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as file:
+        file.write("rustc-x86_64-unknown-linux-gnu\n")
+    return path
+
+
+def test_cold_state_queries_the_toolchain_once(tmp_path, components, commands):
+    state = ToolchainState(str(tmp_path / "toolchain"))
+    state.validate_arch("thumbv7em-none-eabihf")
+    state.validate_arch("thumbv6m-none-eabi")
+
+    assert commands == ["rustc --version", "rustup target list --installed", "rustc --print target-list"]
+    assert state.calls == 3
+
+
+def test_warm_state_makes_no_toolchain_call(tmp_path, components, commands):
+    ToolchainState(str(tmp_path / "toolchain")).state()
+    del commands[:]
+
+    state = ToolchainState(str(tmp_path / "toolchain"))
+    state.validate_arch("thumbv7em-none-eabihf")
+    with pytest.raises(ValueError, match="Did you mean: thumbv7em-none-eabi"):
+        state.validate_arch("thumbv7em-none-eab")
+
+    assert commands == []
+    assert state.calls == 0
+
+
+def test_changed_components_refresh_the_state(tmp_path, components, commands):
+    ToolchainState(str(tmp_path / "toolchain")).state()
+    with open(components, "a") as file:
+        file.write("rust-std-thumbv7em-none-eabihf\n")
+    del commands[:]
+
+    ToolchainState(str(tmp_path / "toolchain")).state()
+
+    assert len(commands) == 3
+
+
+def test_without_rustup_layout_only_the_rustc_version_is_checked(tmp_path, offline_tools, commands):
+    ToolchainState(str(tmp_path / "toolchain")).state()
+    del commands[:]
+
+    state = ToolchainState(str(tmp_path / "toolchain"))
+    state.validate_arch("thumbv7em-none-eabihf")
+
+    # Nothing to fingerprint: the cached lists are reused after a single 'rustc --version'
+    assert commands == ["rustc --version"]
+    assert state.calls == 1
+
+
+def test_without_rustup_layout_a_new_rustc_version_refreshes_the_state(tmp_path, offline_tools, commands):
+    state = ToolchainState(str(tmp_path / "toolchain"))
+    state.state()
+    with open(state.state_path, "r") as file:
+        cached = json.load(file)
+    cached["version"] = "rustc 1.79.0 (previous)"
+    with open(state.state_path, "w") as file:
+        json.dump(cached, file)
+    del commands[:]
+
+    assert ToolchainState(str(tmp_path / "toolchain")).state()["version"] == "rustc 1.80.0 (benchmark stand-in)"
+    assert commands == ["rustc --version", "rustc --version", "rustup target list --installed", "rustc --print target-list"]
+
+
+def test_ensure_targets_adds_only_the_missing_targets_in_one_call(tmp_path, components):
+    state = ToolchainState(str(tmp_path / "toolchain"))
+
+    assert state.ensure_targets(["thumbv7em-none-eabihf", "thumbv6m-none-eabi"]) == ["thumbv6m-none-eabi", "thumbv7em-none-eabihf"]
+    assert state.ensure_targets(["thumbv7em-none-eabihf"]) == []
+    # Three queries and a single 'rustup target add'
+    assert state.calls == 4
+    with open(os.environ["FAKE_RUSTUP_STATE"], "r") as file:
+        assert file.read().split() == ["thumbv6m-none-eabi", "thumbv7em-none-eabihf"]
@@ -0,0 +1,28 @@
+import logging
+
+import pytest
+
+from embedded_creator.tracing import LOGGER_NAME, configure_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logger():
+    logger = logging.getLogger(LOGGER_NAME)
+    handlers, level, propagate = list(logger.handlers), logger.level, logger.propagate
+    yield
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+@pytest.mark.parametrize("level", ["debug", "WARNING", "error"])
+def test_known_levels_are_applied(level):
+    configure_logging(level)
+    assert logging.getLogger(LOGGER_NAME).level == getattr(logging, level.upper())
+
+
+def test_unknown_level_falls_back_to_info_with_a_warning(monkeypatch, capsys):
+    monkeypatch.setenv("LOG_LEVEL", "bogus")
+    configure_logging()
+    assert logging.getLogger(LOGGER_NAME).level == logging.INFO
+    assert "Unknown log level 'bogus', using 'info'" in capsys.readouterr().err
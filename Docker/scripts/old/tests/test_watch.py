@@ -0,0 +1,103 @@
+import copy
+import json
+import os
+
+import pytest
+
+from embedded_creator.constants import NATIVE_RENDERER
+from embedded_creator.toolchain_state import ToolchainState
+from embedded_creator.watch import ProjectWatcher
+
+from test_project_creator import M4_CORE, M7_CORE
+
+
+@pytest.fixture
+def watched(tmp_path, template_cache, offline_tools):
+    config_path = tmp_path / "config.json"
+    config_data = {"mcu_family": "STM32H7", "config": copy.deepcopy([M4_CORE, M7_CORE])}
+    config_path.write_text(json.dumps(config_data))
+    project_watcher = ProjectWatcher(
+        "project", str(config_path), template_cache, ToolchainState(str(tmp_path / "toolchain")),
+        destination=str(tmp_path),
+        renderer=NATIVE_RENDERER,
+    )
+    assert project_watcher.start().full
+
+    def edit(change):
+        change(config_data)
+        config_path.write_text(json.dumps(config_data))
+        return project_watcher.update()
+
+    project_watcher.edit = edit
+    return project_watcher
+
+
+def test_ram_edit_rewrites_only_the_memory_x_of_its_core(watched):
+    m7_memory_x = os.path.join(watched.project_path, "cortex-m7", "memory.x")
+    m7_before = os.stat(m7_memory_x).st_mtime_ns
+
+    update = watched.edit(lambda config_data: config_data["config"][0]["memory"]["ram"].__setitem__(1, "128K"))
+
+    assert not update.full
+    assert update.files == [os.path.join("cortex-m4", "memory.x")]
+    with open(os.path.join(watched.project_path, "cortex-m4", "memory.x")) as file:
+        assert "LENGTH = 128K" in file.read()
+    assert os.stat(m7_memory_x).st_mtime_ns == m7_before
+
+
+def test_save_without_change_rewrites_nothing(watched):
+    update = watched.edit(lambda config_data: None)
+
+    assert not update.full
+    assert update.files == []
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda config_data: config_data["config"].pop(),
+        lambda config_data: config_data["config"][1].__setitem__("core", "cortex-m7-renamed"),
+        lambda config_data: config_data["config"].reverse(),
+    ],
+    ids=["core removed", "core renamed", "cores reordered"],
+)
+def test_layout_change_regenerates_the_project(watched, change):
+    update = watched.edit(change)
+
+    assert update.full
+    # The model follows the new layout: the next edit is applied to the files again
+    core_name = watched.project_config.config[0].core
+    update = watched.edit(lambda config_data: config_data["config"][0]["memory"]["ram"].__setitem__(1, "64K"))
+    assert not update.full
+    assert update.files == [os.path.join(core_name, "memory.x")]
+
+
+def test_unusable_config_is_ignored(watched):
+    memory_x = os.path.join(watched.project_path, "cortex-m4", "memory.x")
+    with open(memory_x) as file:
+        before = file.read()
+
+    assert watched.edit(lambda config_data: config_data["config"][0].__setitem__("arch", "x86")) is None
+
+    with open(memory_x) as file:
+        assert file.read() == before
+
+
+def test_cargo_generate_renderer_goes_through_the_whole_creator(tmp_path, template_cache, offline_tools):
+    config_path = tmp_path / "config.json"
+    config_data = {"mcu_family": "STM32H7", "config": copy.deepcopy([M4_CORE, M7_CORE])}
+    config_path.write_text(json.dumps(config_data))
+    project_watcher = ProjectWatcher(
+        "project", str(config_path), template_cache, ToolchainState(str(tmp_path / "toolchain")), destination=str(tmp_path)
+    )
+    project_watcher.start()
+
+    config_data["config"][0]["memory"]["ram"][1] = "64K"
+    config_path.write_text(json.dumps(config_data))
+    update = project_watcher.update()
+
+    assert update.full
+    # The .project-lock still limits the regeneration to the core whose inputs changed
+    assert list(update.cores) == ["cortex-m4"]
+    with open(os.path.join(project_watcher.project_path, "cortex-m4", "memory.x")) as file:
+        assert "LENGTH = 64K" in file.read()